@@ -0,0 +1,121 @@
+"""
+Deterministic fixtures for benchmarks.
+
+Builds a representative mid-run system state, agent responses, a media spec
+and a pre-populated approval ledger, shaped like a standard 6-module course.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+from unittest.mock import patch
+
+from orchestrator.providers.dry_run_provider import DryRunProvider
+from schemas.system_state import get_initial_state
+
+LEARNING_ARCHITECT_PROMPT = "# Learning Architect Agent\nDesign the curriculum."
+
+
+def build_learning_architect_response() -> str:
+    """Raw (JSON string) learning architect output from the dry-run stub."""
+    return DryRunProvider().run(LEARNING_ARCHITECT_PROMPT)
+
+
+def build_state() -> Dict[str, Any]:
+    """
+    A system state as it looks entering the QA step: curriculum, module
+    designs, assessments and storyboards for six modules.
+    """
+    state = get_initial_state()
+    la = json.loads(build_learning_architect_response())["updated_state"]
+    state.update(la)
+    state["strategy"] = {
+        "course_title": la["course_title"],
+        "business_goal": "Reduce time-to-proficiency for new team members",
+        "success_metrics": ["Time to first solo client call", "QA pass rate"],
+    }
+    state["research"] = {
+        "personas": [
+            {"name": f"Persona {i}", "pain_points": [f"Pain point {i}.{j}" for j in range(4)]}
+            for i in range(3)
+        ]
+    }
+
+    modules = la["curriculum"]["modules"]
+    state["module_designs"] = [
+        {
+            "module_id": m["module_id"],
+            "title": m["title"],
+            "lessons": [
+                {
+                    "lesson_id": f"{m['module_id']}.L{l}",
+                    "title": f"{m['title']} lesson {l}",
+                    "content_outline": [f"Point {p}: {m['outcome']}" for p in range(5)],
+                    "practice": f"[Scenario: {m['title']} practice {l}]",
+                }
+                for l in range(1, 4)
+            ],
+        }
+        for m in modules
+    ]
+    state["assessments"] = {
+        "questions": [
+            {
+                "question_id": f"Q{i + 1}",
+                "module_id": m["module_id"],
+                "objective_ref": obj,
+                "stem": f"Which action best satisfies: {obj}",
+                "options": [f"Option {c}" for c in "ABCD"],
+                "correct_option": "A",
+                "rationale": "Option A applies the checklist exactly.",
+            }
+            for i, (m, obj) in enumerate((m, o) for m in modules for o in m["objectives"])
+        ]
+    }
+    state["storyboards"] = json.loads(DryRunProvider()._create_storyboard_stub())["updated_state"]["storyboards"]
+    return state
+
+
+def build_media_spec(num_assets: int = 6, slides_per_asset: int = 5) -> Dict[str, Any]:
+    """A media spec with ``num_assets`` learning objects of ``slides_per_asset`` slides."""
+    return {
+        "course_id": "bench_course",
+        "architecture_hash": "0" * 64,
+        "generated_at_utc": "2026-01-01T00:00:00Z",
+        "media_assets": [
+            {
+                "learning_object_id": f"lo_{a + 1}",
+                "slides": [
+                    {
+                        "order": s + 1,
+                        "layout": "title" if s == 0 else "bullet_list",
+                        "title": f"LO {a + 1} slide {s + 1}",
+                        "bullets": [f"Bullet {b}" for b in range(4)],
+                        "narration": "Narration text for this slide. " * 4,
+                        "visual_prompt": "A clean diagram of the process",
+                    }
+                    for s in range(slides_per_asset)
+                ],
+            }
+            for a in range(num_assets)
+        ],
+    }
+
+
+def build_approval_ledger(ledger_path: Path, entries: int) -> None:
+    """Populate a hash-chained approval ledger at ``ledger_path`` with ``entries`` entries."""
+    from governance import approval_ledger
+
+    ledger_path = Path(ledger_path)
+    ledger_path.parent.mkdir(parents=True, exist_ok=True)
+    if ledger_path.exists():
+        ledger_path.unlink()
+    with patch.object(approval_ledger, "_get_ledger_path", lambda: str(ledger_path)):
+        for i in range(entries):
+            approval_ledger.append_entry(
+                action="SIGNAL_CREATED",
+                actor="bench",
+                target_artifact_id=f"signal-{i:06d}",
+                evidence_ref=f"knowledge/signals/signal-{i:06d}.json",
+                decision_metadata={"seq_hint": i},
+            )
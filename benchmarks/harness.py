@@ -0,0 +1,305 @@
+"""
+Benchmark harness - timing, result persistence and regression comparison.
+
+This module provides utilities for:
+- Timing a callable over several repeats (min/median/mean/max/stdev in ms)
+- Running a dry-run pipeline inside an isolated sandbox directory
+- Writing and reading benchmark result files under baselines/benchmarks/
+- Comparing two result files and flagging regressions beyond a threshold
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+BASELINES_DIR = PROJECT_ROOT / "baselines" / "benchmarks"
+DEFAULT_BASELINE_PATH = BASELINES_DIR / "baseline.json"
+DEFAULT_RESULTS_PATH = BASELINES_DIR / "latest.json"
+FIXTURE_INPUTS_DIR = PROJECT_ROOT / "tests" / "fixtures" / "golden_run"
+
+RESULTS_SCHEMA_VERSION = 1
+
+# Default relative slowdown (25%) before a benchmark is flagged as regressed
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class Benchmark:
+    """A named benchmark case.
+
+    ``func`` is timed ``number`` times per repeat. ``setup`` (optional) runs
+    before every repeat and is excluded from the timing.
+    """
+    name: str
+    func: Callable[[], Any]
+    setup: Optional[Callable[[], Any]] = None
+    number: int = 1
+
+
+# ------------------------------------------------------------------------------
+# Timing
+# ------------------------------------------------------------------------------
+
+def measure(
+    func: Callable[[], Any],
+    repeat: int = 5,
+    number: int = 1,
+    setup: Optional[Callable[[], Any]] = None,
+    warmup: int = 1,
+) -> Dict[str, float]:
+    """
+    Time ``func`` and return per-call statistics in milliseconds.
+
+    Args:
+        func: Zero-argument callable to time
+        repeat: Number of timed samples
+        number: Calls per sample (the sample is divided by this)
+        setup: Optional callable run before every sample (not timed)
+        warmup: Untimed calls made before sampling starts
+
+    Returns:
+        Dict with min_ms, median_ms, mean_ms, max_ms, stdev_ms, repeat, number
+    """
+    repeat = max(1, repeat)
+    number = max(1, number)
+
+    for _ in range(max(0, warmup)):
+        if setup:
+            setup()
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed * 1000.0 / number)
+
+    return {
+        "min_ms": round(min(samples), 6),
+        "median_ms": round(statistics.median(samples), 6),
+        "mean_ms": round(statistics.fmean(samples), 6),
+        "max_ms": round(max(samples), 6),
+        "stdev_ms": round(statistics.stdev(samples), 6) if len(samples) > 1 else 0.0,
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: int = 5, quiet: bool = False) -> Dict[str, Dict[str, float]]:
+    """Run each benchmark and return a mapping of name -> timing stats."""
+    results = {}
+    for bench in benchmarks:
+        stats = measure(bench.func, repeat=repeat, number=bench.number, setup=bench.setup)
+        results[bench.name] = stats
+        if not quiet:
+            print(f"   {bench.name:55s} median={stats['median_ms']:10.4f} ms")
+    return results
+
+
+# ------------------------------------------------------------------------------
+# Dry-Run Sandbox
+# ------------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def pipeline_sandbox(inputs_dir: Optional[Path] = None, provider: str = "dry_run") -> Iterator[Path]:
+    """
+    Create an isolated working directory for dry-run pipeline executions.
+
+    The orchestrator resolves config/, prompts/, outputs/ and governance/
+    relative to the current directory, so we copy config and prompts into a
+    temp directory, chdir into it and force ``provider`` (dry_run, or
+    synthetic for realistic state growth) with auto-approval. Environment
+    and cwd are restored on exit.
+
+    Yields:
+        Path to the sandbox root
+    """
+    inputs_dir = Path(inputs_dir or FIXTURE_INPUTS_DIR)
+    env_keys = ("PROVIDER", "AUTO_APPROVE", "AUTO_APPROVE_SOURCE")
+    saved_env = {k: os.environ.get(k) for k in env_keys}
+    saved_cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix="adk_bench_") as tmp:
+        root = Path(tmp)
+        shutil.copytree(PROJECT_ROOT / "config", root / "config")
+        shutil.copytree(PROJECT_ROOT / "prompts", root / "prompts")
+        shutil.copy2(PROJECT_ROOT / "VERSION", root / "VERSION")
+        (root / "inputs").mkdir()
+        for name in ("business_brief.md", "sme_notes.md"):
+            shutil.copy2(inputs_dir / name, root / "inputs" / name)
+
+        os.environ["PROVIDER"] = provider
+        os.environ["AUTO_APPROVE"] = "1"
+        os.environ["AUTO_APPROVE_SOURCE"] = "cli_flag"
+        os.chdir(root)
+        try:
+            yield root
+        finally:
+            os.chdir(saved_cwd)
+            for k, v in saved_env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+
+def reset_sandbox(root: Path) -> None:
+    """Remove run outputs and ledgers from a sandbox so runs stay independent."""
+    shutil.rmtree(root / "outputs", ignore_errors=True)
+    shutil.rmtree(root / "governance", ignore_errors=True)
+
+
+def run_dry_pipeline(root: Path) -> Path:
+    """Run the full dry-run pipeline in the sandbox (stdout suppressed) and return the run dir."""
+    from orchestrator.root_agent import run_pipeline
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_pipeline(inputs_dir=str(root / "inputs"))
+
+    runs = sorted((root / "outputs").iterdir())
+    return runs[-1]
+
+
+# ------------------------------------------------------------------------------
+# Result Files
+# ------------------------------------------------------------------------------
+
+def build_results_document(suite: str, results: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """Wrap raw timing results with environment metadata."""
+    version_path = PROJECT_ROOT / "VERSION"
+    system_version = version_path.read_text().strip() if version_path.exists() else "unknown"
+    return {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "suite": suite,
+        "created_at_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        "system_version": system_version,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": dict(sorted(results.items())),
+    }
+
+
+def write_results(path: Path, document: Dict[str, Any]) -> None:
+    """Write a results document as indented, key-sorted JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def read_results(path: Path) -> Dict[str, Any]:
+    """
+    Read a results document.
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the schema version is unsupported
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Benchmark results not found: {path}")
+    with open(path, "r") as f:
+        document = json.load(f)
+    if document.get("schema_version") != RESULTS_SCHEMA_VERSION:
+        raise ValueError(
+            f"Unsupported benchmark schema_version {document.get('schema_version')!r} in {path}"
+        )
+    return document
+
+
+# ------------------------------------------------------------------------------
+# Comparison
+# ------------------------------------------------------------------------------
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = 0.0,
+    metric: str = "min_ms",
+) -> Dict[str, Any]:
+    """
+    Compare two results documents benchmark by benchmark.
+
+    A benchmark regresses when ``current > baseline * (1 + threshold)`` and
+    the absolute slowdown exceeds ``min_delta_ms`` (guards sub-microsecond noise).
+    The default metric is the fastest sample (``min_ms``), which is far less
+    sensitive to scheduler noise than the median on shared machines.
+
+    Returns:
+        Dict with 'regressions', 'improvements', 'unchanged', 'missing' (in
+        baseline only) and 'new' (in current only). Each compared entry holds
+        name, baseline_ms, current_ms and ratio.
+    """
+    base_results = baseline.get("results", {})
+    cur_results = current.get("results", {})
+
+    report = {"regressions": [], "improvements": [], "unchanged": [], "missing": [], "new": []}
+
+    for name in sorted(set(base_results) | set(cur_results)):
+        if name not in cur_results:
+            report["missing"].append(name)
+            continue
+        if name not in base_results:
+            report["new"].append(name)
+            continue
+
+        base_ms = float(base_results[name][metric])
+        cur_ms = float(cur_results[name][metric])
+        ratio = (cur_ms / base_ms) if base_ms > 0 else float("inf")
+        entry = {
+            "name": name,
+            "baseline_ms": base_ms,
+            "current_ms": cur_ms,
+            "ratio": round(ratio, 4),
+        }
+
+        delta = cur_ms - base_ms
+        if ratio > 1.0 + threshold and delta > min_delta_ms:
+            report["regressions"].append(entry)
+        elif ratio < 1.0 - threshold and -delta > min_delta_ms:
+            report["improvements"].append(entry)
+        else:
+            report["unchanged"].append(entry)
+
+    return report
+
+
+def format_comparison(report: Dict[str, Any], threshold: float) -> str:
+    """Render a comparison report as plain text."""
+    lines = [f"Benchmark comparison (threshold: {threshold:.0%})", ""]
+    for label, key in (("REGRESSED", "regressions"), ("IMPROVED", "improvements"), ("OK", "unchanged")):
+        for e in report[key]:
+            lines.append(
+                f"  {label:9s} {e['name']:55s} {e['baseline_ms']:10.3f} -> {e['current_ms']:10.3f} ms  (x{e['ratio']:.2f})"
+            )
+    for name in report["missing"]:
+        lines.append(f"  {'MISSING':9s} {name}")
+    for name in report["new"]:
+        lines.append(f"  {'NEW':9s} {name}")
+    lines.append("")
+    lines.append(
+        f"{len(report['regressions'])} regressed, {len(report['improvements'])} improved, "
+        f"{len(report['unchanged'])} unchanged, {len(report['missing'])} missing, {len(report['new'])} new"
+    )
+    return "\n".join(lines)
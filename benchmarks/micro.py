@@ -0,0 +1,119 @@
+"""
+Micro-benchmarks for the hot helpers of a pipeline run.
+
+Each case isolates one function on a representative 6-module course so a
+change in its cost shows up independently of provider latency.
+"""
+
+import copy
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+from benchmarks.fixtures import (
+    build_approval_ledger,
+    build_learning_architect_response,
+    build_media_spec,
+    build_state,
+)
+from benchmarks.harness import Benchmark, pipeline_sandbox, run_benchmarks, run_dry_pipeline
+
+LEDGER_ENTRIES = 500
+
+
+def build_micro_benchmarks(workdir: Path) -> List[Benchmark]:
+    """
+    Construct the micro-benchmark cases.
+
+    Args:
+        workdir: Scratch directory (must outlive the returned benchmarks)
+
+    Returns:
+        List of Benchmark cases
+    """
+    from governance import approval_ledger
+    from orchestrator import root_agent, validation
+    from orchestrator.audit import generate_audit_summary
+    from orchestrator.json_tools import parse_json_object
+    from orchestrator.quality.quality_score import calculate_quality_score
+    from orchestrator.run_artifacts import ensure_run_dirs, write_checkpoint
+    from services.delivery_packager import DeliveryPackager
+
+    workdir = Path(workdir)
+    state = build_state()
+    la_raw = build_learning_architect_response()
+    la_fenced = "Here is the output:\n```json\n" + la_raw + "\n```\nLet me know if you need changes."
+    la_parsed = json.loads(la_raw)
+    update = {"module_designs": state["module_designs"], "storyboards": state["storyboards"]}
+    vcfg = validation.ValidationConfig(min_deliverable_chars=300, placeholder_markers=["[Missing", "TBD", "TODO"])
+
+    checkpoints_dir = ensure_run_dirs(workdir / "run")
+
+    # A completed dry run provides the run dir for audit and quality scoring
+    with pipeline_sandbox() as root:
+        sandbox_run_dir = run_dry_pipeline(root)
+        run_copy = workdir / "dry_run" / sandbox_run_dir.name
+        run_copy.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copytree(sandbox_run_dir, run_copy)
+        ledger_copy = workdir / "dry_run" / "run_ledger.jsonl"
+        shutil.copy2(root / "governance" / "run_ledger.jsonl", ledger_copy)
+
+    ledger_seed = workdir / "approval_seed.jsonl"
+    ledger_path = workdir / "approval_ledger.jsonl"
+    build_approval_ledger(ledger_seed, LEDGER_ENTRIES)
+
+    def reset_ledger():
+        ledger_path.write_bytes(ledger_seed.read_bytes())
+
+    def append_entry():
+        with patch.object(approval_ledger, "_get_ledger_path", lambda: str(ledger_path)):
+            approval_ledger.append_entry("SIGNAL_CREATED", "bench", "signal-bench", None, {"k": 1})
+
+    def verify_ledger():
+        with patch.object(approval_ledger, "_get_ledger_path", lambda: str(ledger_seed)):
+            approval_ledger.verify_ledger()
+
+    validation_target = copy.deepcopy(state)
+    media_spec = build_media_spec()
+    packager = DeliveryPackager(workdir / "package")
+
+    return [
+        Benchmark("micro.prune_system_state.learning_architect_agent",
+                  lambda: root_agent.prune_system_state(state, "learning_architect_agent"), number=20),
+        Benchmark("micro.prune_system_state.storyboard_agent",
+                  lambda: root_agent.prune_system_state(state, "storyboard_agent"), number=20),
+        Benchmark("micro.prune_system_state.qa_agent",
+                  lambda: root_agent.prune_system_state(state, "qa_agent"), number=20),
+        Benchmark("micro.deep_merge.root_agent",
+                  lambda: root_agent.deep_merge(state, update), number=200),
+        Benchmark("micro.deep_merge.validation",
+                  lambda: validation.deep_merge(validation_target, update), number=200),
+        Benchmark("micro.parse_json_object.bare",
+                  lambda: parse_json_object(la_raw), number=50),
+        Benchmark("micro.parse_json_object.fenced",
+                  lambda: parse_json_object(la_fenced), number=50),
+        Benchmark("micro.validate_agent_output.learning_architect_agent",
+                  lambda: validation.validate_agent_output("learning_architect_agent", la_parsed, vcfg), number=200),
+        Benchmark("micro.write_checkpoint",
+                  lambda: write_checkpoint(checkpoints_dir, 8, state), number=10),
+        Benchmark("micro.generate_audit_summary",
+                  lambda: generate_audit_summary(run_copy.name, str(run_copy), ledger_path=str(ledger_copy),
+                                                 suppress_ledger_events=True), number=5),
+        Benchmark("micro.calculate_quality_score",
+                  lambda: calculate_quality_score(str(run_copy)), number=10),
+        Benchmark(f"micro.approval_ledger.append_entry.{LEDGER_ENTRIES}",
+                  append_entry, setup=reset_ledger, number=10),
+        Benchmark(f"micro.approval_ledger.verify_ledger.{LEDGER_ENTRIES}",
+                  verify_ledger, number=2),
+        Benchmark("micro.delivery_packager.process",
+                  lambda: packager.process(media_spec), number=3),
+    ]
+
+
+def run_micro_suite(repeat: int = 5, quiet: bool = False):
+    """Build and run the micro suite in a temporary scratch directory."""
+    with tempfile.TemporaryDirectory(prefix="adk_micro_") as tmp:
+        return run_benchmarks(build_micro_benchmarks(Path(tmp)), repeat=repeat, quiet=quiet)
@@ -0,0 +1,66 @@
+"""
+End-to-end dry-run pipeline throughput benchmark.
+
+Runs the full 10-step pipeline inside an isolated sandbox, once with the
+dry_run provider and once with the synthetic provider. Provider latency is
+zero, so the timing captures orchestration overhead only: prompt rendering,
+pruning, parsing, validation, state merges, checkpoints, manifest rewrites,
+ledger appends and the audit summary. The dry_run stubs leave the state
+nearly empty; the synthetic outputs grow it like a real run, so
+``pipeline.synthetic.full`` also reports the final state and run directory
+sizes.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.harness import measure, pipeline_sandbox, reset_sandbox, run_dry_pipeline
+
+PIPELINE_PROVIDERS = ("dry_run", "synthetic")
+
+
+def _dir_kib(path: Path) -> float:
+    return round(sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) / 1024.0, 1)
+
+
+def run_pipeline_suite(repeat: int = 5, quiet: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Time full pipeline executions with each of PIPELINE_PROVIDERS.
+
+    Returns:
+        Mapping with 'pipeline.dry_run.full' and 'pipeline.synthetic.full'
+        entries whose stats also carry runs_per_min and steps_per_sec derived
+        from the median; the synthetic entry adds state_kib and run_dir_kib
+    """
+    results = {}
+    for provider in PIPELINE_PROVIDERS:
+        with pipeline_sandbox(provider=provider) as root:
+            with open(root / "config" / "run_config.json") as f:
+                num_steps = len(json.load(f)["agents"])
+
+            stats = measure(
+                lambda: run_dry_pipeline(root),
+                repeat=repeat,
+                number=1,
+                setup=lambda: reset_sandbox(root),
+            )
+            if provider == "synthetic":
+                reset_sandbox(root)
+                run_dir = run_dry_pipeline(root)
+                stats["state_kib"] = round((run_dir / "99_final_state.json").stat().st_size / 1024.0, 1)
+                stats["run_dir_kib"] = _dir_kib(run_dir)
+
+        median_s = stats["median_ms"] / 1000.0
+        stats["steps"] = num_steps
+        stats["runs_per_min"] = round(60.0 / median_s, 3) if median_s > 0 else 0.0
+        stats["steps_per_sec"] = round(num_steps / median_s, 3) if median_s > 0 else 0.0
+
+        name = f"pipeline.{provider}.full"
+        if not quiet:
+            print(
+                f"   {name:55s} median={stats['median_ms']:10.3f} ms "
+                f"({stats['runs_per_min']:.1f} runs/min, {stats['steps_per_sec']:.1f} steps/s)"
+            )
+        results[name] = stats
+    return results
@@ -0,0 +1,167 @@
+"""
+Scaling benchmarks - time and peak memory versus course size.
+
+Runs each pipeline hot path against the synthetic size ladder
+(benchmarks/synthetic.py) so super-linear behavior shows up as a curve
+rather than a single number. Result names are ``scaling.<op>.<size>``;
+each entry carries the usual timing stats plus ``peak_kib`` (tracemalloc
+peak of one extra, untimed call) and the synthetic spec label, so the
+results documents can be diffed release over release with compare_results.
+"""
+
+import copy
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from benchmarks.harness import BASELINES_DIR, Benchmark, measure
+from benchmarks.synthetic import (
+    SIZE_LADDER,
+    SyntheticCourseSpec,
+    generate_business_brief,
+    generate_learning_architect_response,
+    generate_media_spec,
+    generate_sme_notes,
+    generate_state,
+    write_run_dir,
+)
+
+SCALING_OPS = (
+    "prompt_render",
+    "prune_system_state",
+    "deep_merge",
+    "write_checkpoint",
+    "validate_agent_output",
+    "calculate_quality_score",
+    "generate_audit_summary",
+    "delivery_packager",
+)
+
+
+def scaling_results_path(system_version: str) -> Path:
+    """Per-release scaling results file, e.g. baselines/benchmarks/scaling_3.1.0.json."""
+    return BASELINES_DIR / f"scaling_{system_version}.json"
+
+
+def peak_memory_kib(func: Callable[[], Any], setup: Optional[Callable[[], Any]] = None) -> float:
+    """Peak traced allocation (KiB) during a single call of ``func``."""
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024.0, 1)
+
+
+def build_scaling_benchmarks(size: str, spec: SyntheticCourseSpec, workdir: Path) -> List[Benchmark]:
+    """
+    Construct the scaling cases for one rung of the size ladder.
+
+    Args:
+        size: Ladder label used in benchmark names (e.g. "m")
+        spec: Synthetic course spec for this rung
+        workdir: Scratch directory (must outlive the returned benchmarks)
+    """
+    from orchestrator import root_agent, validation
+    from orchestrator.audit import generate_audit_summary
+    from orchestrator.json_tools import parse_json_object
+    from orchestrator.quality.quality_score import calculate_quality_score
+    from orchestrator.run_artifacts import ensure_run_dirs, write_checkpoint
+    from services.delivery_packager import DeliveryPackager
+
+    workdir = Path(workdir) / size
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    prompt_template = (Path(root_agent.__file__).parent.parent / "prompts" / "qa" / "prompt.md").read_text()
+    business_brief = generate_business_brief(spec)
+    sme_notes = generate_sme_notes(spec)
+    state = generate_state(spec)
+    # Merging the full state into itself exercises every nested dict
+    update = copy.deepcopy(state)
+    la_parsed = parse_json_object(generate_learning_architect_response(spec))
+    vcfg = validation.ValidationConfig(min_deliverable_chars=300, placeholder_markers=["[Missing", "TBD", "TODO"])
+
+    checkpoints_dir = ensure_run_dirs(workdir / "run")
+    ledger_path = workdir / "run_ledger.jsonl"
+    run_dir = write_run_dir(spec, workdir / "outputs" / f"synthetic_{size}", ledger_path)
+    media_spec = generate_media_spec(spec)
+    packager = DeliveryPackager(workdir / "package")
+
+    def prefix(op: str) -> str:
+        return f"scaling.{op}.{size}"
+
+    return [
+        Benchmark(prefix("prompt_render"),
+                  lambda: root_agent.render_prompt(prompt_template, "qa_agent", business_brief, sme_notes, state)),
+        Benchmark(prefix("prune_system_state"),
+                  lambda: root_agent.prune_system_state(state, "qa_agent")),
+        Benchmark(prefix("deep_merge"),
+                  lambda: root_agent.deep_merge(state, update)),
+        Benchmark(prefix("write_checkpoint"),
+                  lambda: write_checkpoint(checkpoints_dir, 8, state)),
+        Benchmark(prefix("validate_agent_output"),
+                  lambda: validation.validate_agent_output("learning_architect_agent", copy.deepcopy(la_parsed), vcfg)),
+        Benchmark(prefix("calculate_quality_score"),
+                  lambda: calculate_quality_score(str(run_dir))),
+        Benchmark(prefix("generate_audit_summary"),
+                  lambda: generate_audit_summary(run_dir.name, str(run_dir), ledger_path=str(ledger_path),
+                                                 suppress_ledger_events=True)),
+        Benchmark(prefix("delivery_packager"),
+                  lambda: packager.process(media_spec)),
+    ]
+
+
+def run_scaling_suite(
+    sizes: Optional[Iterable[str]] = None,
+    repeat: int = 3,
+    quiet: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the scaling suite over the requested ladder rungs.
+
+    Returns:
+        Mapping of ``scaling.<op>.<size>`` -> timing stats + peak_kib + spec label
+    """
+    sizes = list(sizes or SIZE_LADDER)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="adk_scaling_") as tmp:
+        for size in sizes:
+            spec = SIZE_LADDER[size]
+            if not quiet:
+                print(f"\n   [{size}] {spec.label}")
+            for bench in build_scaling_benchmarks(size, spec, Path(tmp)):
+                stats = measure(bench.func, repeat=repeat, number=bench.number, setup=bench.setup)
+                stats["peak_kib"] = peak_memory_kib(bench.func, bench.setup)
+                stats["spec"] = spec.label
+                results[bench.name] = stats
+                if not quiet:
+                    print(f"   {bench.name:55s} median={stats['median_ms']:10.4f} ms  peak={stats['peak_kib']:10.1f} KiB")
+    return results
+
+
+def format_scaling_table(results: Dict[str, Dict[str, Any]], metric: str = "median_ms") -> str:
+    """Render results as an op x size table (one column per ladder rung)."""
+    sizes = [s for s in SIZE_LADDER if any(name.endswith(f".{s}") for name in results)]
+    lines = [f"{'operation':28s}" + "".join(f"{s:>14s}" for s in sizes)]
+    for op in SCALING_OPS:
+        row = f"{op:28s}"
+        for s in sizes:
+            entry = results.get(f"scaling.{op}.{s}")
+            row += f"{entry[metric]:14.3f}" if entry else f"{'-':>14s}"
+        lines.append(row)
+    return "\n".join(lines)
+
+
+def load_scaling_history(directory: Path = BASELINES_DIR) -> Dict[str, Dict[str, Any]]:
+    """Load every committed scaling_<version>.json, keyed by system version."""
+    history = {}
+    for path in sorted(Path(directory).glob("scaling_*.json")):
+        with open(path, "r") as f:
+            document = json.load(f)
+        history[document.get("system_version", path.stem[len("scaling_"):])] = document
+    return history
@@ -0,0 +1,311 @@
+"""
+Synthetic large-course generator.
+
+Produces deterministic, parameterized courses for scaling benchmarks: inputs
+(business brief, SME notes of a target size), a full end-of-run system
+state, a contract-valid learning architect response, a media spec and a
+populated run directory (deliverables, step state files, manifest, ledger).
+
+Every output is derived from a seeded random.Random, so the same spec
+always yields byte-identical artifacts.
+"""
+
+import json
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.fixtures import build_media_spec
+from schemas.system_state import get_initial_state
+
+AGENT_SEQUENCE = [
+    "strategy_lead_agent",
+    "learner_research_agent",
+    "learning_architect_agent",
+    "instructional_designer_agent",
+    "assessment_designer_agent",
+    "storyboard_agent",
+    "media_producer_agent",
+    "qa_agent",
+    "change_management_agent",
+    "operations_librarian_agent",
+]
+
+_VOCABULARY = (
+    "policy escalation client onboarding checklist exception approval risk audit evidence "
+    "handoff stakeholder workflow remediation accountability governance threshold variance "
+    "reconciliation dialogue coaching feedback scenario compliance retention service ledger "
+    "incident root-cause mitigation owner cadence dashboard metric baseline pilot rollout"
+).split()
+
+
+@dataclass(frozen=True)
+class SyntheticCourseSpec:
+    """Size knobs for a synthetic course."""
+    num_modules: int = 6
+    objectives_per_module: int = 2
+    lessons_per_module: int = 3
+    assessment_items: int = 12
+    sme_notes_kib: int = 3
+    seed: int = 7
+
+    @property
+    def label(self) -> str:
+        return (
+            f"m{self.num_modules:03d}_o{self.objectives_per_module}"
+            f"_q{self.assessment_items:04d}_sme{self.sme_notes_kib}k"
+        )
+
+
+# Size ladder used by the scaling benchmark (smallest = today's fixture shape)
+SIZE_LADDER = {
+    "s": SyntheticCourseSpec(),
+    "m": SyntheticCourseSpec(num_modules=12, objectives_per_module=3, assessment_items=72, sme_notes_kib=64),
+    "l": SyntheticCourseSpec(num_modules=30, objectives_per_module=4, assessment_items=240, sme_notes_kib=512),
+    "xl": SyntheticCourseSpec(num_modules=30, objectives_per_module=6, lessons_per_module=5,
+                              assessment_items=500, sme_notes_kib=2048),
+}
+
+
+# ------------------------------------------------------------------------------
+# Text
+# ------------------------------------------------------------------------------
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    text = " ".join(rng.choice(_VOCABULARY) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def generate_sme_notes(spec: SyntheticCourseSpec) -> str:
+    """SME notes of approximately ``spec.sme_notes_kib`` KiB, split into headed sections."""
+    rng = random.Random(spec.seed * 31 + 1)
+    target = spec.sme_notes_kib * 1024
+    parts = ["# SME Notes (synthetic)\n"]
+    size = len(parts[0])
+    section = 0
+    while size < target:
+        section += 1
+        block = [f"\n## Section {section}: {rng.choice(_VOCABULARY).title()} practices\n"]
+        for _ in range(6):
+            block.append("- " + _sentence(rng) + "\n")
+        chunk = "".join(block)
+        parts.append(chunk)
+        size += len(chunk)
+    return "".join(parts)[:target]
+
+
+def generate_business_brief(spec: SyntheticCourseSpec) -> str:
+    rng = random.Random(spec.seed * 31 + 2)
+    lines = [
+        "# Business Brief (synthetic)",
+        "",
+        f"## Goal\n{_sentence(rng, 20)}",
+        "",
+        "## Audience\nClient-facing operations staff in their first 90 days.",
+        "",
+        "## Success Metrics",
+    ]
+    lines.extend(f"- {_sentence(rng, 10)}" for _ in range(5))
+    lines.append("")
+    lines.append(f"## Scope\nThe course spans {spec.num_modules} modules.")
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------------------------------
+# State
+# ------------------------------------------------------------------------------
+
+def generate_modules(spec: SyntheticCourseSpec) -> List[Dict[str, Any]]:
+    """Curriculum modules satisfying the learning architect contract."""
+    rng = random.Random(spec.seed * 31 + 3)
+    modules = []
+    for i in range(1, spec.num_modules + 1):
+        mid = f"M{i}"
+        modules.append({
+            "module_id": mid,
+            "title": f"{rng.choice(_VOCABULARY).title()} {rng.choice(_VOCABULARY).title()} ({mid})",
+            "outcome": f"Apply {mid} practices to realistic client scenarios.",
+            "objectives": [
+                f"{mid}.{o}: Evaluate {rng.choice(_VOCABULARY)} decisions against the {rng.choice(_VOCABULARY)} checklist."
+                for o in range(1, spec.objectives_per_module + 1)
+            ],
+            "key_concepts": [f"{mid} concept {c}" for c in "ABCD"],
+            "activities": [f"{mid} activity {a}: {_sentence(rng, 8)}" for a in (1, 2)],
+            "checks": [
+                {"type": "mcq", "prompt": f"{mid}: Which option applies the principle?",
+                 "success_criteria": ["Selects the compliant option"]},
+                {"type": "scenario", "prompt": f"{mid}: Resolve the escalation scenario.",
+                 "success_criteria": ["Cites the governing policy"]},
+            ],
+        })
+    return modules
+
+
+def generate_state(spec: SyntheticCourseSpec) -> Dict[str, Any]:
+    """A full end-of-run system state for ``spec``."""
+    rng = random.Random(spec.seed * 31 + 4)
+    modules = generate_modules(spec)
+    objectives = [(m["module_id"], o) for m in modules for o in m["objectives"]]
+
+    state = get_initial_state()
+    state["inputs"] = {"business_brief_chars": len(generate_business_brief(spec)),
+                       "sme_notes_chars": spec.sme_notes_kib * 1024}
+    state["strategy"] = {
+        "course_title": f"Synthetic Course {spec.label}",
+        "business_goal": _sentence(rng, 16),
+        "success_metrics": [_sentence(rng, 8) for _ in range(4)],
+    }
+    state["research"] = {
+        "personas": [
+            {"name": f"Persona {p}", "pain_points": [_sentence(rng, 10) for _ in range(4)]}
+            for p in range(1, 4)
+        ]
+    }
+    state["curriculum"] = {"modules": modules}
+    state["module_designs"] = [
+        {
+            "module_id": m["module_id"],
+            "title": m["title"],
+            "lessons": [
+                {
+                    "lesson_id": f"{m['module_id']}.L{l}",
+                    "title": f"{m['title']} lesson {l}",
+                    "content_outline": [_sentence(rng, 12) for _ in range(4)],
+                    "practice": f"[Scenario: {m['module_id']}-{l}] {_sentence(rng, 10)}",
+                }
+                for l in range(1, spec.lessons_per_module + 1)
+            ],
+        }
+        for m in modules
+    ]
+    state["assessments"] = {
+        "questions": [
+            {
+                "question_id": f"Q{q + 1}",
+                "module_id": objectives[q % len(objectives)][0],
+                "objective_ref": objectives[q % len(objectives)][1],
+                "stem": _sentence(rng, 18),
+                "options": [_sentence(rng, 6) for _ in range(4)],
+                "correct_option": rng.choice("ABCD"),
+                "rationale": _sentence(rng, 12),
+            }
+            for q in range(spec.assessment_items)
+        ]
+    }
+    state["storyboards"] = [
+        {
+            "module_id": m["module_id"],
+            "screen_id": s,
+            "visual_layout": "Content Slide",
+            "media_asset_description": _sentence(rng, 10),
+            "alt_text": f"{m['module_id']} screen {s}",
+            "dev_notes": _sentence(rng, 8),
+            "transformational_dilemma": "Transformational Dilemma: " + _sentence(rng, 10),
+            "governance_anchor": "Governance Anchor: " + _sentence(rng, 8),
+            "dialogue_prompts": [f"Dialogue Prompt {d}: {_sentence(rng, 8)}" for d in (1, 2)],
+            "level_3_behavior_signal": "Level 3 Behavior Signal: " + _sentence(rng, 8),
+        }
+        for m in modules
+        for s in range(1, spec.lessons_per_module + 1)
+    ]
+    state["qa_findings"] = [
+        {"finding_id": f"F{f + 1}", "severity": rng.choice(["MINOR", "MAJOR"]), "detail": _sentence(rng, 14)}
+        for f in range(spec.num_modules)
+    ]
+    state["asset_catalog"] = [
+        {"asset_id": f"{m['module_id']}-A{a}", "type": "slide_deck", "owner": "L&D Ops"}
+        for m in modules
+        for a in (1, 2)
+    ]
+    return state
+
+
+def generate_learning_architect_response(spec: SyntheticCourseSpec) -> str:
+    """Contract-valid learning architect output (raw JSON string) with ``spec.num_modules`` modules."""
+    deliverable = "# Course Architecture (synthetic)\n\n" + "\n".join(
+        f"| {m['module_id']} | {m['title']} | {m['outcome']} |" for m in generate_modules(spec)
+    )
+    deliverable += "\n\n" + "Synthetic learning architect output for scaling benchmarks. " * 6
+    response = {
+        "deliverable_markdown": deliverable,
+        "updated_state": {
+            "course_title": f"Synthetic Course {spec.label}",
+            "course_summary": "Synthetic course used for scaling benchmarks.",
+            "target_audience": "Client-facing operations staff.",
+            "business_goal_alignment": ["Reduce time-to-proficiency"],
+            "belief_behavior_systems": {"belief": "Practice builds confidence", "behaviors": [],
+                                        "systems_policies_enablers": []},
+            "curriculum": {"modules": generate_modules(spec)},
+            "constraints": {"length_minutes": 30 * spec.num_modules},
+            "assumptions": [f"JUSTIFICATION: module_count={spec.num_modules} (synthetic)"],
+        },
+        "open_questions": [],
+    }
+    return json.dumps(response, indent=2)
+
+
+def generate_media_spec(spec: SyntheticCourseSpec) -> Dict[str, Any]:
+    return build_media_spec(num_assets=spec.num_modules, slides_per_asset=spec.lessons_per_module + 2)
+
+
+# ------------------------------------------------------------------------------
+# Files
+# ------------------------------------------------------------------------------
+
+def write_inputs(spec: SyntheticCourseSpec, inputs_dir: Path) -> Path:
+    """Write business_brief.md and sme_notes.md for ``spec`` into ``inputs_dir``."""
+    inputs_dir = Path(inputs_dir)
+    inputs_dir.mkdir(parents=True, exist_ok=True)
+    (inputs_dir / "business_brief.md").write_text(generate_business_brief(spec))
+    (inputs_dir / "sme_notes.md").write_text(generate_sme_notes(spec))
+    return inputs_dir
+
+
+def write_run_dir(spec: SyntheticCourseSpec, run_dir: Path, ledger_path: Path) -> Path:
+    """
+    Populate a completed run directory as the orchestrator would leave it:
+    NN_agent.md / NN_agent_state.json per step, 99_final_state.json,
+    run_manifest.json, and the matching run ledger events.
+    """
+    rng = random.Random(spec.seed * 31 + 5)
+    run_dir = Path(run_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    run_id = run_dir.name
+    state = generate_state(spec)
+
+    events = [{"timestamp_utc": "2026-01-01T00:00:00", "event": "run_started", "run_dir": str(run_dir),
+               "run_id": run_id, "start_step": 1}]
+    for idx, agent in enumerate(AGENT_SEQUENCE, start=1):
+        sections = []
+        for m in state["curriculum"]["modules"]:
+            sections.append(
+                f"## {m['module_id']} Learning Objectives\n" + "\n".join(f"- {o}" for o in m["objectives"])
+                + f"\n\n### Practice\n[Scenario: {m['module_id']}] {_sentence(rng, 16)}\n"
+                + f"\n### Feedback\n{_sentence(rng, 12)}\n"
+            )
+        deliverable = f"# {agent}\n\n" + "\n".join(sections)
+        open_questions = [f"MINOR: {_sentence(rng, 8)}" for _ in range(2)]
+        (run_dir / f"{idx:02d}_{agent}.md").write_text(deliverable)
+        with open(run_dir / f"{idx:02d}_{agent}_state.json", "w") as f:
+            json.dump({"deliverable_markdown": deliverable, "updated_state": {}, "open_questions": open_questions},
+                      f, indent=2)
+        if idx in (3, 6, 9):
+            events.append({"timestamp_utc": "2026-01-01T00:00:00", "event": "step_approved",
+                           "approval_mode": "auto", "step_idx": idx, "agent_name": agent,
+                           "gate_type": "phase_gate", "run_id": run_id, "run_dir": str(run_dir)})
+
+    with open(run_dir / "99_final_state.json", "w") as f:
+        json.dump(state, f, indent=2)
+    with open(run_dir / "run_manifest.json", "w") as f:
+        json.dump({"run_id": run_id, "status": "completed", "current_step_completed": len(AGENT_SEQUENCE),
+                   "synthetic_spec": asdict(spec)}, f, indent=2)
+
+    events.append({"timestamp_utc": "2026-01-01T00:00:00", "event": "run_completed",
+                   "run_dir": str(run_dir), "run_id": run_id})
+    ledger_path = Path(ledger_path)
+    ledger_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(ledger_path, "a") as f:
+        for e in events:
+            f.write(json.dumps(e) + "\n")
+    return run_dir
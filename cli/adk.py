@@ -3,8 +3,16 @@ CLI entry point for the ld-course-factory-adk package.
 
 Usage:
     python -m adk                  # Run full pipeline
-    python -m adk --help           # Show help
+    python -m adk --help           # List commands
+    python -m adk run --help       # Pipeline options (same as scripts/run_pipeline.py)
+    python -m adk approvals list   # Queued approval gates (also approve/reject/resume/serve)
+    python -m adk serve            # Long-running service: job queue, workers, HTTP API
+    python -m adk signal create    # Improvement signals, proposals and knowledge packs
+    python -m adk runs materialize # Plain file layout of runs in the artifact store
     python scripts/run_pipeline.py # Direct script invocation (equivalent)
+
+Startup is kept cheap: nothing beyond the standard library is imported until
+a command is chosen, and only that command's modules are imported then.
 """
 
 import sys
@@ -13,8 +21,69 @@ import os
 # Ensure project root is on path when invoked as a package
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# command -> (description, command modules registered under it, parser layout)
+#   "nested": a sub-command group; each module registers its sub-commands
+#   "flat":   the module adds its options to the command parser itself
+#   "self":   the module registers the top-level command itself
+COMMANDS = {
+    "run": ("Run the course pipeline (default command)", (), "pipeline"),
+    "approvals": ("Manage queued approval gates", ("cli.commands.approvals",), "nested"),
+    "serve": ("Run the course-factory worker service", ("cli.commands.serve",), "flat"),
+    "signal": ("Improvement Signal commands", ("cli.commands.signal_create",), "self"),
+    "proposal": ("Improvement Proposal commands",
+                 ("cli.commands.proposal_create", "cli.commands.proposal_approve"), "self"),
+    "pack": ("Knowledge Pack commands", ("cli.commands.pack_apply", "cli.commands.pack_rollback"), "nested"),
+    "runs": ("Run directory maintenance",
+             ("cli.commands.runs_materialize", "cli.commands.runs_gc", "cli.commands.runs_archive"), "nested"),
+    "ledger": ("Approval ledger verification and inclusion proofs",
+               ("cli.commands.ledger_verify", "cli.commands.ledger_prove"), "nested"),
+}
+
+
+def print_help() -> None:
+    print("usage: adk [command] [options]\n")
+    print("commands:")
+    for name, (description, _, _) in COMMANDS.items():
+        print(f"  {name:<10} {description}")
+    print("\nWithout a command, runs the pipeline. Use 'adk <command> --help' for command options.")
+
+
+def command_main(name: str, argv) -> None:
+    """Build the parser for one command (importing only its modules) and run it."""
+    import argparse
+    import importlib
+
+    description, module_names, layout = COMMANDS[name]
+    modules = [importlib.import_module(m) for m in module_names]
+
+    if layout == "flat":
+        parser = argparse.ArgumentParser(prog=f"adk {name}", description=description)
+        modules[0].register(parser)
+    elif layout == "nested":
+        parser = argparse.ArgumentParser(prog=f"adk {name}", description=description)
+        subparsers = parser.add_subparsers(dest="command", required=True)
+        for module in modules:
+            module.register(subparsers)
+    else:
+        parser = argparse.ArgumentParser(prog="adk")
+        subparsers = parser.add_subparsers(dest="command", required=True)
+        group = modules[0].register(subparsers)
+        for module in modules[1:]:
+            module.register(group)
+        argv = [name] + list(argv)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
 
 def main():
-    """Primary CLI entry point — delegates to the run_pipeline script."""
+    """Primary CLI entry point — dispatches a command, or runs the pipeline."""
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command in ("-h", "--help"):
+        return print_help()
+    if command in COMMANDS and command != "run":
+        return command_main(command, sys.argv[2:])
+    if command == "run":
+        sys.argv = [sys.argv[0]] + sys.argv[2:]
     from scripts.run_pipeline import main as run_pipeline_main
     run_pipeline_main()
@@ -1,5 +1,10 @@
-from cli.commands import proposal_create
-from cli.commands import signal_create
-from cli.commands import proposal_approve
-from cli.commands import pack_apply
-from cli.commands import pack_rollback
+"""
+CLI command modules, each with register(subparsers) and execute(args).
+
+Modules are imported by cli/adk.py only when their command runs (see
+cli.adk.COMMANDS), so importing this package stays cheap:
+
+    approvals, serve, signal_create, proposal_create, proposal_approve,
+    pack_apply, pack_rollback, runs_materialize, runs_gc, runs_archive,
+    ledger_verify, ledger_prove
+"""
@@ -0,0 +1,123 @@
+import argparse
+import json
+import sys
+
+from orchestrator.approval_queue import DEFAULT_QUEUE_PATH, ApprovalQueue, apply_decision, make_http_server, resume_request
+
+def register(approvals_subparsers):
+    list_parser = approvals_subparsers.add_parser('list', help='List approval requests')
+    list_parser.add_argument('--status', default='pending', help="Filter by status (pending/approved/rejected/resumed, or 'all')")
+    list_parser.add_argument('--run-id', help='Only requests for this run')
+    list_parser.add_argument('--json', action='store_true', help='Print requests as JSON')
+    list_parser.set_defaults(func=execute_list)
+
+    for name, help_text in (('approve', 'Approve pending gates and resume their runs'),
+                            ('reject', 'Reject pending gates and abort their runs')):
+        decide_parser = approvals_subparsers.add_parser(name, help=help_text)
+        decide_parser.add_argument('request_ids', nargs='*', help='Approval request IDs')
+        decide_parser.add_argument('--all', action='store_true', help='Decide every pending request (optionally within --run-id)')
+        decide_parser.add_argument('--run-id', help='Limit --all to one run')
+        decide_parser.add_argument('--actor-id', help='ID of the reviewer')
+        decide_parser.add_argument('--notes', help='Optional decision notes')
+        if name == 'approve':
+            decide_parser.add_argument('--no-resume', action='store_true', help='Record approvals without resuming runs')
+        decide_parser.set_defaults(func=execute_decide, approved=(name == 'approve'))
+
+    resume_parser = approvals_subparsers.add_parser('resume', help='Resume runs of approvals recorded with --no-resume')
+    resume_parser.add_argument('request_ids', nargs='*', help='Approved request IDs')
+    resume_parser.add_argument('--all', action='store_true', help='Resume every approved request (optionally within --run-id)')
+    resume_parser.add_argument('--run-id', help='Limit --all to one run')
+    resume_parser.set_defaults(func=execute_resume)
+
+    serve_parser = approvals_subparsers.add_parser('serve', help='Serve the approval queue over local HTTP')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.set_defaults(func=execute_serve)
+
+    for subparser in approvals_subparsers.choices.values():
+        subparser.add_argument('--queue', default=DEFAULT_QUEUE_PATH, help=f'Approval queue database (default: {DEFAULT_QUEUE_PATH})')
+
+def execute_list(args):
+    queue = ApprovalQueue(args.queue)
+    status = None if args.status == 'all' else args.status
+    requests = queue.list(status=status, run_id=args.run_id)
+
+    if args.json:
+        print(json.dumps(requests, indent=2))
+        return
+
+    if not requests:
+        print("No approval requests.")
+        return
+    print(f"{'REQUEST':<18} {'STATUS':<9} {'RUN':<20} {'STEP':>4}  {'AGENT':<28} GATE")
+    for r in requests:
+        gate = r['gate_type'] if r['gate_type'] != 'risk_gate' else f"risk_gate ({r['gate_reason']})"
+        print(f"{r['request_id']:<18} {r['status']:<9} {r['run_id']:<20} {r['step_idx']:>4}  {r['agent_name']:<28} {gate}")
+
+def execute_decide(args):
+    queue = ApprovalQueue(args.queue)
+    request_ids = list(args.request_ids)
+    if args.all:
+        request_ids += [r['request_id'] for r in queue.list(status='pending', run_id=args.run_id)]
+    if not request_ids:
+        print("Error: give request IDs or --all.", file=sys.stderr)
+        sys.exit(1)
+
+    verb = 'Approved' if args.approved else 'Rejected'
+    failures = 0
+    for request_id in dict.fromkeys(request_ids):
+        try:
+            request = apply_decision(
+                queue, request_id, args.approved,
+                actor_id=args.actor_id, notes=args.notes,
+                resume=args.approved and not getattr(args, 'no_resume', False),
+            )
+        except (KeyError, ValueError) as e:
+            print(f"Error: {e.args[0]}", file=sys.stderr)
+            failures += 1
+            continue
+        except SystemExit:
+            # Resumed run failed; run_pipeline already recorded it
+            print(f"{verb} {request_id}; resumed run failed (see ledger).", file=sys.stderr)
+            failures += 1
+            continue
+        print(f"{verb} {request_id} (run {request['run_id']}, step {request['step_idx']})")
+
+    if failures:
+        sys.exit(1)
+
+def execute_resume(args):
+    queue = ApprovalQueue(args.queue)
+    request_ids = list(args.request_ids)
+    if args.all:
+        request_ids += [r['request_id'] for r in queue.list(status='approved', run_id=args.run_id)]
+    if not request_ids:
+        print("Error: give request IDs or --all.", file=sys.stderr)
+        sys.exit(1)
+
+    failures = 0
+    for request_id in dict.fromkeys(request_ids):
+        try:
+            request = resume_request(queue, request_id)
+        except (KeyError, ValueError) as e:
+            print(f"Error: {e.args[0]}", file=sys.stderr)
+            failures += 1
+            continue
+        except SystemExit:
+            print(f"Resumed {request_id}; run failed (see ledger).", file=sys.stderr)
+            failures += 1
+            continue
+        print(f"Resumed {request_id} (run {request['run_id']}, from step {request['step_idx'] + 1})")
+
+    if failures:
+        sys.exit(1)
+
+def execute_serve(args):
+    server = make_http_server(ApprovalQueue(args.queue), args.host, args.port)
+    print(f"Approval queue listening on http://{args.host}:{args.port}/approvals (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
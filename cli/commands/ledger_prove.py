@@ -0,0 +1,31 @@
+import json
+import sys
+
+from governance import approval_ledger
+
+def register(ledger_subparsers):
+    prove_parser = ledger_subparsers.add_parser(
+        'prove', help='Print an inclusion proof for a ledger entry, or check one')
+    group = prove_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('ledger_seq', nargs='?', type=int, help='Sequence number of the entry to prove')
+    group.add_argument('--check', metavar='PROOF_JSON', help='Verify a proof file without the ledger')
+    prove_parser.set_defaults(func=execute)
+
+def execute(args):
+    if args.check:
+        try:
+            with open(args.check, 'r') as f:
+                proof = json.load(f)
+            approval_ledger.verify_inclusion_proof(proof)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Invalid proof: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Proof valid: entry {proof['entry']['ledger_seq']} is in checkpoint {proof['checkpoint']['block']} "
+              f"(merkle root {proof['checkpoint']['merkle_root']}).")
+        return
+
+    proof = approval_ledger.inclusion_proof(args.ledger_seq)
+    if proof is None:
+        print(f"Entry {args.ledger_seq} is not in a checkpointed block yet.", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(proof, indent=2))
@@ -0,0 +1,28 @@
+import sys
+
+from governance import approval_ledger
+
+def register(ledger_subparsers):
+    verify_parser = ledger_subparsers.add_parser(
+        'verify', help='Verify the approval ledger chain from its last checkpoint (or in full)')
+    verify_parser.add_argument('--full', action='store_true',
+                               help='Re-hash every entry from genesis and re-check every checkpoint')
+    verify_parser.add_argument('--checkpoint', action='store_true',
+                               help='Afterwards, sign off checkpoints for complete blocks that have none')
+    verify_parser.set_defaults(func=execute)
+
+def execute(args):
+    try:
+        approval_ledger.verify_ledger(full=args.full)
+    except (OSError, ValueError) as e:
+        print(f"Ledger verification failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Ledger verified{' in full' if args.full else ''}.")
+
+    if args.checkpoint:
+        try:
+            written = approval_ledger.checkpoint_ledger()
+        except (OSError, ValueError) as e:
+            print(f"Checkpoint failed: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{len(written)} checkpoint(s) written.")
@@ -8,6 +8,7 @@ from datetime import datetime, timezone
 
 # Relative imports
 from governance import approval_ledger
+from orchestrator import knowledge_pack
 from utils import hashing
 
 def register(pack_subparsers):
@@ -198,5 +199,8 @@ def execute(args):
         # I'll just exit 1 to signal "Partial Failure / Operational Error".
         sys.exit(1)
 
+    # Cached retrieval indexes of other packs are stale now (see orchestrator/knowledge_pack.py)
+    knowledge_pack.invalidate_pack_indexes(active_dir, keep=manifest.get('manifest_hash'))
+
     print(f"Applied {args.pack_version} successfully.")
     sys.exit(0)
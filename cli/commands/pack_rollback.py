@@ -8,6 +8,7 @@ from datetime import datetime, timezone
 # Relative imports
 from governance import approval_ledger
 from cli.commands import pack_apply
+from orchestrator import knowledge_pack
 
 def register(pack_subparsers):
     rollback_parser = pack_subparsers.add_parser('rollback', help='Rollback active sandbox to a previous snapshot')
@@ -157,5 +158,12 @@ def execute(args):
         
         sys.exit(1)
 
+    # Cached retrieval indexes of other packs are stale now (see orchestrator/knowledge_pack.py)
+    try:
+        restored_pack = knowledge_pack.load_active_pack(active_dir)
+    except ValueError:
+        restored_pack = None
+    knowledge_pack.invalidate_pack_indexes(active_dir, keep=restored_pack.manifest_hash if restored_pack else None)
+
     print(f"Rolled back to snapshot {snapshot_arg} (version {target_pack_version})")
     sys.exit(0)
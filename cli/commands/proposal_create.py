@@ -27,6 +27,9 @@ def register(subparsers):
 
     create_parser.set_defaults(func=execute)
 
+    # Other proposal commands (e.g. proposal_approve) register under this group
+    return proposal_subparsers
+
 
 def execute(args):
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+from orchestrator.run_archive import FINAL_STATUSES, archive_runs, list_runs
+
+DEFAULT_OUTPUTS_DIR = 'outputs'
+
+def register(runs_subparsers):
+    archive_parser = runs_subparsers.add_parser(
+        'archive', help='Move finished runs into the monthly run archives regardless of the retention policy')
+    archive_parser.add_argument('runs', nargs='+', help='Run IDs under --outputs-dir')
+    archive_parser.add_argument('--outputs-dir', default=DEFAULT_OUTPUTS_DIR,
+                                help=f'Directory holding run directories (default: {DEFAULT_OUTPUTS_DIR})')
+    archive_parser.add_argument('--dry-run', action='store_true', help='Report what would be archived without changing anything')
+    archive_parser.set_defaults(func=execute)
+
+def execute(args):
+    runs = {run.run_id: run for run in list_runs(args.outputs_dir)}
+    selected = []
+    for run_id in args.runs:
+        run = runs.get(Path(run_id).name)
+        if run is None:
+            print(f"Run not found (or already archived): {run_id}", file=sys.stderr)
+            sys.exit(1)
+        if run.status not in FINAL_STATUSES:
+            print(f"Run {run.run_id} is {run.status or 'in an unknown state'}; only finished runs are archived",
+                  file=sys.stderr)
+            sys.exit(1)
+        selected.append(run)
+
+    try:
+        result = archive_runs(args.outputs_dir, selected, dry_run=args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"Archive failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.dry_run:
+        print(f"Would archive {len(result['runs'])} run(s) into {', '.join(result['archives'])} "
+              f"({result['bytes_freed']} bytes of run directories)")
+    else:
+        print(f"Archived {len(result['runs'])} run(s) into {', '.join(result['archives'])}; "
+              f"reclaimed {result['bytes_reclaimed']} bytes")
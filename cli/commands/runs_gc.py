@@ -0,0 +1,57 @@
+import sys
+from dataclasses import replace
+
+from orchestrator.artifact_store import default_store_root, store_settings
+from orchestrator.run_archive import archive_runs, list_runs, plan_retention, retention_settings, sweep_blobs
+
+DEFAULT_OUTPUTS_DIR = 'outputs'
+
+def register(runs_subparsers):
+    gc_parser = runs_subparsers.add_parser(
+        'gc', help='Archive runs the retention policy does not keep and sweep unreferenced artifact blobs')
+    gc_parser.add_argument('--outputs-dir', default=DEFAULT_OUTPUTS_DIR,
+                           help=f'Directory holding run directories (default: {DEFAULT_OUTPUTS_DIR})')
+    gc_parser.add_argument('--keep-last', type=int, help='Override retention.keep_last_per_inputs')
+    gc_parser.add_argument('--archive-after-days', type=float, help='Override retention.archive_after_days')
+    gc_parser.add_argument('--dry-run', action='store_true', help='Report what would be archived without changing anything')
+    gc_parser.add_argument('--verbose', action='store_true', help='Also list kept runs and why')
+    gc_parser.set_defaults(func=execute)
+
+def execute(args):
+    from orchestrator.root_agent import load_config
+    config = load_config()
+    try:
+        settings = retention_settings(config)
+        store = store_settings(config)
+    except ValueError as e:
+        print(f"Invalid run config: {e}")
+        sys.exit(2)
+    # Runs written with a configured artifact_store.path point into that store
+    store_root = default_store_root(args.outputs_dir, store) if store is not None else None
+    if args.keep_last is not None:
+        settings = replace(settings, keep_last_per_inputs=args.keep_last)
+    if args.archive_after_days is not None:
+        settings = replace(settings, archive_after_days=args.archive_after_days)
+
+    decisions = plan_retention(list_runs(args.outputs_dir), settings)
+    for decision in decisions:
+        if not decision.keep or args.verbose:
+            action = 'keep   ' if decision.keep else 'archive'
+            print(f"{action} {decision.run.run_id:30s} {decision.reason}")
+
+    try:
+        result = archive_runs(args.outputs_dir, [d.run for d in decisions if not d.keep], dry_run=args.dry_run)
+        swept = sweep_blobs(args.outputs_dir, store_root, dry_run=args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"Run gc failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    prefix = "Would archive" if args.dry_run else "Archived"
+    print(f"{prefix} {len(result['runs'])} of {len(decisions)} run(s) into {', '.join(result['archives']) or 'no archive'}; "
+          f"{swept['blobs']} unreferenced blob(s) ({swept['bytes']} bytes)")
+    if args.dry_run:
+        print(f"Run directories to remove: {result['bytes_freed']} bytes")
+    else:
+        print(f"Reclaimed {result['bytes_reclaimed'] + swept['bytes']} bytes "
+              f"({result['bytes_freed']} in run directories, {swept['bytes']} in blobs, "
+              f"{result['archive_bytes']} added to archives)")
@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+from orchestrator.artifact_store import POINTER_MANIFEST, materialize_run
+from orchestrator.run_log import RUN_LOG_FILENAME
+
+DEFAULT_OUTPUTS_DIR = 'outputs'
+
+def register(runs_subparsers):
+    materialize_parser = runs_subparsers.add_parser(
+        'materialize', help='Write the plain file layout of runs kept in the artifact store or a run log')
+    materialize_parser.add_argument('runs', nargs='+', help='Run IDs (under --outputs-dir) or run directories')
+    materialize_parser.add_argument('--out', help='Write a plain copy here instead of materializing in place (one run only)')
+    materialize_parser.add_argument('--outputs-dir', default=DEFAULT_OUTPUTS_DIR,
+                                    help=f'Directory holding run directories (default: {DEFAULT_OUTPUTS_DIR})')
+    materialize_parser.set_defaults(func=execute)
+
+def resolve_run_dir(run, outputs_dir):
+    path = Path(run)
+    return path if path.is_dir() else Path(outputs_dir) / run
+
+def execute(args):
+    if args.out and len(args.runs) > 1:
+        print("--out takes a single run")
+        sys.exit(2)
+
+    for run in args.runs:
+        run_dir = resolve_run_dir(run, args.outputs_dir)
+        if not run_dir.is_dir():
+            print(f"Run directory not found: {run_dir}", file=sys.stderr)
+            sys.exit(1)
+        if args.out is None and not any((run_dir / name).exists() for name in (POINTER_MANIFEST, RUN_LOG_FILENAME)):
+            print(f"{run_dir}: already plain")
+            continue
+        try:
+            stats = materialize_run(run_dir, args.out)
+        except (OSError, ValueError) as e:
+            print(f"Materialize failed for {run_dir}: {e}", file=sys.stderr)
+            sys.exit(1)
+        target = args.out or run_dir
+        print(f"{target}: {stats['files']} artifact(s) written ({stats['bytes']} bytes)")
@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from orchestrator.service import DEFAULT_LEASE_SECONDS, JobQueue, WorkerPool, make_service_server
+
+DEFAULT_WORK_DIR = os.path.join('outputs', '_jobs')
+
+def register(parser):
+    parser.add_argument('--host', default='127.0.0.1', help='API bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8780, help='API port (default: 8780)')
+    parser.add_argument('--workers', type=int, default=2, help='Worker threads running courses (default: 2)')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help=f'Job database and submitted inputs (default: {DEFAULT_WORK_DIR})')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='Idle worker poll interval in seconds')
+    parser.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS,
+                        help=f'Job lease length; jobs of a worker that stops heartbeating are taken over after it (default: {DEFAULT_LEASE_SECONDS:g})')
+    parser.add_argument('--no-api', action='store_true',
+                        help='Run workers only (extra nodes sharing the work dir, outputs/ and governance/)')
+    parser.add_argument('--exit-when-idle', action='store_true',
+                        help='With --no-api: exit once no job is claimable instead of polling')
+    parser.add_argument('--skip-preflight', action='store_true', help='Skip the startup preflight checks')
+    parser.set_defaults(func=execute)
+
+def execute(args):
+    if not args.skip_preflight:
+        # Run once at startup instead of once per course
+        from scripts.preflight_check import run_preflight_checks
+        if not run_preflight_checks():
+            sys.exit(1)
+
+    if args.exit_when_idle and not args.no_api:
+        print("--exit-when-idle requires --no-api")
+        sys.exit(2)
+
+    # Tenant weights, running-job caps and token quotas (run_config "tenants")
+    from orchestrator.root_agent import load_config
+    from orchestrator.tenants import tenant_settings
+    try:
+        tenants = tenant_settings(load_config())
+    except ValueError as e:
+        print(f"Invalid tenants config: {e}")
+        sys.exit(2)
+
+    work_dir = Path(args.work_dir)
+    queue = JobQueue(work_dir / 'jobs.db', tenants=tenants)
+    # Jobs left running by a stopped or crashed worker (on any node) are taken
+    # over by the next claim once their lease expires.
+    pool = WorkerPool(queue, workers=args.workers, poll_interval=args.poll_interval,
+                      lease_seconds=args.lease_seconds).start(exit_when_idle=args.exit_when_idle)
+
+    if args.no_api:
+        print(f"Course factory workers: {args.workers} worker(s) as {pool.worker_prefix} on {queue.path} (Ctrl+C to stop)")
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            print("\nStopping: waiting for running jobs to reach a stop point...")
+            pool.stop()
+        return
+
+    server = make_service_server(queue, pool, work_dir, args.host, args.port)
+    print(f"Course factory service: {args.workers} worker(s), API on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping: waiting for running jobs to reach a stop point...")
+    finally:
+        server.server_close()
+        pool.stop()
@@ -1,14 +1,38 @@
 import json
 import os
 import hashlib
+import sys
+import threading
 from datetime import datetime, timezone
 
+try:
+    import fcntl
+except ImportError:  # Windows: appends are not locked against other processes
+    fcntl = None
+
 LEDGER_PATH_REL = 'governance/approval_ledger.jsonl'
+GENESIS_HASH = "0" * 64
+_TAIL_CHUNK_BYTES = 4096
+
+# Every CHECKPOINT_BLOCK_SIZE entries are signed off as a checkpoint: the
+# Merkle root of their integrity hashes, kept in approval_ledger.checkpoints.jsonl
+# next to the ledger. verify_ledger re-hashes only entries after the last
+# checkpoint (full=True re-hashes everything and re-checks every checkpoint),
+# and inclusion_proof shows an entry is in a checkpointed block with
+# O(log CHECKPOINT_BLOCK_SIZE) hashes.
+CHECKPOINT_BLOCK_SIZE = 256
+CHECKPOINTS_SUFFIX = '.checkpoints.jsonl'
+
+# The file lock excludes other processes; this one excludes threads of this process
+_append_lock = threading.Lock()
 
 def _get_ledger_path():
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     return os.path.join(project_root, LEDGER_PATH_REL)
 
+def _get_checkpoints_path():
+    return os.path.splitext(_get_ledger_path())[0] + CHECKPOINTS_SUFFIX
+
 def _canonical_json_dumps(data):
     """
     Returns a canonical JSON string for hashing:
@@ -24,102 +48,421 @@ def _calculate_hash(entry):
     canonical = _canonical_json_dumps(entry)
     return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
 
-def append_entry(action, actor, target_artifact_id, evidence_ref=None, decision_metadata=None):
+def _read_last_line(fd, end=None):
     """
-    Appends a new entry to the approval ledger with hash chaining.
+    Returns the last non-blank line of the file open at fd that ends at or
+    before byte ``end`` (default: end of file), reading backwards so the cost
+    does not grow with history. Returns b'' when there is none.
     """
-    ledger_path = _get_ledger_path()
-    
-    # Read last entry to get sequence number and hash
-    last_seq = 0
-    previous_hash = "0" * 64 # Genesis hash
-    
-    if os.path.exists(ledger_path):
-        with open(ledger_path, 'r') as f:
-            lines = f.readlines()
-            if lines:
-                try:
-                    last_line = lines[-1].strip()
-                    if last_line:
-                        last_entry = json.loads(last_line)
-                        last_seq = last_entry.get('ledger_seq', 0)
-                        previous_hash = last_entry.get('integrity_hash', "0" * 64)
-                except json.JSONDecodeError:
-                    raise ValueError("Ledger file is corrupted (last line invalid JSON).")
-
-    new_seq = last_seq + 1
-    timestamp = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
-    
-    entry_payload = {
-        "timestamp_utc": timestamp,
-        "ledger_seq": new_seq,
-        "action": action,
-        "actor": actor,
-        "target_artifact_id": target_artifact_id,
-        "evidence_ref": evidence_ref,
-        "decision_metadata": decision_metadata or {},
-        "previous_entry_hash": previous_hash
-    }
-    
-    # Calculate integrity hash
-    integrity_hash = _calculate_hash(entry_payload)
-    entry_payload['integrity_hash'] = integrity_hash
-    
-    # Append to file
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(ledger_path), exist_ok=True)
-    
-    with open(ledger_path, 'a') as f:
-        f.write(json.dumps(entry_payload) + '\n')
-        
-    return entry_payload
+    pos = os.lseek(fd, 0, os.SEEK_END) if end is None else end
+    tail = b''
+    while pos > 0:
+        size = min(_TAIL_CHUNK_BYTES, pos)
+        pos -= size
+        os.lseek(fd, pos, os.SEEK_SET)
+        tail = os.read(fd, size) + tail
+        # Blank lines are skipped, as verify_ledger does
+        if b'\n' in tail.rstrip():
+            break
+    return tail.rstrip().rsplit(b'\n', 1)[-1].strip()
 
-def verify_ledger():
+def _read_last_entry(fd):
     """
-    Verifies the integrity of the ledger.
-    Returns True if valid, raises ValueError if invalid.
+    Returns the last entry of the ledger open at fd (None when it has none).
     """
-    ledger_path = _get_ledger_path()
-    if not os.path.exists(ledger_path):
-        return True # Empty ledger is valid
-        
-    with open(ledger_path, 'r') as f:
-        lines = f.readlines()
-        
-    expected_prev_hash = "0" * 64
-    expected_seq = 1
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
+    last_line = _read_last_line(fd)
+    if not last_line:
+        return None
+    try:
+        return json.loads(last_line)
+    except json.JSONDecodeError:
+        raise ValueError("Ledger file is corrupted (last line invalid JSON).")
+
+def _iter_lines(fd, offset=0, end=None):
+    """
+    Yields (line number counted from offset, stripped line, offset after the
+    line) for the lines of the file open at fd from byte offset on.
+    """
+    with os.fdopen(os.dup(fd), 'rb') as f:
+        f.seek(offset)
+        line_no = 0
+        for raw in f:
+            if end is not None and offset >= end:
+                break
+            line_no += 1
+            offset += len(raw)
+            yield line_no, raw.strip(), offset
+
+def _verify_entries(lines, expected_seq, expected_prev_hash, label="Line"):
+    """
+    Checks the chain of ledger lines (sequence, previous hash, integrity hash).
+    Returns (next expected seq, last integrity hash, verified entries with their end offsets).
+    """
+    verified = []
+    for i, line, end_offset in lines:
         if not line:
             continue
-            
+
         try:
             entry = json.loads(line)
         except json.JSONDecodeError:
-            raise ValueError(f"Line {i+1}: Invalid JSON")
-            
+            raise ValueError(f"{label} {i}: Invalid JSON")
+
         # Check sequence
         if entry.get('ledger_seq') != expected_seq:
-            raise ValueError(f"Line {i+1}: Sequence mismatch. Expected {expected_seq}, got {entry.get('ledger_seq')}")
-            
+            raise ValueError(f"{label} {i}: Sequence mismatch. Expected {expected_seq}, got {entry.get('ledger_seq')}")
+
         # Check previous hash
         if entry.get('previous_entry_hash') != expected_prev_hash:
-            raise ValueError(f"Line {i+1}: Previous hash mismatch. Expected {expected_prev_hash}, got {entry.get('previous_entry_hash')}")
-            
+            raise ValueError(f"{label} {i}: Previous hash mismatch. Expected {expected_prev_hash}, got {entry.get('previous_entry_hash')}")
+
         # Verify integrity hash
         stored_hash = entry.get('integrity_hash')
         # Create copy without integrity_hash for calculation
         calc_payload = entry.copy()
         calc_payload.pop('integrity_hash', None)
-        
+
         calculated_hash = _calculate_hash(calc_payload)
-        
+
         if calculated_hash != stored_hash:
-            raise ValueError(f"Line {i+1}: Integrity hash mismatch. Content tampered.")
-            
+            raise ValueError(f"{label} {i}: Integrity hash mismatch. Content tampered.")
+
         # Prepare for next iteration
         expected_prev_hash = stored_hash
         expected_seq += 1
-        
+        verified.append((entry, end_offset))
+
+    return expected_seq, expected_prev_hash, verified
+
+# --- Merkle checkpoints ---
+
+def _leaf_hash(integrity_hash):
+    return hashlib.sha256(b'\x00' + bytes.fromhex(integrity_hash)).digest()
+
+def _node_hash(left, right):
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+def merkle_root(integrity_hashes):
+    """
+    Merkle root (hex) over entry integrity hashes. Leaves and inner nodes are
+    domain-separated; an odd node at the end of a level is carried up unchanged.
+    """
+    level = [_leaf_hash(h) for h in integrity_hashes]
+    if not level:
+        return GENESIS_HASH
+    while len(level) > 1:
+        paired = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+def _merkle_path(integrity_hashes, index):
+    """Sibling hashes from leaf ``index`` up to the root, as [side, hex] pairs."""
+    level = [_leaf_hash(h) for h in integrity_hashes]
+    path = []
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append(['left' if sibling < index else 'right', level[sibling].hex()])
+        paired = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+        index //= 2
+    return path
+
+def _read_last_checkpoint():
+    checkpoints_path = _get_checkpoints_path()
+    if not os.path.exists(checkpoints_path):
+        return None
+    fd = os.open(checkpoints_path, os.O_RDONLY)
+    try:
+        last_line = _read_last_line(fd)
+    finally:
+        os.close(fd)
+    if not last_line:
+        return None
+    try:
+        return json.loads(last_line)
+    except json.JSONDecodeError:
+        raise ValueError("Checkpoint file is corrupted (last line invalid JSON).")
+
+def load_checkpoints():
+    """Returns every checkpoint record, oldest first."""
+    checkpoints_path = _get_checkpoints_path()
+    if not os.path.exists(checkpoints_path):
+        return []
+    with open(checkpoints_path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _verify_checkpoint_record(checkpoint, previous=None):
+    calc_payload = checkpoint.copy()
+    calc_payload.pop('checkpoint_hash', None)
+    if _calculate_hash(calc_payload) != checkpoint.get('checkpoint_hash'):
+        raise ValueError(f"Checkpoint {checkpoint.get('block')}: Checkpoint hash mismatch. Content tampered.")
+    if previous is not None and checkpoint.get('previous_checkpoint_hash') != previous['checkpoint_hash']:
+        raise ValueError(f"Checkpoint {checkpoint.get('block')}: Previous checkpoint hash mismatch.")
+
+def _sign_off_checkpoints(fd):
+    """
+    Verifies the entries after the last checkpoint and writes a checkpoint for
+    every complete block of them. Called with the ledger locked.
+    Returns the checkpoints written.
+    """
+    last = _read_last_checkpoint()
+    if last is not None:
+        _verify_checkpoint_record(last)
+        block, seq, prev_hash, offset = last['block'] + 1, last['last_seq'] + 1, last['last_entry_hash'], last['end_offset']
+    else:
+        block, seq, prev_hash, offset = 0, 1, GENESIS_HASH, 0
+
+    _, _, verified = _verify_entries(_iter_lines(fd, offset), seq, prev_hash, label=f"Line after byte {offset}")
+    written = []
+    for start in range(0, len(verified) - CHECKPOINT_BLOCK_SIZE + 1, CHECKPOINT_BLOCK_SIZE):
+        block_entries = verified[start:start + CHECKPOINT_BLOCK_SIZE]
+        hashes = [entry['integrity_hash'] for entry, _ in block_entries]
+        checkpoint = {
+            "block": block,
+            "first_seq": block_entries[0][0]['ledger_seq'],
+            "last_seq": block_entries[-1][0]['ledger_seq'],
+            "start_offset": offset,
+            "end_offset": block_entries[-1][1],
+            "merkle_root": merkle_root(hashes),
+            "last_entry_hash": hashes[-1],
+            "created_at_utc": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z'),
+            "previous_checkpoint_hash": last['checkpoint_hash'] if last is not None else GENESIS_HASH
+        }
+        checkpoint['checkpoint_hash'] = _calculate_hash(checkpoint)
+        written.append(checkpoint)
+        last, block, offset = checkpoint, block + 1, checkpoint['end_offset']
+
+    if written:
+        with open(_get_checkpoints_path(), 'a') as f:
+            f.write(''.join(json.dumps(c) + '\n' for c in written))
+            f.flush()
+            os.fsync(f.fileno())
+    return written
+
+def checkpoint_ledger():
+    """
+    Signs off checkpoints for complete blocks not checkpointed yet (e.g. a
+    ledger written before checkpoints existed). Returns the checkpoints written.
+    """
+    ledger_path = _get_ledger_path()
+    if not os.path.exists(ledger_path):
+        return []
+    with _append_lock:
+        fd = os.open(ledger_path, os.O_RDWR)
+        try:
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                return _sign_off_checkpoints(fd)
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+def append_entries(entries):
+    """
+    Appends several entries to the approval ledger, chained in one transaction.
+
+    Each entry is a dict with action, actor, target_artifact_id and optionally
+    evidence_ref and decision_metadata (the arguments of append_entry). The
+    ledger stays locked from reading the last entry's sequence number and hash
+    until the new lines are written, so concurrent writers (several CLI
+    invocations) never fork the chain.
+
+    Returns the appended entries (with ledger_seq and integrity_hash).
+    """
+    ledger_path = _get_ledger_path()
+    os.makedirs(os.path.dirname(ledger_path), exist_ok=True)
+
+    with _append_lock:
+        return _append_locked(ledger_path, entries)
+
+def _append_locked(ledger_path, entries):
+    fd = os.open(ledger_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            last_entry = _read_last_entry(fd)
+            last_seq = 0
+            previous_hash = GENESIS_HASH
+            if last_entry is not None:
+                last_seq = last_entry.get('ledger_seq', 0)
+                previous_hash = last_entry.get('integrity_hash', GENESIS_HASH)
+
+            appended = []
+            for entry in entries:
+                timestamp = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
+                entry_payload = {
+                    "timestamp_utc": timestamp,
+                    "ledger_seq": last_seq + len(appended) + 1,
+                    "action": entry['action'],
+                    "actor": entry['actor'],
+                    "target_artifact_id": entry['target_artifact_id'],
+                    "evidence_ref": entry.get('evidence_ref'),
+                    "decision_metadata": entry.get('decision_metadata') or {},
+                    "previous_entry_hash": previous_hash
+                }
+                # Calculate integrity hash
+                entry_payload['integrity_hash'] = _calculate_hash(entry_payload)
+                previous_hash = entry_payload['integrity_hash']
+                appended.append(entry_payload)
+
+            if appended:
+                data = ''.join(json.dumps(e) + '\n' for e in appended).encode('utf-8')
+                os.lseek(fd, 0, os.SEEK_END)
+                os.write(fd, data)
+                os.fsync(fd)
+
+            # Sign off a checkpoint when this append completed a block
+            if appended and (last_seq + len(appended)) // CHECKPOINT_BLOCK_SIZE > last_seq // CHECKPOINT_BLOCK_SIZE:
+                try:
+                    _sign_off_checkpoints(fd)
+                except ValueError as e:
+                    print(f"Warning: Ledger checkpoint not written: {e}", file=sys.stderr)
+        finally:
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+    return appended
+
+def append_entry(action, actor, target_artifact_id, evidence_ref=None, decision_metadata=None):
+    """
+    Appends a new entry to the approval ledger with hash chaining.
+    """
+    return append_entries([{
+        "action": action,
+        "actor": actor,
+        "target_artifact_id": target_artifact_id,
+        "evidence_ref": evidence_ref,
+        "decision_metadata": decision_metadata
+    }])[0]
+
+def verify_ledger(full=False):
+    """
+    Verifies the integrity of the ledger.
+
+    By default only entries after the last checkpoint are re-hashed (the
+    checkpoint itself must be intact and match the ledger at its offset);
+    full=True re-hashes every entry from genesis and re-checks every checkpoint.
+    Returns True if valid, raises ValueError if invalid.
+    """
+    ledger_path = _get_ledger_path()
+    if not os.path.exists(ledger_path):
+        return True # Empty ledger is valid
+
+    fd = os.open(ledger_path, os.O_RDONLY)
+    try:
+        if full:
+            _, _, verified = _verify_entries(_iter_lines(fd), 1, GENESIS_HASH)
+            _verify_all_checkpoints(verified)
+            return True
+
+        checkpoint = _read_last_checkpoint()
+        if checkpoint is None:
+            _verify_entries(_iter_lines(fd), 1, GENESIS_HASH)
+            return True
+
+        _verify_checkpoint_record(checkpoint)
+        last_line = _read_last_line(fd, end=checkpoint['end_offset'])
+        try:
+            last_entry = json.loads(last_line)
+        except json.JSONDecodeError:
+            last_entry = {}
+        if (last_entry.get('ledger_seq') != checkpoint['last_seq']
+                or last_entry.get('integrity_hash') != checkpoint['last_entry_hash']):
+            raise ValueError(f"Checkpoint {checkpoint['block']}: Does not match the ledger at byte {checkpoint['end_offset']}. Run a full verification.")
+        _verify_entries(_iter_lines(fd, checkpoint['end_offset']), checkpoint['last_seq'] + 1,
+                        checkpoint['last_entry_hash'], label=f"Line after byte {checkpoint['end_offset']}")
+        return True
+    finally:
+        os.close(fd)
+
+def _verify_all_checkpoints(verified):
+    previous = None
+    for checkpoint in load_checkpoints():
+        _verify_checkpoint_record(checkpoint, previous)
+        start = checkpoint['block'] * CHECKPOINT_BLOCK_SIZE
+        block_entries = verified[start:start + CHECKPOINT_BLOCK_SIZE]
+        if (len(block_entries) != CHECKPOINT_BLOCK_SIZE
+                or block_entries[-1][0]['ledger_seq'] != checkpoint['last_seq']
+                or block_entries[-1][1] != checkpoint['end_offset']
+                or merkle_root([e['integrity_hash'] for e, _ in block_entries]) != checkpoint['merkle_root']):
+            raise ValueError(f"Checkpoint {checkpoint['block']}: Merkle root does not match ledger entries {start + 1}-{start + CHECKPOINT_BLOCK_SIZE}.")
+        previous = checkpoint
+
+# --- Inclusion proofs ---
+
+def entries_for(artifact_ids):
+    """Returns the entries whose target_artifact_id or evidence_ref is one of artifact_ids."""
+    ledger_path = _get_ledger_path()
+    if not os.path.exists(ledger_path):
+        return []
+    artifact_ids = set(artifact_ids)
+    found = []
+    with open(ledger_path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get('target_artifact_id') in artifact_ids or entry.get('evidence_ref') in artifact_ids:
+                found.append(entry)
+    return found
+
+def inclusion_proof(ledger_seq):
+    """
+    Proof that entry ``ledger_seq`` is in a checkpointed block: the entry, its
+    Merkle path (O(log CHECKPOINT_BLOCK_SIZE) hashes) and the checkpoint.
+    Returns None when the entry's block has no checkpoint yet.
+    """
+    block = (ledger_seq - 1) // CHECKPOINT_BLOCK_SIZE
+    checkpoint = next((c for c in load_checkpoints() if c['block'] == block), None)
+    if checkpoint is None:
+        return None
+
+    fd = os.open(_get_ledger_path(), os.O_RDONLY)
+    try:
+        entries = [json.loads(line) for _, line, _ in
+                   _iter_lines(fd, checkpoint['start_offset'], end=checkpoint['end_offset']) if line]
+    finally:
+        os.close(fd)
+    hashes = [e['integrity_hash'] for e in entries]
+    index = ledger_seq - checkpoint['first_seq']
+    return {
+        "entry": entries[index],
+        "leaf_index": index,
+        "merkle_path": _merkle_path(hashes, index),
+        "checkpoint": checkpoint
+    }
+
+def verify_inclusion_proof(proof):
+    """
+    Checks an inclusion proof without the ledger: the entry's integrity hash,
+    its Merkle path to the checkpoint's root and the checkpoint's own hash.
+    Returns True if valid, raises ValueError if invalid.
+    """
+    entry, checkpoint = proof['entry'], proof['checkpoint']
+    _verify_checkpoint_record(checkpoint)
+
+    calc_payload = entry.copy()
+    calc_payload.pop('integrity_hash', None)
+    if _calculate_hash(calc_payload) != entry.get('integrity_hash'):
+        raise ValueError(f"Entry {entry.get('ledger_seq')}: Integrity hash mismatch. Content tampered.")
+    if not checkpoint['first_seq'] <= entry.get('ledger_seq', 0) <= checkpoint['last_seq']:
+        raise ValueError(f"Entry {entry.get('ledger_seq')}: Not in checkpoint {checkpoint['block']}.")
+
+    node = _leaf_hash(entry['integrity_hash'])
+    for side, sibling in proof['merkle_path']:
+        sibling = bytes.fromhex(sibling)
+        node = _node_hash(sibling, node) if side == 'left' else _node_hash(node, sibling)
+    if node.hex() != checkpoint['merkle_root']:
+        raise ValueError(f"Entry {entry.get('ledger_seq')}: Merkle path does not lead to the checkpoint root.")
     return True
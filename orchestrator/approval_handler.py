@@ -7,6 +7,8 @@ Extracted from root_agent.py to keep the orchestrator focused on pipeline flow.
 import os
 from typing import Any, Dict, List, Tuple
 
+from orchestrator.approval_queue import ApprovalPendingError
+
 
 # --------------------------------------------------------------------------
 # Errors
@@ -21,6 +23,24 @@ class ApprovalRejectedError(Exception):
 # Approval Gate
 # --------------------------------------------------------------------------
 
+def gate_requires_human(gate_type: str = "phase_gate", risk_metadata: Dict[str, Any] = None) -> bool:
+    """
+    Whether approval_gate() will block on stdin for this gate.
+
+    Mirrors the mode selection in approval_gate(): auto-approval (unless a
+    strict risk gate disables it) and CI risk-gate simulation never block.
+    """
+    risk_metadata = risk_metadata or {}
+    if os.getenv("AUTO_APPROVE", "").lower() in ("1", "true", "yes", "on"):
+        strict_risk = gate_type == "risk_gate" and not risk_metadata.get("risk_auto_override", True)
+        if not strict_risk:
+            return False
+    ci_simulate = os.getenv("CI_SIMULATE_MANUAL_RISK_APPROVAL", "").lower() in ("1", "true", "yes", "on")
+    if ci_simulate and gate_type == "risk_gate":
+        return False
+    return True
+
+
 def approval_gate(
     step_idx: int,
     agent_name: str,
@@ -33,13 +53,16 @@ def approval_gate(
     gate_type: str = "phase_gate",
     gate_reason: str = "routine_check",
     risk_metadata: Dict[str, Any] = None,
+    approval_queue=None,
+    resume_context: Dict[str, Any] = None,
 ):
     """
     Pause execution and require approval before continuing.
 
-    Supports three approval modes:
+    Supports four approval modes:
     - auto:       AUTO_APPROVE env var is set → log and continue
     - ci_harness: CI_SIMULATE_MANUAL_RISK_APPROVAL is set (risk gates only) → log and continue
+    - queue:      approval_queue is given → persist a request and raise ApprovalPendingError
     - manual:     Prompt user via stdin
 
     Args:
@@ -54,6 +77,8 @@ def approval_gate(
         gate_type:       'phase_gate' or 'risk_gate'.
         gate_reason:     Human-readable reason for the gate.
         risk_metadata:   Extra metadata attached to risk gate ledger events.
+        approval_queue:  ApprovalQueue to park the run on instead of prompting.
+        resume_context:  run_pipeline arguments stored with a queued request.
     """
     if risk_metadata is None:
         risk_metadata = {}
@@ -142,6 +167,23 @@ def approval_gate(
         })
         return
 
+    # ── Approval queue (park the run) ─────────────────────────────────────
+    if approval_queue is not None:
+        request_id = approval_queue.submit(
+            run_id=run_id,
+            run_dir=run_dir,
+            step_idx=step_idx,
+            agent_name=agent_name,
+            gate_strategy=gate_strategy,
+            gate_type=gate_type,
+            gate_reason=gate_reason,
+            risk_metadata=risk_metadata,
+            resume=resume_context,
+        )
+        print(f"\n⏸  APPROVAL QUEUED: step {step_idx} ({agent_name}, {gate_type}) - request {request_id}")
+        print(f"   Decide with: python -m adk approvals approve {request_id}  (or reject)")
+        raise ApprovalPendingError(request_id)
+
     # ── Manual approval (stdin) ───────────────────────────────────────────
     if gate_type == "risk_gate":
         print(f"\n⚠️  RISK GATE: {gate_reason}")
@@ -155,8 +197,49 @@ def approval_gate(
         )
 
     user_input = input(prompt_text).strip()
+    approved = user_input.lower() == approval_token.lower()
+
+    record_gate_decision(
+        approved=approved,
+        approval_source="stdin",
+        step_idx=step_idx,
+        agent_name=agent_name,
+        gate_strategy=gate_strategy,
+        run_id=run_id,
+        run_dir=run_dir,
+        write_ledger_fn=write_ledger_fn,
+        utc_now_fn=utc_now_fn,
+        gate_type=gate_type,
+        gate_reason=gate_reason,
+    )
+    if not approved:
+        raise ApprovalRejectedError("Approval rejected by user")
 
-    if user_input.lower() != approval_token.lower():
+
+def record_gate_decision(
+    approved: bool,
+    approval_source: str,
+    step_idx: int,
+    agent_name: str,
+    gate_strategy: str,
+    run_id: str,
+    run_dir: str,
+    write_ledger_fn,
+    utc_now_fn,
+    gate_type: str = "phase_gate",
+    gate_reason: str = "routine_check",
+) -> None:
+    """
+    Write the ledger events for a manual gate decision.
+
+    Shared by the stdin prompt and the approval queue so both produce the
+    same run_failed / risk_gate_approved / step_approved events.
+
+    Args:
+        approved:        Whether the gate was approved.
+        approval_source: 'stdin' or 'approval_queue'.
+    """
+    if not approved:
         write_ledger_fn({
             "timestamp_utc": utc_now_fn(),
             "event": "run_failed",
@@ -170,7 +253,7 @@ def approval_gate(
             "run_id": run_id,
             "run_dir": run_dir,
         })
-        raise ApprovalRejectedError("Approval rejected by user")
+        return
 
     # Approved manually
     if gate_type == "risk_gate":
@@ -183,14 +266,14 @@ def approval_gate(
             "agent": agent_name,
             "gate_reason": gate_reason,
             "approval_mode": "manual",
-            "approval_source": "stdin",
+            "approval_source": approval_source,
         })
 
     write_ledger_fn({
         "timestamp_utc": utc_now_fn(),
         "event": "step_approved",
         "approval_mode": "manual",
-        "approval_source": "stdin",
+        "approval_source": approval_source,
         "step_idx": step_idx,
         "agent": agent_name,
         "agent_name": agent_name,
@@ -0,0 +1,436 @@
+"""
+Asynchronous approval queue - park runs at human gates instead of blocking on stdin.
+
+With ``"approval": {"backend": "queue"}`` in run_config.json, a gate that
+would prompt on stdin instead persists an approval request (SQLite, stdlib
+sqlite3) and the run parks itself: the manifest is marked
+``awaiting_approval`` and run_pipeline returns. The step's checkpoint is
+already written, so nothing is held in memory.
+
+Decisions arrive through ``python -m adk approvals approve/reject`` or the
+local HTTP endpoint (``python -m adk approvals serve``):
+
+    GET  /approvals[?status=pending]
+    GET  /approvals/<id>
+    POST /approvals/<id>/approve   {"actor_id": "...", "notes": "..."}
+    POST /approvals/<id>/reject    {"actor_id": "...", "notes": "..."}
+
+Each decision writes the same ledger events as a stdin decision
+(step_approved / risk_gate_approved / run_failed) and approved runs resume
+automatically from the step after the gate. Approvals recorded with
+``--no-resume`` are resumed later with ``python -m adk approvals resume``.
+Runs of service jobs are not resumed in the deciding process: the job is
+requeued for a service worker (rejected jobs are marked aborted). Cancelling
+a parked service job cancels its run and closes its pending request.
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_QUEUE_PATH = "governance/approval_queue.db"
+APPROVAL_BACKENDS = ("stdin", "queue")
+
+# Request lifecycle: pending -> approved | rejected | cancelled; approved -> resumed
+REQUEST_STATUSES = ("pending", "approved", "rejected", "resumed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS approval_requests (
+    request_id    TEXT PRIMARY KEY,
+    run_id        TEXT NOT NULL,
+    run_dir       TEXT NOT NULL,
+    step_idx      INTEGER NOT NULL,
+    agent_name    TEXT NOT NULL,
+    gate_strategy TEXT NOT NULL,
+    gate_type     TEXT NOT NULL,
+    gate_reason   TEXT NOT NULL,
+    risk_metadata TEXT NOT NULL,
+    resume        TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    created_at    TEXT NOT NULL,
+    decided_at    TEXT,
+    decided_by    TEXT,
+    notes         TEXT
+)
+"""
+
+_JSON_COLUMNS = ("risk_metadata", "resume")
+
+
+class ApprovalPendingError(Exception):
+    """Raised by approval_gate() when a gate was queued; the run parks."""
+
+    def __init__(self, request_id: str):
+        super().__init__(f"Approval pending: {request_id}")
+        self.request_id = request_id
+
+
+def resolve_approval_backend(approval_cfg: Dict[str, Any]) -> str:
+    """
+    Read the approval backend from the run_config "approval" block.
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = (approval_cfg.get("backend") or "stdin").strip().lower()
+    if backend not in APPROVAL_BACKENDS:
+        raise ValueError(f"Unknown approval backend: '{backend}'. Supported backends: {', '.join(APPROVAL_BACKENDS)}")
+    return backend
+
+
+class ApprovalQueue:
+    """SQLite-backed store of approval requests (safe for several processes)."""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        request = dict(row)
+        for key in _JSON_COLUMNS:
+            request[key] = json.loads(request[key])
+        return request
+
+    def submit(
+        self,
+        run_id: str,
+        run_dir: str,
+        step_idx: int,
+        agent_name: str,
+        gate_strategy: str,
+        gate_type: str,
+        gate_reason: str,
+        risk_metadata: Dict[str, Any] = None,
+        resume: Dict[str, Any] = None,
+    ) -> str:
+        """Persist a pending request and return its id (reuses an open request for the same gate)."""
+        with self._connect() as conn:
+            existing = conn.execute(
+                "SELECT request_id FROM approval_requests WHERE run_dir = ? AND step_idx = ? AND status = 'pending'",
+                (str(run_dir), step_idx),
+            ).fetchone()
+            if existing:
+                return existing["request_id"]
+            request_id = f"apr_{uuid.uuid4().hex[:12]}"
+            conn.execute(
+                "INSERT INTO approval_requests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?, NULL, NULL, NULL)",
+                (
+                    request_id, run_id, str(run_dir), step_idx, agent_name, gate_strategy, gate_type,
+                    gate_reason, json.dumps(risk_metadata or {}), json.dumps(resume or {}),
+                    datetime.utcnow().isoformat(),
+                ),
+            )
+        return request_id
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM approval_requests WHERE request_id = ?", (request_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, status: str = None, run_id: str = None) -> List[Dict[str, Any]]:
+        query, params = "SELECT * FROM approval_requests WHERE 1 = 1", []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if run_id:
+            query += " AND run_id = ?"
+            params.append(run_id)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY created_at, request_id", params).fetchall()
+        return [self._row(r) for r in rows]
+
+    def decide(self, request_id: str, approved: bool, actor_id: str = None, notes: str = None) -> Dict[str, Any]:
+        """
+        Record a decision on a pending request.
+
+        Raises:
+            KeyError: Unknown request
+            ValueError: Request already decided
+        """
+        status = "approved" if approved else "rejected"
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE approval_requests SET status = ?, decided_at = ?, decided_by = ?, notes = ? "
+                "WHERE request_id = ? AND status = 'pending'",
+                (status, datetime.utcnow().isoformat(), actor_id, notes, request_id),
+            )
+            if cursor.rowcount == 0:
+                row = conn.execute(
+                    "SELECT status FROM approval_requests WHERE request_id = ?", (request_id,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(f"Unknown approval request: {request_id}")
+                raise ValueError(f"Approval request {request_id} is already {row['status']}")
+        return self.get(request_id)
+
+    def cancel(self, request_id: str, notes: str = None) -> bool:
+        """Close a pending request without a decision (its run was cancelled); False if not pending."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE approval_requests SET status = 'cancelled', decided_at = ?, notes = ? "
+                "WHERE request_id = ? AND status = 'pending'",
+                (datetime.utcnow().isoformat(), notes, request_id),
+            )
+        return cursor.rowcount == 1
+
+    def mark_resumed(self, request_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE approval_requests SET status = 'resumed' WHERE request_id = ? AND status = 'approved'",
+                (request_id,),
+            )
+
+
+# ------------------------------------------------------------------------------
+# Decisions and Resume
+# ------------------------------------------------------------------------------
+
+def apply_decision(
+    queue: ApprovalQueue,
+    request_id: str,
+    approved: bool,
+    actor_id: str = None,
+    notes: str = None,
+    resume: bool = True,
+) -> Dict[str, Any]:
+    """
+    Decide a request, write the gate ledger events, and resume or abort the run.
+
+    Returns:
+        The updated request dict
+    """
+    from orchestrator import root_agent
+    from orchestrator.approval_handler import record_gate_decision
+    from orchestrator.run_artifacts import read_manifest, write_manifest
+
+    request = queue.decide(request_id, approved, actor_id=actor_id, notes=notes)
+    record_gate_decision(
+        approved=approved,
+        approval_source="approval_queue",
+        step_idx=request["step_idx"],
+        agent_name=request["agent_name"],
+        gate_strategy=request["gate_strategy"],
+        run_id=request["run_id"],
+        run_dir=request["run_dir"],
+        write_ledger_fn=root_agent.write_ledger,
+        utc_now_fn=root_agent.utc_now,
+        gate_type=request["gate_type"],
+        gate_reason=request["gate_reason"],
+    )
+
+    if not approved:
+        run_dir = Path(request["run_dir"])
+        manifest = read_manifest(run_dir)
+        manifest["status"] = "aborted"
+        manifest.pop("pending_approval", None)
+        write_manifest(run_dir, manifest)
+        try:
+            root_agent.generate_audit_summary(request["run_id"], str(run_dir), ledger_path=root_agent.LEDGER_PATH)
+        except Exception:
+            pass
+        service_job = request["resume"].get("service_job")
+        if service_job:
+            from orchestrator.service.jobs import JobQueue
+            JobQueue(service_job["jobs_path"]).abort_parked(
+                service_job["job_id"], f"Approval request {request_id} rejected")
+    elif resume:
+        resume_approved_run(queue, request)
+    return request
+
+
+def resume_approved_run(queue: ApprovalQueue, request: Dict[str, Any]) -> None:
+    """
+    Resume a parked run from the step after its approved gate.
+
+    A service job's run is handed back to the service instead: the job is
+    requeued and a worker resumes it under its lease and tenant quota.
+    """
+    from orchestrator import root_agent
+    from orchestrator.run_artifacts import read_checkpoint
+
+    run_dir = Path(request["run_dir"])
+    resume = request["resume"]
+    service_job = resume.get("service_job")
+    if service_job:
+        from orchestrator.service.jobs import JobQueue
+        requeued = JobQueue(service_job["jobs_path"]).requeue(
+            service_job["job_id"], {"request_id": request["request_id"], "step_idx": request["step_idx"]})
+        if not requeued:
+            print(f"Service job {service_job['job_id']} is no longer awaiting approval; not requeued")
+            return
+        queue.mark_resumed(request["request_id"])
+        print(f"Requeued service job {service_job['job_id']} to resume after step {request['step_idx']}")
+        return
+
+    state = read_checkpoint(run_dir / "checkpoints", request["step_idx"])
+    queue.mark_resumed(request["request_id"])
+
+    # PROVIDER is passed through, not set in os.environ: resumes run in
+    # threads next to other runs (HTTP decisions, service workers)
+    root_agent.run_pipeline(
+        config_path=resume.get("config_path"),
+        run_dir=str(run_dir),
+        start_step=request["step_idx"] + 1,
+        initial_state=state,
+        config_overrides=resume.get("config_overrides"),
+        governance_profile=resume.get("governance_profile"),
+        max_step=resume.get("max_step"),
+        inputs_dir=resume.get("inputs_dir", root_agent.INPUTS_DIR),
+        provider_env=resume.get("provider_env"),
+    )
+
+
+def cancel_parked_run(run_dir: str, reason: str) -> Optional[str]:
+    """
+    Cancel a run parked at a gate: close its pending approval request (in the
+    queue its run plan used), mark the manifest cancelled and log run_cancelled.
+
+    Returns:
+        The closed request_id (None if no request was pending)
+    """
+    from orchestrator import root_agent
+    from orchestrator.run_artifacts import read_manifest, write_manifest
+    from orchestrator.run_plan import read_run_plan
+
+    run_dir = Path(run_dir)
+    plan = read_run_plan(run_dir)
+    queue_path = (plan.approval.get("queue_path") if plan is not None else None) or DEFAULT_QUEUE_PATH
+    manifest = read_manifest(run_dir)
+    pending = manifest.pop("pending_approval", None) or {}
+    request_id = pending.get("request_id")
+    if request_id and not ApprovalQueue(queue_path).cancel(request_id, notes=reason):
+        request_id = None
+    manifest["status"] = "cancelled"
+    write_manifest(run_dir, manifest)
+    root_agent.write_ledger({
+        "timestamp_utc": root_agent.utc_now(),
+        "event": "run_cancelled",
+        "reason": reason,
+        "last_step_completed": manifest.get("current_step_completed"),
+        "approval_request_id": request_id,
+        "run_id": manifest.get("run_id", run_dir.name),
+        "run_dir": str(run_dir),
+    })
+    return request_id
+
+
+def resume_request(queue: ApprovalQueue, request_id: str) -> Dict[str, Any]:
+    """
+    Resume the run of an approval recorded without resuming it.
+
+    Returns:
+        The request dict
+
+    Raises:
+        KeyError: Unknown request
+        ValueError: Request is not approved (pending, rejected or already resumed)
+    """
+    request = queue.get(request_id)
+    if request is None:
+        raise KeyError(f"Unknown approval request: {request_id}")
+    if request["status"] != "approved":
+        raise ValueError(f"Approval request {request_id} is {request['status']}; only approved requests resume")
+    resume_approved_run(queue, request)
+    return request
+
+
+# ------------------------------------------------------------------------------
+# Local HTTP Endpoint
+# ------------------------------------------------------------------------------
+
+def make_http_server(
+    queue: ApprovalQueue,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    decide_fn: Callable[..., Dict[str, Any]] = apply_decision,
+) -> "ThreadingHTTPServer":
+    """
+    Build the approvals HTTP server (call serve_forever() to run it).
+
+    Approved runs are resumed in a background thread so the response
+    returns as soon as the decision is recorded.
+    """
+
+    # Imported here so the pipeline and `adk approvals list` skip http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Any) -> None:
+            body = json.dumps(payload, indent=2).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if parts == ["approvals"]:
+                query = parse_qs(url.query)
+                status = (query.get("status") or [None])[0]
+                run_id = (query.get("run_id") or [None])[0]
+                return self._send(200, queue.list(status=status, run_id=run_id))
+            if len(parts) == 2 and parts[0] == "approvals":
+                request = queue.get(parts[1])
+                if request is None:
+                    return self._send(404, {"error": f"Unknown approval request: {parts[1]}"})
+                return self._send(200, request)
+            self._send(404, {"error": "Not found"})
+
+        def do_POST(self):
+            parts = [p for p in urlparse(self.path).path.split("/") if p]
+            if len(parts) != 3 or parts[0] != "approvals" or parts[2] not in ("approve", "reject"):
+                return self._send(404, {"error": "Not found"})
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                return self._send(400, {"error": "Body must be JSON"})
+
+            approved = parts[2] == "approve"
+            try:
+                request = decide_fn(
+                    queue, parts[1], approved,
+                    actor_id=body.get("actor_id"), notes=body.get("notes"), resume=False,
+                )
+            except KeyError as e:
+                return self._send(404, {"error": e.args[0]})
+            except ValueError as e:
+                return self._send(409, {"error": str(e)})
+
+            if approved:
+                threading.Thread(target=_resume_quietly, args=(queue, request), daemon=True).start()
+            self._send(200, request)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def _resume_quietly(queue: ApprovalQueue, request: Dict[str, Any]) -> None:
+    # run_pipeline reports its own failures (ledger, manifest) and exits
+    try:
+        resume_approved_run(queue, request)
+    except SystemExit:
+        pass
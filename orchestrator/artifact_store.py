@@ -0,0 +1,338 @@
+"""
+Content-addressed artifact store for run outputs.
+
+Deliverables (``NN_agent.md``), step state files (``NN_agent_state.json``),
+checkpoints (``checkpoints/step_NN_state.json``) and ``99_final_state.json``
+are often byte-identical across runs (cached or replayed steps, unchanged
+upstream state). With the store enabled they are written once as
+zlib-compressed blobs named by the sha256 of their content
+(``outputs/_cas/<ab>/<sha256>``), and the run directory keeps a small
+pointer manifest (``artifacts.json``) mapping each relative path to its
+digest. ``run_manifest.json``, audit summaries, ``dist/`` and the run plan
+stay plain files.
+
+Readers go through read_run_bytes / read_run_text / read_run_json /
+list_run_files, which take a plain file when one exists and otherwise
+resolve the pointer, so both layouts (and runs written before the store)
+read the same. They also resolve the files of a run in log storage mode
+(see orchestrator/run_log.py) from its log, and the files of an archived
+run (see orchestrator/run_archive.py) from its month archive. ``adk runs materialize``
+(materialize_run) writes the plain layout back, in place or to another
+directory.
+
+The pointer manifest records the store path relative to the run directory,
+so readers need no config. Configured in run_config (all keys optional)::
+
+    "artifact_store": {"enabled": true, "path": "outputs/_cas", "compression_level": 6}
+"""
+
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import shutil
+import zlib
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from orchestrator.run_log import RUN_LOG_FILENAME, load_view
+from orchestrator.shared_fs import atomic_write_bytes, atomic_write_json
+
+POINTER_MANIFEST = "artifacts.json"
+DEFAULT_STORE_DIRNAME = "_cas"  # under the outputs directory
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+# ------------------------------------------------------------------------------
+# Settings
+# ------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class StoreSettings:
+    """Resolved ``artifact_store`` block."""
+    path: Optional[str] = None  # None: <outputs>/_cas
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL
+
+
+def store_settings(config: Mapping[str, Any]) -> Optional[StoreSettings]:
+    """
+    Read the ``artifact_store`` block of a run config.
+
+    Returns:
+        StoreSettings, or None when run artifacts are written as plain files
+
+    Raises:
+        ValueError: Malformed settings
+    """
+    cfg = config.get("artifact_store") or {}
+    if not isinstance(cfg, Mapping):
+        raise ValueError("artifact_store must be an object")
+    if not cfg.get("enabled", False):
+        return None
+    path = cfg.get("path")
+    if path is not None and (not isinstance(path, str) or not path):
+        raise ValueError("artifact_store.path must be a non-empty string")
+    level = cfg.get("compression_level", DEFAULT_COMPRESSION_LEVEL)
+    if isinstance(level, bool) or not isinstance(level, int) or not 0 <= level <= 9:
+        raise ValueError("artifact_store.compression_level must be an integer from 0 to 9")
+    return StoreSettings(path=path, compression_level=level)
+
+
+# ------------------------------------------------------------------------------
+# Blob store
+# ------------------------------------------------------------------------------
+
+class ArtifactStore:
+    """sha256-addressed, zlib-compressed blobs under one directory."""
+
+    def __init__(self, root: Union[str, Path], compression_level: int = DEFAULT_COMPRESSION_LEVEL):
+        self.root = Path(root)
+        self.compression_level = compression_level
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.blob_path(digest).exists()
+
+    def put(self, data: bytes) -> Tuple[str, bool]:
+        """
+        Store data unless a blob with the same content exists.
+
+        Returns:
+            Tuple of (sha256 hex digest, written) - written is False when deduplicated
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        try:
+            # A reused blob restarts the sweep grace period (orchestrator/run_archive.py)
+            # before the caller writes its pointer
+            os.utime(path)
+            return digest, False
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, zlib.compress(data, self.compression_level))
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        """
+        Raises:
+            FileNotFoundError: No blob with this digest
+            ValueError: The blob is corrupt (content does not match its digest)
+        """
+        path = self.blob_path(digest)
+        if not path.exists():
+            raise FileNotFoundError(f"Artifact blob not found: {path}")
+        with open(path, "rb") as f:
+            try:
+                data = zlib.decompress(f.read())
+            except zlib.error as e:
+                raise ValueError(f"Corrupt artifact blob {path}: {e}")
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Corrupt artifact blob {path}: content does not match its digest")
+        return data
+
+
+def default_store_root(outputs_dir: Union[str, Path], settings: StoreSettings) -> Path:
+    return Path(settings.path) if settings.path else Path(outputs_dir) / DEFAULT_STORE_DIRNAME
+
+
+# ------------------------------------------------------------------------------
+# Run directories
+# ------------------------------------------------------------------------------
+
+def load_pointers(run_dir: Union[str, Path]) -> Dict[str, Any]:
+    """The run's pointer manifest ({"store": ..., "files": {}} when there is none)."""
+    try:
+        with open(os.path.join(run_dir, POINTER_MANIFEST), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"store": None, "files": {}}
+
+
+def _run_store(run_dir: Path, pointers: Mapping[str, Any]) -> ArtifactStore:
+    return ArtifactStore(run_dir / pointers["store"])
+
+
+def _as_bytes(data: Union[str, bytes]) -> bytes:
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def write_run_file(
+    run_dir: Union[str, Path],
+    rel_path: str,
+    data: Union[str, bytes],
+    store: Optional[ArtifactStore] = None,
+) -> bool:
+    """
+    Write a run artifact: a plain file, or a blob plus a pointer when ``store`` is given.
+
+    Returns:
+        True when bytes were written (False when the store already had the content)
+    """
+    run_dir = Path(run_dir)
+    data = _as_bytes(data)
+    if store is None:
+        path = run_dir / rel_path
+        if "/" in rel_path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, data)
+        return True
+
+    digest, written = store.put(data)
+    pointers = load_pointers(run_dir)
+    pointers["store"] = os.path.relpath(store.root.resolve(), run_dir.resolve())
+    pointers["files"][rel_path] = {"sha256": digest, "size": len(data)}
+    atomic_write_json(run_dir / POINTER_MANIFEST, pointers)
+    # A stale plain copy (e.g. from before the store was enabled) would shadow the pointer
+    (run_dir / rel_path).unlink(missing_ok=True)
+    return written
+
+
+def read_run_bytes(run_dir: Union[str, Path], rel_path: str) -> bytes:
+    """
+    A run artifact from the run log (log storage mode), a plain file, a pointer
+    or the run's archive, in that order.
+
+    Raises:
+        FileNotFoundError: No run artifact at rel_path
+    """
+    run_dir = Path(run_dir)
+    view = load_view(run_dir)
+    if view is not None and rel_path in view.files:
+        return view.files[rel_path]
+    path = run_dir / rel_path
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    pointers = load_pointers(run_dir)
+    entry = pointers["files"].get(rel_path)
+    if entry is not None:
+        return _run_store(run_dir, pointers).get(entry["sha256"])
+    archived = _archived_files(run_dir).get(rel_path)
+    if archived is None:
+        raise FileNotFoundError(f"Run artifact not found: {path}")
+    archive, name = archived
+    return archive.read(name)
+
+
+def read_run_text(run_dir: Union[str, Path], rel_path: str) -> str:
+    return read_run_bytes(run_dir, rel_path).decode("utf-8")
+
+
+def read_run_json(run_dir: Union[str, Path], rel_path: str) -> Any:
+    return json.loads(read_run_bytes(run_dir, rel_path))
+
+
+def _logged_files(run_dir: Path) -> Dict[str, bytes]:
+    view = load_view(run_dir)
+    return view.files if view is not None else {}
+
+
+def _archived_files(run_dir: Path) -> Dict[str, Any]:
+    # run_archive builds on this module, so it is imported on first use
+    from orchestrator.run_archive import archived_files
+    return archived_files(run_dir)
+
+
+def run_file_exists(run_dir: Union[str, Path], rel_path: str) -> bool:
+    return (
+        rel_path in _logged_files(Path(run_dir))
+        or (Path(run_dir) / rel_path).exists()
+        or rel_path in load_pointers(run_dir)["files"]
+        or rel_path in _archived_files(Path(run_dir))
+    )
+
+
+def _matches(rel_path: str, pattern: str) -> bool:
+    parts, pattern_parts = PurePosixPath(rel_path).parts, PurePosixPath(pattern).parts
+    return len(parts) == len(pattern_parts) and all(
+        fnmatch.fnmatchcase(part, pat) for part, pat in zip(parts, pattern_parts)
+    )
+
+
+def list_run_files(run_dir: Union[str, Path], pattern: str) -> List[str]:
+    """Relative paths of run artifacts matching a glob pattern (e.g. ``*_state.json``), sorted."""
+    run_dir = Path(run_dir)
+    found = {
+        rel.replace(os.sep, "/") for rel in glob.glob(pattern, root_dir=run_dir, include_hidden=True)
+        if os.path.isfile(os.path.join(run_dir, rel))
+    }
+    found.update(rel for rel in load_pointers(run_dir)["files"] if _matches(rel, pattern))
+    found.update(rel for rel in _logged_files(run_dir) if _matches(rel, pattern))
+    found.update(rel for rel in _archived_files(run_dir) if _matches(rel, pattern))
+    return sorted(found)
+
+
+def list_run_artifacts(run_dir: Union[str, Path]) -> List[str]:
+    """Relative paths of every artifact of a run (plain, pointed-to, logged or archived), sorted."""
+    run_dir = Path(run_dir)
+    found = set(_archived_files(run_dir))
+    if run_dir.is_dir():
+        found.update(
+            p.relative_to(run_dir).as_posix() for p in run_dir.rglob("*")
+            if p.is_file() and p.name not in (POINTER_MANIFEST, RUN_LOG_FILENAME)
+        )
+        found.update(load_pointers(run_dir)["files"])
+        found.update(_logged_files(run_dir))
+    return sorted(found)
+
+
+def materialize_log(run_dir: Union[str, Path], store: Optional[ArtifactStore] = None) -> int:
+    """
+    Write the files of a run log (log storage mode) and remove the log.
+
+    ``run_manifest.json`` is always a plain file; the other artifacts go to
+    ``store`` when one is given.
+
+    Returns:
+        Number of files written
+    """
+    run_dir = Path(run_dir)
+    view = load_view(run_dir)
+    if view is None:
+        return 0
+    for rel_path, data in sorted(view.files.items()):
+        write_run_file(run_dir, rel_path, data, None if rel_path == "run_manifest.json" else store)
+    (run_dir / RUN_LOG_FILENAME).unlink()
+    return len(view.files)
+
+
+def materialize_run(run_dir: Union[str, Path], dest: Optional[Union[str, Path]] = None) -> Dict[str, int]:
+    """
+    Write the plain layout of a run: every pointed-to or logged artifact as a file.
+
+    In place (``dest`` None) the pointer manifest and the run log are removed
+    afterwards; otherwise the run directory is copied to ``dest`` (which must
+    not exist) and the copy is materialized. Blobs stay in the store.
+
+    Returns:
+        {"files": artifacts written, "bytes": their total size}
+    """
+    run_dir = Path(run_dir)
+    pointers = load_pointers(run_dir)
+    logged = _logged_files(run_dir)
+    target = run_dir
+    if dest is not None:
+        target = Path(dest)
+        if target.exists():
+            raise FileExistsError(f"Destination exists: {target}")
+        shutil.copytree(run_dir, target, ignore=shutil.ignore_patterns(POINTER_MANIFEST, RUN_LOG_FILENAME))
+
+    stats = {"files": 0, "bytes": 0}
+    for rel_path in sorted(set(pointers["files"]) | set(logged)):
+        if rel_path not in logged and (run_dir / rel_path).exists():
+            continue  # a plain file already takes precedence over its pointer
+        data = read_run_bytes(run_dir, rel_path)
+        write_run_file(target, rel_path, data)
+        stats["files"] += 1
+        stats["bytes"] += len(data)
+    if dest is None:
+        (run_dir / POINTER_MANIFEST).unlink(missing_ok=True)
+        (run_dir / RUN_LOG_FILENAME).unlink(missing_ok=True)
+    return stats
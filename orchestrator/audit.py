@@ -1,9 +1,11 @@
 import json
 import os
-import glob
 from pathlib import Path
 from typing import Dict, Any, List
 
+from orchestrator.artifact_store import list_run_files, read_run_json
+from orchestrator.shared_fs import append_line
+
 def load_json_safe(path: str) -> Dict[str, Any]:
     try:
         if not os.path.exists(path):
@@ -29,8 +31,7 @@ def utc_now():
 def write_ledger(event: Dict[str, Any], ledger_path: str = "governance/run_ledger.jsonl"):
     try:
         os.makedirs(os.path.dirname(ledger_path), exist_ok=True)
-        with open(ledger_path, "a") as f:
-            f.write(json.dumps(event) + "\n")
+        append_line(ledger_path, json.dumps(event))
     except Exception:
         pass
 
@@ -60,8 +61,10 @@ def generate_audit_summary(run_id: str, run_dir: str, ledger_path: str = "govern
         }
 
         # 1. Gather Run Metadata (Manifest & Config)
-        manifest_path = Path(run_dir) / "run_manifest.json"
-        manifest = load_json_safe(str(manifest_path))
+        try:
+            manifest = read_run_json(run_dir, "run_manifest.json")
+        except Exception:
+            manifest = {}
         
         # Load Config (global)
         config_path = "config/run_config.json"
@@ -90,6 +93,9 @@ def generate_audit_summary(run_id: str, run_dir: str, ledger_path: str = "govern
             "started_at_utc": manifest.get("started_at_utc"),
         }
 
+        # Provider usage, tokens and cost (aggregated per call by the orchestrator)
+        summary["usage_summary"] = manifest.get("usage_totals") or {}
+
         # Add Risk Gate Policy (Transparency)
         # Try manifest first (effective resolved config), then fallback to config default
         approval_cfg_manifest = manifest.get("approval_config", {})
@@ -205,14 +211,17 @@ def generate_audit_summary(run_id: str, run_dir: str, ledger_path: str = "govern
         # Reset unique counter
         all_open_questions = []
 
-        # Find all state files: NN_agentname_state.json
-        state_files = sorted(glob.glob(os.path.join(run_dir, "*_state.json")))
+        # Find all state files: NN_agentname_state.json (plain or in the artifact store)
+        state_files = list_run_files(run_dir, "*_state.json")
         
         for sf in state_files:
             if "99_final_state.json" in sf:
                 continue
                 
-            data = load_json_safe(sf)
+            try:
+                data = read_run_json(run_dir, sf)
+            except Exception:
+                data = {}
             qs = data.get("open_questions", [])
             if isinstance(qs, list):
                 all_open_questions.extend(qs)
@@ -0,0 +1,42 @@
+"""
+Offline batch-submission mode.
+
+Advances many queued courses wave by wave, sending each wave's provider
+calls as one batch (provider batch JSONL format) through a BatchBackend.
+"""
+
+from .backends import (
+    BatchBackend,
+    BatchError,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    get_batch_backend,
+)
+from .coordinator import (
+    BATCH_PROVIDER_PREFIX,
+    BatchCoordinator,
+    BatchCourse,
+    BatchStepProvider,
+    find_batch,
+    read_batch_manifest,
+    request_course_cancel,
+    resumable_courses,
+    run_outcome,
+)
+
+__all__ = [
+    "BatchBackend",
+    "BatchError",
+    "LocalBatchBackend",
+    "OpenAIBatchBackend",
+    "get_batch_backend",
+    "BatchCoordinator",
+    "BatchCourse",
+    "BatchStepProvider",
+    "BATCH_PROVIDER_PREFIX",
+    "find_batch",
+    "read_batch_manifest",
+    "request_course_cancel",
+    "resumable_courses",
+    "run_outcome",
+]
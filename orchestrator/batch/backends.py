@@ -0,0 +1,320 @@
+"""
+Batch backends - submit a JSONL batch of chat completion requests, poll, fetch.
+
+Request and result lines use the OpenAI Batch API JSONL format so the same
+files work against the real endpoint and the local stand-in:
+
+    request: {"custom_id", "method": "POST", "url": "/v1/chat/completions", "body": {...}}
+    result:  {"id", "custom_id", "response": {"status_code", "body": {...}}, "error": null}
+
+Backends:
+- LocalBatchBackend: file-based stand-in (no network); answers each request
+  with a local provider (DryRunProvider by default)
+- OpenAIBatchBackend: Files + Batches endpoints over urllib
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from orchestrator.providers.base import BaseProvider, flatten_messages
+from orchestrator.providers.openai_provider import JSON_SYSTEM_PROMPT
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# Batch statuses (mirrors the OpenAI Batch object)
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchError(Exception):
+    """A batch could not be submitted, failed, or produced unusable results."""
+    pass
+
+
+# ------------------------------------------------------------------------------
+# JSONL Lines
+# ------------------------------------------------------------------------------
+
+def build_request_line(
+    custom_id: str,
+    prompt: str,
+    model: str,
+    temperature: float,
+    messages: Optional[List[Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """
+    One batch request line carrying the same payload OpenAIProvider sends.
+
+    ``messages`` (cache-friendly layout) replaces the single user ``prompt`` message.
+    """
+    user_messages = [dict(m) for m in messages] if messages else [{"role": "user", "content": prompt}]
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": CHAT_COMPLETIONS_URL,
+        "body": {
+            "model": model,
+            "messages": [{"role": "system", "content": JSON_SYSTEM_PROMPT}] + user_messages,
+            "temperature": temperature,
+            "response_format": {"type": "json_object"},
+        },
+    }
+
+
+def parse_result_line(line: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the outcome of one batch result line.
+
+    Returns:
+        Dict with custom_id, content (str or None), usage and error (str or None)
+    """
+    custom_id = line.get("custom_id")
+    if line.get("error"):
+        err = line["error"]
+        message = err.get("message", str(err)) if isinstance(err, dict) else str(err)
+        return {"custom_id": custom_id, "content": None, "usage": None, "error": message}
+
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    if response.get("status_code") != 200:
+        message = (body.get("error") or {}).get("message") or f"status_code={response.get('status_code')}"
+        return {"custom_id": custom_id, "content": None, "usage": None, "error": message}
+
+    try:
+        content = body["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return {"custom_id": custom_id, "content": None, "usage": None,
+                "error": f"Unexpected response body: {json.dumps(body)[:200]}"}
+    return {"custom_id": custom_id, "content": content.strip(), "usage": body.get("usage"), "error": None}
+
+
+def write_jsonl(path: Path, lines: List[Dict[str, Any]]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for line in lines:
+            f.write(json.dumps(line) + "\n")
+
+
+def read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ------------------------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------------------------
+
+class BatchBackend:
+    """
+    Base interface for batch backends.
+
+    Any backend must implement:
+        submit(requests_path) -> batch_id
+        status(batch_id) -> one of validating/in_progress/finalizing/completed/failed/expired/cancelled
+        fetch_results(batch_id) -> list of result lines
+    """
+
+    name = "base"
+
+    def submit(self, requests_path: Path) -> str:
+        raise NotImplementedError("BatchBackend.submit(requests_path) must be implemented")
+
+    def status(self, batch_id: str) -> str:
+        raise NotImplementedError("BatchBackend.status(batch_id) must be implemented")
+
+    def fetch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError("BatchBackend.fetch_results(batch_id) must be implemented")
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    File-based stand-in for a provider batch endpoint.
+
+    Each submitted batch gets a directory under ``root_dir`` holding
+    input.jsonl, batch.json (status) and, once processed, output.jsonl.
+    Requests are answered by ``responder`` after ``polls_until_complete``
+    status polls, so callers exercise the same submit/poll/fetch cycle.
+    """
+
+    name = "local"
+
+    def __init__(self, root_dir: Path, responder: Optional[BaseProvider] = None, polls_until_complete: int = 1):
+        from orchestrator.providers.dry_run_provider import DryRunProvider
+
+        self.root_dir = Path(root_dir)
+        self.responder = responder or DryRunProvider()
+        self.polls_until_complete = polls_until_complete
+
+    def _batch_dir(self, batch_id: str) -> Path:
+        return self.root_dir / batch_id
+
+    def _read_batch(self, batch_id: str) -> Dict[str, Any]:
+        path = self._batch_dir(batch_id) / "batch.json"
+        if not path.exists():
+            raise BatchError(f"Unknown batch: {batch_id}")
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _write_batch(self, batch: Dict[str, Any]) -> None:
+        with open(self._batch_dir(batch["id"]) / "batch.json", "w") as f:
+            json.dump(batch, f, indent=2)
+
+    def submit(self, requests_path: Path) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        batch_dir = self._batch_dir(batch_id)
+        batch_dir.mkdir(parents=True)
+        requests = read_jsonl(requests_path)
+        write_jsonl(batch_dir / "input.jsonl", requests)
+        self._write_batch({
+            "id": batch_id,
+            "status": "validating",
+            "created_at": datetime.utcnow().isoformat(),
+            "polls": 0,
+            "request_counts": {"total": len(requests), "completed": 0, "failed": 0},
+        })
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        batch = self._read_batch(batch_id)
+        if batch["status"] in TERMINAL_STATUSES:
+            return batch["status"]
+
+        batch["polls"] += 1
+        if batch["polls"] < self.polls_until_complete:
+            batch["status"] = "in_progress"
+        else:
+            self._process(batch)
+        self._write_batch(batch)
+        return batch["status"]
+
+    def _process(self, batch: Dict[str, Any]) -> None:
+        batch_dir = self._batch_dir(batch["id"])
+        results = []
+        for req in read_jsonl(batch_dir / "input.jsonl"):
+            prompt = flatten_messages([m for m in req["body"]["messages"] if m["role"] == "user"])
+            result = {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": req["custom_id"]}
+            try:
+                content = self.responder.run(prompt)
+                result["response"] = {
+                    "status_code": 200,
+                    "body": {
+                        "object": "chat.completion",
+                        "model": req["body"].get("model"),
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                     "finish_reason": "stop"}],
+                    },
+                }
+                result["error"] = None
+                batch["request_counts"]["completed"] += 1
+            except Exception as e:
+                result["response"] = None
+                result["error"] = {"code": "responder_error", "message": str(e)}
+                batch["request_counts"]["failed"] += 1
+            results.append(result)
+        write_jsonl(batch_dir / "output.jsonl", results)
+        batch["status"] = "completed"
+        batch["completed_at"] = datetime.utcnow().isoformat()
+
+    def fetch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        batch = self._read_batch(batch_id)
+        if batch["status"] != "completed":
+            raise BatchError(f"Batch {batch_id} is not completed (status={batch['status']})")
+        return read_jsonl(self._batch_dir(batch_id) / "output.jsonl")
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """
+    OpenAI Batch API backend (Files + Batches endpoints, 24h completion window).
+
+    Requires:
+        - OPENAI_API_KEY environment variable
+    """
+
+    name = "openai"
+
+    def __init__(self, api_base: str = "https://api.openai.com/v1", completion_window: str = "24h"):
+        self.api_key = os.environ.get("OPENAI_API_KEY", "").strip()
+        if not self.api_key:
+            raise ValueError(
+                "OPENAI_API_KEY environment variable is required for OpenAI batch mode. "
+                "Set it before running: export OPENAI_API_KEY='your-key-here'"
+            )
+        self.api_base = api_base.rstrip("/")
+        self.completion_window = completion_window
+
+    def _request(self, method: str, path: str, data: bytes = None, content_type: str = "application/json") -> bytes:
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if data is not None:
+            headers["Content-Type"] = content_type
+        request = urllib.request.Request(f"{self.api_base}{path}", data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=300) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            raise BatchError(f"OpenAI batch request {method} {path} failed with status {e.code}: "
+                             f"{e.read().decode('utf-8', 'replace')}")
+
+    def _upload(self, requests_path: Path) -> str:
+        boundary = f"----adkbatch{uuid.uuid4().hex}"
+        file_bytes = Path(requests_path).read_bytes()
+        body = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="purpose"\r\n\r\n'
+            "batch\r\n"
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{Path(requests_path).name}"\r\n'
+            "Content-Type: application/jsonl\r\n\r\n"
+        ).encode("utf-8") + file_bytes + f"\r\n--{boundary}--\r\n".encode("utf-8")
+        response = self._request("POST", "/files", body, content_type=f"multipart/form-data; boundary={boundary}")
+        return json.loads(response)["id"]
+
+    def submit(self, requests_path: Path) -> str:
+        input_file_id = self._upload(requests_path)
+        payload = {
+            "input_file_id": input_file_id,
+            "endpoint": CHAT_COMPLETIONS_URL,
+            "completion_window": self.completion_window,
+        }
+        response = self._request("POST", "/batches", json.dumps(payload).encode("utf-8"))
+        return json.loads(response)["id"]
+
+    def _batch(self, batch_id: str) -> Dict[str, Any]:
+        return json.loads(self._request("GET", f"/batches/{batch_id}"))
+
+    def status(self, batch_id: str) -> str:
+        return self._batch(batch_id)["status"]
+
+    def fetch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        batch = self._batch(batch_id)
+        if batch["status"] != "completed":
+            raise BatchError(f"Batch {batch_id} is not completed (status={batch['status']})")
+        lines = []
+        for key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(key)
+            if file_id:
+                content = self._request("GET", f"/files/{file_id}/content").decode("utf-8")
+                lines.extend(json.loads(line) for line in content.splitlines() if line.strip())
+        return lines
+
+
+def get_batch_backend(name: str, root_dir: Path = None) -> BatchBackend:
+    """
+    Factory for batch backends.
+
+    Args:
+        name: 'local' or 'openai'
+        root_dir: Working directory for the local backend
+    """
+    name = (name or "").strip().lower()
+    if name == "local":
+        return LocalBatchBackend(root_dir or Path("outputs") / "_batches")
+    elif name == "openai":
+        return OpenAIBatchBackend()
+    else:
+        raise ValueError(f"Unknown batch backend: '{name}'. Supported backends: 'local', 'openai'.")
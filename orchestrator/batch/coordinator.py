@@ -0,0 +1,472 @@
+"""
+Batch coordinator - advance many queued courses wave by wave through one batch per wave.
+
+Each course runs the normal run_pipeline() in its own worker thread with a
+BatchStepProvider. When a course reaches a provider call, the provider parks
+the prompt with the coordinator and blocks. Once every active course is
+parked (or finished), the coordinator writes one JSONL batch, submits it,
+polls until it completes, and hands each result back to the waiting course,
+which then continues through the usual parse/validate/checkpoint/gate flow
+until its next provider call. Identical prompts within a wave are sent once.
+
+A single course can be cancelled (``cancel()``, or from another process with
+request_course_cancel() / ``run_batch.py --cancel``): it stops before its next
+step or provider call with its manifest marked ``cancelled``, and the other
+courses continue.
+
+Each course's outcome is the final status its run recorded in
+run_manifest.json (``completed``, ``awaiting_approval``, ``cancelled``,
+``failed``, ...; ``fenced`` if the run stopped without recording one).
+batch_manifest.json lists the courses, so an interrupted batch can be resumed
+(resumable_courses(), ``run_batch.py --resume``): every course that did not
+finish continues from its last checkpoint through a new coordinator on the
+same work directory. A batch course's run plan names the batch provider
+(``batch:<backend>``), which only a coordinator can serve, so
+scripts/resume_run.py does not resume it.
+
+Courses may be tagged with a tenant (recorded in each run manifest); with
+``tenants`` settings, the courses of a tenant with a token quota share one
+meter limited to that quota (see orchestrator/tenants.py).
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from orchestrator.batch.backends import (
+    TERMINAL_STATUSES,
+    BatchBackend,
+    BatchError,
+    build_request_line,
+    parse_result_line,
+    write_jsonl,
+)
+from orchestrator.providers.base import BaseProvider, flatten_messages, normalize_usage
+from orchestrator.run_artifacts import read_checkpoint, read_manifest
+from orchestrator.run_control import RunCancelledError
+from orchestrator.tenants import TenantSettings, tenant_meters
+from orchestrator.usage import UsageMeter
+
+# Cancel request files: <work_dir>/cancel/<course_id>
+CANCEL_DIRNAME = "cancel"
+CANCEL_POLL_SECONDS = 1.0
+
+BATCH_MANIFEST_FILENAME = "batch_manifest.json"
+# Provider name recorded in a batch course's run plan: batch:<backend>
+BATCH_PROVIDER_PREFIX = "batch:"
+# Run statuses a resumed batch leaves alone
+FINISHED_STATUSES = ("completed", "aborted")
+
+
+def request_course_cancel(work_dir: Path, course_id: str) -> Path:
+    """Ask a running batch (possibly in another process) to cancel one course."""
+    path = Path(work_dir) / CANCEL_DIRNAME / course_id
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return path
+
+
+@dataclass
+class BatchCourse:
+    """
+    A queued course: its inputs, the run directory to create and its tenant.
+
+    A resumed course also carries the step to continue from and the state of
+    its last checkpoint (see resumable_courses()).
+    """
+    course_id: str
+    inputs_dir: str
+    run_dir: str
+    tenant_id: Optional[str] = None
+    start_step: int = 1
+    initial_state: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Entry recorded in batch_manifest.json (without resume state)."""
+        data = asdict(self)
+        del data["start_step"], data["initial_state"]
+        return data
+
+
+def read_batch_manifest(work_dir: Path) -> Dict[str, Any]:
+    """
+    Load <work_dir>/batch_manifest.json.
+
+    Raises:
+        FileNotFoundError: No batch manifest in work_dir
+    """
+    with open(Path(work_dir) / BATCH_MANIFEST_FILENAME, "r") as f:
+        return json.load(f)
+
+
+def run_outcome(run_dir: str, stopped: str = "failed") -> str:
+    """Final status a course's run recorded in its manifest; ``stopped`` if it recorded none."""
+    try:
+        status = read_manifest(Path(run_dir)).get("status")
+    except FileNotFoundError:
+        return "failed"
+    return stopped if status in (None, "running") else status
+
+
+def resumable_courses(work_dir: Path) -> List[BatchCourse]:
+    """
+    Courses of a batch whose runs did not finish, set to continue from their
+    last checkpoint (a course that completed no step starts over).
+
+    Raises:
+        FileNotFoundError: No batch manifest in work_dir
+    """
+    courses = []
+    for entry in read_batch_manifest(work_dir).get("courses", []):
+        course = BatchCourse(**entry)
+        try:
+            manifest = read_manifest(Path(course.run_dir))
+        except FileNotFoundError:
+            courses.append(course)
+            continue
+        if manifest.get("status") in FINISHED_STATUSES:
+            continue
+        last_step = manifest.get("current_step_completed", 0)
+        if last_step:
+            course.start_step = last_step + 1
+            course.initial_state = read_checkpoint(Path(course.run_dir) / "checkpoints", last_step)
+        courses.append(course)
+    return courses
+
+
+def find_batch(batches_dir: Path, run_dir: Path) -> Optional[str]:
+    """Batch id (work directory name under batches_dir) that ran run_dir, if any."""
+    run_dir = Path(run_dir).resolve()
+    for manifest_path in sorted(Path(batches_dir).glob(f"*/{BATCH_MANIFEST_FILENAME}")):
+        try:
+            entries = read_batch_manifest(manifest_path.parent).get("courses", [])
+        except (OSError, ValueError):
+            continue
+        if any(Path(entry["run_dir"]).resolve() == run_dir for entry in entries):
+            return manifest_path.parent.name
+    return None
+
+
+@dataclass
+class _Pending:
+    prompt: str
+    key: str
+    messages: Optional[List[Dict[str, str]]] = None
+    done: threading.Event = field(default_factory=threading.Event)
+    content: Optional[str] = None
+    usage: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
+    cancelled: bool = False
+
+
+class BatchStepProvider(BaseProvider):
+    """Provider handed to run_pipeline(); each run() waits for the next wave's batch."""
+
+    def __init__(self, coordinator: "BatchCoordinator", course_id: str):
+        self.coordinator = coordinator
+        self.course_id = course_id
+        self.provider_name = f"{BATCH_PROVIDER_PREFIX}{coordinator.backend.name}"
+        self.model = coordinator.model
+
+    def run(self, prompt: str) -> str:
+        return self._request(prompt)
+
+    def run_messages(self, messages: List[Dict[str, str]]) -> str:
+        return self._request(flatten_messages(messages), messages)
+
+    def _request(self, prompt: str, messages: Optional[List[Dict[str, str]]] = None) -> str:
+        pending = self.coordinator.submit(self.course_id, prompt, messages=messages)
+        self.last_usage = pending.usage
+        return pending.content
+
+
+class BatchCoordinator:
+    """
+    Collects ready steps across courses into batches and fans results back.
+
+    A coordinator on the work directory of an earlier batch continues its
+    wave numbering and course list (resuming that batch).
+
+    Args:
+        backend: BatchBackend to submit to
+        work_dir: Directory for per-wave request files and batch_manifest.json
+        model: Model name written into each request body
+        temperature: Sampling temperature written into each request body
+        poll_interval: Seconds between status polls
+        max_wait_seconds: Give up on a batch after this long
+        usage_meter: Batch-wide UsageMeter passed to every course's run
+                     (max_batch_tokens / max_batch_cost_usd budgets)
+        tenants: Tenant token quotas applied to the tagged courses
+    """
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        work_dir: Path,
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.2,
+        poll_interval: float = 30.0,
+        max_wait_seconds: float = 24 * 3600,
+        usage_meter: Optional[UsageMeter] = None,
+        tenants: Optional[TenantSettings] = None,
+    ):
+        self.backend = backend
+        self.work_dir = Path(work_dir)
+        self.model = model
+        self.temperature = temperature
+        self.poll_interval = poll_interval
+        self.max_wait_seconds = max_wait_seconds
+        self.usage_meter = usage_meter
+        self.tenants = tenants
+        self.tenant_meters: Dict[str, UsageMeter] = {}
+
+        self._cond = threading.Condition()
+        self._active = set()
+        self._pending: Dict[str, _Pending] = {}
+        self._cancelled = set()
+        self.waves: List[Dict[str, Any]] = []
+        self.courses: Dict[str, Dict[str, Any]] = {}
+        if (self.work_dir / BATCH_MANIFEST_FILENAME).exists():
+            previous = read_batch_manifest(self.work_dir)
+            self.waves = previous.get("waves", [])
+            self.courses = {entry["course_id"]: entry for entry in previous.get("courses", [])}
+
+    # --------------------------------------------------------------------------
+    # Worker side
+    # --------------------------------------------------------------------------
+
+    def request(self, course_id: str, prompt: str, messages: Optional[List[Dict[str, str]]] = None) -> str:
+        return self.submit(course_id, prompt, messages=messages).content
+
+    def submit(self, course_id: str, prompt: str, messages: Optional[List[Dict[str, str]]] = None) -> _Pending:
+        """Park a prompt until its wave completes; returns the answered request (content, usage)."""
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        pending = _Pending(prompt=prompt, key=key, messages=messages)
+        with self._cond:
+            if course_id in self._cancelled:
+                raise RunCancelledError(f"Course {course_id} cancelled")
+            self._pending[course_id] = pending
+            self._cond.notify_all()
+        pending.done.wait()
+        if pending.cancelled:
+            raise RunCancelledError(f"Course {course_id} cancelled")
+        if pending.error is not None:
+            raise BatchError(f"Batch request failed for {course_id}: {pending.error}")
+        return pending
+
+    def cancel(self, course_id: str) -> bool:
+        """
+        Cancel one course; the others continue.
+
+        A course parked on a request is released at once; one whose request is
+        in the current batch stops after that step is checkpointed.
+
+        Returns:
+            False if the course is not running (or already cancelled)
+        """
+        with self._cond:
+            if course_id not in self._active or course_id in self._cancelled:
+                return False
+            self._cancelled.add(course_id)
+            pending = self._pending.pop(course_id, None)
+            self._cond.notify_all()
+        if pending is not None:
+            pending.cancelled = True
+            pending.done.set()
+        return True
+
+    def cancel_all(self) -> None:
+        with self._cond:
+            active = sorted(self._active)
+        for course_id in active:
+            self.cancel(course_id)
+
+    def is_cancelled(self, course_id: str) -> bool:
+        """cancel_check for a course's run (also picks up cancel request files)."""
+        if course_id not in self._cancelled and (self.work_dir / CANCEL_DIRNAME / course_id).exists():
+            self.cancel(course_id)
+        return course_id in self._cancelled
+
+    def _check_cancel_requests(self) -> None:
+        cancel_dir = self.work_dir / CANCEL_DIRNAME
+        if cancel_dir.is_dir():
+            for path in cancel_dir.iterdir():
+                self.cancel(path.name)
+
+    def _finish(self, course_id: str) -> None:
+        with self._cond:
+            self._active.discard(course_id)
+            self._cond.notify_all()
+
+    # --------------------------------------------------------------------------
+    # Coordinator side
+    # --------------------------------------------------------------------------
+
+    def _wait_for_wave(self) -> Dict[str, _Pending]:
+        """Block until every active course is parked on a request; return them."""
+        with self._cond:
+            while self._active and len(self._pending) < len(self._active):
+                self._cond.wait(timeout=CANCEL_POLL_SECONDS)
+                self._check_cancel_requests()
+            wave = dict(self._pending)
+            self._pending.clear()
+            return wave
+
+    def _run_wave(self, wave_idx: int, wave: Dict[str, _Pending]) -> None:
+        wave_dir = self.work_dir / f"wave_{wave_idx:02d}"
+        started = time.monotonic()
+
+        # One request line per distinct prompt
+        custom_ids = {}
+        lines = []
+        for course_id, pending in sorted(wave.items()):
+            if pending.key not in custom_ids:
+                custom_id = f"w{wave_idx:02d}-{pending.key[:16]}"
+                custom_ids[pending.key] = custom_id
+                lines.append(build_request_line(
+                    custom_id, pending.prompt, self.model, self.temperature, messages=pending.messages
+                ))
+        requests_path = wave_dir / "requests.jsonl"
+        write_jsonl(requests_path, lines)
+
+        record = {
+            "wave": wave_idx,
+            "courses": sorted(wave),
+            "requests": len(lines),
+            "deduplicated": len(wave) - len(lines),
+            "submitted_at_utc": datetime.utcnow().isoformat(),
+        }
+        try:
+            batch_id = self.backend.submit(requests_path)
+            record["batch_id"] = batch_id
+            status = self._poll(batch_id)
+            record["status"] = status
+            if status != "completed":
+                raise BatchError(f"Batch {batch_id} ended with status '{status}'")
+
+            results = {}
+            for line in self.backend.fetch_results(batch_id):
+                parsed = parse_result_line(line)
+                results[parsed["custom_id"]] = parsed
+            write_jsonl(wave_dir / "results.jsonl", list(results.values()))
+
+            billed = set()
+            for _, pending in sorted(wave.items()):
+                result = results.get(custom_ids[pending.key])
+                if result is None:
+                    pending.error = "missing from batch results"
+                else:
+                    pending.content, pending.error = result["content"], result["error"]
+                    # A deduplicated request is billed once, to the first course that sent it
+                    if pending.key not in billed:
+                        billed.add(pending.key)
+                        pending.usage = normalize_usage(result.get("usage"))
+            record["failed"] = sum(1 for p in wave.values() if p.error is not None)
+        except Exception as e:
+            record.setdefault("status", "error")
+            record["error"] = str(e)
+            for pending in wave.values():
+                pending.error = str(e)
+        finally:
+            record["duration_seconds"] = round(time.monotonic() - started, 3)
+            self.waves.append(record)
+            self._write_manifest()
+            for pending in wave.values():
+                pending.done.set()
+
+    def _poll(self, batch_id: str) -> str:
+        deadline = time.monotonic() + self.max_wait_seconds
+        while True:
+            status = self.backend.status(batch_id)
+            if status in TERMINAL_STATUSES:
+                return status
+            if time.monotonic() >= deadline:
+                raise BatchError(f"Batch {batch_id} did not complete within {self.max_wait_seconds}s")
+            time.sleep(self.poll_interval)
+
+    def _write_manifest(self) -> None:
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.work_dir / BATCH_MANIFEST_FILENAME, "w") as f:
+            json.dump({
+                "backend": self.backend.name,
+                "model": self.model,
+                "courses": list(self.courses.values()),
+                "waves": self.waves,
+            }, f, indent=2)
+
+    def run_courses(
+        self,
+        courses: List[BatchCourse],
+        run_fn: Optional[Callable[..., None]] = None,
+    ) -> Dict[str, str]:
+        """
+        Run every course until it stops, one batch per wave.
+
+        Args:
+            courses: Courses to advance (resumed courses continue from their start_step)
+            run_fn: Pipeline entry point (default: orchestrator.root_agent.run_pipeline)
+
+        Returns:
+            Mapping of course_id -> final run status from the course's manifest
+            ('completed', 'awaiting_approval', 'cancelled', 'failed', ...; 'fenced'
+            if the run stopped without recording one)
+        """
+        if run_fn is None:
+            from orchestrator.root_agent import run_pipeline as run_fn
+
+        outcomes: Dict[str, str] = {}
+        self.courses.update((c.course_id, c.to_dict()) for c in courses)
+        self._write_manifest()
+        if self.tenants is not None:
+            self.tenant_meters = tenant_meters(
+                self.tenants, [c.tenant_id for c in courses if c.tenant_id], parent=self.usage_meter
+            )
+
+        def worker(course: BatchCourse) -> None:
+            provider = BatchStepProvider(self, course.course_id)
+            try:
+                meter = self.tenant_meters.get(course.tenant_id, self.usage_meter)
+                kwargs = {"usage_meter": meter} if meter is not None else {}
+                if course.tenant_id:
+                    kwargs["tenant_id"] = course.tenant_id
+                if course.initial_state is not None:
+                    kwargs.update(start_step=course.start_step, initial_state=course.initial_state)
+                run_fn(
+                    run_dir=course.run_dir,
+                    inputs_dir=course.inputs_dir,
+                    provider_override=provider,
+                    cancel_check=lambda: self.is_cancelled(course.course_id),
+                    **kwargs,
+                )
+                # A run that returns still "running" was fenced (another owner took it over)
+                outcomes[course.course_id] = run_outcome(course.run_dir, stopped="fenced")
+            except (Exception, SystemExit):
+                # run_pipeline records the failure (manifest, ledger) and exits non-zero
+                outcomes[course.course_id] = run_outcome(course.run_dir)
+            finally:
+                self._finish(course.course_id)
+
+        with self._cond:
+            self._active = {c.course_id for c in courses}
+
+        threads = [threading.Thread(target=worker, args=(c,), name=f"batch-{c.course_id}") for c in courses]
+        for t in threads:
+            t.start()
+
+        wave_idx = len(self.waves)
+        while True:
+            wave = self._wait_for_wave()
+            if not wave:
+                break
+            wave_idx += 1
+            self._run_wave(wave_idx, wave)
+
+        for t in threads:
+            t.join()
+        self._write_manifest()
+        return outcomes
@@ -6,10 +6,11 @@ Handles loading, saving, validation, and hashing of the v0.6 Course Architecture
 
 import json
 import hashlib
-import jsonschema
 from pathlib import Path
 from typing import Dict, Any, Union
 
+from orchestrator import file_cache
+
 # Define paths relative to this file
 ORCHESTRATOR_DIR = Path(__file__).parent
 PROJECT_ROOT = ORCHESTRATOR_DIR.parent
@@ -21,8 +22,7 @@ def _load_schema(schema_name: str) -> Dict[str, Any]:
     if not schema_path.exists():
         raise FileNotFoundError(f"Schema not found: {schema_path}")
     
-    with open(schema_path, "r") as f:
-        schema = json.load(f)
+    schema = file_cache.read_json(schema_path)
         
     return schema
 
@@ -82,6 +82,8 @@ def validate_course_architecture(obj: Dict[str, Any]) -> None:
     Raises:
         ValueError: If validation fails, with a descriptive error message.
     """
+    import jsonschema  # deferred: ~100 ms import, only needed when validating
+
     try:
         # Load schemas
         ca_schema = _load_schema("course_architecture.json")
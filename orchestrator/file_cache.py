@@ -0,0 +1,61 @@
+"""
+Mtime-checked file cache for config, prompts and schemas.
+
+Each read stats the file and only re-reads it when its mtime or size
+changed, so a long-running process (``python -m adk serve``) keeps these
+files loaded and still picks up edits on the next read (hot reload). For a
+one-shot CLI run the behaviour is the same as reading the file directly.
+
+Entries are never evicted, so only the fixed set of deployment files goes
+through here; per-run files such as course inputs are read directly.
+"""
+
+import copy
+import json
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+_lock = threading.Lock()
+_text_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_json_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+
+def _signature(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def read_text(path) -> str:
+    """Return the file's text, re-reading it only if it changed on disk."""
+    key = os.path.abspath(path)
+    sig = _signature(key)
+    with _lock:
+        cached = _text_cache.get(key)
+        if cached and cached[0] == sig:
+            return cached[1]
+    with open(key, "r") as f:
+        text = f.read()
+    with _lock:
+        _text_cache[key] = (sig, text)
+    return text
+
+
+def read_json(path) -> Any:
+    """Return a fresh copy of the file's parsed JSON, re-parsing only on change."""
+    key = os.path.abspath(path)
+    sig = _signature(key)
+    with _lock:
+        cached = _json_cache.get(key)
+    if not cached or cached[0] != sig:
+        cached = (sig, json.loads(read_text(key)))
+        with _lock:
+            _json_cache[key] = cached
+    return copy.deepcopy(cached[1])
+
+
+def clear() -> None:
+    """Drop every cached file."""
+    with _lock:
+        _text_cache.clear()
+        _json_cache.clear()
@@ -0,0 +1,251 @@
+"""
+Active knowledge pack content for agent prompts.
+
+``adk pack apply`` / ``rollback`` maintain ``knowledge/active/ACTIVE_PACK.json``
+and the applied pack under ``knowledge/active/packs/<version>/`` (a
+``manifest.json`` listing the ``included/`` files and their hashes). Splicing
+a whole pack into every prompt does not scale, so the text files of the
+active pack are chunked and indexed with the same BM25 index as the course
+inputs (see orchestrator/retrieval.py), and each agent with knowledge rules
+gets only its top-k passages within a token budget.
+
+The index is cached on disk per ``manifest_hash``
+(``knowledge/active/_index/<manifest_hash>-<chunk_chars>.json``): applying or
+rolling back a pack changes the active manifest hash, so the next run builds
+(or finds) the index of the new pack, and both commands prune the indexes of
+packs that are no longer active (``invalidate_pack_indexes``).
+
+Configured in run_config (all keys optional; per-agent ``knowledge_pack``
+merges over it, ``"knowledge_pack": false`` on an agent disables it)::
+
+    "knowledge_pack": {"enabled": true, "chunk_chars": 800, "top_k": 4, "budget_tokens": 800}
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from orchestrator.retrieval import (
+    LexicalIndex,
+    RetrievalRules,
+    build_queries,
+    chunk_text,
+    render_passages,
+    select_passages,
+)
+from orchestrator.shared_fs import atomic_write_json
+
+ACTIVE_DIR = Path("knowledge") / "active"
+ACTIVE_PACK_MARKER = "ACTIVE_PACK.json"
+PACK_INDEX_DIRNAME = "_index"
+
+# Pack files that are indexed (others, e.g. binaries, are listed in the manifest only)
+PACK_TEXT_SUFFIXES = (".md", ".markdown", ".txt")
+
+DEFAULT_PACK_CHUNK_CHARS = 800
+DEFAULT_PACK_TOP_K = 4
+DEFAULT_PACK_BUDGET_TOKENS = 800
+
+
+# ------------------------------------------------------------------------------
+# Settings
+# ------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class PackRules:
+    """Resolved knowledge pack retrieval settings for one agent."""
+    chunk_chars: int = DEFAULT_PACK_CHUNK_CHARS
+    top_k: int = DEFAULT_PACK_TOP_K
+    budget_tokens: int = DEFAULT_PACK_BUDGET_TOKENS
+    query: str = ""
+
+
+def pack_rules(config: Mapping[str, Any], agent_cfg: Mapping[str, Any]) -> Optional[PackRules]:
+    """
+    Merge the run_config ``knowledge_pack`` block with an agent's ``knowledge_pack`` block.
+
+    Returns:
+        PackRules, or None when the agent gets no pack content
+
+    Raises:
+        ValueError: Malformed settings
+    """
+    name = agent_cfg.get("name")
+    base = config.get("knowledge_pack") or {}
+    override = agent_cfg.get("knowledge_pack")
+    if override is False:
+        return None
+    if override is not None and not isinstance(override, Mapping):
+        raise ValueError(f"knowledge_pack for '{name}' must be an object or false")
+    cfg = {**base, **(override or {})}
+    if not cfg or not cfg.get("enabled", True):
+        return None
+
+    values = {}
+    for key, default, minimum in (
+        ("chunk_chars", DEFAULT_PACK_CHUNK_CHARS, 200),
+        ("top_k", DEFAULT_PACK_TOP_K, 1),
+        ("budget_tokens", DEFAULT_PACK_BUDGET_TOKENS, 1),
+    ):
+        value = cfg.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+            raise ValueError(f"knowledge_pack.{key} for '{name}' must be an integer >= {minimum}")
+        values[key] = value
+    query = cfg.get("query", "")
+    if not isinstance(query, str):
+        raise ValueError(f"knowledge_pack.query for '{name}' must be a string")
+    return PackRules(query=query, **values)
+
+
+# ------------------------------------------------------------------------------
+# Active pack
+# ------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ActivePack:
+    """The applied pack named by ACTIVE_PACK.json."""
+    version: str
+    manifest_hash: str
+    path: Path
+    files: Tuple[str, ...]
+
+
+def load_active_pack(active_dir: Path = ACTIVE_DIR) -> Optional[ActivePack]:
+    """
+    Read the active pack marker and the applied pack's manifest.
+
+    Returns:
+        ActivePack, or None when no pack has been applied
+
+    Raises:
+        ValueError: The marker names a pack whose manifest is missing or invalid
+    """
+    marker = Path(active_dir) / ACTIVE_PACK_MARKER
+    if not marker.exists():
+        return None
+    try:
+        with open(marker, "r") as f:
+            version = json.load(f).get("pack_version")
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Unreadable active pack marker {marker}: {e}")
+    if not version:
+        raise ValueError(f"Active pack marker {marker} has no pack_version")
+
+    pack_path = Path(active_dir) / "packs" / version
+    manifest_path = pack_path / "manifest.json"
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Active pack {version} has no readable manifest ({manifest_path}): {e}")
+    if not manifest.get("manifest_hash"):
+        raise ValueError(f"Active pack {version} manifest has no manifest_hash")
+    files = tuple(sorted(entry["path"] for entry in manifest.get("files", []) if entry.get("path")))
+    return ActivePack(version=version, manifest_hash=manifest["manifest_hash"], path=pack_path, files=files)
+
+
+def pack_index_path(active_dir: Path, manifest_hash: str, chunk_chars: int) -> Path:
+    """Cache file of a pack's index."""
+    return Path(active_dir) / PACK_INDEX_DIRNAME / f"{manifest_hash}-{chunk_chars}.json"
+
+
+def build_pack_index(pack: ActivePack, chunk_chars: int = DEFAULT_PACK_CHUNK_CHARS) -> LexicalIndex:
+    """
+    Index the pack's text files. Chunk IDs are the file path relative to
+    ``included/`` plus a sequence number (e.g. ``policies/refunds.md:0003``).
+    """
+    chunks: List[Dict[str, Any]] = []
+    for rel_path in pack.files:
+        if not rel_path.lower().endswith(PACK_TEXT_SUFFIXES):
+            continue
+        path = pack.path / rel_path
+        source = rel_path[len("included/"):] if rel_path.startswith("included/") else rel_path
+        chunks.extend(chunk_text(path.read_text(encoding="utf-8"), source, chunk_chars))
+    return LexicalIndex.build(chunks, key=pack.manifest_hash)
+
+
+def load_or_build_pack_index(
+    pack: ActivePack,
+    chunk_chars: int = DEFAULT_PACK_CHUNK_CHARS,
+    active_dir: Path = ACTIVE_DIR,
+) -> Tuple[LexicalIndex, bool]:
+    """
+    The pack's index, read from the cache when it was built before for the
+    same manifest hash and chunk size.
+
+    Returns:
+        Tuple of (index, cached)
+    """
+    path = pack_index_path(active_dir, pack.manifest_hash, chunk_chars)
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = LexicalIndex.from_dict(json.load(f))
+            if index.key == pack.manifest_hash:
+                return index, True
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable or stale cache entry: rebuild
+    index = build_pack_index(pack, chunk_chars)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(path, index.to_dict(), indent=None)
+    return index, False
+
+
+def invalidate_pack_indexes(active_dir: Path = ACTIVE_DIR, keep: Optional[str] = None) -> int:
+    """
+    Delete cached pack indexes, except those of manifest hash ``keep``.
+
+    Called by ``adk pack apply`` / ``rollback`` after the active pack changes.
+
+    Returns:
+        Number of index files removed
+    """
+    index_dir = Path(active_dir) / PACK_INDEX_DIRNAME
+    if not index_dir.is_dir():
+        return 0
+    removed = 0
+    for path in index_dir.glob("*.json"):
+        if keep and path.name.startswith(f"{keep}-"):
+            continue
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+class PackRetriever:
+    """
+    The active pack's indexes for one run, built once (or read from the
+    cache) and queried per step.
+    """
+
+    def __init__(self, pack: ActivePack, active_dir: Path = ACTIVE_DIR):
+        self.pack = pack
+        self.active_dir = active_dir
+        self._indexes: Dict[int, LexicalIndex] = {}
+
+    def index(self, chunk_chars: int) -> LexicalIndex:
+        if chunk_chars not in self._indexes:
+            index, cached = load_or_build_pack_index(self.pack, chunk_chars, self.active_dir)
+            print(
+                f"[Knowledge] pack {self.pack.version}: {len(index.chunks)} chunks "
+                f"({'cached index' if cached else 'indexed'})"
+            )
+            self._indexes[chunk_chars] = index
+        return self._indexes[chunk_chars]
+
+    def retrieve(
+        self, agent_name: str, state: Mapping[str, Any], rules: PackRules
+    ) -> Tuple[Optional[str], List[str]]:
+        """
+        Pack passages for an agent's prompt.
+
+        Returns:
+            Tuple of (prompt text or None when no chunk matched, chunk IDs)
+        """
+        index = self.index(rules.chunk_chars)
+        queries = build_queries(agent_name, state, RetrievalRules(query=rules.query))
+        selection = select_passages(index, queries, rules.top_k, rules.budget_tokens)
+        if not selection["chunk_ids"]:
+            return None, []
+        return render_passages(index, selection, f"KNOWLEDGE PACK {self.pack.version}"), selection["chunk_ids"]
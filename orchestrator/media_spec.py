@@ -5,10 +5,11 @@ Handles loading, saving, validation, and integrity checking of the Media Specifi
 """
 
 import json
-import jsonschema
 from pathlib import Path
 from typing import Dict, Any, Union
 
+from orchestrator import file_cache
+
 # Define paths relative to this file
 ORCHESTRATOR_DIR = Path(__file__).parent
 PROJECT_ROOT = ORCHESTRATOR_DIR.parent
@@ -20,8 +21,7 @@ def _load_schema(schema_name: str) -> Dict[str, Any]:
     if not schema_path.exists():
         raise FileNotFoundError(f"Schema not found: {schema_path}")
     
-    with open(schema_path, "r") as f:
-        schema = json.load(f)
+    schema = file_cache.read_json(schema_path)
         
     return schema
 
@@ -59,6 +59,8 @@ def validate_media_spec(obj: Dict[str, Any]) -> None:
     Raises:
         ValueError: If validation fails.
     """
+    import jsonschema  # deferred: ~100 ms import, only needed when validating
+
     try:
         schema = _load_schema("media_spec.json")
         jsonschema.validate(instance=obj, schema=schema)
@@ -0,0 +1,82 @@
+"""
+Model cascade routing - try a cheap/fast model first, escalate on failure.
+
+An agent entry in run_config.json may declare:
+
+    "model_cascade": {
+        "tiers": [
+            {"provider": "openai", "model": "gpt-4o-mini"},
+            {"provider": "openai", "model": "gpt-4o"}
+        ],
+        "quality_checks": ["scenario_density"]
+    }
+
+The orchestrator runs tier 1 and escalates to the next tier when the response
+fails parse_json_object, validate_agent_output, or any listed quality check.
+Parse and validation failures on the last tier fail the run as usual; quality
+check failures on the last tier are logged and the output is accepted.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from orchestrator.quality.human_ai_validator import validate_human_ai_framing
+from orchestrator.quality.scenario_validator import validate_scenario_density
+
+# Quality checks usable as escalation triggers: name -> validator(deliverable_markdown)
+QUALITY_CHECKS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "scenario_density": validate_scenario_density,
+    "human_ai_framing": validate_human_ai_framing,
+}
+
+
+def resolve_model_tiers(
+    agent_cfg: Dict[str, Any],
+    default_provider: str,
+    env_provider: Optional[str] = None,
+) -> List[Dict[str, Optional[str]]]:
+    """
+    Resolve the ordered provider/model tiers for an agent.
+
+    Args:
+        agent_cfg: Agent entry from run_config
+        default_provider: Provider resolved for the agent without a cascade
+        env_provider: PROVIDER env override; replaces every tier's provider
+                      (e.g. dry_run) while keeping the tier count
+
+    Returns:
+        List of {"provider", "model"} dicts; a single tier with model None
+        (provider default) when no cascade is configured
+
+    Raises:
+        ValueError: If the cascade is malformed or names an unknown quality check
+    """
+    cascade = agent_cfg.get("model_cascade")
+    if not cascade:
+        return [{"provider": default_provider, "model": None}]
+
+    tiers = cascade.get("tiers") or []
+    if not tiers:
+        raise ValueError(f"model_cascade for '{agent_cfg.get('name')}' must list at least one tier")
+
+    unknown = [c for c in cascade.get("quality_checks", []) if c not in QUALITY_CHECKS]
+    if unknown:
+        raise ValueError(
+            f"Unknown quality check(s) in model_cascade for '{agent_cfg.get('name')}': {', '.join(unknown)}. "
+            f"Supported: {', '.join(sorted(QUALITY_CHECKS))}"
+        )
+
+    resolved = []
+    for tier in tiers:
+        provider = env_provider or tier.get("provider") or default_provider
+        resolved.append({"provider": provider, "model": tier.get("model")})
+    return resolved
+
+
+def run_quality_checks(agent_cfg: Dict[str, Any], deliverable: str) -> List[str]:
+    """Run the agent's cascade quality checks on a deliverable; return error messages."""
+    errors = []
+    for name in (agent_cfg.get("model_cascade") or {}).get("quality_checks", []):
+        result = QUALITY_CHECKS[name](deliverable)
+        if not result.get("passed", False):
+            errors.extend(f"{name}: {e}" for e in result.get("errors", []))
+    return errors
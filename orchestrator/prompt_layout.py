@@ -0,0 +1,89 @@
+"""
+Prompt layouts - how a rendered agent prompt is split into chat messages.
+
+- legacy: the template with {business_brief}, {sme_notes}, {knowledge_pack}
+  and {system_state} substituted in place, sent as one user message.
+- cache_friendly: the template with each placeholder replaced by a fixed
+  reference sent first (a byte-stable prefix per agent, so provider-side
+  prefix caches can hit), followed by one message per variable in order of
+  stability (brief, notes, knowledge pack, state) and any per-step preamble last.
+
+Knowledge pack passages go where a template puts {knowledge_pack}; templates
+without it get a KNOWLEDGE PACK section appended when the step has passages
+(see with_knowledge_slot).
+
+Both layouts carry the same instructions and the same variable content.
+"""
+
+from typing import Dict, List, Optional
+
+PROMPT_LAYOUTS = ("legacy", "cache_friendly")
+DEFAULT_PROMPT_LAYOUT = "legacy"
+
+# Placeholder -> section label, in the order variables are appended (most stable first)
+PROMPT_VARIABLES = (
+    ("{business_brief}", "BUSINESS BRIEF"),
+    ("{sme_notes}", "SME NOTES"),
+    ("{knowledge_pack}", "KNOWLEDGE PACK"),
+    ("{system_state}", "SYSTEM STATE"),
+)
+
+
+def variable_reference(label: str) -> str:
+    """Fixed text standing in for a placeholder in the cache-friendly static prefix."""
+    return f"[{label}: provided in the '{label}' message below]"
+
+
+def with_knowledge_slot(prompt_template: str, knowledge_text: Optional[str]) -> str:
+    """The template, with a {knowledge_pack} section appended if there are passages but no placeholder."""
+    if knowledge_text and "{knowledge_pack}" not in prompt_template:
+        return f"{prompt_template.rstrip()}\n\n## KNOWLEDGE PACK\n\n{{knowledge_pack}}\n"
+    return prompt_template
+
+
+def static_prefix(prompt_template: str) -> str:
+    """The template with every placeholder replaced by its fixed reference."""
+    prefix = prompt_template
+    for placeholder, label in PROMPT_VARIABLES:
+        prefix = prefix.replace(placeholder, variable_reference(label))
+    return prefix
+
+
+def build_cache_friendly_messages(
+    prompt_template: str,
+    values: Dict[str, str],
+    preamble: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """
+    Build the cache-friendly message list.
+
+    Args:
+        prompt_template: Raw agent template
+        values: Placeholder -> substituted text (e.g. {"{sme_notes}": "..."})
+        preamble: Optional per-step text that the legacy layout prepends
+                  (e.g. the assessment designer objective table)
+
+    Returns:
+        List of user messages: static prefix, then one per placeholder used
+        by the template, then the preamble
+    """
+    messages = [{"role": "user", "content": static_prefix(prompt_template)}]
+    for placeholder, label in PROMPT_VARIABLES:
+        if placeholder in prompt_template:
+            messages.append({"role": "user", "content": f"## {label}\n\n{values[placeholder]}"})
+    if preamble:
+        messages.append({"role": "user", "content": preamble})
+    return messages
+
+
+def resolve_prompt_layout(config: Dict) -> str:
+    """
+    Read the prompt layout from run_config ("prompt_layout").
+
+    Raises:
+        ValueError: If the configured layout is unknown
+    """
+    layout = (config.get("prompt_layout") or DEFAULT_PROMPT_LAYOUT).strip().lower()
+    if layout not in PROMPT_LAYOUTS:
+        raise ValueError(f"Unknown prompt_layout: '{layout}'. Supported layouts: {', '.join(PROMPT_LAYOUTS)}")
+    return layout
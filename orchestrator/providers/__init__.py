@@ -1,10 +1,39 @@
+import importlib
 import os
 from .base import BaseProvider
-from .manual_provider import ManualProvider
-from .claude_cli_provider import ClaudeCliProvider
-from .openai_provider import OpenAIProvider
-from .perplexity_provider import PerplexityProvider
-from .dry_run_provider import DryRunProvider
+
+# Provider classes are imported on first use (get_provider or attribute
+# access), so CLI commands that never call a provider skip urllib/http.client.
+_PROVIDER_MODULES = {
+    "ManualProvider": "manual_provider",
+    "ClaudeCliProvider": "claude_cli_provider",
+    "OpenAIProvider": "openai_provider",
+    "PerplexityProvider": "perplexity_provider",
+    "DryRunProvider": "dry_run_provider",
+    "SyntheticProvider": "synthetic_provider",
+}
+
+# Provider name (and aliases) -> (class name, accepts a model override)
+_PROVIDER_REGISTRY = {
+    "manual": ("ManualProvider", False),
+    "claude_cli": ("ClaudeCliProvider", False),
+    "claude": ("ClaudeCliProvider", False),
+    "openai": ("OpenAIProvider", True),
+    "openai_api": ("OpenAIProvider", True),
+    "perplexity": ("PerplexityProvider", True),
+    "dry_run": ("DryRunProvider", False),
+    "synthetic": ("SyntheticProvider", False),
+}
+
+
+def __getattr__(name: str):
+    module = _PROVIDER_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    cls = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = cls
+    return cls
+
 
 __all__ = [
     "BaseProvider", 
@@ -13,18 +42,21 @@ __all__ = [
     "OpenAIProvider",
     "PerplexityProvider",
     "DryRunProvider",
+    "SyntheticProvider",
     "get_provider"
 ]
 
 
-def get_provider(provider_name: str = None) -> BaseProvider:
+def get_provider(provider_name: str = None, model: str = None) -> BaseProvider:
     """
     Factory function to create provider instances.
     
     Args:
         provider_name: Name of provider to create. If None, reads from PROVIDER env var.
                       Supported values: 'manual', 'claude_cli', 'openai', 'openai_api', 
-                                       'perplexity', 'dry_run'
+                                       'perplexity', 'dry_run', 'synthetic'
+        model: Optional model override for API providers (openai, perplexity);
+               ignored by providers without a model choice
     
     Returns:
         BaseProvider instance
@@ -37,19 +69,14 @@ def get_provider(provider_name: str = None) -> BaseProvider:
     
     provider_name = provider_name.strip().lower()
     
-    if provider_name == "manual":
-        return ManualProvider()
-    elif provider_name in ("claude_cli", "claude"):
-        return ClaudeCliProvider()
-    elif provider_name in ("openai", "openai_api"):
-        return OpenAIProvider()
-    elif provider_name == "perplexity":
-        return PerplexityProvider()
-    elif provider_name == "dry_run":
-        return DryRunProvider()
+    entry = _PROVIDER_REGISTRY.get(provider_name)
+    if entry is not None:
+        class_name, takes_model = entry
+        cls = __getattr__(class_name)
+        return cls(model=model) if takes_model else cls()
     else:
         raise ValueError(
             f"Unknown provider: '{provider_name}'. "
-            f"Supported providers: 'manual', 'claude_cli', 'openai', 'perplexity', 'dry_run'. "
+            f"Supported providers: 'manual', 'claude_cli', 'openai', 'perplexity', 'dry_run', 'synthetic'. "
             f"Set PROVIDER environment variable or pass provider_name parameter."
         )
@@ -1,4 +1,39 @@
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List, Optional
+
+
+def flatten_messages(messages: List[Dict[str, str]]) -> str:
+    """Join chat message contents into a single prompt string."""
+    return "\n\n".join(m["content"] for m in messages)
+
+
+def normalize_usage(usage: Optional[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+    """
+    Normalize a Chat Completions ``usage`` payload.
+
+    Returns:
+        Dict with prompt_tokens, completion_tokens, total_tokens and
+        cached_tokens (``prompt_tokens_details.cached_tokens``; 0 when the
+        provider does not report it), or None if no usage was returned.
+    """
+    if not usage:
+        return None
+    details = usage.get("prompt_tokens_details") or {}
+    return {
+        "prompt_tokens": int(usage.get("prompt_tokens", 0) or 0),
+        "completion_tokens": int(usage.get("completion_tokens", 0) or 0),
+        "total_tokens": int(usage.get("total_tokens", 0) or 0),
+        "cached_tokens": int(details.get("cached_tokens", 0) or 0),
+    }
+
+
+def add_usage(a: Optional[Dict[str, int]], b: Optional[Dict[str, int]]) -> Optional[Dict[str, int]]:
+    """Sum two normalized usage dicts (either may be None)."""
+    if a is None:
+        return dict(b) if b else None
+    if b is None:
+        return dict(a)
+    return {k: a.get(k, 0) + b.get(k, 0) for k in set(a) | set(b)}
 
 
 class BaseProvider:
@@ -7,9 +42,42 @@ class BaseProvider:
 
     Any provider must implement:
         run(prompt: str) -> str
-        
+
     The returned string should be valid JSON matching the agent output contract.
+
+    Providers that talk to a chat API may override run_messages() to send
+    multi-message prompts as-is (e.g. cache-friendly layout); the default
+    flattens the messages into one prompt. Providers that report token usage
+    set ``last_usage`` (see normalize_usage) after each call; providers that
+    make HTTP requests list each one (including retries, fallbacks and JSON
+    repairs) in ``last_requests`` via record_request().
     """
 
+    last_usage: Optional[Dict[str, int]] = None
+    last_requests: Optional[List[Dict[str, Any]]] = None
+
+    def record_request(self, kind: str, started: float, usage: Optional[Dict[str, int]] = None,
+                       error: Optional[str] = None) -> None:
+        """
+        Append one HTTP request to ``last_requests``.
+
+        Args:
+            kind: "request", "retry", "fallback" or "repair"
+            started: time.monotonic() when the request was sent
+            usage: Normalized usage of the response, if any
+            error: Short error description for a failed request
+        """
+        entry = {"kind": kind, "latency_ms": int((time.monotonic() - started) * 1000)}
+        if usage is not None:
+            entry["usage"] = usage
+        if error is not None:
+            entry["error"] = error[:200]
+        if self.last_requests is None:
+            self.last_requests = []
+        self.last_requests.append(entry)
+
     def run(self, prompt: str) -> str:
-        raise NotImplementedError("BaseProvider.run(prompt) must be implemented")
\ No newline at end of file
+        raise NotImplementedError("BaseProvider.run(prompt) must be implemented")
+
+    def run_messages(self, messages: List[Dict[str, str]]) -> str:
+        return self.run(flatten_messages(messages))
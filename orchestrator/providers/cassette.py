@@ -0,0 +1,314 @@
+"""
+Record-and-replay cassettes for provider traffic.
+
+Recording wraps each step's provider and appends the rendered prompt and
+the raw response of every call to ``provider_cassette.jsonl`` in the run
+directory, one line per call, so a crashed run keeps the calls it made and
+recording costs the same per call however long the run. Prompt and response
+texts are stored once by content hash (a line carries only the texts not
+seen before), so repeated prompts (retries, cascade tiers) and repeated
+responses cost nothing extra. Single-document ``provider_cassette.json``
+files from earlier versions still load.
+
+Replay serves the recorded responses back without any provider call, so a
+recorded course re-runs offline in seconds and reproduces parse, validation
+and cascade behaviour exactly. Replayed calls spend nothing: they are marked
+``replayed`` in the run's usage records and are not charged to run, batch or
+tenant budgets.
+
+- strict: a call must match a recorded prompt byte for byte; identical
+  prompts are answered in recorded order.
+- lenient: calls are answered by (agent, step) in recorded order, falling
+  back to the agent's calls at any step, so prompt or template edits still
+  replay.
+
+Configured via run_config (``"cassette"`` block) or scripts/run_pipeline.py
+``--record-cassette`` / ``--replay-cassette PATH``.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from orchestrator.shared_fs import append_line, atomic_write_bytes
+
+from .base import BaseProvider, flatten_messages
+
+CASSETTE_FILENAME = "provider_cassette.jsonl"
+LEGACY_CASSETTE_FILENAME = "provider_cassette.json"
+CASSETTE_VERSION = 2
+LEGACY_CASSETTE_VERSION = 1
+CASSETTE_MODES = ("off", "record", "replay")
+CASSETTE_MATCH_MODES = ("strict", "lenient")
+
+
+class CassetteMissError(LookupError):
+    """Raised on replay when a call has no recorded response left to serve."""
+    pass
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cassette_settings(config: Dict[str, Any]) -> Tuple[str, Optional[str], str]:
+    """
+    Resolve the run config's ``cassette`` block.
+
+    Returns:
+        Tuple of (mode, path, match); path is None when recording to the
+        default run-directory cassette
+
+    Raises:
+        ValueError: Unknown mode or match, or replay without a path
+    """
+    cfg = config.get("cassette") or {}
+    mode = (cfg.get("mode") or "off").strip().lower()
+    match = (cfg.get("match") or "strict").strip().lower()
+    path = cfg.get("path")
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"cassette.mode must be one of {', '.join(CASSETTE_MODES)} (got '{mode}')")
+    if match not in CASSETTE_MATCH_MODES:
+        raise ValueError(f"cassette.match must be one of {', '.join(CASSETTE_MATCH_MODES)} (got '{match}')")
+    if mode == "replay" and not path:
+        raise ValueError("cassette.path is required when cassette.mode is 'replay'")
+    return mode, path, match
+
+
+def resolve_cassette_path(path: str) -> Path:
+    """Accept a cassette file or a run directory containing one."""
+    path = Path(path)
+    if not path.is_dir():
+        return path
+    if not (path / CASSETTE_FILENAME).exists() and (path / LEGACY_CASSETTE_FILENAME).exists():
+        return path / LEGACY_CASSETTE_FILENAME
+    return path / CASSETTE_FILENAME
+
+
+class Cassette:
+    """
+    In-memory cassette backed by an append-only JSONL file.
+
+    File layout (a header line, then one line per call)::
+
+        {"version": 2}
+        {"texts": {"<sha256>": "<prompt or response text>", ...},
+         "call": {"step": 1, "agent": "...", "provider": "...", "model": null,
+                  "prompt": "<sha256>", "response": "<sha256>", "usage": {...}}}
+
+    Version 1 files hold one document (``{"version": 1, "texts": {...},
+    "calls": [...]}``); recording into one rewrites it as JSONL first. A torn
+    last line (a crash mid-append) is dropped on load.
+    """
+
+    def __init__(self, path: Path, texts: Dict[str, str] = None, calls: List[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.texts: Dict[str, str] = texts or {}
+        self.calls: List[Dict[str, Any]] = calls or []
+        self._lock = threading.Lock()
+        # The file is rewritten before the next append (missing, version 1, or torn)
+        self._rewrite = True
+
+    @classmethod
+    def load(cls, path, must_exist: bool = False) -> "Cassette":
+        """
+        Load a cassette file, or start an empty one if it does not exist yet.
+
+        Raises:
+            FileNotFoundError: must_exist is set and there is no cassette file
+        """
+        path = Path(path)
+        if not path.exists():
+            if must_exist:
+                raise FileNotFoundError(f"Cassette not found: {path}")
+            return cls(path)
+        with open(path, "r") as f:
+            text = f.read()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict) and data.get("version") == LEGACY_CASSETTE_VERSION:
+            return cls(path, data.get("texts"), data.get("calls"))
+
+        lines = text.splitlines()
+        header = json.loads(lines[0]) if lines else {}
+        if header.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {path}: {header.get('version')}")
+        cassette = cls(path)
+        for i, line in enumerate(lines[1:], start=2):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                if i == len(lines):
+                    break  # torn by a crash mid-append
+                raise ValueError(f"Corrupt cassette line {i} in {path}")
+            cassette.texts.update(entry.get("texts") or {})
+            cassette.calls.append(entry["call"])
+        else:
+            cassette._rewrite = not text.endswith("\n")
+        return cassette
+
+    def _dump(self) -> bytes:
+        lines = [json.dumps({"version": CASSETTE_VERSION})]
+        written = set()
+        for call in self.calls:
+            texts = {}
+            for key in (call["prompt"], call["response"]):
+                if key not in written:
+                    written.add(key)
+                    texts[key] = self.texts[key]
+            lines.append(json.dumps({"texts": texts, "call": call}))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def save(self) -> None:
+        """Write the whole cassette (atomically) as JSONL."""
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        os.makedirs(self.path.parent, exist_ok=True)
+        atomic_write_bytes(self.path, self._dump())
+        self._rewrite = False
+
+    def record(self, step_idx: int, agent: str, provider_name: str, model: Optional[str],
+               prompt: str, response: str, usage: Optional[Dict[str, int]] = None) -> None:
+        """Append one call to the cassette file (so a crashed run keeps its calls)."""
+        prompt_key, response_key = _digest(prompt), _digest(response)
+        call = {
+            "step": step_idx,
+            "agent": agent,
+            "provider": provider_name,
+            "model": model,
+            "prompt": prompt_key,
+            "response": response_key,
+            "usage": usage,
+        }
+        with self._lock:
+            texts = {}
+            for key, text in ((prompt_key, prompt), (response_key, response)):
+                if key not in self.texts:
+                    self.texts[key] = texts[key] = text
+            self.calls.append(call)
+            if self._rewrite:
+                self._save()
+            else:
+                append_line(self.path, json.dumps({"texts": texts, "call": call}))
+
+
+class RecordingProvider(BaseProvider):
+    """Wraps a step's provider and records every call into a cassette."""
+
+    def __init__(self, inner: BaseProvider, cassette: Cassette, step_idx: int, agent: str,
+                 provider_name: str, model: Optional[str] = None):
+        self.inner = inner
+        self.cassette = cassette
+        self.step_idx = step_idx
+        self.agent = agent
+        self.provider_name = provider_name
+        self.model = model or getattr(inner, "model", None)
+
+    def run(self, prompt: str) -> str:
+        return self._record(prompt, self.inner.run(prompt))
+
+    def run_messages(self, messages: List[Dict[str, str]]) -> str:
+        return self._record(flatten_messages(messages), self.inner.run_messages(messages))
+
+    def _record(self, prompt: str, response: str) -> str:
+        usage = getattr(self.inner, "last_usage", None)
+        self.last_usage = usage
+        self.last_requests = getattr(self.inner, "last_requests", None)
+        self.cassette.record(
+            self.step_idx, self.agent, self.provider_name, self.model, prompt, response,
+            usage if isinstance(usage, dict) else None,
+        )
+        return response
+
+
+class CassettePlayer:
+    """
+    Serves a cassette's recorded responses; shared by every step of a replay run.
+
+    Args:
+        cassette: Recorded cassette
+        match: "strict" (exact prompt) or "lenient" (agent/step, then agent)
+    """
+
+    def __init__(self, cassette: Cassette, match: str = "strict"):
+        if match not in CASSETTE_MATCH_MODES:
+            raise ValueError(f"Unknown cassette match mode: {match}")
+        self.cassette = cassette
+        self.match = match
+        self._lock = threading.Lock()
+        self._by_prompt: Dict[str, Deque[int]] = {}
+        self._by_step: Dict[Tuple[str, int], Deque[int]] = {}
+        self._by_agent: Dict[str, Deque[int]] = {}
+        self._served = set()
+        for i, call in enumerate(cassette.calls):
+            self._by_prompt.setdefault(call["prompt"], deque()).append(i)
+            self._by_step.setdefault((call["agent"], call["step"]), deque()).append(i)
+            self._by_agent.setdefault(call["agent"], deque()).append(i)
+        self.stats = {"served": 0, "misses": 0}
+
+    @staticmethod
+    def _next_unserved(queue: Optional[Deque[int]], served: set) -> Optional[int]:
+        while queue:
+            i = queue.popleft()
+            if i not in served:
+                return i
+        return None
+
+    def serve(self, step_idx: int, agent: str, prompt: str) -> Dict[str, Any]:
+        """
+        Return the next recorded call for this request.
+
+        Raises:
+            CassetteMissError: No recorded call matches
+        """
+        with self._lock:
+            if self.match == "strict":
+                i = self._next_unserved(self._by_prompt.get(_digest(prompt)), self._served)
+            else:
+                i = self._next_unserved(self._by_step.get((agent, step_idx)), self._served)
+                if i is None:
+                    i = self._next_unserved(self._by_agent.get(agent), self._served)
+            if i is None:
+                self.stats["misses"] += 1
+                raise CassetteMissError(
+                    f"No recorded response for step {step_idx} ({agent}) in {self.cassette.path} "
+                    f"[{self.match} match]"
+                )
+            self._served.add(i)
+            self.stats["served"] += 1
+            call = self.cassette.calls[i]
+        return dict(call, response_text=self.cassette.texts[call["response"]])
+
+    def provider_for(self, step_idx: int, agent: str) -> "ReplayProvider":
+        return ReplayProvider(self, step_idx, agent)
+
+
+class ReplayProvider(BaseProvider):
+    """Answers a step's calls from a CassettePlayer; never calls a real provider."""
+
+    provider_name = "replay"
+
+    def __init__(self, player: CassettePlayer, step_idx: int, agent: str):
+        self.player = player
+        self.step_idx = step_idx
+        self.agent = agent
+        self.last_call: Optional[Dict[str, Any]] = None
+        self.model: Optional[str] = None
+
+    def run(self, prompt: str) -> str:
+        call = self.player.serve(self.step_idx, self.agent, prompt)
+        self.last_call = call
+        self.last_usage = call.get("usage")
+        self.model = call.get("model")  # priced as the recorded model
+        return call["response_text"]
+
+    def run_messages(self, messages: List[Dict[str, str]]) -> str:
+        return self.run(flatten_messages(messages))
@@ -4,6 +4,7 @@ import subprocess
 from typing import Any, Dict, List
 
 from orchestrator.providers.base import BaseProvider
+from orchestrator.run_control import check_run_control, request_timeout
 
 
 class ClaudeCliProvider(BaseProvider):
@@ -37,13 +38,17 @@ class ClaudeCliProvider(BaseProvider):
             + prompt
         )
 
-        proc = subprocess.run(
-            cmd,
-            input=wrapped_prompt,
-            text=True,
-            capture_output=True,
-            timeout=self.timeout_seconds,
-        )
+        try:
+            proc = subprocess.run(
+                cmd,
+                input=wrapped_prompt,
+                text=True,
+                capture_output=True,
+                timeout=request_timeout(self.timeout_seconds),
+            )
+        except subprocess.TimeoutExpired:
+            check_run_control()  # cut short by the step/run deadline
+            raise
 
         if proc.returncode != 0:
             raise RuntimeError(
@@ -3,8 +3,18 @@ import json
 import urllib.request
 import urllib.error
 import time
-from typing import Any, Dict
-from .base import BaseProvider
+from typing import Any, Dict, List
+from .base import BaseProvider, add_usage, normalize_usage
+from orchestrator.run_control import (
+    DeadlineExceededError,
+    RunCancelledError,
+    check_run_control,
+    request_timeout,
+    retry_sleep,
+)
+
+# Strong system instruction for JSON enforcement (shared with batch requests)
+JSON_SYSTEM_PROMPT = "Return ONLY valid JSON that matches the requested schema. No markdown. No prose."
 
 
 class OpenAIProvider(BaseProvider):
@@ -17,7 +27,7 @@ class OpenAIProvider(BaseProvider):
         - Optional: OPENAI_TEMPERATURE (default: 0.2)
     """
     
-    def __init__(self):
+    def __init__(self, model: str = None):
         self.api_key = os.environ.get("OPENAI_API_KEY", "").strip()
         if not self.api_key:
             raise ValueError(
@@ -25,7 +35,8 @@ class OpenAIProvider(BaseProvider):
                 "Set it before running: export OPENAI_API_KEY='your-key-here'"
             )
         
-        self.model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini").strip()
+        # Explicit model (e.g. a model_cascade tier) wins over OPENAI_MODEL
+        self.model = (model or os.environ.get("OPENAI_MODEL", "gpt-4o-mini")).strip()
         
         # Parse temperature (default 0.2 for deterministic JSON)
         try:
@@ -49,21 +60,28 @@ class OpenAIProvider(BaseProvider):
         Raises:
             Exception: If API call fails or returns error
         """
+        return self.run_messages([{"role": "user", "content": prompt}])
+
+    def run_messages(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Execute a multi-message prompt (sent after the JSON system message as-is).
+
+        Token usage for the call (including any fallback/repair requests) is
+        accumulated in ``self.last_usage``; every HTTP request (with its
+        latency) is listed in ``self.last_requests``.
+        """
+        self.last_usage = None
+        self.last_requests = []
+
         # Strong system instruction for JSON enforcement
         system_message = {
             "role": "system", 
-            "content": "Return ONLY valid JSON that matches the requested schema. No markdown. No prose."
+            "content": JSON_SYSTEM_PROMPT
         }
         
         payload = {
             "model": self.model,
-            "messages": [
-                system_message,
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            "messages": [system_message] + [dict(m) for m in messages],
             "temperature": self.temperature,
             "response_format": {"type": "json_object"}
         }
@@ -73,14 +91,14 @@ class OpenAIProvider(BaseProvider):
         
         for attempt in range(max_retries):
             try:
-                return self._execute_request(payload)
+                return self._execute_request(payload, "request" if attempt == 0 else "retry")
                 
             except urllib.error.HTTPError as e:
                 # Retry on rate limits (429) or transient server errors (5xx)
                 if e.code in [429, 500, 502, 503, 504]:
                     if attempt < max_retries - 1:
                         print(f"⚠️  OpenAI API error {e.code}. Retrying in {retry_delay}s... (Attempt {attempt+1}/{max_retries})")
-                        time.sleep(retry_delay)
+                        retry_sleep(retry_delay)
                         retry_delay *= 2
                         continue
                 
@@ -103,7 +121,7 @@ class OpenAIProvider(BaseProvider):
                     retry_payload["messages"] = new_messages
                     
                     try:
-                        return self._execute_request(retry_payload)
+                        return self._execute_request(retry_payload, "fallback")
                         
                     except urllib.error.HTTPError as retry_e:
                         retry_error_body = retry_e.read().decode("utf-8")
@@ -116,18 +134,23 @@ class OpenAIProvider(BaseProvider):
                         f"OpenAI API request failed with status {e.code}: {error_body}"
                     )
                     
+            except (RunCancelledError, DeadlineExceededError):
+                raise
+
             except Exception as e:
+                # A timeout capped by the step/run deadline is not retried
+                check_run_control()
                 # For network timeouts or other transient exceptions, retry as well
                 if "timed out" in str(e).lower() or "connection" in str(e).lower():
                     if attempt < max_retries - 1:
                         print(f"⚠️  OpenAI connection error: {str(e)}. Retrying in {retry_delay}s... (Attempt {attempt+1}/{max_retries})")
-                        time.sleep(retry_delay)
+                        retry_sleep(retry_delay)
                         retry_delay *= 2
                         continue
                 raise Exception(f"OpenAI API request failed: {str(e)}")
 
-    def _execute_request(self, payload: Dict[str, Any]) -> str:
-        """Helper to execute the actual HTTP request"""
+    def _execute_request(self, payload: Dict[str, Any], kind: str = "request") -> str:
+        """Helper to execute the actual HTTP request (recorded in ``last_requests`` as ``kind``)"""
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
@@ -140,61 +163,73 @@ class OpenAIProvider(BaseProvider):
             method="POST"
         )
         
-        with urllib.request.urlopen(request, timeout=300) as response:
-            response_data = json.loads(response.read().decode("utf-8"))
+        timeout = request_timeout(300)
+        started = time.monotonic()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response_data = json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            self.record_request(kind, started, error=f"HTTP {e.code}")
+            raise
+        except Exception as e:
+            self.record_request(kind, started, error=str(e))
+            raise
+        usage = normalize_usage(response_data.get("usage"))
+        self.record_request(kind, started, usage=usage)
+        self.last_usage = add_usage(self.last_usage, usage)
+        
+        if "choices" not in response_data or len(response_data["choices"]) == 0:
+            raise ValueError(f"Unexpected OpenAI API response format: {response_data}")
+        
+        content = response_data["choices"][0]["message"]["content"]
+        
+        # ------------------------------------------------------------------
+        # JSON Integrity Check & Auto-Repair
+        # ------------------------------------------------------------------
+        try:
+            # Try to parse to verify it is valid JSON
+            json.loads(content)
+            return content.strip()
+        except json.JSONDecodeError as e:
+            print(f"⚠️  JSON Parse Error in OpenAI response. Attempting repair...")
+            
+            # RECURSION GUARD: Check if we are already in a retry loop
+            # If the last message was our repair prompt, do not retry again
+            if len(payload.get("messages", [])) > 0:
+                 last_msg = payload["messages"][-1]
+                 if last_msg.get("role") == "user" and "Previous response object failed to parse" in last_msg.get("content", ""):
+                     print("⚠️  JSON repair failed (recursion detected). Aborting.")
+                     raise e
+
+            # Construct repair payload
+            # We simply append a user message asking to fix it
+            repair_payload = payload.copy()
+            new_messages = [m.copy() for m in repair_payload["messages"]]
             
-            if "choices" not in response_data or len(response_data["choices"]) == 0:
-                raise ValueError(f"Unexpected OpenAI API response format: {response_data}")
+            # Append the failure context
+            new_messages.append({
+                "role": "user",
+                "content": (
+                    f"Previous response object failed to parse as JSON: {str(e)}\n\n"
+                    f"Here is your JSON:\n{content}\n\n"
+                    f"Please FIX this and return ONLY valid JSON."
+                )
+            })
             
-            content = response_data["choices"][0]["message"]["content"]
+            repair_payload["messages"] = new_messages
+            
+            # We can keep response_format={"type": "json_object"} if model supports it
+            # or rely on the prompt. Let's keep it if original had it.
             
-            # ------------------------------------------------------------------
-            # JSON Integrity Check & Auto-Repair
-            # ------------------------------------------------------------------
             try:
-                # Try to parse to verify it is valid JSON
-                json.loads(content)
-                return content.strip()
-            except json.JSONDecodeError as e:
-                print(f"⚠️  JSON Parse Error in OpenAI response. Attempting repair...")
-                
-                # RECURSION GUARD: Check if we are already in a retry loop
-                # If the last message was our repair prompt, do not retry again
-                if len(payload.get("messages", [])) > 0:
-                     last_msg = payload["messages"][-1]
-                     if last_msg.get("role") == "user" and "Previous response object failed to parse" in last_msg.get("content", ""):
-                         print("⚠️  JSON repair failed (recursion detected). Aborting.")
-                         raise e
-
-                # Construct repair payload
-                # We simply append a user message asking to fix it
-                repair_payload = payload.copy()
-                new_messages = [m.copy() for m in repair_payload["messages"]]
-                
-                # Append the failure context
-                new_messages.append({
-                    "role": "user",
-                    "content": (
-                        f"Previous response object failed to parse as JSON: {str(e)}\n\n"
-                        f"Here is your JSON:\n{content}\n\n"
-                        f"Please FIX this and return ONLY valid JSON."
-                    )
-                })
-                
-                repair_payload["messages"] = new_messages
-                
-                # We can keep response_format={"type": "json_object"} if model supports it
-                # or rely on the prompt. Let's keep it if original had it.
-                
-                try:
-                    return self._execute_request(repair_payload)
-                except Exception as repair_error:
-                     # If repair fails (HTTP or otherwise), we raise the ORIGINAL parse error 
-                     # or the new error? 
-                     # If we return the raw string here, the Agent validation will fail later 
-                     # and dump the error file, which is robust.
-                     # BUT the requirement says "returns ONLY corrected JSON".
-                     # If we fail here, we should probably let the downstream validator handle it.
-                     # However, to satisfy the test "verify retry success", we must return new content.
-                     raise repair_error
+                return self._execute_request(repair_payload, "repair")
+            except Exception as repair_error:
+                 # If repair fails (HTTP or otherwise), we raise the ORIGINAL parse error 
+                 # or the new error? 
+                 # If we return the raw string here, the Agent validation will fail later 
+                 # and dump the error file, which is robust.
+                 # BUT the requirement says "returns ONLY corrected JSON".
+                 # If we fail here, we should probably let the downstream validator handle it.
+                 # However, to satisfy the test "verify retry success", we must return new content.
+                 raise repair_error
 
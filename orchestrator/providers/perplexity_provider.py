@@ -1,8 +1,10 @@
 import os
 import json
+import time
 import urllib.request
-from typing import Any, Dict
-from .base import BaseProvider
+from typing import Any, Dict, List
+from .base import BaseProvider, normalize_usage
+from orchestrator.run_control import DeadlineExceededError, RunCancelledError, check_run_control, request_timeout
 
 
 class PerplexityProvider(BaseProvider):
@@ -14,7 +16,7 @@ class PerplexityProvider(BaseProvider):
         - Optional: PERPLEXITY_MODEL (default: sonar)
     """
     
-    def __init__(self):
+    def __init__(self, model: str = None):
         self.api_key = os.environ.get("PERPLEXITY_API_KEY", "").strip()
         if not self.api_key:
             raise ValueError(
@@ -22,7 +24,7 @@ class PerplexityProvider(BaseProvider):
                 "Set it before running: export PERPLEXITY_API_KEY='your-key-here'"
             )
         
-        self.model = os.environ.get("PERPLEXITY_MODEL", "sonar").strip()
+        self.model = (model or os.environ.get("PERPLEXITY_MODEL", "sonar")).strip()
         self.api_url = "https://api.perplexity.ai/chat/completions"
     
     def run(self, prompt: str) -> str:
@@ -38,14 +40,15 @@ class PerplexityProvider(BaseProvider):
         Raises:
             Exception: If API call fails or returns error
         """
+        return self.run_messages([{"role": "user", "content": prompt}])
+
+    def run_messages(self, messages: List[Dict[str, str]]) -> str:
+        """Execute a multi-message prompt; token usage is stored in ``self.last_usage``."""
+        self.last_usage = None
+        self.last_requests = []
         payload = {
             "model": self.model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
+            "messages": [dict(m) for m in messages]
         }
         
         headers = {
@@ -60,9 +63,13 @@ class PerplexityProvider(BaseProvider):
             method="POST"
         )
         
+        timeout = request_timeout(120)
+        started = time.monotonic()
         try:
-            with urllib.request.urlopen(request, timeout=120) as response:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
                 response_data = json.loads(response.read().decode("utf-8"))
+                self.last_usage = normalize_usage(response_data.get("usage"))
+                self.record_request("request", started, usage=self.last_usage)
                 
                 if "choices" not in response_data or len(response_data["choices"]) == 0:
                     raise ValueError(f"Unexpected Perplexity API response format: {response_data}")
@@ -71,9 +78,15 @@ class PerplexityProvider(BaseProvider):
                 return content.strip()
                 
         except urllib.error.HTTPError as e:
+            self.record_request("request", started, error=f"HTTP {e.code}")
             error_body = e.read().decode("utf-8")
             raise Exception(
                 f"Perplexity API request failed with status {e.code}: {error_body}"
             )
+        except (RunCancelledError, DeadlineExceededError):
+            raise
         except Exception as e:
+            check_run_control()
+            if not self.last_requests:
+                self.record_request("request", started, error=str(e))
             raise Exception(f"Perplexity API request failed: {str(e)}")
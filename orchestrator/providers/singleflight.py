@@ -0,0 +1,175 @@
+"""
+In-flight request deduplication (singleflight) at the provider boundary.
+
+When several runs in the same process issue an identical provider call at
+the same moment (same provider, model and rendered prompt), only the first
+caller (the leader) hits the provider; concurrent callers with the same key
+wait for and share the leader's result or exception. Completed calls are not
+cached - a later identical call goes to the provider again.
+
+The leader's call runs under the leader's RunControl (orchestrator/run_control.py).
+When it fails because the leader's run was cancelled or hit its deadline,
+followers do not inherit that error: they retry, one of them becoming the
+new leader, under their own RunControl.
+
+Dedup is enabled per agent via run_config ("singleflight" block, overridable
+per agent entry) because some harnesses intentionally want independent samples.
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from orchestrator.run_control import DeadlineExceededError, RunCancelledError, check_run_control
+
+from .base import BaseProvider, flatten_messages
+
+# Errors that belong to the leader's run, not to the call it shares
+_LEADER_RUN_ERRORS = (RunCancelledError, DeadlineExceededError)
+
+
+class _Call:
+    """A single in-flight provider call shared by its followers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Group of in-flight calls keyed by a canonical request key.
+
+    Thread-safe: concurrent ``do()`` calls with the same key share one
+    execution of ``fn``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {"leader_calls": 0, "shared_hits": 0}
+
+    def do(self, key: str, fn: Callable[[], str]) -> Tuple[str, bool]:
+        """
+        Execute ``fn`` once per in-flight ``key``.
+
+        Returns:
+            Tuple of (result, shared) where ``shared`` is True when the result
+            came from another caller's in-flight call.
+
+        Raises:
+            Whatever ``fn`` raised (re-raised in every waiting caller, except
+            the leader's own cancellation or deadline, after which waiting
+            callers retry)
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    call.followers += 1
+                    self.stats["shared_hits"] += 1
+                    leader = False
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    self.stats["leader_calls"] += 1
+                    leader = True
+            if leader:
+                break
+
+            call.done.wait()
+            if isinstance(call.error, _LEADER_RUN_ERRORS):
+                check_run_control()  # this caller's own run may be stopping too
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Process-wide group shared by all runs (concurrent runs live in one process)
+_DEFAULT_GROUP = SingleFlight()
+
+
+def get_default_group() -> SingleFlight:
+    return _DEFAULT_GROUP
+
+
+def singleflight_key(provider_name: str, prompt: str, model: Optional[str] = None, temperature: Any = None) -> str:
+    """Canonical key for a provider call: sha256 over provider, model, temperature and prompt."""
+    h = hashlib.sha256()
+    parts = (
+        provider_name or "",
+        "" if model is None else str(model),
+        "" if temperature is None else repr(temperature),
+    )
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    h.update(prompt.encode("utf-8"))
+    return h.hexdigest()
+
+
+class SingleFlightProvider(BaseProvider):
+    """
+    Wraps a provider so identical concurrent ``run()`` calls share one result.
+
+    ``last_shared`` and ``last_key`` describe the most recent call, so the
+    orchestrator can record dedup hits per step.
+    """
+
+    def __init__(self, inner: BaseProvider, provider_name: str, group: Optional[SingleFlight] = None):
+        self.inner = inner
+        self.provider_name = provider_name
+        self.group = group or _DEFAULT_GROUP
+        self.last_key: Optional[str] = None
+        self.last_shared = False
+
+    def run(self, prompt: str) -> str:
+        return self._do(prompt, lambda: self.inner.run(prompt))
+
+    def run_messages(self, messages: List[Dict[str, str]]) -> str:
+        return self._do(flatten_messages(messages), lambda: self.inner.run_messages(messages))
+
+    def _do(self, prompt: str, fn: Callable[[], str]) -> str:
+        key = singleflight_key(
+            self.provider_name,
+            prompt,
+            model=getattr(self.inner, "model", None),
+            temperature=getattr(self.inner, "temperature", None),
+        )
+        result, shared = self.group.do(key, fn)
+        self.last_key = key
+        self.last_shared = shared
+        # Followers did not make a provider call, so they report no usage
+        self.last_usage = None if shared else getattr(self.inner, "last_usage", None)
+        self.last_requests = [] if shared else getattr(self.inner, "last_requests", None)
+        return result
+
+
+def singleflight_enabled(config: Dict[str, Any], agent_cfg: Dict[str, Any]) -> bool:
+    """
+    Resolve whether dedup applies to an agent.
+
+    Per-agent ``"singleflight": true|false`` wins; otherwise the run config's
+    ``singleflight.enabled`` (default: False).
+    """
+    if "singleflight" in agent_cfg:
+        return bool(agent_cfg["singleflight"])
+    return bool(config.get("singleflight", {}).get("enabled", False))
@@ -0,0 +1,434 @@
+"""
+Synthetic Provider - contract-valid, state-derived outputs for every agent.
+
+Unlike DryRunProvider (one generic stub with ``updated_state: {}`` for most
+agents), each response is derived from the state carried in the incoming
+prompt, so the system state grows the way it does in a real run:
+
+- strategy lead: strategy with one module intent per module
+- learner research: learner profile
+- learning architect: a contract-valid curriculum (MODULE_COUNT_TARGET honoured)
+- instructional designer: module designs (lessons per module) and the script
+- assessment designer: one question per row of the pre-computed objective list
+- storyboard: one storyboard entry per curriculum module
+- media producer: a media spec with one learning object per module
+- qa / change management / operations librarian: findings, plan and asset
+  catalog per module (read from the full state or its digest)
+
+Sizes, simulated latency and the seed are set with environment variables
+(see SyntheticSettings.from_env), e.g.::
+
+    PROVIDER=synthetic SYNTHETIC_MODULES=12 SYNTHETIC_TEXT_WORDS=60 SYNTHETIC_LATENCY_MS=200 \\
+        python3 scripts/run_pipeline.py --mode synthetic --yes
+
+The same seed, settings and prompt always yield the same response. Token
+usage is not reported, so usage accounting estimates it from prompt and
+response sizes.
+"""
+
+import json
+import os
+import random
+import re
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from orchestrator.providers.base import BaseProvider
+from orchestrator.run_control import retry_sleep
+
+OBJECTIVE_LIST_MARKER = "PRE-COMPUTED OBJECTIVE LIST"
+
+# Heading text -> agent key; the marker found earliest in the prompt wins
+AGENT_MARKERS = (
+    ("# Strategy Lead Agent", "strategy_lead"),
+    ("# Learner Research Agent", "learner_research"),
+    ("# Learning Architect Agent", "learning_architect"),
+    ("# Instructional Designer Agent", "instructional_designer"),
+    ("# Assessment Designer Agent", "assessment_designer"),
+    (OBJECTIVE_LIST_MARKER, "assessment_designer"),
+    ("# Storyboard Agent", "storyboard"),
+    ("Media Producer Agent", "media_producer"),
+    ("# QA Agent", "qa"),
+    ("# Change Management Agent", "change_management"),
+    ("# Operations Librarian Agent", "operations_librarian"),
+    ("Quality Review Agent", "quality_review"),
+)
+
+_VOCABULARY = (
+    "policy escalation client onboarding checklist exception approval risk audit evidence "
+    "handoff stakeholder workflow remediation accountability governance threshold variance "
+    "reconciliation dialogue coaching feedback scenario compliance retention service ledger "
+    "incident root-cause mitigation owner cadence dashboard metric baseline pilot rollout"
+).split()
+
+_OBJECTIVE_ROW = re.compile(r"^\|\s*\d+\s*\|\s*(M\d+)\s*\|\s*(.+?)\s*\|\s*$", re.MULTILINE)
+_STATE_START = re.compile(r'\{\s*"(?:inputs|_digest)"')
+
+
+@dataclass(frozen=True)
+class SyntheticSettings:
+    """Size, latency and seed knobs for SyntheticProvider."""
+    modules: int = 6                 # modules in a fresh curriculum
+    objectives_per_module: int = 2
+    lessons_per_module: int = 3      # module design lessons; media slides = lessons + 2
+    text_words: int = 24             # words per generated text field
+    deliverable_paragraphs: int = 4  # narrative paragraphs per deliverable
+    latency_ms: int = 0              # simulated provider latency per call
+    latency_jitter_ms: int = 0       # +/- uniform jitter (seeded)
+    seed: int = 7
+
+    @classmethod
+    def from_env(cls) -> "SyntheticSettings":
+        """
+        Read SYNTHETIC_<FIELD> environment variables (e.g. SYNTHETIC_MODULES).
+
+        Raises:
+            ValueError: A value is not a non-negative integer
+        """
+        values = {}
+        for f in fields(cls):
+            raw = os.environ.get(f"SYNTHETIC_{f.name.upper()}", "").strip()
+            if not raw:
+                continue
+            if not raw.isdigit():
+                raise ValueError(f"SYNTHETIC_{f.name.upper()} must be a non-negative integer, got {raw!r}")
+            values[f.name] = int(raw)
+        settings = cls(**values)
+        if settings.modules < 1 or settings.objectives_per_module < 1 or settings.lessons_per_module < 1:
+            raise ValueError("SYNTHETIC_MODULES, SYNTHETIC_OBJECTIVES_PER_MODULE and "
+                             "SYNTHETIC_LESSONS_PER_MODULE must be at least 1")
+        return settings
+
+
+def detect_agent(prompt: str) -> Optional[str]:
+    """Agent key for a rendered prompt (see AGENT_MARKERS), or None."""
+    found = [(prompt.find(marker), agent) for marker, agent in AGENT_MARKERS if marker in prompt]
+    return min(found)[1] if found else None
+
+
+def extract_state(prompt: str) -> Dict[str, Any]:
+    """
+    The system state (pruned JSON or state digest) embedded in a prompt.
+
+    Returns:
+        The first JSON object with an ``inputs`` or ``_digest`` key; {} if none
+    """
+    decoder = json.JSONDecoder()
+    for match in _STATE_START.finditer(prompt):
+        try:
+            value, _ = decoder.raw_decode(prompt, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return {}
+
+
+def objective_rows(prompt: str) -> List[Tuple[str, str]]:
+    """(module_id, objective_text) rows of the pre-computed objective list, if the prompt has one."""
+    start = prompt.find(OBJECTIVE_LIST_MARKER)
+    if start < 0:
+        return []
+    end = prompt.find("You MUST generate", start)
+    return _OBJECTIVE_ROW.findall(prompt[start:end if end >= 0 else len(prompt)])
+
+
+def _state_modules(state: Mapping[str, Any]) -> List[Tuple[str, str, List[str]]]:
+    """(module_id, title, objectives) from the curriculum, or the digest's objective coverage."""
+    modules = (state.get("curriculum") or {}).get("modules") or []
+    found = [
+        (m["module_id"], m.get("title", m["module_id"]), list(m.get("objectives") or []))
+        for m in modules if isinstance(m, Mapping) and "module_id" in m
+    ]
+    if found:
+        return found
+    by_module: Dict[str, List[str]] = {}
+    for row in (state.get("objective_coverage") or {}).get("by_objective") or []:
+        by_module.setdefault(row.get("module_id"), []).append(row.get("objective"))
+    return [(mid, mid, objectives) for mid, objectives in by_module.items() if mid]
+
+
+class SyntheticProvider(BaseProvider):
+    """
+    Provider that synthesizes contract-valid, state-derived outputs without API calls.
+
+    Used to measure realistic state growth, prompt sizes and I/O cost in dry
+    runs and benchmarks.
+    """
+
+    def __init__(self, settings: Optional[SyntheticSettings] = None):
+        self.settings = settings or SyntheticSettings.from_env()
+
+    def run(self, prompt: str) -> str:
+        """
+        Return a synthetic agent response for ``prompt``.
+
+        Args:
+            prompt: The rendered agent prompt
+
+        Returns:
+            JSON string matching the agent output contract
+        """
+        agent = detect_agent(prompt) or "unknown"
+        rng = random.Random(f"{self.settings.seed}:{agent}")
+        self._simulate_latency(rng)
+
+        if agent == "quality_review":
+            from orchestrator.providers.dry_run_provider import DryRunProvider
+            return DryRunProvider().run(prompt)
+
+        state = extract_state(prompt)
+        builder = getattr(self, f"_build_{agent}", self._build_unknown)
+        title, patch, table = builder(prompt, state, rng)
+        response = {
+            "deliverable_markdown": self._deliverable(title, table, rng),
+            "updated_state": patch,
+            "open_questions": [],
+        }
+        return json.dumps(response, indent=2)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _simulate_latency(self, rng: random.Random) -> None:
+        s = self.settings
+        if s.latency_ms <= 0 and s.latency_jitter_ms <= 0:
+            return
+        delay_ms = max(0, s.latency_ms + rng.randint(-s.latency_jitter_ms, s.latency_jitter_ms))
+        retry_sleep(delay_ms / 1000.0)  # never sleeps past a step/run deadline
+
+    def _text(self, rng: random.Random, words: Optional[int] = None) -> str:
+        text = " ".join(rng.choice(_VOCABULARY) for _ in range(words or self.settings.text_words))
+        return text[0].upper() + text[1:] + "."
+
+    def _deliverable(self, title: str, table: List[List[str]], rng: random.Random) -> str:
+        lines = [f"# {title}", "", "## Summary", ""]
+        lines.append(" ".join(self._text(rng) for _ in range(2)))
+        if table:
+            lines += ["", "## Detail", "", "| " + " | ".join(table[0]) + " |",
+                      "|" + "---|" * len(table[0])]
+            lines += ["| " + " | ".join(str(c) for c in row) + " |" for row in table[1:]]
+        for i in range(1, self.settings.deliverable_paragraphs + 1):
+            lines += ["", f"## Notes {i}", "", " ".join(self._text(rng) for _ in range(3))]
+        lines += ["", "*Generated by SyntheticProvider - No API calls made*"]
+        return "\n".join(lines) + "\n"
+
+    def _modules(self, state: Mapping[str, Any]) -> List[Tuple[str, str, List[str]]]:
+        modules = _state_modules(state)
+        if modules:
+            return modules
+        s = self.settings
+        return [(f"M{i}", f"Module {i}", [f"M{i}.{o}: Apply M{i} practice {o}." for o in
+                                          range(1, s.objectives_per_module + 1)])
+                for i in range(1, s.modules + 1)]
+
+    # ------------------------------------------------------------------
+    # Agents: each returns (deliverable title, updated_state, table rows)
+    # ------------------------------------------------------------------
+
+    def _build_strategy_lead(self, prompt, state, rng):
+        modules = self._modules(state)
+        strategy = {
+            "learner_profile": self._text(rng),
+            "success_criteria": [self._text(rng, 10) for _ in range(4)],
+            "scope_in": [self._text(rng, 8) for _ in range(3)],
+            "scope_out": [self._text(rng, 8) for _ in range(2)],
+            "modality": "asynchronous",
+            "governance_emphasis": [self._text(rng, 8) for _ in range(2)],
+            "module_intent": [{"module_id": mid, "intent": self._text(rng)} for mid, _, _ in modules],
+        }
+        table = [["Module", "Intent"]] + [[i["module_id"], i["intent"]] for i in strategy["module_intent"]]
+        return "Course Strategy", {"strategy": strategy}, table
+
+    def _build_learner_research(self, prompt, state, rng):
+        profile = {
+            "persona_name": "Synthetic Persona",
+            "key_motivations": [self._text(rng, 10) for _ in range(4)],
+            "pain_points": [self._text(rng, 10) for _ in range(4)],
+            "technical_constraints": self._text(rng),
+        }
+        table = [["Pain point"]] + [[p] for p in profile["pain_points"]]
+        return "Learner Profile", {"learner_profile": profile}, table
+
+    def _build_learning_architect(self, prompt, state, rng):
+        s = self.settings
+        match = re.search(r"MODULE_COUNT_TARGET:\s*(\d+)", prompt)
+        count = int(match.group(1)) if match else s.modules
+        modules = []
+        for i in range(1, count + 1):
+            mid = f"M{i}"
+            modules.append({
+                "module_id": mid,
+                "title": f"{rng.choice(_VOCABULARY).title()} {rng.choice(_VOCABULARY).title()} ({mid})",
+                "outcome": f"Apply {mid} practices to realistic client scenarios.",
+                "objectives": [
+                    f"{mid}.{o}: Evaluate {rng.choice(_VOCABULARY)} decisions against the "
+                    f"{rng.choice(_VOCABULARY)} checklist."
+                    for o in range(1, s.objectives_per_module + 1)
+                ],
+                "key_concepts": [f"{mid} concept {c}" for c in "ABCD"],
+                "activities": [f"{mid} activity {a}: {self._text(rng, 8)}" for a in (1, 2)],
+                "checks": [
+                    {"type": "mcq", "prompt": f"{mid}: Which option applies the principle?",
+                     "success_criteria": ["Selects the compliant option"]},
+                    {"type": "scenario", "prompt": f"{mid}: Resolve the escalation scenario.",
+                     "success_criteria": ["Cites the governing policy"]},
+                ],
+            })
+        patch = {
+            "course_title": "Synthetic Course",
+            "course_summary": self._text(rng),
+            "target_audience": "Client-facing operations staff.",
+            "business_goal_alignment": [self._text(rng, 8) for _ in range(3)],
+            "belief_behavior_systems": {
+                "belief": self._text(rng, 10),
+                "behaviors": [self._text(rng, 8) for _ in range(2)],
+                "systems_policies_enablers": [self._text(rng, 8) for _ in range(2)],
+            },
+            "curriculum": {"modules": modules},
+            "constraints": {"length_minutes": 30, "modality": "self-paced digital micro-modules",
+                            "do_not_invent_policies": True},
+            "assumptions": [f"JUSTIFICATION: module_count={count} (synthetic)"],
+        }
+        table = [["Module", "Title", "Outcome"]] + [[m["module_id"], m["title"], m["outcome"]] for m in modules]
+        return "Course Architecture", patch, table
+
+    def _build_instructional_designer(self, prompt, state, rng):
+        designs = [
+            {
+                "module_id": mid,
+                "title": title,
+                "lessons": [
+                    {
+                        "lesson_id": f"{mid}.L{n}",
+                        "title": f"{title} lesson {n}",
+                        "content_outline": [self._text(rng, 12) for _ in range(4)],
+                        "practice": f"[Scenario: {mid}-{n}] {self._text(rng)}",
+                    }
+                    for n in range(1, self.settings.lessons_per_module + 1)
+                ],
+            }
+            for mid, title, _ in self._modules(state)
+        ]
+        script = "\n\n".join(
+            f"## {d['module_id']}: {d['title']}\n\n" + "\n\n".join(
+                f"### {lesson['title']}\n\n" + " ".join(lesson["content_outline"]) for lesson in d["lessons"]
+            )
+            for d in designs
+        )
+        minutes = 5 * sum(len(d["lessons"]) for d in designs)
+        patch = {
+            "module_designs": designs,
+            "scripts": {"full_script_markdown": script, "estimated_duration_minutes": minutes},
+        }
+        table = [["Module", "Lessons"]] + [[d["module_id"], len(d["lessons"])] for d in designs]
+        return "Module Designs and Script", patch, table
+
+    def _build_assessment_designer(self, prompt, state, rng):
+        rows = objective_rows(prompt)
+        if not rows:
+            rows = [(mid, obj) for mid, _, objectives in self._modules(state) for obj in objectives]
+        questions = [
+            {
+                "q_id": n,
+                "module_id": mid,
+                "objective_ref": objective,
+                "skill_tested": f"Evaluate {rng.choice(_VOCABULARY)} decisions",
+                "stem": self._text(rng),
+                "options": [self._text(rng, 6) for _ in range(4)],
+                "correct_idx": rng.randrange(4),
+                "feedback": self._text(rng, 12),
+            }
+            for n, (mid, objective) in enumerate(rows, start=1)
+        ]
+        table = [["Q", "Module", "Objective"]] + [[q["q_id"], q["module_id"], q["objective_ref"]] for q in questions]
+        return "Assessment", {"assessment": {"questions": questions}}, table
+
+    def _build_storyboard(self, prompt, state, rng):
+        storyboards = [
+            {
+                "module_id": mid,
+                "screen_id": n,
+                "visual_layout": "Content Slide",
+                "media_asset_description": self._text(rng),
+                "alt_text": f"{mid} screen illustration",
+                "dev_notes": self._text(rng, 8),
+                "transformational_dilemma": f"Transformational Dilemma: {self._text(rng)} Question: {self._text(rng, 8)}",
+                "governance_anchor": f"Governance Anchor: {self._text(rng)} Evidence Check: {self._text(rng, 8)}",
+                "dialogue_prompts": [f"Dialogue Prompt {d}: {self._text(rng, 10)}" for d in (1, 2)],
+                "level_3_behavior_signal": f"Level 3 Behavior Signal: {self._text(rng)}",
+            }
+            for n, (mid, _, _) in enumerate(self._modules(state), start=1)
+        ]
+        table = [["Screen", "Module", "Layout"]] + [[s["screen_id"], s["module_id"], s["visual_layout"]]
+                                                   for s in storyboards]
+        return "Storyboard", {"storyboards": storyboards}, table
+
+    def _build_media_producer(self, prompt, state, rng):
+        assets = [
+            {
+                "learning_object_id": f"lo_{mid.lower()}",
+                "slides": [
+                    {
+                        "order": n,
+                        "layout": "title" if n == 1 else "bullet_list",
+                        "title": f"{title} slide {n}",
+                        "bullets": [self._text(rng, 8) for _ in range(3)],
+                        "narration": " ".join(self._text(rng) for _ in range(2)),
+                        "visual_prompt": self._text(rng, 12),
+                        "duration_seconds": 15,
+                    }
+                    for n in range(1, self.settings.lessons_per_module + 3)
+                ],
+            }
+            for mid, title, _ in self._modules(state)
+        ]
+        media_spec = {
+            "course_id": "synthetic_course",
+            "architecture_hash": "0" * 64,
+            "generated_at_utc": "2026-01-01T00:00:00Z",
+            "media_assets": assets,
+        }
+        table = [["Learning object", "Slides"]] + [[a["learning_object_id"], len(a["slides"])] for a in assets]
+        return "Media Specification", {"media_spec": media_spec}, table
+
+    def _build_qa(self, prompt, state, rng):
+        findings = [
+            {"finding_id": f"F{n}", "module_id": mid, "severity": "MINOR", "detail": self._text(rng)}
+            for n, (mid, _, _) in enumerate(self._modules(state), start=1)
+        ]
+        patch = {"qa": {"status": "PASS", "suggestions": [self._text(rng, 10) for _ in range(3)],
+                        "findings": findings}}
+        table = [["Finding", "Module", "Severity"]] + [[f["finding_id"], f["module_id"], f["severity"]]
+                                                      for f in findings]
+        return "QA Report", patch, table
+
+    def _build_change_management(self, prompt, state, rng):
+        modules = self._modules(state)
+        timeline = [{"day": -7, "action": "Announcement email"}, {"day": 0, "action": "Launch"}]
+        timeline += [{"day": 7 * n, "action": f"{mid} reinforcement: {self._text(rng, 8)}"}
+                     for n, (mid, _, _) in enumerate(modules, start=1)]
+        patch = {"change_plan": {"comms_timeline": timeline,
+                                 "reinforcement_tactics": [self._text(rng, 8) for _ in modules]}}
+        table = [["Day", "Action"]] + [[t["day"], t["action"]] for t in timeline]
+        return "Change Management Plan", patch, table
+
+    def _build_operations_librarian(self, prompt, state, rng):
+        catalog = [
+            {"asset_id": f"{mid}-A{a}", "module_id": mid, "type": kind, "owner": "L&D Ops"}
+            for mid, _, _ in self._modules(state)
+            for a, kind in enumerate(("script", "storyboard", "slide_deck"), start=1)
+        ]
+        patch = {"ops_metadata": {
+            "course_code": "SYN-101",
+            "lms_description": self._text(rng),
+            "tags": sorted({rng.choice(_VOCABULARY) for _ in range(6)}),
+            "asset_manifest": ["Script", "Storyboard", "Assessment"],
+            "asset_catalog": catalog,
+        }}
+        table = [["Asset", "Module", "Type"]] + [[c["asset_id"], c["module_id"], c["type"]] for c in catalog]
+        return "Operations Package", patch, table
+
+    def _build_unknown(self, prompt, state, rng):
+        return "Synthetic Deliverable", {}, []
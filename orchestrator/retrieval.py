@@ -0,0 +1,433 @@
+"""
+Local lexical retrieval over large course inputs.
+
+Every agent prompt substitutes the whole business brief and SME notes. That
+is fine for a few KB but not for a 200-page policy manual, so an input at
+least ``min_source_chars`` long is chunked once per run, indexed with BM25
+(pure Python, no network) and each agent receives only the top-k passages
+relevant to it within a token budget. Shorter inputs are passed in full, as
+before.
+
+Queries are built per agent (role name, strategy, configured ``query``
+terms) and per curriculum module (title, outcome, objectives, key
+concepts), so agents that work module by module get passages for every
+module ("module shards"). Selected passages are rendered in document order,
+each prefixed with its chunk ID (e.g. ``[sme_notes:0042]``); the chunk IDs
+per query are recorded in the step state file for traceability.
+
+Indexes are cached on disk by SHA256 of the input text and chunking
+settings (``<cache_dir>/<source>-<sha>.json``), so a re-run or resume over the
+same inputs does not re-chunk or re-index.
+
+Configured in run_config (all keys optional; per-agent ``retrieval`` merges
+over it, ``"retrieval": false`` on an agent disables it)::
+
+    "retrieval": {"enabled": true, "sources": ["sme_notes", "business_brief"],
+                  "min_source_chars": 12000, "chunk_chars": 1200, "top_k": 8, "budget_tokens": 2000}
+"""
+
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from orchestrator.shared_fs import atomic_write_json
+from orchestrator.state_digest import estimate_tokens
+
+INDEX_VERSION = 1
+
+RETRIEVAL_SOURCES = ("business_brief", "sme_notes")
+SOURCE_LABELS = {"business_brief": "BUSINESS BRIEF", "sme_notes": "SME NOTES"}
+
+DEFAULT_SOURCES = ("sme_notes", "business_brief")
+DEFAULT_MIN_SOURCE_CHARS = 12000
+DEFAULT_CHUNK_CHARS = 1200
+DEFAULT_TOP_K = 8
+DEFAULT_BUDGET_TOKENS = 2000
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can do does for from has have how if in into is it its "
+    "may must no not of on or our should so such than that the their them then there these they "
+    "this those to was we were what when where which while who will with within without you your "
+    "agent agents".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms without stopwords or single characters."""
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+# ------------------------------------------------------------------------------
+# Settings
+# ------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RetrievalRules:
+    """Resolved retrieval settings for one agent."""
+    sources: Tuple[str, ...] = DEFAULT_SOURCES
+    min_source_chars: int = DEFAULT_MIN_SOURCE_CHARS
+    chunk_chars: int = DEFAULT_CHUNK_CHARS
+    top_k: int = DEFAULT_TOP_K
+    budget_tokens: int = DEFAULT_BUDGET_TOKENS
+    query: str = ""
+
+
+def retrieval_rules(config: Mapping[str, Any], agent_cfg: Mapping[str, Any]) -> Optional[RetrievalRules]:
+    """
+    Merge the run_config ``retrieval`` block with an agent's ``retrieval`` block.
+
+    Returns:
+        RetrievalRules, or None when retrieval is off for the agent
+
+    Raises:
+        ValueError: Malformed settings
+    """
+    name = agent_cfg.get("name")
+    base = config.get("retrieval") or {}
+    override = agent_cfg.get("retrieval")
+    if override is False:
+        return None
+    if override is not None and not isinstance(override, Mapping):
+        raise ValueError(f"retrieval for '{name}' must be an object or false")
+    cfg = {**base, **(override or {})}
+    if not cfg or not cfg.get("enabled", True):
+        return None
+
+    sources = cfg.get("sources", list(DEFAULT_SOURCES))
+    if isinstance(sources, str) or not sources or any(s not in RETRIEVAL_SOURCES for s in sources):
+        raise ValueError(f"retrieval.sources for '{name}' must list one or more of: {', '.join(RETRIEVAL_SOURCES)}")
+    values = {}
+    for key, default, minimum in (
+        ("min_source_chars", DEFAULT_MIN_SOURCE_CHARS, 0),
+        ("chunk_chars", DEFAULT_CHUNK_CHARS, 200),
+        ("top_k", DEFAULT_TOP_K, 1),
+        ("budget_tokens", DEFAULT_BUDGET_TOKENS, 1),
+    ):
+        value = cfg.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+            raise ValueError(f"retrieval.{key} for '{name}' must be an integer >= {minimum}")
+        values[key] = value
+    query = cfg.get("query", "")
+    if not isinstance(query, str):
+        raise ValueError(f"retrieval.query for '{name}' must be a string")
+    return RetrievalRules(sources=tuple(sources), query=query, **values)
+
+
+# ------------------------------------------------------------------------------
+# Chunking
+# ------------------------------------------------------------------------------
+
+def _split_long(paragraph: str, limit: int) -> List[str]:
+    """Split an over-long paragraph at sentence ends (hard cut as a last resort)."""
+    parts, current = [], ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(sentence[:limit])
+            sentence = sentence[limit:]
+        if current and len(current) + 1 + len(sentence) > limit:
+            parts.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        parts.append(current)
+    return parts
+
+
+def chunk_text(text: str, source: str, chunk_chars: int = DEFAULT_CHUNK_CHARS) -> List[Dict[str, Any]]:
+    """
+    Split markdown into chunks of at most ``chunk_chars`` characters.
+
+    Chunks never span a heading; paragraphs are packed together and long
+    paragraphs are split at sentence ends. Each chunk keeps the heading it
+    falls under.
+
+    Returns:
+        List of {"id": "<source>:NNNN", "heading": ..., "text": ...} in document order
+    """
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    for block in re.split(r"\n\s*\n", text):
+        lines = block.strip().splitlines()
+        while lines and _HEADING.match(lines[0].strip()):
+            sections.append((_HEADING.match(lines[0].strip()).group(1).strip(), []))
+            lines = lines[1:]
+        if lines:
+            sections[-1][1].append("\n".join(lines).strip())
+
+    chunks: List[Dict[str, Any]] = []
+    for heading, paragraphs in sections:
+        current = ""
+        for paragraph in paragraphs:
+            for piece in _split_long(paragraph, chunk_chars) if len(paragraph) > chunk_chars else [paragraph]:
+                if current and len(current) + 2 + len(piece) > chunk_chars:
+                    chunks.append({"heading": heading, "text": current})
+                    current = piece
+                else:
+                    current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            chunks.append({"heading": heading, "text": current})
+    for n, chunk in enumerate(chunks, start=1):
+        chunk["id"] = f"{source}:{n:04d}"
+    return [{"id": c["id"], "heading": c["heading"], "text": c["text"]} for c in chunks]
+
+
+# ------------------------------------------------------------------------------
+# BM25 index
+# ------------------------------------------------------------------------------
+
+class LexicalIndex:
+    """BM25 index over a list of chunks (see chunk_text)."""
+
+    def __init__(self, chunks: List[Dict[str, Any]], postings: Dict[str, List[List[int]]],
+                 lengths: List[int], key: str = ""):
+        self.chunks = chunks
+        self.postings = postings
+        self.lengths = lengths
+        self.key = key
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    @classmethod
+    def build(cls, chunks: List[Dict[str, Any]], key: str = "") -> "LexicalIndex":
+        postings: Dict[str, List[List[int]]] = {}
+        lengths = []
+        for idx, chunk in enumerate(chunks):
+            terms = tokenize(f"{chunk['heading']}\n{chunk['text']}")
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings.setdefault(term, []).append([idx, tf])
+        return cls(chunks, postings, lengths, key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": INDEX_VERSION, "key": self.key, "chunks": self.chunks,
+                "lengths": self.lengths, "postings": self.postings}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "LexicalIndex":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported retrieval index version: {data.get('version')}")
+        return cls(data["chunks"], data["postings"], data["lengths"], data.get("key", ""))
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """BM25 score per chunk index (chunks matching no query term are omitted)."""
+        n = len(self.chunks)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for idx, tf in posting:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[idx] / (self.avg_length or 1))
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top ``k`` (chunk index, score), best first; ties keep document order."""
+        ranked = sorted(self.scores(query).items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
+
+
+def index_key(text: str, source: str, chunk_chars: int) -> str:
+    """Cache key for an input's index: SHA256 of the text and chunking settings."""
+    hasher = hashlib.sha256()
+    hasher.update(f"{INDEX_VERSION}:{source}:{chunk_chars}\n".encode("utf-8"))
+    hasher.update(text.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def load_or_build_index(
+    text: str,
+    source: str,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    cache_dir: Optional[Path] = None,
+) -> Tuple[LexicalIndex, bool]:
+    """
+    The index of ``text``, read from ``cache_dir`` when an index of the same
+    input and settings was built before.
+
+    Returns:
+        Tuple of (index, cached)
+    """
+    key = index_key(text, source, chunk_chars)
+    path = Path(cache_dir) / f"{source}-{key[:16]}.json" if cache_dir is not None else None
+    if path is not None and path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = LexicalIndex.from_dict(json.load(f))
+            if index.key == key:
+                return index, True
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable or stale cache entry: rebuild
+    index = LexicalIndex.build(chunk_text(text, source, chunk_chars), key)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(path, index.to_dict(), indent=None)
+    return index, False
+
+
+# ------------------------------------------------------------------------------
+# Queries and selection
+# ------------------------------------------------------------------------------
+
+def _flatten(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, Mapping):
+        for v in value.values():
+            yield from _flatten(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _flatten(v)
+
+
+def build_queries(agent_name: str, state: Mapping[str, Any], rules: RetrievalRules) -> List[Tuple[str, str]]:
+    """
+    (label, query text) pairs: one for the agent, one per curriculum module.
+    """
+    role = agent_name.replace("_agent", "").replace("_", " ")
+    strategy = state.get("strategy") or {}
+    agent_query = " ".join([role, rules.query, " ".join(_flatten(strategy))[:2000]])
+    queries = [("agent", agent_query)]
+    for module in (state.get("curriculum") or {}).get("modules") or []:
+        if isinstance(module, Mapping) and module.get("module_id"):
+            fields = [module.get(k) for k in ("title", "outcome", "objectives", "key_concepts")]
+            queries.append((str(module["module_id"]), " ".join(_flatten(fields))))
+    return queries
+
+
+def select_passages(
+    index: LexicalIndex,
+    queries: Sequence[Tuple[str, str]],
+    top_k: int,
+    budget_tokens: int,
+) -> Dict[str, Any]:
+    """
+    Pick up to ``top_k`` chunks within ``budget_tokens``, round-robin over the
+    queries (each query's next best chunk in turn), so every module shard is
+    represented before any query gets a second passage.
+
+    Returns:
+        {"chunk_ids": [...] in document order, "by_query": {label: [chunk ids]}, "tokens": int}
+    """
+    ranked = [(label, [idx for idx, _ in index.search(query, top_k)]) for label, query in queries]
+    selected: List[int] = []
+    by_query: Dict[str, List[str]] = {label: [] for label, _ in queries}
+    tokens = 0
+    exhausted = set()
+    while len(selected) < top_k and len(exhausted) < len(ranked):
+        progressed = False
+        for label, candidates in ranked:
+            if len(selected) >= top_k:
+                break
+            while candidates and candidates[0] in selected:
+                candidates.pop(0)
+            if not candidates:
+                exhausted.add(label)
+                continue
+            idx = candidates.pop(0)
+            cost = estimate_tokens(index.chunks[idx]["text"])
+            if tokens + cost > budget_tokens:
+                exhausted.add(label)
+                continue
+            selected.append(idx)
+            by_query[label].append(index.chunks[idx]["id"])
+            tokens += cost
+            progressed = True
+        if not progressed:
+            break
+    selected.sort()
+    return {
+        "chunk_ids": [index.chunks[idx]["id"] for idx in selected],
+        "by_query": {label: ids for label, ids in by_query.items() if ids},
+        "tokens": tokens,
+        "indexes": selected,
+    }
+
+
+def render_passages(index: LexicalIndex, selection: Mapping[str, Any], source: str) -> str:
+    """Prompt text for the selected chunks, in document order, each tagged with its chunk ID."""
+    label = SOURCE_LABELS.get(source, source)
+    lines = [
+        f"[Relevant excerpts: {len(selection['chunk_ids'])} of {len(index.chunks)} passages of the "
+        f"{label}, selected for this step. Cite chunk IDs when relying on an excerpt.]"
+    ]
+    for idx in selection["indexes"]:
+        chunk = index.chunks[idx]
+        heading = f" {chunk['heading']}" if chunk["heading"] else ""
+        lines.append(f"\n[{chunk['id']}]{heading}\n{chunk['text']}")
+    return "\n".join(lines)
+
+
+class InputRetriever:
+    """
+    Indexes of one run's inputs, built once (or read from the cache) and
+    queried per step.
+
+    Args:
+        texts: Source name -> full text (business_brief, sme_notes)
+        cache_dir: Where indexes are cached (None = in memory only)
+    """
+
+    def __init__(self, texts: Mapping[str, str], cache_dir: Optional[Path] = None):
+        self.texts = dict(texts)
+        self.cache_dir = cache_dir
+        self._indexes: Dict[Tuple[str, int], LexicalIndex] = {}
+
+    def index(self, source: str, chunk_chars: int) -> LexicalIndex:
+        key = (source, chunk_chars)
+        if key not in self._indexes:
+            index, cached = load_or_build_index(self.texts[source], source, chunk_chars, self.cache_dir)
+            print(f"[Retrieval] {source}: {len(index.chunks)} chunks ({'cached index' if cached else 'indexed'})")
+            self._indexes[key] = index
+        return self._indexes[key]
+
+    def retrieve(
+        self, agent_name: str, state: Mapping[str, Any], rules: RetrievalRules
+    ) -> Tuple[Dict[str, str], Optional[Dict[str, Any]]]:
+        """
+        Input texts for an agent's prompt.
+
+        Returns:
+            Tuple of (source -> text to substitute, trace or None when every
+            source was passed in full). A source with no matching chunk is
+            passed in full. The trace maps each retrieved source to
+            its chunk IDs, per-query chunk IDs, chunk count and tokens.
+        """
+        values = dict(self.texts)
+        trace: Dict[str, Any] = {}
+        queries = None
+        for source in rules.sources:
+            if len(self.texts.get(source, "")) < rules.min_source_chars:
+                continue
+            index = self.index(source, rules.chunk_chars)
+            if queries is None:
+                queries = build_queries(agent_name, state, rules)
+            selection = select_passages(index, queries, rules.top_k, rules.budget_tokens)
+            if not selection["chunk_ids"]:
+                continue  # nothing matched: better the full text than an empty excerpt
+            values[source] = render_passages(index, selection, source)
+            trace[source] = {
+                "index_sha256": index.key,
+                "chunks_total": len(index.chunks),
+                "chunk_ids": selection["chunk_ids"],
+                "by_query": selection["by_query"],
+                "tokens": selection["tokens"],
+                "full_tokens": estimate_tokens(self.texts[source]),
+            }
+        return values, (trace or None)
@@ -1,20 +1,50 @@
 import json
 import sys
 import os
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Mapping, Optional, Callable
 import copy
-
-from orchestrator.providers import get_provider
-from orchestrator.validation import validate_agent_output, ValidationConfig
+from contextlib import ExitStack
+
+from orchestrator import file_cache
+from orchestrator.providers import BaseProvider, get_provider
+from orchestrator.providers.base import add_usage
+from orchestrator.providers.singleflight import SingleFlightProvider, singleflight_enabled
+from orchestrator.providers.cassette import (
+    CASSETTE_FILENAME,
+    Cassette,
+    CassettePlayer,
+    RecordingProvider,
+    cassette_settings,
+    resolve_cassette_path,
+)
+from orchestrator.validation import validate_agent_output
 from orchestrator.json_tools import parse_json_object
+from orchestrator.prompt_layout import build_cache_friendly_messages, with_knowledge_slot
+from orchestrator.model_cascade import run_quality_checks
+from orchestrator.speculative import SpeculativeRun, speculation_settings
+from orchestrator.artifact_store import (
+    ArtifactStore,
+    default_store_root,
+    materialize_log,
+    store_settings,
+    write_run_file,
+)
+from orchestrator.batch.coordinator import BATCH_PROVIDER_PREFIX
+from orchestrator.approval_queue import (
+    DEFAULT_QUEUE_PATH,
+    ApprovalPendingError,
+    ApprovalQueue,
+    resolve_approval_backend,
+)
 from orchestrator.approval_handler import (
     ApprovalRejectedError,
     approval_gate,
     evaluate_risk_gate,
-    load_phase_gates,
+    gate_requires_human,
 )
 from orchestrator.run_artifacts import (
     ensure_run_dirs,
@@ -24,6 +54,47 @@ from orchestrator.run_artifacts import (
     compute_config_hash,
     compute_inputs_hash,
 )
+from orchestrator.run_plan import (
+    RUN_PLAN_FILENAME,
+    ProviderPool,
+    RunPlan,
+    StepPlan,
+    compile_run_plan,
+    read_run_plan,
+    thaw,
+    write_run_plan,
+)
+from orchestrator.run_control import (
+    Deadline,
+    DeadlineExceededError,
+    RunCancelledError,
+    RunControl,
+    check_run_control,
+    deadline_settings,
+    run_control,
+)
+from orchestrator.knowledge_pack import PackRetriever, load_active_pack
+from orchestrator.retrieval import InputRetriever
+from orchestrator.run_log import open_run_log, run_log_settings
+from orchestrator.shared_fs import append_line
+from orchestrator.state_digest import (
+    build_state_digest,
+    expansion_requested,
+    render_digest,
+    requested_sections,
+    tokens_for_chars,
+)
+from orchestrator.usage import (
+    BudgetExceededError,
+    UsageMeter,
+    budget_settings,
+    call_record,
+    estimated_usage,
+    price_table,
+    run_meter,
+    update_usage_manifest,
+    usage_cost,
+)
 from schemas.system_state import get_initial_state
 from schemas.agent_output_contract import REQUIRED_KEYS
 from orchestrator.audit import generate_audit_summary
@@ -36,6 +107,8 @@ CONFIG_PATH = Path("config/run_config.json")
 LEDGER_PATH = "governance/run_ledger.jsonl"
 OUTPUTS_DIR = "outputs"
 INPUTS_DIR = "inputs"
+RETRIEVAL_CACHE_DIRNAME = "_index"  # under OUTPUTS_DIR: input retrieval indexes by input hash
+KNOWLEDGE_DIR = "knowledge/active"  # ACTIVE_PACK.json and applied packs (see adk pack apply)
 
 # ------------------------------------------------------------------------------
 # Errors
@@ -46,6 +119,16 @@ INPUTS_DIR = "inputs"
 class ValidationError(Exception):
     pass
 
+# RunCancelledError and DeadlineExceededError are imported from orchestrator.run_control
+
+class RunFencedError(Exception):
+    """
+    Raised by a cancel_check when this process no longer owns the run (e.g. its
+    service job lease expired and another worker took it over). The run stops
+    without writing its manifest, which now belongs to the new owner.
+    """
+    pass
+
 # ------------------------------------------------------------------------------
 # Utilities
 # ------------------------------------------------------------------------------
@@ -55,8 +138,7 @@ def utc_now():
 
 def write_ledger(event: Dict[str, Any]):
     os.makedirs(os.path.dirname(LEDGER_PATH), exist_ok=True)
-    with open(LEDGER_PATH, "a") as f:
-        f.write(json.dumps(event) + "\n")
+    append_line(LEDGER_PATH, json.dumps(event))
 
 def deep_merge(a: Dict, b: Dict) -> Dict:
     result = dict(a)
@@ -79,18 +161,26 @@ def get_system_version() -> str:
         return "unknown"
 
 def load_text(path: str) -> str:
+    """Read config-side text (prompt templates) through the mtime-checked file cache."""
+    return file_cache.read_text(path)
+
+def load_input(path: str) -> str:
+    """
+    Read a course input directly: inputs differ per run, so caching them would
+    keep every job's inputs in memory for the life of a service process.
+    """
     with open(path, "r") as f:
         return f.read()
 
-def load_config() -> Dict[str, Any]:
-    """Load and validate run configuration."""
-    if not CONFIG_PATH.exists():
+def load_config(config_path: str = None) -> Dict[str, Any]:
+    """Load and validate run configuration (default: CONFIG_PATH)."""
+    config_path = Path(config_path) if config_path is not None else CONFIG_PATH
+    if not config_path.exists():
         raise FileNotFoundError(
-            f"Missing {CONFIG_PATH}. Create it before running."
+            f"Missing {config_path}. Create it before running."
         )
     
-    with open(CONFIG_PATH, "r") as f:
-        config = json.load(f)
+    config = file_cache.read_json(config_path)
     
     # Validate required fields
     if "agents" not in config:
@@ -108,8 +198,8 @@ def load_config() -> Dict[str, Any]:
     
     return config
 
-# approval_gate(), evaluate_risk_gate(), and load_phase_gates() are
-# defined in orchestrator/approval_handler.py and imported above.
+# approval_gate() and evaluate_risk_gate() are defined in
+# orchestrator/approval_handler.py and imported above.
 
 # ------------------------------------------------------------------------------
 # Main Orchestrator
@@ -141,11 +231,102 @@ def prune_system_state(state: dict, agent_name: str) -> dict:
         # However, we still return a copy to be safe
         return copy.deepcopy(state)
 
-    # For other agents (like learner_research, learning_architect), 
+    # For other agents (like learner_research, learning_architect),
     # the core keys are usually sufficient or they are starting fresh.
     return pruned
 
 
+def _objective_table(system_state: dict) -> str:
+    """Pre-computed flat objective list for the assessment designer."""
+    modules = system_state.get("curriculum", {}).get("modules", [])
+    obj_rows = []
+    for mod in modules:
+        mid = mod.get("module_id", "?")
+        for obj in mod.get("objectives", []):
+            obj_rows.append(f"| {len(obj_rows)+1} | {mid} | {obj} |")
+    return (
+        "## PRE-COMPUTED OBJECTIVE LIST (AUTHORITATIVE — DO NOT DEVIATE)\n"
+        f"Total objectives: {len(obj_rows)}\n"
+        "| # | module_id | objective_text |\n"
+        "|---|---|---|\n"
+        + "\n".join(obj_rows)
+        + f"\n\nYou MUST generate EXACTLY {len(obj_rows)} questions, one per row above, in order.\n"
+        "Each question's objective_ref MUST exactly match the objective_text column.\n"
+    )
+
+
+def _prompt_values(
+    agent_name: str,
+    business_brief: str,
+    sme_notes: str,
+    system_state: dict,
+    state_text: str = None,
+    knowledge_text: str = None,
+) -> Dict[str, str]:
+    """Placeholder -> substituted text for an agent prompt."""
+    # Prune and dump system state, unless the caller rendered it (e.g. a state digest)
+    if state_text is None:
+        state_text = json.dumps(prune_system_state(system_state, agent_name), indent=2)
+    return {
+        "{business_brief}": business_brief,
+        "{sme_notes}": sme_notes,
+        "{knowledge_pack}": knowledge_text or "[No knowledge pack passages for this step]",
+        "{system_state}": state_text,
+    }
+
+
+def render_prompt(
+    prompt_template: str,
+    agent_name: str,
+    business_brief: str,
+    sme_notes: str,
+    system_state: dict,
+    state_text: str = None,
+    knowledge_text: str = None,
+) -> str:
+    """
+    Render an agent prompt from its template and the current run context.
+
+    Uses simple string replacement instead of .format() to avoid conflicts
+    with JSON braces in prompt templates (which contain JSON examples).
+    ``state_text`` replaces the pruned system state JSON (e.g. a state digest).
+    ``knowledge_text`` (retrieved knowledge pack passages) fills {knowledge_pack},
+    or is appended as a KNOWLEDGE PACK section if the template has no placeholder.
+    """
+    values = _prompt_values(agent_name, business_brief, sme_notes, system_state, state_text, knowledge_text)
+
+    prompt = with_knowledge_slot(prompt_template, knowledge_text)
+    prompt = prompt.replace("{business_brief}", values["{business_brief}"])
+    prompt = prompt.replace("{sme_notes}", values["{sme_notes}"])
+    prompt = prompt.replace("{knowledge_pack}", values["{knowledge_pack}"])
+    prompt = prompt.replace("{system_state}", values["{system_state}"])
+
+    # For the assessment designer, inject a pre-computed flat objective list
+    # so the LLM cannot truncate or skip later modules.
+    if agent_name == "assessment_designer_agent":
+        prompt = _objective_table(system_state) + "\n\n" + prompt
+
+    return prompt
+
+
+def render_prompt_messages(
+    prompt_template: str,
+    agent_name: str,
+    business_brief: str,
+    sme_notes: str,
+    system_state: dict,
+    state_text: str = None,
+    knowledge_text: str = None,
+) -> List[Dict[str, str]]:
+    """
+    Render an agent prompt in the cache-friendly layout (see orchestrator/prompt_layout.py):
+    a static template prefix followed by one message per variable.
+    """
+    values = _prompt_values(agent_name, business_brief, sme_notes, system_state, state_text, knowledge_text)
+    preamble = _objective_table(system_state) if agent_name == "assessment_designer_agent" else None
+    return build_cache_friendly_messages(with_knowledge_slot(prompt_template, knowledge_text), values, preamble=preamble)
+
+
 def run_pipeline(
     config_path: str = None,
     run_dir: str = None,
@@ -155,47 +336,120 @@ def run_pipeline(
     governance_profile: str = None,
     max_step: int = None,
     inputs_dir: str = "inputs",
+    provider_override: BaseProvider = None,
+    cancel_check: Callable[[], bool] = None,
+    run_plan: RunPlan = None,
+    replan: bool = False,
+    usage_meter: UsageMeter = None,
+    tenant_id: str = None,
+    provider_env: str = None,
+    service_job: Dict[str, str] = None,
 ) -> None:
     """
     Execute the agent pipeline with optional resume support.
     
     Args:
         config_path: Path to config file (default: config/run_config.json)
-        run_dir: Existing run directory for resume (default: create new)
+        run_dir: Existing run directory for resume, or the directory to create
+                 for a fresh run when initial_state is None (default: outputs/<timestamp>)
         start_step: Step index to start from (default: 1)
         initial_state: Initial state for resume (default: get_initial_state())
         max_step: Stop execution after completing this step number (inclusive)
         inputs_dir: Directory containing input files (default: "inputs")
+        provider_override: Provider instance used for every step instead of the
+                           configured providers (e.g. batch mode)
+        cancel_check: Callable polled before each step and provider request;
+                      returning True stops the run with manifest status
+                      "cancelled" (e.g. service jobs, SIGINT/SIGTERM). It may
+                      raise RunFencedError to stop without touching run state;
+                      it is also polled after each provider response and
+                      before each artifact, checkpoint and manifest write.
+        run_plan: Pre-compiled RunPlan to execute (e.g. from scripts/run_pipeline.py);
+                  config_path and config_overrides are then not read
+        replan: On resume, recompile the plan from the current config instead of
+                using the plan persisted in run_dir
+        usage_meter: Enclosing meter (e.g. a batch budget) that every provider
+                     call of this run is also charged to and checked against
+        tenant_id: Tenant the run belongs to (service and batch mode; recorded
+                   in the manifest and the run_started ledger event)
+        provider_env: PROVIDER override the run plan is compiled with instead of
+                      the PROVIDER env var (e.g. a resumed approval passes the
+                      one its run started with)
+        service_job: Service job executing the run ({"job_id", "jobs_path"});
+                     recorded with queued approval requests so a decision hands
+                     the job back to the service instead of resuming in-process
     """
     # Track manifest in outer scope for error handlers
     manifest = None
+    # Run log writer (log storage mode, see orchestrator/run_log.py)
+    run_log = None
+
+    def log_event(event: Dict[str, Any]) -> None:
+        """Append a ledger event, mirrored into the run log in log storage mode."""
+        write_ledger(event)
+        if run_log is not None:
+            run_log.log_event(event)
+
+    # Run-scoped context (deadlines and cancellation seen by provider calls)
+    scope = ExitStack()
     
     try:
         # ----------------------------------------------------------------------
-        # Load Configuration
+        # Run Plan: config, providers, templates and gates resolved once.
+        # A resumed run executes the plan persisted in its run directory.
         # ----------------------------------------------------------------------
 
-        if config_path is None:
-            config_path = str(CONFIG_PATH)
-        
-        config = load_config()
-
-        # Apply Overrides
-        if config_overrides:
-            print(f"Applying config overrides: {json.dumps(config_overrides, indent=2)}")
-            config = deep_merge(config, config_overrides)
+        resuming = run_dir is not None and initial_state is not None
+        if resuming:
+            # Loaded first so a plan that fails to compile marks the run failed
+            manifest = read_manifest(Path(run_dir))
+        plan = run_plan
+        if plan is None and resuming and not replan:
+            plan = read_run_plan(Path(run_dir))
+            if plan is not None:
+                print(f"Using persisted run plan: {Path(run_dir) / RUN_PLAN_FILENAME}")
+        if plan is None:
+            if config_path is None:
+                config_path = str(CONFIG_PATH)
+            config = load_config(config_path)
+
+            # Apply Overrides
+            if config_overrides:
+                print(f"Applying config overrides: {json.dumps(config_overrides, indent=2)}")
+                config = deep_merge(config, config_overrides)
+
+            plan = compile_run_plan(
+                config,
+                config_path,
+                provider_env=provider_env or os.getenv("PROVIDER"),
+                provider_override_name=(
+                    getattr(provider_override, "provider_name", type(provider_override).__name__)
+                    if provider_override is not None else None
+                ),
+                load_template=load_text,
+            )
+        config = plan.config
+        config_path = plan.config_path
+        if provider_override is None and any(
+            step.provider_name.startswith(BATCH_PROVIDER_PREFIX) for step in plan.steps
+        ):
+            # Only a BatchCoordinator serves the batch provider
+            raise ValueError(
+                "Run plan uses the batch provider; resume batch courses with "
+                "scripts/run_batch.py --resume <batch_id> (or --replan)"
+            )
 
         # ----------------------------------------------------------------------
         # Pilot Profile Validation
         # ----------------------------------------------------------------------
         if governance_profile == "pilot":
-            env_provider = os.getenv("PROVIDER")
-            # If PROVIDER is strictly "dry_run" or if default config uses "dry_run" and no env override
+            env_provider = plan.provider_env
+            # If PROVIDER is strictly "dry_run"/"synthetic" or the default config uses one with no env override
             resolved_provider = env_provider or config.get("provider", "")
             
-            if resolved_provider == "dry_run":
+            if resolved_provider in ("dry_run", "synthetic"):
                 raise ValueError(
-                    "❌ PILOT SAFETY: Cannot use 'dry_run' provider with 'pilot' governance profile. "
+                    f"❌ PILOT SAFETY: Cannot use '{resolved_provider}' provider with 'pilot' governance profile. "
                     "You must use a real provider (e.g., openai)."
                 )
             
@@ -216,22 +470,52 @@ def run_pipeline(
         if not os.path.exists(sme_notes_path):
              raise FileNotFoundError(f"Missing input file: {sme_notes_path}")
 
-        business_brief = load_text(business_brief_path)
-        sme_notes = load_text(sme_notes_path)
+        business_brief = load_input(business_brief_path)
+        sme_notes = load_input(sme_notes_path)
+
+        # Large inputs are chunked and indexed once; agents with retrieval
+        # rules then get only their top-k passages (see orchestrator/retrieval.py)
+        retriever = None
+        if any(step.retrieval is not None for step in plan.steps):
+            retriever = InputRetriever(
+                {"business_brief": business_brief, "sme_notes": sme_notes},
+                cache_dir=Path(OUTPUTS_DIR) / RETRIEVAL_CACHE_DIRNAME,
+            )
+
+        # Active knowledge pack: indexed per manifest hash, queried per step
+        # for agents with knowledge_pack rules (see orchestrator/knowledge_pack.py)
+        pack_retriever = None
+        if any(step.knowledge is not None for step in plan.steps):
+            active_pack = load_active_pack(Path(KNOWLEDGE_DIR))
+            if active_pack is not None:
+                pack_retriever = PackRetriever(active_pack, Path(KNOWLEDGE_DIR))
+
+        # Content-addressed artifact store: step outputs, checkpoints and the
+        # final state are written once as blobs, the run directory keeps
+        # pointers (see orchestrator/artifact_store.py)
+        artifact_store = None
+        artifact_settings = store_settings(config)
+        if artifact_settings is not None:
+            artifact_store = ArtifactStore(
+                default_store_root(OUTPUTS_DIR, artifact_settings), artifact_settings.compression_level
+            )
 
         # ----------------------------------------------------------------------
         # Initial State and Run Directory
         # ----------------------------------------------------------------------
 
+        # Log storage mode: a run directory with a run log keeps appending to it
+        log_settings = run_log_settings(config)
+
         # Resume mode: use provided state and directory
-        if run_dir is not None and initial_state is not None:
+        if resuming:
             system_state = initial_state
             run_id = Path(run_dir).name
+            run_log = open_run_log(run_dir, log_settings)
             print(f"\n🔄 RESUMING RUN: {run_id} from step {start_step}")
             
-            # Load existing manifest
-            manifest = read_manifest(Path(run_dir))
             manifest["status"] = "running"  # Reset to running
+            manifest.pop("pending_approval", None)
             
             # v0.3 Hardening: Update auto_approve intent on resume
             # Only set if missing (legacy manifests). If present, MUST preserve original run intent.
@@ -258,14 +542,20 @@ def run_pipeline(
             # I'll update it to match current run args if provided.
             if governance_profile:
                 manifest["governance_profile"] = governance_profile
+            if tenant_id and "tenant_id" not in manifest:
+                manifest["tenant_id"] = tenant_id
             
-            write_manifest(Path(run_dir), manifest)
+            write_manifest(Path(run_dir), manifest, run_log)
         else:
             # Fresh run: create new state and directory
             system_state = get_initial_state()
-            run_id = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-            run_dir = os.path.join(OUTPUTS_DIR, run_id)
+            if run_dir is None:
+                run_id = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+                run_dir = os.path.join(OUTPUTS_DIR, run_id)
+            else:
+                run_id = Path(run_dir).name
             os.makedirs(run_dir, exist_ok=True)
+            run_log = open_run_log(run_dir, log_settings)
             
             # Initialize manifest
             manifest = {
@@ -284,30 +574,51 @@ def run_pipeline(
                 "governance_profile": governance_profile,
                 "risk_auto_override_default": config.get("approval", {}).get("risk_gate_escalation", {}).get("auto_override", True),
                 "approval_config": {
-                    "risk_gate_escalation": config.get("approval", {}).get("risk_gate_escalation", {})
+                    "risk_gate_escalation": thaw(config.get("approval", {}).get("risk_gate_escalation", {}))
                 }
             }
+            if tenant_id:
+                manifest["tenant_id"] = tenant_id
         
+        if run_log is not None:
+            scope.callback(run_log.close)
+
         # Ensure checkpoints directory exists
         checkpoints_dir = ensure_run_dirs(Path(run_dir))
-        write_manifest(Path(run_dir), manifest)
+        write_run_plan(Path(run_dir), plan)
+        manifest["plan_hash"] = plan.plan_hash
+        write_manifest(Path(run_dir), manifest, run_log)
 
-        write_ledger({
+        log_event({
             "timestamp_utc": utc_now(),
             "event": "run_started" if start_step == 1 else "run_resumed",
             "run_dir": run_dir,
             "start_step": start_step,
+            **({"tenant_id": manifest["tenant_id"]} if manifest.get("tenant_id") else {}),
         })
 
         # ----------------------------------------------------------------------
         # Approval Configuration (from config file)
         # ----------------------------------------------------------------------
 
-        approval_cfg = config.get("approval", {})
-        gate_strategy = (approval_cfg.get("gate_strategy", "per_phase") or "per_phase").strip().lower()
-        approval_token = approval_cfg.get("require_approval_token", "APPROVE")
-
-        phase_gates = load_phase_gates(approval_cfg, gate_strategy)
+        approval_cfg = plan.approval
+        gate_strategy = plan.gate_strategy
+        approval_token = plan.approval_token
+
+        # Approval backend: blocking stdin prompt, or a persistent queue the run parks on
+        approval_backend = resolve_approval_backend(approval_cfg)
+        approval_queue = None
+        if approval_backend == "queue":
+            approval_queue = ApprovalQueue(approval_cfg.get("queue_path") or DEFAULT_QUEUE_PATH)
+        resume_context = {
+            "config_path": config_path,
+            "config_overrides": config_overrides,
+            "governance_profile": governance_profile,
+            "max_step": max_step,
+            "inputs_dir": inputs_dir,
+            "provider_env": plan.provider_env,
+            "service_job": service_job,
+        }
 
         # Risk Escalation Configuration
         risk_cfg = approval_cfg.get("risk_gate_escalation", {})
@@ -319,18 +630,247 @@ def run_pipeline(
         # Validation Configuration (from config file)
         # ----------------------------------------------------------------------
 
-        validation_cfg = config.get("validation", {})
-        min_deliverable_chars = validation_cfg.get("min_deliverable_chars", 300)
-        placeholder_markers = validation_cfg.get("placeholder_markers", [
-            "[Missing", "[Pending", "TODO", "TBD", "PLACEHOLDER", "template"
-        ])
-        retry_once_on_parse_error = validation_cfg.get("retry_once_on_parse_error", False)
+        validation_config = plan.validation_config()
+        retry_once_on_parse_error = plan.retry_once_on_parse_error
+
+        # Prompt layout (legacy single message or cache-friendly static prefix)
+        prompt_layout = plan.prompt_layout
+        manifest["prompt_layout"] = prompt_layout
+
+        # Active knowledge pack version; the chunk IDs each step saw are added per step
+        if pack_retriever is not None:
+            pack = pack_retriever.pack
+            previous = manifest.get("knowledge_pack") or {}
+            if previous.get("manifest_hash") not in (None, pack.manifest_hash):
+                print(f"⚠️  Knowledge pack changed since the last session: {previous.get('pack_version')} -> {pack.version}")
+            manifest["knowledge_pack"] = {
+                "pack_version": pack.version,
+                "manifest_hash": pack.manifest_hash,
+                "chunk_ids_by_step": previous.get("chunk_ids_by_step", {}),
+            }
+
+        # Provider cassette: record every call into the run directory, or
+        # replay a recorded run without calling any provider
+        cassette_mode, cassette_path, cassette_match = cassette_settings(config)
+        cassette = None
+        cassette_player = None
+        if cassette_mode == "record":
+            cassette = Cassette.load(
+                resolve_cassette_path(cassette_path) if cassette_path else Path(run_dir) / CASSETTE_FILENAME
+            )
+            manifest["cassette"] = {"mode": "record", "path": str(cassette.path)}
+        elif cassette_mode == "replay":
+            cassette_player = CassettePlayer(
+                Cassette.load(resolve_cassette_path(cassette_path), must_exist=True), cassette_match
+            )
+            manifest["cassette"] = {
+                "mode": "replay",
+                "path": str(cassette_player.cassette.path),
+                "match": cassette_match,
+            }
+
+        # Speculative execution of the steps after a pending human gate
+        # (not used with a provider_override, e.g. batch mode, a parking
+        # approval queue, or a cassette, whose call order must match the run)
+        speculation_enabled, speculation_max_steps = speculation_settings(config)
+        speculation_enabled = (
+            speculation_enabled and provider_override is None and approval_queue is None and cassette_mode == "off"
+        )
+        staged_results = {}
+
+        # Provider instances are built on first use and reused by later steps
+        provider_pool = ProviderPool(get_provider)
+
+        # Usage accounting: every provider call is recorded (tokens, latency,
+        # cost from the config price table) and checked against the budgets
+        prices = price_table(config)
+        budget = budget_settings(config)
+        meter = run_meter(budget, manifest.get("usage_totals"), parent=usage_meter)
+        step_calls: Dict[int, List[Dict[str, Any]]] = {}
+
+        # Deadlines: the run deadline starts now (a resumed run gets a fresh one);
+        # each step's deadline starts with the step. Both cap provider requests.
+        deadlines = deadline_settings(config)
+        control = scope.enter_context(run_control(RunControl(
+            run_deadline=Deadline(deadlines.run_seconds, "Run"),
+            cancel_check=cancel_check,
+            request_timeout_seconds=deadlines.request_timeout_seconds,
+        )))
+
+        def count_artifact(written: bool) -> None:
+            if artifact_store is not None and run_log is None:
+                tally = manifest.setdefault("artifact_store", {"blobs_written": 0, "deduplicated": 0})
+                tally["blobs_written" if written else "deduplicated"] += 1
+
+        def check_owner() -> None:
+            """
+            Poll cancel_check for a fence only: RunFencedError stops the run before
+            it writes run state the new owner may be writing; a cancellation waits
+            for the step to complete.
+            """
+            if cancel_check is not None:
+                cancel_check()
+
+        def save_artifact(rel_path: str, data: str) -> None:
+            """Write a run artifact (plain file, pointer into the artifact store, or run log record)."""
+            check_owner()
+            if run_log is not None:
+                run_log.write_file(rel_path, data)
+            else:
+                count_artifact(write_run_file(run_dir, rel_path, data, artifact_store))
+
+        def budget_overrun(prompt_chars: int, provider_name: str, model: Optional[str]) -> Optional[str]:
+            """Why a call with this prompt would cross a budget (None if it fits)."""
+            estimate = estimated_usage(prompt_chars, budget.reserve_completion_tokens)
+            cost = usage_cost(estimate, prices.price_for(provider_name, model))
+            return meter.exceeded_by(estimate["total_tokens"], cost)
+
+        def build_provider(agent_cfg: Mapping[str, Any], tier: Mapping[str, Any], step_idx: int) -> BaseProvider:
+            if cassette_player is not None:
+                return cassette_player.provider_for(step_idx, agent_cfg["name"])
+            if provider_override is not None:
+                provider = provider_override
+            else:
+                provider = provider_pool.get(
+                    tier["provider"], tier["model"], singleflight=singleflight_enabled(config, agent_cfg)
+                )
+            if cassette is not None:
+                provider = RecordingProvider(
+                    provider, cassette, step_idx, agent_cfg["name"], tier["provider"], model=tier["model"]
+                )
+            return provider
+
+        def singleflight_of(provider: BaseProvider) -> Optional[SingleFlightProvider]:
+            inner = provider.inner if isinstance(provider, RecordingProvider) else provider
+            return inner if isinstance(inner, SingleFlightProvider) else None
+
+        # Prompt-size trace for steps that receive a state digest, the input
+        # chunks retrieved per step (recorded in the step state file) and the
+        # knowledge pack chunks per step (recorded in the manifest)
+        digest_traces: Dict[int, Dict[str, Any]] = {}
+        retrieval_traces: Dict[int, Dict[str, Any]] = {}
+        knowledge_chunks: Dict[int, List[str]] = {}
+
+        def step_caller(
+            provider: BaseProvider,
+            step: StepPlan,
+            state: dict,
+            tier: Mapping[str, Any],
+            expand: List[str] = (),
+            can_expand: bool = True,
+            record: Callable[[Callable[[], None]], bool] = None,
+            full_state: bool = False,
+        ) -> Callable[..., str]:
+            """
+            Render the step's prompt for ``state`` and return the metered provider call.
+            ``record`` (speculative steps) guards recording the call's usage on the run;
+            ``full_state`` sends the (pruned) state instead of the step's digest.
+            """
+            state_text = None
+            if step.digest is not None and not full_state:
+                state_text = render_digest(build_state_digest(state, step.digest, expand, can_expand=can_expand))
+            brief_text, notes_text = business_brief, sme_notes
+            if retriever is not None and step.retrieval is not None:
+                inputs, retrieval_trace = retriever.retrieve(step.name, state, step.retrieval)
+                if retrieval_trace is not None:
+                    brief_text, notes_text = inputs["business_brief"], inputs["sme_notes"]
+                    retrieval_traces[step.step_idx] = retrieval_trace
+            knowledge_text = None
+            if pack_retriever is not None and step.knowledge is not None:
+                knowledge_text, knowledge_chunks[step.step_idx] = pack_retriever.retrieve(step.name, state, step.knowledge)
+            if prompt_layout == "cache_friendly":
+                messages = render_prompt_messages(
+                    step.template, step.name, brief_text, notes_text, state, state_text, knowledge_text
+                )
+                prompt_chars = sum(len(m["content"]) for m in messages)
+                send = lambda: provider.run_messages(messages)
+            else:
+                prompt = render_prompt(
+                    step.template, step.name, brief_text, notes_text, state, state_text, knowledge_text
+                )
+                prompt_chars = len(prompt)
+                send = lambda: provider.run(prompt)
+            if state_text is not None:
+                full_chars = len(json.dumps(prune_system_state(state, step.name), indent=2))
+                digest_chars = len(state_text)
+                full_prompt_chars = prompt_chars + (full_chars - digest_chars) * step.template.count("{system_state}")
+                digest_traces[step.step_idx] = {
+                    "state_tokens_full": tokens_for_chars(full_chars),
+                    "state_tokens_digest": tokens_for_chars(digest_chars),
+                    "prompt_tokens_full": tokens_for_chars(full_prompt_chars),
+                    "prompt_tokens_digest": tokens_for_chars(prompt_chars),
+                    "reduction_pct": round(100 * (1 - prompt_chars / full_prompt_chars), 1) if full_prompt_chars else 0.0,
+                    "expanded": list(expand),
+                }
+
+            # A cassette replay spends nothing: not checked against or charged to any budget
+            replayed = cassette_player is not None
+
+            def call(kind: str = "request") -> str:
+                check_run_control()
+                reason = None if replayed else budget_overrun(
+                    prompt_chars, tier["provider"], getattr(provider, "model", None) or tier["model"]
+                )
+                if reason:
+                    raise BudgetExceededError(f"Step {step.step_idx} ({step.name}): {reason}")
+                started = time.monotonic()
+                response = send()
+                latency_ms = int((time.monotonic() - started) * 1000)
+                check_owner()  # the lease may have been lost while the request was in flight
+                usage = getattr(provider, "last_usage", None)
+                sf_provider = singleflight_of(provider)
+                if sf_provider is not None and sf_provider.last_shared:
+                    # Served from another run's in-flight call: nothing was spent
+                    kind, usage = "shared", dict.fromkeys(("prompt_tokens", "completion_tokens", "total_tokens"), 0)
+                call_usage = call_record(
+                    kind, tier["provider"], getattr(provider, "model", None) or tier["model"],
+                    usage if isinstance(usage, dict) else None, latency_ms, prices,
+                    prompt_chars=prompt_chars, response_chars=len(response),
+                    requests=getattr(provider, "last_requests", None), replayed=replayed,
+                )
+
+                def charge() -> None:
+                    step_calls.setdefault(step.step_idx, []).append(call_usage)
+                    if not replayed:
+                        meter.charge(call_usage["total_tokens"], call_usage["cost_usd"])
+
+                if record is None:
+                    charge()
+                elif not record(charge):
+                    raise RunCancelledError(f"Speculative step {step.step_idx} discarded")
+                # A late response does not complete the step; a cancellation waits for the step
+                control.check_deadlines()
+                return response
+
+            call.prompt_chars = prompt_chars
+            return call
+
+        def speculative_step(
+            step_idx: int, agent_cfg: Mapping[str, Any], state: dict, record: Callable[[Callable[[], None]], bool]
+        ) -> Dict[str, Any]:
+            """Run a step's first tier for speculation; any failure raises."""
+            step = plan.steps[step_idx - 1]
+            tiers = step.tiers
+            provider = build_provider(agent_cfg, tiers[0], step_idx)
+            parsed = parse_json_object(step_caller(provider, step, state, tiers[0], record=record)())
+            validate_agent_output(agent_cfg["name"], parsed, validation_config)
+            quality_errors = run_quality_checks(agent_cfg, parsed["deliverable_markdown"])
+            if quality_errors and len(tiers) > 1:
+                raise ValueError(f"quality checks failed: {'; '.join(quality_errors)}")
+            usage = getattr(provider, "last_usage", None)
+            return {
+                "parsed": parsed,
+                "provider": provider,
+                "provider_name": tiers[0]["provider"],
+                "usage": usage if isinstance(usage, dict) else None,
+            }
 
         # ----------------------------------------------------------------------
         # Execute Agents (config-driven)
         # ----------------------------------------------------------------------
 
-        for step_idx, agent_cfg in enumerate(config["agents"], start=1):
+        for step in plan.steps:
+            step_idx, agent_cfg = step.step_idx, step.agent
             # Skip steps before start_step (for resume)
             if step_idx < start_step:
                 continue
@@ -346,7 +886,7 @@ def run_pipeline(
             
             if max_step is not None and step_idx > max_step:
                 print(f"\n🛑 Reached max_step ({max_step}) - Stopping early.")
-                write_ledger({
+                log_event({
                     "timestamp_utc": utc_now(),
                     "event": "run_stopped_early",
                     "max_step": max_step,
@@ -356,197 +896,266 @@ def run_pipeline(
                 })
                 break
 
-            agent_name = agent_cfg["name"]
-            prompt_path = agent_cfg["prompt_path"]
-
-            # ------------------------------------------------------------------
-            # Provider Selection (per-agent)
-            # ------------------------------------------------------------------
-            
-            # When run_pipeline.py sets PROVIDER env var (via --dry_run or --mode),
-            # it should override ALL agents, including per-agent overrides.
-            # Otherwise, per-agent overrides take precedence.
-            env_provider = os.getenv("PROVIDER")
-            
-            # If env var is set, use it for all agents (--dry_run or --mode flag)
-            # Otherwise, respect per-agent overrides, then config default
-            if env_provider:
-                provider_name = env_provider
-            else:
-                provider_name = (
-                    agent_cfg.get("provider") or  # Per-agent override
-                    config.get("provider")         # Config default
-                )
-            
-            provider = get_provider(provider_name)
-            
-            # Diagnostic logging
-            print(f"[Provider] step={step_idx} agent={agent_name} provider={provider_name}")
-            print(f"\n▶ Running Step {step_idx}: {agent_name}")
-
-            # Validate prompt file exists
-            if not os.path.exists(prompt_path):
-                raise FileNotFoundError(
-                    f"Missing prompt file for {agent_name}: {prompt_path}"
-                )
-
-            prompt_template = load_text(prompt_path)
-
-            # Use simple string replacement instead of .format() to avoid conflicts
-            # with JSON braces in prompt templates (which contain JSON examples)
-            # Prune and dump system state
-            pruned_state = prune_system_state(system_state, agent_name)
-            system_state_json = json.dumps(pruned_state, indent=2)
-            
-            prompt = prompt_template
-            prompt = prompt.replace("{business_brief}", business_brief)
-            prompt = prompt.replace("{sme_notes}", sme_notes)
-            prompt = prompt.replace("{system_state}", system_state_json)
-
-            # For the assessment designer, inject a pre-computed flat objective list
-            # so the LLM cannot truncate or skip later modules.
-            if agent_name == "assessment_designer_agent":
-                modules = system_state.get("curriculum", {}).get("modules", [])
-                obj_rows = []
-                for mod in modules:
-                    mid = mod.get("module_id", "?")
-                    for obj in mod.get("objectives", []):
-                        obj_rows.append(f"| {len(obj_rows)+1} | {mid} | {obj} |")
-                obj_table = (
-                    "## PRE-COMPUTED OBJECTIVE LIST (AUTHORITATIVE — DO NOT DEVIATE)\n"
-                    f"Total objectives: {len(obj_rows)}\n"
-                    "| # | module_id | objective_text |\n"
-                    "|---|---|---|\n"
-                    + "\n".join(obj_rows)
-                    + f"\n\nYou MUST generate EXACTLY {len(obj_rows)} questions, one per row above, in order.\n"
-                    "Each question's objective_ref MUST exactly match the objective_text column.\n"
-                )
-                prompt = obj_table + "\n\n" + prompt
+            if cancel_check is not None and cancel_check():
+                raise RunCancelledError(f"Run cancelled before step {step_idx}")
 
+            agent_name = step.name
+            control.start_step(
+                f"Step {step_idx} ({agent_name})", agent_cfg.get("deadline_seconds") or deadlines.step_seconds
+            )
+            control.check()
 
-            response = provider.run(prompt)
+            # Provider selection and template were resolved in the run plan
+            provider_name, tiers = step.provider_name, step.tiers
 
-            # ------------------------------------------------------------------
-            # Validation
-            # ------------------------------------------------------------------
+            print(f"\n▶ Running Step {step_idx}: {agent_name}")
 
-            # Parse JSON response with robust extraction
-            parsed = None
-            parse_error = None
-            
-            try:
-                parsed = parse_json_object(response)
-            except Exception as e:
-                parse_error = e
-                
-                # Retry logic: only for parse errors, only once
-                if retry_once_on_parse_error and "PARSE_ERROR" in str(e):
-                    print(f"⚠️  Parse failed, retrying {agent_name} once...")
-                    write_ledger({
+            step_usage = None
+            escalations = []
+            staged = staged_results.pop(step_idx, None)
+
+            if staged is not None:
+                # Result produced speculatively while the previous gate was open
+                print(f"[Speculative] step={step_idx} agent={agent_name} using staged result")
+                parsed = staged["parsed"]
+                provider = staged["provider"]
+                provider_name = staged["provider_name"]
+                tier_idx, tier = 1, tiers[0]
+                step_usage = staged["usage"]
+            else:
+                def escalate(tier_idx: int, reason: str, error: str) -> None:
+                    print(f"⚠️  {agent_name} tier {tier_idx} failed ({reason}); escalating to tier {tier_idx + 1}")
+                    escalations.append({"tier": tier_idx, "reason": reason})
+                    log_event({
                         "timestamp_utc": utc_now(),
-                        "event": "parse_retry",
+                        "event": "model_escalated",
                         "step_idx": step_idx,
                         "agent": agent_name,
-                        "error": str(e)[:200],
+                        "from_tier": tier_idx,
+                        "to_tier": tier_idx + 1,
+                        "from_model": tiers[tier_idx - 1]["model"],
+                        "to_model": tiers[tier_idx]["model"],
+                        "reason": reason,
+                        "error": error[:200],
+                        "run_id": run_id,
                     })
-                    
-                    # Retry the provider call
-                    response = provider.run(prompt)
-                    
+
+                for tier_idx, tier in enumerate(tiers, start=1):
+                    is_last_tier = tier_idx == len(tiers)
+                    provider_name = tier["provider"]
+
+                    provider = build_provider(agent_cfg, tier, step_idx)
+                    call_provider = step_caller(provider, step, system_state, tier)
+
+                    def record_usage() -> None:
+                        nonlocal step_usage
+                        usage = getattr(provider, "last_usage", None)
+                        if isinstance(usage, dict):
+                            step_usage = add_usage(step_usage, usage)
+
+                    # Diagnostic logging
+                    tier_label = f" tier={tier_idx}/{len(tiers)} model={tier['model']}" if len(tiers) > 1 else ""
+                    print(f"[Provider] step={step_idx} agent={agent_name} provider={provider_name}{tier_label}")
+
+                    response = call_provider()
+                    record_usage()
+
+                    # A digest-fed agent may ask for sections in full before answering
+                    expanded, expansions = [], 0
+                    while step.digest is not None and expansions < step.digest.max_expansions:
+                        requested = requested_sections(response, system_state, expanded)
+                        if not requested:
+                            break
+                        expanded.extend(requested)
+                        expansions += 1
+                        print(f"[Digest] step={step_idx} agent={agent_name} expanding {', '.join(requested)}")
+                        log_event({
+                            "timestamp_utc": utc_now(),
+                            "event": "state_digest_expanded",
+                            "step_idx": step_idx,
+                            "agent": agent_name,
+                            "sections": requested,
+                            "run_id": run_id,
+                        })
+                        call_provider = step_caller(
+                            provider, step, system_state, tier, expanded,
+                            can_expand=expansions < step.digest.max_expansions,
+                        )
+                        response = call_provider("expansion")
+                        record_usage()
+
+                    # Still asking with no expansion left: final attempt with the full state
+                    if step.digest is not None and expansion_requested(response):
+                        print(f"[Digest] step={step_idx} agent={agent_name} expansions used up, sending full state")
+                        log_event({
+                            "timestamp_utc": utc_now(),
+                            "event": "state_digest_full_state",
+                            "step_idx": step_idx,
+                            "agent": agent_name,
+                            "expanded": list(expanded),
+                            "run_id": run_id,
+                        })
+                        call_provider = step_caller(provider, step, system_state, tier, full_state=True)
+                        response = call_provider("expansion")
+                        record_usage()
+                        digest_traces[step_idx]["full_state"] = True
+
+                    sf_provider = singleflight_of(provider)
+                    if sf_provider is not None and sf_provider.last_shared:
+                        print(f"[SingleFlight] step={step_idx} agent={agent_name} shared in-flight result")
+
+                    # Budget downgrade: stay on this (cheaper) tier when the next cannot be afforded
+                    if not is_last_tier and budget.on_exceed == "downgrade":
+                        next_tier = tiers[tier_idx]
+                        reason = budget_overrun(call_provider.prompt_chars, next_tier["provider"], next_tier["model"])
+                        if reason:
+                            is_last_tier = True
+                            print(f"[Budget] step={step_idx} agent={agent_name} staying on tier {tier_idx}: {reason}")
+                            manifest.setdefault("budget_downgrades", []).append({"step_idx": step_idx, "tier": tier_idx})
+                            log_event({
+                                "timestamp_utc": utc_now(),
+                                "event": "budget_downgrade",
+                                "step_idx": step_idx,
+                                "agent": agent_name,
+                                "tier": tier_idx,
+                                "skipped_model": next_tier["model"],
+                                "reason": reason,
+                                "run_id": run_id,
+                            })
+
+                    # ------------------------------------------------------------------
+                    # Validation
+                    # ------------------------------------------------------------------
+
+                    # Parse JSON response with robust extraction
+                    parsed = None
+                    parse_error = None
+            
                     try:
                         parsed = parse_json_object(response)
-                        parse_error = None  # Success on retry
-                        print(f"✅ Retry successful for {agent_name}")
-                    except Exception as retry_error:
-                        parse_error = retry_error
+                    except Exception as e:
+                        parse_error = e
+                
+                        # Retry logic: only for parse errors, only once
+                        if retry_once_on_parse_error and "PARSE_ERROR" in str(e):
+                            print(f"⚠️  Parse failed, retrying {agent_name} once...")
+                            log_event({
+                                "timestamp_utc": utc_now(),
+                                "event": "parse_retry",
+                                "step_idx": step_idx,
+                                "agent": agent_name,
+                                "error": str(e)[:200],
+                            })
+                    
+                            # Retry the provider call
+                            response = call_provider("parse_retry")
+                            record_usage()
+                    
+                            try:
+                                parsed = parse_json_object(response)
+                                parse_error = None  # Success on retry
+                                print(f"✅ Retry successful for {agent_name}")
+                            except Exception as retry_error:
+                                parse_error = retry_error
             
-            # If parsing still failed, stop immediately
-            if parse_error:
-                error_category = "PARSE_ERROR" if "PARSE_ERROR" in str(parse_error) else "VALIDATION_ERROR"
-                error_snippet = response[:300] if len(response) > 300 else response
+                    # Escalate to the next tier, or stop immediately on the last one
+                    if parse_error and not is_last_tier:
+                        escalate(tier_idx, "parse_error", str(parse_error))
+                        continue
+                    if parse_error:
+                        error_category = "PARSE_ERROR" if "PARSE_ERROR" in str(parse_error) else "VALIDATION_ERROR"
+                        error_snippet = response[:300] if len(response) > 300 else response
                 
-                # Write error file
-                error_file = os.path.join(run_dir, f"{step_idx:02d}_{agent_name}_error.txt")
-                with open(error_file, "w") as f:
-                    f.write(f"Error Category: {error_category}\n")
-                    f.write(f"Step: {step_idx}\n")
-                    f.write(f"Agent: {agent_name}\n")
-                    f.write(f"Provider: {provider_name}\n")
-                    f.write(f"\nError Message:\n{str(parse_error)}\n")
-                    f.write(f"\nRaw Response (first 1000 chars):\n{response[:1000]}\n")
+                        # Write error file
+                        error_file = os.path.join(run_dir, f"{step_idx:02d}_{agent_name}_error.txt")
+                        with open(error_file, "w") as f:
+                            f.write(f"Error Category: {error_category}\n")
+                            f.write(f"Step: {step_idx}\n")
+                            f.write(f"Agent: {agent_name}\n")
+                            f.write(f"Provider: {provider_name}\n")
+                            f.write(f"\nError Message:\n{str(parse_error)}\n")
+                            f.write(f"\nRaw Response (first 1000 chars):\n{response[:1000]}\n")
                 
-                # Console error
-                print(f"\n❌ PIPELINE FAILURE")
-                print(f"Step: {step_idx}")
-                print(f"Agent: {agent_name}")
-                print(f"Provider: {provider_name}")
-                print(f"Category: {error_category}")
-                print(f"Error: {str(parse_error)}")
-                print(f"\nResponse snippet (first 300 chars):\n{error_snippet}...")
-                print(f"\nFull error details saved to: {error_file}")
+                        # Console error
+                        print(f"\n❌ PIPELINE FAILURE")
+                        print(f"Step: {step_idx}")
+                        print(f"Agent: {agent_name}")
+                        print(f"Provider: {provider_name}")
+                        print(f"Category: {error_category}")
+                        print(f"Error: {str(parse_error)}")
+                        print(f"\nResponse snippet (first 300 chars):\n{error_snippet}...")
+                        print(f"\nFull error details saved to: {error_file}")
                 
-                # Ledger entry
-                write_ledger({
-                    "timestamp_utc": utc_now(),
-                    "event": "run_failed",
-                    "reason": error_category.lower(),
-                    "step_idx": step_idx,
-                    "agent": agent_name,
-                    "provider": provider_name,
-                    "error": str(parse_error)[:500],
-                    "error_file": error_file,
-                    "run_id": run_id,
-                    "run_dir": run_dir,
-                })
+                        # Ledger entry
+                        log_event({
+                            "timestamp_utc": utc_now(),
+                            "event": "run_failed",
+                            "reason": error_category.lower(),
+                            "step_idx": step_idx,
+                            "agent": agent_name,
+                            "provider": provider_name,
+                            "error": str(parse_error)[:500],
+                            "error_file": error_file,
+                            "run_id": run_id,
+                            "run_dir": run_dir,
+                        })
                 
-                raise ValidationError(f"{error_category}: {str(parse_error)}")
-            
-            # Validate using config-driven validation settings
-            validation_config = ValidationConfig(
-                min_deliverable_chars=min_deliverable_chars,
-                placeholder_markers=placeholder_markers
-            )
+                        raise ValidationError(f"{error_category}: {str(parse_error)}")
             
-            try:
-                validate_agent_output(agent_name, parsed, validation_config)
-            except Exception as val_error:
-                # Validation failure (not parse error)
-                error_snippet = response[:300] if len(response) > 300 else response
+                    # Validate using config-driven validation settings
+                    try:
+                        validate_agent_output(agent_name, parsed, validation_config)
+                    except Exception as val_error:
+                        if not is_last_tier:
+                            escalate(tier_idx, "validation_error", str(val_error))
+                            continue
+
+                        # Validation failure (not parse error)
+                        error_snippet = response[:300] if len(response) > 300 else response
                 
-                # Write error file
-                error_file = os.path.join(run_dir, f"{step_idx:02d}_{agent_name}_error.txt")
-                with open(error_file, "w") as f:
-                    f.write(f"Error Category: VALIDATION_ERROR\n")
-                    f.write(f"Step: {step_idx}\n")
-                    f.write(f"Agent: {agent_name}\n")
-                    f.write(f"Provider: {provider_name}\n")
-                    f.write(f"\nError Message:\n{str(val_error)}\n")
-                    f.write(f"\nParsed Output:\n{json.dumps(parsed, indent=2)}\n")
+                        # Write error file
+                        error_file = os.path.join(run_dir, f"{step_idx:02d}_{agent_name}_error.txt")
+                        with open(error_file, "w") as f:
+                            f.write(f"Error Category: VALIDATION_ERROR\n")
+                            f.write(f"Step: {step_idx}\n")
+                            f.write(f"Agent: {agent_name}\n")
+                            f.write(f"Provider: {provider_name}\n")
+                            f.write(f"\nError Message:\n{str(val_error)}\n")
+                            f.write(f"\nParsed Output:\n{json.dumps(parsed, indent=2)}\n")
                 
-                # Console error
-                print(f"\n❌ PIPELINE FAILURE")
-                print(f"Step: {step_idx}")
-                print(f"Agent: {agent_name}")
-                print(f"Provider: {provider_name}")
-                print(f"Category: VALIDATION_ERROR")
-                print(f"Error: {str(val_error)}")
-                print(f"\nFull error details saved to: {error_file}")
+                        # Console error
+                        print(f"\n❌ PIPELINE FAILURE")
+                        print(f"Step: {step_idx}")
+                        print(f"Agent: {agent_name}")
+                        print(f"Provider: {provider_name}")
+                        print(f"Category: VALIDATION_ERROR")
+                        print(f"Error: {str(val_error)}")
+                        print(f"\nFull error details saved to: {error_file}")
                 
-                # Ledger entry
-                write_ledger({
-                    "timestamp_utc": utc_now(),
-                    "event": "run_failed",
-                    "reason": "validation_error",
-                    "step_idx": step_idx,
-                    "agent": agent_name,
-                    "provider": provider_name,
-                    "error": str(val_error)[:500],
-                    "error_file": error_file,
-                    "run_id": run_id,
-                    "run_dir": run_dir,
-                })
+                        # Ledger entry
+                        log_event({
+                            "timestamp_utc": utc_now(),
+                            "event": "run_failed",
+                            "reason": "validation_error",
+                            "step_idx": step_idx,
+                            "agent": agent_name,
+                            "provider": provider_name,
+                            "error": str(val_error)[:500],
+                            "error_file": error_file,
+                            "run_id": run_id,
+                            "run_dir": run_dir,
+                        })
                 
-                raise ValidationError(f"VALIDATION_ERROR: {str(val_error)}")
+                        raise ValidationError(f"VALIDATION_ERROR: {str(val_error)}")
+
+                    # Cascade quality checks: escalate, or accept with a warning on the last tier
+                    quality_errors = run_quality_checks(agent_cfg, parsed["deliverable_markdown"])
+                    if quality_errors and not is_last_tier:
+                        escalate(tier_idx, "quality_check", "; ".join(quality_errors))
+                        continue
+                    if quality_errors:
+                        print(f"⚠️  {agent_name} quality checks failed on final tier (accepted): {'; '.join(quality_errors)}")
+                    break
 
             deliverable = parsed["deliverable_markdown"]
             updated_state = parsed["updated_state"]
@@ -556,14 +1165,15 @@ def run_pipeline(
             # Save Outputs
             # ------------------------------------------------------------------
 
-            md_path = os.path.join(run_dir, f"{step_idx:02d}_{agent_name}.md")
-            state_path = os.path.join(run_dir, f"{step_idx:02d}_{agent_name}_state.json")
-
-            with open(md_path, "w") as f:
-                f.write(deliverable)
-
-            with open(state_path, "w") as f:
-                json.dump(parsed, f, indent=2)
+            retrieval_trace = retrieval_traces.pop(step_idx, None)
+            step_output = {**parsed, "retrieval": retrieval_trace} if retrieval_trace else parsed
+            save_artifact(f"{step_idx:02d}_{agent_name}.md", deliverable)
+            save_artifact(f"{step_idx:02d}_{agent_name}_state.json", json.dumps(step_output, indent=2))
+            if retrieval_trace:
+                print("[Retrieval] step={} agent={} {}".format(step_idx, agent_name, " ".join(
+                    f"{source}={len(t['chunk_ids'])}/{t['chunks_total']} chunks ~{t['tokens']} tokens "
+                    f"(full ~{t['full_tokens']})" for source, t in retrieval_trace.items()
+                )))
 
             # ------------------------------------------------------------------
             # Merge State
@@ -575,21 +1185,60 @@ def run_pipeline(
             # Write Checkpoint and Update Manifest
             # ------------------------------------------------------------------
             
-            write_checkpoint(checkpoints_dir, step_idx, system_state)
+            check_owner()
+            count_artifact(write_checkpoint(checkpoints_dir, step_idx, system_state, store=artifact_store, run_log=run_log))
             manifest["current_step_completed"] = step_idx
             manifest["providers_used_by_step"][str(step_idx)] = provider_name
-            write_manifest(Path(run_dir), manifest)
+            sf_provider = singleflight_of(provider)
+            if sf_provider is not None:
+                sf = manifest.setdefault("singleflight", {"dedup_hits": 0, "steps": {}})
+                sf["steps"][str(step_idx)] = {
+                    "key": sf_provider.last_key[:16],
+                    "shared": sf_provider.last_shared,
+                }
+                sf["dedup_hits"] += int(sf_provider.last_shared)
+            if agent_cfg.get("model_cascade") and provider_override is None:
+                manifest.setdefault("model_tier_by_step", {})[str(step_idx)] = {
+                    "tier": tier_idx,
+                    "provider": provider_name,
+                    "model": getattr(provider, "model", None) or tier["model"],
+                    "escalations": escalations,
+                }
+            if staged is not None:
+                manifest.setdefault("speculative_steps", []).append(step_idx)
+            pack_chunks = knowledge_chunks.pop(step_idx, None)
+            if pack_chunks is not None:
+                manifest["knowledge_pack"]["chunk_ids_by_step"][str(step_idx)] = pack_chunks
+                print(f"[Knowledge] step={step_idx} agent={agent_name} pack_chunks={len(pack_chunks)}")
+            digest_trace = digest_traces.pop(step_idx, None)
+            if digest_trace is not None:
+                manifest.setdefault("state_digest_by_step", {})[str(step_idx)] = digest_trace
+                print(
+                    f"[Digest] step={step_idx} agent={agent_name} prompt_tokens~{digest_trace['prompt_tokens_digest']} "
+                    f"(full state ~{digest_trace['prompt_tokens_full']}, -{digest_trace['reduction_pct']}%)"
+                )
+            usage = step_usage
+            if isinstance(usage, dict):
+                manifest.setdefault("usage_by_step", {})[str(step_idx)] = usage
+                print(
+                    f"[Usage] step={step_idx} prompt_tokens={usage.get('prompt_tokens', 0)} "
+                    f"cached_tokens={usage.get('cached_tokens', 0)} completion_tokens={usage.get('completion_tokens', 0)}"
+                )
+            totals = update_usage_manifest(manifest, step_calls, budget, step_idx=step_idx)
+            step_cost = sum(c["cost_usd"] or 0.0 for c in manifest["usage_calls_by_step"].get(str(step_idx), []))
+            print(
+                f"[Cost] step={step_idx} cost_usd={step_cost:.4f} run_tokens={totals['total_tokens']} "
+                f"run_cost_usd={totals['cost_usd']:.4f}"
+            )
+            check_owner()
+            write_manifest(Path(run_dir), manifest, run_log)
+            control.end_step()  # time at an approval gate is not step time
 
             # ------------------------------------------------------------------
             # Approval Gate Logic
             # ------------------------------------------------------------------
 
-            should_gate = False
-
-            if gate_strategy == "per_phase":
-                should_gate = step_idx in phase_gates
-            elif gate_strategy == "per_agent":
-                should_gate = agent_cfg.get("gate", False)
+            should_gate = step.gated
 
             gate_type = "phase_gate"
             gate_reason = "routine_check"
@@ -606,38 +1255,86 @@ def run_pipeline(
                 if gate_type == "risk_gate":
                     risk_metadata["risk_auto_override"] = risk_cfg.get("auto_override", True)
 
-                approval_gate(
-                    step_idx=step_idx,
-                    agent_name=agent_name,
-                    gate_strategy=gate_strategy,
-                    run_id=run_id,
-                    run_dir=run_dir,
-                    write_ledger_fn=write_ledger,
-                    utc_now_fn=utc_now,
-                    approval_token=approval_token,
-                    gate_type=gate_type,
-                    gate_reason=gate_reason,
-                    risk_metadata=risk_metadata,
-                )
+                # Speculatively run the following steps while a human decides
+                speculation = None
+                if speculation_enabled and gate_requires_human(gate_type, risk_metadata):
+                    next_steps = []
+                    for next_step in plan.steps[step_idx:]:
+                        if len(next_steps) >= speculation_max_steps:
+                            break
+                        if max_step is not None and next_step.step_idx > max_step:
+                            break
+                        next_steps.append((next_step.step_idx, next_step.agent))
+                        # Stop after the next gated step; its own gate runs after commit
+                        if next_step.gated:
+                            break
+                    if next_steps:
+                        print(f"[Speculative] running step(s) {[i for i, _ in next_steps]} while gate {step_idx} is open")
+                        speculation = SpeculativeRun(
+                            run_dir, step_idx, next_steps, system_state, speculative_step, deep_merge
+                        ).start()
+
+                try:
+                    approval_gate(
+                        step_idx=step_idx,
+                        agent_name=agent_name,
+                        gate_strategy=gate_strategy,
+                        run_id=run_id,
+                        run_dir=run_dir,
+                        write_ledger_fn=log_event,
+                        utc_now_fn=utc_now,
+                        approval_token=approval_token,
+                        gate_type=gate_type,
+                        gate_reason=gate_reason,
+                        risk_metadata=risk_metadata,
+                        approval_queue=approval_queue,
+                        resume_context=resume_context,
+                    )
+                except ApprovalRejectedError:
+                    if speculation is not None:
+                        summary = speculation.discard()
+                        log_event({
+                            "timestamp_utc": utc_now(),
+                            "event": "speculation_discarded",
+                            **summary,
+                            "run_id": run_id,
+                            "run_dir": run_dir,
+                        })
+                    raise
+
+                if speculation is not None:
+                    staged_results, summary = speculation.commit()
+                    log_event({
+                        "timestamp_utc": utc_now(),
+                        "event": "speculation_committed",
+                        **summary,
+                        "run_id": run_id,
+                        "run_dir": run_dir,
+                    })
 
         # ----------------------------------------------------------------------
         # Final State
         # ----------------------------------------------------------------------
 
-        final_state_path = os.path.join(run_dir, "99_final_state.json")
-        with open(final_state_path, "w") as f:
-            json.dump(system_state, f, indent=2)
+        save_artifact("99_final_state.json", json.dumps(system_state, indent=2))
         
         # Update manifest to completed
         manifest["status"] = "completed"
-        write_manifest(Path(run_dir), manifest)
+        check_owner()
+        write_manifest(Path(run_dir), manifest, run_log)
 
-        write_ledger({
+        log_event({
             "timestamp_utc": utc_now(),
             "event": "run_completed",
             "run_dir": run_dir,
         })
 
+        # Log storage mode: the familiar files are written once, at completion
+        if run_log is not None:
+            run_log.close()
+            run_log = None
+            materialize_log(Path(run_dir), artifact_store)
+
         # Generate Audit Summary
         summary_path = generate_audit_summary(run_id, run_dir, ledger_path=LEDGER_PATH)
         if summary_path:
@@ -645,10 +1342,92 @@ def run_pipeline(
 
         print("\n✅ RUN COMPLETE")
 
+    except ApprovalPendingError as pending:
+        # Parked: the step checkpoint is written; the run resumes when the request is approved
+        manifest["status"] = "awaiting_approval"
+        manifest["pending_approval"] = {
+            "request_id": pending.request_id,
+            "step_idx": manifest["current_step_completed"],
+        }
+        write_manifest(Path(run_dir), manifest, run_log)
+        print(f"\n⏸  Run parked awaiting approval ({pending.request_id}).")
+
+    except RunFencedError as fenced:
+        # Another worker owns the run now: leave its run log alone
+        write_ledger({
+            "timestamp_utc": utc_now(),
+            "event": "run_fenced",
+            "reason": str(fenced),
+            "run_dir": run_dir,
+        })
+        print(f"\n🛑 {fenced}.")
+
+    except RunCancelledError as cancelled:
+        # Steps completed so far keep their artifacts and checkpoints; resumable
+        manifest["status"] = "cancelled"
+        if 'step_calls' in locals():
+            update_usage_manifest(manifest, step_calls, budget)
+        write_manifest(Path(run_dir), manifest, run_log)
+        log_event({
+            "timestamp_utc": utc_now(),
+            "event": "run_cancelled",
+            "reason": str(cancelled),
+            "last_step_completed": manifest["current_step_completed"],
+            "run_id": run_id,
+            "run_dir": run_dir,
+        })
+        print(f"\n🛑 {cancelled}.")
+        print(f"   Resume with: python3 scripts/resume_run.py --run_id {run_id}")
+
+    except DeadlineExceededError as timed_out:
+        manifest["status"] = "timed_out"
+        update_usage_manifest(manifest, step_calls, budget)
+        write_manifest(Path(run_dir), manifest, run_log)
+        log_event({
+            "timestamp_utc": utc_now(),
+            "event": "run_timed_out",
+            "reason": str(timed_out),
+            "last_step_completed": manifest["current_step_completed"],
+            "run_id": run_id,
+            "run_dir": run_dir,
+        })
+        print(f"\n⏱  {timed_out} - run stopped after step {manifest['current_step_completed']}.")
+        print(f"   Resume with: python3 scripts/resume_run.py --run_id {run_id}")
+        try:
+            summary_path = generate_audit_summary(run_id, run_dir, ledger_path=LEDGER_PATH)
+            if summary_path:
+                print(f"📄 Audit summary generated: {summary_path}")
+        except Exception:
+            pass
+        sys.exit(1)
+
+    except BudgetExceededError as exceeded:
+        # Stopped before the call that would overspend; resumable with a higher budget (--replan)
+        manifest["status"] = "budget_exceeded"
+        update_usage_manifest(manifest, step_calls, budget)
+        write_manifest(Path(run_dir), manifest, run_log)
+        log_event({
+            "timestamp_utc": utc_now(),
+            "event": "run_budget_exceeded",
+            "reason": str(exceeded),
+            "last_step_completed": manifest["current_step_completed"],
+            "usage_totals": manifest["usage_totals"],
+            "run_id": run_id,
+            "run_dir": run_dir,
+        })
+        print(f"\n💰 Budget exceeded - run stopped: {exceeded}")
+        try:
+            summary_path = generate_audit_summary(run_id, run_dir, ledger_path=LEDGER_PATH)
+            if summary_path:
+                print(f"📄 Audit summary generated: {summary_path}")
+        except Exception:
+            pass
+        sys.exit(1)
+
     except ApprovalRejectedError:
         if manifest:
             manifest["status"] = "aborted"
-            write_manifest(Path(run_dir), manifest)
+            write_manifest(Path(run_dir), manifest, run_log)
         print("\n⛔ Run stopped by user approval rejection.")
         
         # Generate Audit Summary (attempt best effort)
@@ -670,8 +1449,10 @@ def run_pipeline(
     except Exception as e:
         if manifest:
             manifest["status"] = "failed"
-            write_manifest(Path(run_dir), manifest)
-        write_ledger({
+            if 'step_calls' in locals():
+                update_usage_manifest(manifest, step_calls, budget)
+            write_manifest(Path(run_dir), manifest, run_log)
+        log_event({
             "timestamp_utc": utc_now(),
             "event": "run_failed",
             "error": str(e),
@@ -694,6 +1475,9 @@ def run_pipeline(
 
         sys.exit(1)
 
+    finally:
+        scope.close()
+
 
 def main():
     """Entry point for running a fresh pipeline."""
@@ -0,0 +1,490 @@
+"""
+Run retention - compact old run directories into per-month ZIP archives.
+
+Every run leaves a directory under ``outputs/`` (deliverables, state files,
+checkpoints, manifest, audit summary, dist/), and nothing removes them.
+``adk runs gc`` applies the retention policy below; runs it does not keep
+are written into ``outputs/_archive/<YYYY-MM>.zip`` (by the month the run
+started, entries ``<run_id>/<relative path>``), recorded in the run catalog
+``outputs/_archive/catalog.json`` and their directories removed. It then
+sweeps artifact store blobs (orchestrator/artifact_store.py) no run
+directory points to any more. ``adk runs archive RUN...`` archives given
+runs regardless of the policy.
+
+A run is kept when any of these holds:
+
+- its status is not final (running, awaiting approval)
+- its ``governance_profile`` is listed in ``keep_profiles`` (pilot runs)
+- it is a golden run (its inputs hash is that of ``golden_inputs_dir``)
+- it is one of the ``keep_last_per_inputs`` newest runs with its inputs hash
+- it started less than ``archive_after_days`` ago
+
+Archiving holds an exclusive lockf lock on ``outputs/_archive/.lock`` (and a
+thread lock) from writing the archives to updating the catalog, so
+concurrent ``adk runs gc`` invocations, on one host or several sharing
+``outputs/``, never lose each other's archive entries or catalog records; a
+run another invocation archived meanwhile is skipped.
+
+Archives hold the plain layout (runs in the artifact store or log storage
+mode are materialized into them), so they are self-contained. A ZIP's
+central directory gives random access to single entries: the readers in
+orchestrator/artifact_store.py resolve files of an archived run (its run
+directory gone, its id in the catalog) straight from the archive, so audit,
+bundle export and run diff read archived runs without extracting them.
+
+Configured in run_config (all keys optional)::
+
+    "retention": {"keep_last_per_inputs": 3, "archive_after_days": 30,
+                  "keep_profiles": ["pilot"], "golden_inputs_dir": "tests/fixtures/golden_run"}
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import zipfile
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: archiving is not locked against other processes
+    fcntl = None
+
+from orchestrator.artifact_store import DEFAULT_STORE_DIRNAME, list_run_artifacts, load_pointers, read_run_bytes, read_run_json
+from orchestrator.run_artifacts import compute_inputs_hash
+from orchestrator.shared_fs import atomic_write_json
+
+ARCHIVE_DIRNAME = "_archive"  # under the outputs directory
+CATALOG_FILENAME = "catalog.json"
+LOCK_FILENAME = ".lock"
+ZIP_FIXED_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+# Statuses a run does not leave on its own; such runs are never archived
+FINAL_STATUSES = ("completed", "cancelled", "timed_out", "budget_exceeded", "failed", "aborted")
+
+DEFAULT_KEEP_LAST_PER_INPUTS = 3
+DEFAULT_ARCHIVE_AFTER_DAYS = 30
+DEFAULT_GOLDEN_INPUTS_DIR = "tests/fixtures/golden_run"
+
+# Blobs written or reused more recently than this are never swept: a running
+# step may have put its blob but not yet written the pointer to it
+BLOB_SWEEP_GRACE_SECONDS = 3600
+
+
+# ------------------------------------------------------------------------------
+# Settings
+# ------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RetentionSettings:
+    """Resolved ``retention`` block."""
+    keep_last_per_inputs: int = DEFAULT_KEEP_LAST_PER_INPUTS
+    archive_after_days: float = DEFAULT_ARCHIVE_AFTER_DAYS
+    keep_profiles: Tuple[str, ...] = ("pilot",)
+    golden_inputs_dir: Optional[str] = DEFAULT_GOLDEN_INPUTS_DIR
+
+
+def retention_settings(config: Mapping[str, Any]) -> RetentionSettings:
+    """
+    Read the ``retention`` block of a run config.
+
+    Raises:
+        ValueError: Malformed settings
+    """
+    cfg = config.get("retention") or {}
+    if not isinstance(cfg, Mapping):
+        raise ValueError("retention must be an object")
+    keep_last = cfg.get("keep_last_per_inputs", DEFAULT_KEEP_LAST_PER_INPUTS)
+    if isinstance(keep_last, bool) or not isinstance(keep_last, int) or keep_last < 0:
+        raise ValueError("retention.keep_last_per_inputs must be a non-negative integer")
+    days = cfg.get("archive_after_days", DEFAULT_ARCHIVE_AFTER_DAYS)
+    if isinstance(days, bool) or not isinstance(days, (int, float)) or days < 0:
+        raise ValueError("retention.archive_after_days must be a non-negative number")
+    profiles = cfg.get("keep_profiles", ["pilot"])
+    if not isinstance(profiles, list) or not all(isinstance(p, str) for p in profiles):
+        raise ValueError("retention.keep_profiles must be a list of governance profile names")
+    golden = cfg.get("golden_inputs_dir", DEFAULT_GOLDEN_INPUTS_DIR)
+    if golden is not None and (not isinstance(golden, str) or not golden):
+        raise ValueError("retention.golden_inputs_dir must be a non-empty string or null")
+    return RetentionSettings(
+        keep_last_per_inputs=keep_last,
+        archive_after_days=float(days),
+        keep_profiles=tuple(profiles),
+        golden_inputs_dir=golden,
+    )
+
+
+# ------------------------------------------------------------------------------
+# Catalog and archive reads
+# ------------------------------------------------------------------------------
+
+def archive_dir(outputs_dir: Union[str, Path]) -> Path:
+    return Path(outputs_dir) / ARCHIVE_DIRNAME
+
+
+def load_catalog(outputs_dir: Union[str, Path]) -> Dict[str, Any]:
+    """The run catalog ({"runs": {}} when nothing was archived yet)."""
+    path = archive_dir(outputs_dir) / CATALOG_FILENAME
+    stamp = _stamp(path)
+    if stamp is None:
+        return {"runs": {}}
+    return _cached(("catalog", str(path.resolve())), stamp, lambda: _read_json(path))
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def _cached(key: Tuple[str, str], stamp: Tuple[int, int], load, close: Optional[Callable[[Any], None]] = None) -> Any:
+    """
+    Parse a catalog or open an archive once per (size, mtime) of the file.
+    ``close`` releases a value the cache no longer holds (a superseded archive handle).
+    """
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    value = load()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            superseded, value = value, cached[1]  # another thread loaded it first
+        else:
+            superseded = cached[1] if cached is not None else None
+            _cache[key] = (stamp, value)
+    if close is not None and superseded is not None:
+        close(superseded)
+    return value
+
+
+def _index_archive(path: Path) -> Tuple[zipfile.ZipFile, Dict[str, Dict[str, str]]]:
+    archive = zipfile.ZipFile(path)  # reads only the central directory
+    index: Dict[str, Dict[str, str]] = {}
+    for name in archive.namelist():
+        run_id, _, rel = name.partition("/")
+        if rel and not rel.endswith("/"):
+            index.setdefault(run_id, {})[rel] = name
+    return archive, index
+
+
+def archived_files(run_dir: Union[str, Path]) -> Dict[str, Tuple[zipfile.ZipFile, str]]:
+    """
+    Files of an archived run, by relative path.
+
+    Returns:
+        {relative path: (archive, entry name)}, empty unless the catalog next
+        to the run directory lists the run. Entries are read on demand
+        (``archive.read(name)``, which checks their CRC).
+    """
+    run_dir = Path(run_dir)
+    entry = load_catalog(run_dir.parent)["runs"].get(run_dir.name)
+    if entry is None:
+        return {}
+    path = archive_dir(run_dir.parent) / entry["archive"]
+    stamp = _stamp(path)
+    if stamp is None:
+        return {}
+    archive, index = _cached(
+        ("archive", str(path.resolve())), stamp, lambda: _index_archive(path), close=lambda cached: cached[0].close()
+    )
+    return {rel: (archive, name) for rel, name in index.get(run_dir.name, {}).items()}
+
+
+# ------------------------------------------------------------------------------
+# Retention policy
+# ------------------------------------------------------------------------------
+
+@dataclass
+class RunInfo:
+    """A run directory and the manifest fields retention looks at."""
+    run_id: str
+    path: Path
+    status: Optional[str]
+    inputs_hash: Optional[str]
+    governance_profile: Optional[str]
+    started_at: datetime
+    manifest: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RetentionDecision:
+    run: RunInfo
+    keep: bool
+    reason: str
+
+
+def _started_at(manifest: Mapping[str, Any], run_dir: Path) -> datetime:
+    try:
+        return datetime.fromisoformat(manifest["started_at_utc"])
+    except (KeyError, TypeError, ValueError):
+        return datetime.utcfromtimestamp(run_dir.stat().st_mtime)
+
+
+def list_runs(outputs_dir: Union[str, Path]) -> List[RunInfo]:
+    """Run directories under outputs_dir (with a readable manifest), oldest first."""
+    outputs_dir = Path(outputs_dir)
+    if not outputs_dir.is_dir():
+        return []
+    archived = load_catalog(outputs_dir)["runs"]
+    runs = []
+    for run_dir in outputs_dir.iterdir():
+        if not run_dir.is_dir() or run_dir.name.startswith(("_", ".")) or run_dir.name in archived:
+            continue
+        try:
+            manifest = read_run_json(run_dir, "run_manifest.json")
+        except (OSError, ValueError):
+            continue  # not a run directory
+        runs.append(RunInfo(
+            run_id=run_dir.name,
+            path=run_dir,
+            status=manifest.get("status"),
+            inputs_hash=manifest.get("inputs_hash"),
+            governance_profile=manifest.get("governance_profile"),
+            started_at=_started_at(manifest, run_dir),
+            manifest=manifest,
+        ))
+    runs.sort(key=lambda r: (r.started_at, r.run_id))
+    return runs
+
+
+def golden_inputs_hash(settings: RetentionSettings) -> Optional[str]:
+    """The inputs hash golden runs carry (None when the golden inputs are not present)."""
+    if not settings.golden_inputs_dir:
+        return None
+    inputs = Path(settings.golden_inputs_dir)
+    try:
+        return compute_inputs_hash(inputs / "business_brief.md", inputs / "sme_notes.md")
+    except OSError:
+        return None
+
+
+def plan_retention(
+    runs: Iterable[RunInfo],
+    settings: RetentionSettings,
+    now: Optional[datetime] = None,
+) -> List[RetentionDecision]:
+    """Decide, per run, whether retention keeps it (with the first reason that applies)."""
+    runs = list(runs)
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=settings.archive_after_days)
+    golden = golden_inputs_hash(settings)
+
+    newest: Dict[Optional[str], List[str]] = {}
+    for run in sorted(runs, key=lambda r: (r.started_at, r.run_id), reverse=True):
+        newest.setdefault(run.inputs_hash, []).append(run.run_id)
+    latest = {
+        run_id for run_ids in newest.values() for run_id in run_ids[:settings.keep_last_per_inputs]
+    }
+
+    decisions = []
+    for run in runs:
+        if run.status not in FINAL_STATUSES:
+            reason = f"status {run.status or 'unknown'}"
+        elif run.governance_profile in settings.keep_profiles:
+            reason = f"{run.governance_profile} run"
+        elif golden is not None and run.inputs_hash == golden:
+            reason = "golden run"
+        elif run.run_id in latest:
+            reason = f"among the last {settings.keep_last_per_inputs} for its inputs"
+        elif run.started_at > cutoff:
+            reason = f"younger than {settings.archive_after_days:g} days"
+        else:
+            decisions.append(RetentionDecision(run, False, "expired"))
+            continue
+        decisions.append(RetentionDecision(run, True, reason))
+    return decisions
+
+
+# ------------------------------------------------------------------------------
+# Archiving
+# ------------------------------------------------------------------------------
+
+def _dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _append_to_archive(archive_path: Path, runs: List[RunInfo]) -> Dict[str, int]:
+    """
+    Add runs to a month archive: a copy of the archive gets the new entries
+    and replaces it, so a crash never leaves a truncated central directory.
+
+    Returns:
+        {run_id: number of files}
+    """
+    tmp_path = archive_path.with_name(f".{archive_path.name}.{os.getpid()}.tmp")
+    if archive_path.exists():
+        shutil.copyfile(archive_path, tmp_path)
+    counts = {}
+    try:
+        with zipfile.ZipFile(tmp_path, "a", zipfile.ZIP_DEFLATED) as zf:
+            present = set(zf.namelist())
+            expected = {}
+            for run in runs:
+                files = list_run_artifacts(run.path)
+                counts[run.run_id] = len(files)
+                for rel in files:
+                    name = f"{run.run_id}/{rel}"
+                    data = read_run_bytes(run.path, rel)
+                    expected[name] = (len(data), zlib.crc32(data))
+                    if name in present:
+                        continue  # left by an archive run interrupted before its catalog update
+                    info = zipfile.ZipInfo(name, date_time=ZIP_FIXED_TIMESTAMP)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    info.external_attr = 0o644 << 16
+                    zf.writestr(info, data)
+        with zipfile.ZipFile(tmp_path) as zf:
+            for name, (size, crc) in expected.items():
+                info = zf.getinfo(name)
+                if (info.file_size, info.CRC) != (size, crc):
+                    raise ValueError(f"Archive entry {name} in {archive_path} does not match the run file")
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return counts
+
+
+# The file lock excludes other processes; this one excludes threads of this process
+_archive_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_archive_dir(target_dir: Path):
+    """Hold the archive directory's lock (thread lock, then lockf on its lock file)."""
+    target_dir.mkdir(parents=True, exist_ok=True)
+    with _archive_lock:
+        fd = os.open(target_dir / LOCK_FILENAME, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def archive_runs(outputs_dir: Union[str, Path], runs: Iterable[RunInfo], dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Move runs into their month archives, record them in the catalog and
+    remove their directories, all under the archive directory's lock. Runs
+    archived (or removed) meanwhile by another invocation are skipped.
+
+    Returns:
+        {"runs": archived run ids, "archives": archive names written,
+         "bytes_freed": size of the removed run directories,
+         "archive_bytes": growth of the archives,
+         "bytes_reclaimed": bytes_freed - archive_bytes (None on a dry run)}
+    """
+    outputs_dir = Path(outputs_dir)
+    runs = list(runs)
+    if dry_run:
+        return _plan_archive(runs)[0]
+
+    target_dir = archive_dir(outputs_dir)
+    catalog_path = target_dir / CATALOG_FILENAME
+    with _locked_archive_dir(target_dir):
+        catalog = _read_json(catalog_path) if catalog_path.exists() else {"runs": {}}
+        runs = [run for run in runs if run.run_id not in catalog["runs"] and run.path.is_dir()]
+        result, by_month, sizes = _plan_archive(runs)
+        archived_at = datetime.utcnow().isoformat()
+        for name, month_runs in sorted(by_month.items()):
+            archive_path = target_dir / name
+            size_before = archive_path.stat().st_size if archive_path.exists() else 0
+            counts = _append_to_archive(archive_path, month_runs)
+            result["archive_bytes"] += archive_path.stat().st_size - size_before
+            for run in month_runs:
+                catalog["runs"][run.run_id] = {
+                    "archive": name,
+                    "status": run.status,
+                    "inputs_hash": run.inputs_hash,
+                    "governance_profile": run.governance_profile,
+                    "started_at_utc": run.manifest.get("started_at_utc"),
+                    "files": counts[run.run_id],
+                    "bytes": sizes[run.run_id],
+                    "archived_at_utc": archived_at,
+                }
+            # The catalog points readers at the archive before the directories go
+            atomic_write_json(catalog_path, catalog)
+            for run in month_runs:
+                shutil.rmtree(run.path)
+    result["bytes_reclaimed"] = result["bytes_freed"] - result["archive_bytes"]
+    return result
+
+
+def _plan_archive(runs: List[RunInfo]) -> Tuple[Dict[str, Any], Dict[str, List[RunInfo]], Dict[str, int]]:
+    """(result skeleton, runs by month archive name, directory size by run_id)."""
+    by_month: Dict[str, List[RunInfo]] = {}
+    sizes = {}
+    for run in runs:
+        by_month.setdefault(f"{run.started_at:%Y-%m}.zip", []).append(run)
+        sizes[run.run_id] = _dir_bytes(run.path)
+    result = {"runs": list(sizes), "archives": sorted(by_month), "bytes_freed": sum(sizes.values()),
+              "archive_bytes": 0, "bytes_reclaimed": None}
+    return result, by_month, sizes
+
+
+def sweep_blobs(
+    outputs_dir: Union[str, Path],
+    store_root: Union[str, Path, None] = None,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Remove artifact store blobs that no run directory under outputs_dir
+    points to. Blobs written or reused (``ArtifactStore.put``) within the
+    grace period are kept.
+
+    Args:
+        outputs_dir: Directory holding the run directories
+        store_root: Store to sweep (default: ``<outputs>/_cas``); only runs
+                    under outputs_dir are scanned for references, so it must
+                    not be shared with run directories elsewhere
+
+    Returns:
+        {"blobs": blobs removed, "bytes": their size}
+    """
+    outputs_dir = Path(outputs_dir)
+    store_root = Path(store_root) if store_root is not None else outputs_dir / DEFAULT_STORE_DIRNAME
+    stats = {"blobs": 0, "bytes": 0}
+    if not store_root.is_dir():
+        return stats
+    referenced = set()
+    for run_dir in outputs_dir.iterdir():
+        if run_dir.is_dir() and not run_dir.name.startswith(("_", ".")):
+            referenced.update(e["sha256"] for e in load_pointers(run_dir)["files"].values())
+    cutoff = time.time() - BLOB_SWEEP_GRACE_SECONDS
+    for blob in store_root.glob("*/*"):
+        if blob.name in referenced or blob.name.startswith("."):
+            continue
+        try:
+            stat = blob.stat()
+        except FileNotFoundError:
+            continue
+        if stat.st_mtime > cutoff:
+            continue
+        stats["blobs"] += 1
+        stats["bytes"] += stat.st_size
+        if not dry_run:
+            blob.unlink()
+    return stats
@@ -6,12 +6,21 @@ This module provides utilities for:
 - Writing and reading step checkpoints
 - Managing run manifests (metadata about run progress)
 - Computing hashes for config and input files
+
+Checkpoints may be plain files or pointers into the artifact store (see
+orchestrator/artifact_store.py), and in log storage mode checkpoints and
+the manifest are records in the run log (see orchestrator/run_log.py); the
+readers here resolve all three.
 """
 
 import json
 import hashlib
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
+
+from orchestrator.artifact_store import ArtifactStore, list_run_files, read_run_json, run_file_exists, write_run_file
+from orchestrator.run_log import RunLog
+from orchestrator.shared_fs import atomic_write_json
 
 
 def ensure_run_dirs(run_dir: Path) -> Path:
@@ -33,19 +42,41 @@ def ensure_run_dirs(run_dir: Path) -> Path:
     return checkpoints_dir
 
 
-def write_checkpoint(checkpoints_dir: Path, step_idx: int, state: Dict[str, Any]) -> None:
+def write_checkpoint(
+    checkpoints_dir: Path,
+    step_idx: int,
+    state: Dict[str, Any],
+    store: Optional[ArtifactStore] = None,
+    run_log: Optional[RunLog] = None,
+) -> bool:
     """
     Write a checkpoint file for a completed step.
+
+    Written atomically, so a worker that takes over a crashed run never
+    reads a half-written checkpoint.
     
     Args:
         checkpoints_dir: Path to the checkpoints directory
         step_idx: Step index (1-based)
         state: System state dictionary to save
-    """
-    checkpoint_file = checkpoints_dir / f"step_{step_idx:02d}_state.json"
-    
-    with open(checkpoint_file, "w") as f:
-        json.dump(state, f, indent=2)
+        store: Artifact store to write the checkpoint to (None: plain file)
+        run_log: Run log to append the checkpoint to instead (log storage mode)
+
+    Returns:
+        True when bytes were written (False when the store already had the content)
+    """
+    if run_log is not None:
+        run_log.write_checkpoint(step_idx, state)
+        return True
+    if store is None:
+        checkpoint_file = Path(checkpoints_dir) / f"step_{step_idx:02d}_state.json"
+        atomic_write_json(checkpoint_file, state)
+        return True
+    checkpoints_dir = Path(checkpoints_dir)
+    return write_run_file(
+        checkpoints_dir.parent, f"{checkpoints_dir.name}/step_{step_idx:02d}_state.json",
+        json.dumps(state, indent=2), store,
+    )
 
 
 def read_latest_checkpoint(checkpoints_dir: Path) -> Tuple[int, Dict[str, Any]]:
@@ -64,8 +95,8 @@ def read_latest_checkpoint(checkpoints_dir: Path) -> Tuple[int, Dict[str, Any]]:
     if not checkpoints_dir.exists():
         return (0, {})
     
-    # Find all checkpoint files
-    checkpoint_files = sorted(checkpoints_dir.glob("step_*_state.json"))
+    # Find all checkpoint files (plain or in the artifact store)
+    checkpoint_files = list_run_files(checkpoints_dir.parent, f"{checkpoints_dir.name}/step_*_state.json")
     
     if not checkpoint_files:
         return (0, {})
@@ -74,11 +105,10 @@ def read_latest_checkpoint(checkpoints_dir: Path) -> Tuple[int, Dict[str, Any]]:
     latest_checkpoint = checkpoint_files[-1]
     
     # Extract step index from filename (step_NN_state.json)
-    step_idx = int(latest_checkpoint.stem.split("_")[1])
+    step_idx = int(Path(latest_checkpoint).stem.split("_")[1])
     
     # Load state
-    with open(latest_checkpoint, "r") as f:
-        state = json.load(f)
+    state = read_run_json(checkpoints_dir.parent, latest_checkpoint)
     
     return (step_idx, state)
 
@@ -97,32 +127,37 @@ def read_checkpoint(checkpoints_dir: Path, step_idx: int) -> Dict[str, Any]:
     Raises:
         FileNotFoundError: If checkpoint doesn't exist
     """
-    checkpoint_file = Path(checkpoints_dir) / f"step_{step_idx:02d}_state.json"
+    checkpoints_dir = Path(checkpoints_dir)
+    rel_path = f"{checkpoints_dir.name}/step_{step_idx:02d}_state.json"
     
-    if not checkpoint_file.exists():
-        raise FileNotFoundError(f"Checkpoint not found: {checkpoint_file}")
+    if not run_file_exists(checkpoints_dir.parent, rel_path):
+        raise FileNotFoundError(f"Checkpoint not found: {checkpoints_dir.parent / rel_path}")
     
-    with open(checkpoint_file, "r") as f:
-        return json.load(f)
+    return read_run_json(checkpoints_dir.parent, rel_path)
 
 
-def write_manifest(run_dir: Path, manifest: Dict[str, Any]) -> None:
+def write_manifest(run_dir: Path, manifest: Dict[str, Any], run_log: Optional[RunLog] = None) -> None:
     """
     Write the run manifest file.
+
+    Written to a temp file and renamed into place so concurrent readers
+    (e.g. the service API, other workers on a shared filesystem) never
+    see a partial manifest.
     
     Args:
         run_dir: Path to the run output directory
         manifest: Manifest dictionary to save
+        run_log: Run log to append a manifest patch to instead (log storage mode)
     """
-    manifest_file = Path(run_dir) / "run_manifest.json"
-    
-    with open(manifest_file, "w") as f:
-        json.dump(manifest, f, indent=2)
+    if run_log is not None:
+        run_log.write_manifest(manifest)
+        return
+    atomic_write_json(Path(run_dir) / "run_manifest.json", manifest)
 
 
 def read_manifest(run_dir: Path) -> Dict[str, Any]:
     """
-    Read the run manifest file.
+    Read the run manifest file (or replay it from the run log).
     
     Args:
         run_dir: Path to the run output directory
@@ -133,13 +168,10 @@ def read_manifest(run_dir: Path) -> Dict[str, Any]:
     Raises:
         FileNotFoundError: If manifest doesn't exist
     """
-    manifest_file = Path(run_dir) / "run_manifest.json"
-    
-    if not manifest_file.exists():
-        raise FileNotFoundError(f"Manifest not found: {manifest_file}")
+    if not run_file_exists(run_dir, "run_manifest.json"):
+        raise FileNotFoundError(f"Manifest not found: {Path(run_dir) / 'run_manifest.json'}")
     
-    with open(manifest_file, "r") as f:
-        return json.load(f)
+    return read_run_json(run_dir, "run_manifest.json")
 
 
 def compute_config_hash(config_path: Path) -> str:
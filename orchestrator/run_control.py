@@ -0,0 +1,240 @@
+"""
+Run deadlines and cooperative cancellation.
+
+Deadlines are configured in run_config (``deadlines`` block, seconds, null =
+none) and per agent (``deadline_seconds``)::
+
+    "deadlines": {"run_seconds": 3600, "step_seconds": 600, "request_timeout_seconds": 300}
+
+run_pipeline activates a RunControl (run deadline, the current step's
+deadline, the run's cancel_check) for the thread executing the run. Providers
+call ``request_timeout()`` before each HTTP request / subprocess and
+``retry_sleep()`` between retries, so a request never outlives the step or
+run deadline and a cancellation is noticed before the next request is sent.
+
+Cancellation is cooperative: ``graceful_shutdown()`` turns the first SIGINT /
+SIGTERM into a CancelToken (the run stops before its next step or provider
+request, with its manifest marked ``cancelled`` and its last checkpoint kept);
+a second signal interrupts immediately.
+"""
+
+import contextvars
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+
+class RunCancelledError(Exception):
+    """Raised between steps (or before a provider request) when the run's cancel_check reports a cancellation."""
+    pass
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a step or run deadline has passed."""
+    pass
+
+
+@dataclass(frozen=True)
+class DeadlineSettings:
+    """run_config ``deadlines`` block (seconds; None = no limit)."""
+    run_seconds: Optional[float] = None
+    step_seconds: Optional[float] = None
+    request_timeout_seconds: Optional[float] = None
+
+
+def _positive_or_none(value: Any, name: str) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"{name} must be a positive number of seconds or null")
+    return value
+
+
+def deadline_settings(config: Mapping[str, Any]) -> DeadlineSettings:
+    """
+    Read the ``deadlines`` block and validate per-agent ``deadline_seconds``.
+
+    Raises:
+        ValueError: Non-positive or non-numeric values
+    """
+    cfg = config.get("deadlines") or {}
+    for agent in config.get("agents") or []:
+        _positive_or_none(agent.get("deadline_seconds"), f"deadline_seconds for '{agent.get('name')}'")
+    return DeadlineSettings(
+        run_seconds=_positive_or_none(cfg.get("run_seconds"), "deadlines.run_seconds"),
+        step_seconds=_positive_or_none(cfg.get("step_seconds"), "deadlines.step_seconds"),
+        request_timeout_seconds=_positive_or_none(
+            cfg.get("request_timeout_seconds"), "deadlines.request_timeout_seconds"
+        ),
+    )
+
+
+class Deadline:
+    """A point in (monotonic) time, or no limit when ``seconds`` is None."""
+
+    def __init__(self, seconds: Optional[float], label: str):
+        self.seconds = seconds
+        self.label = label
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        return None if self.expires_at is None else self.expires_at - time.monotonic()
+
+
+@dataclass
+class RunControl:
+    """Deadlines and cancel_check of the run executing in this thread."""
+    run_deadline: Deadline
+    step_deadline: Optional[Deadline] = None
+    cancel_check: Optional[Callable[[], bool]] = None
+    request_timeout_seconds: Optional[float] = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the nearest deadline (None = no deadline)."""
+        remaining = [d.remaining() for d in (self.run_deadline, self.step_deadline) if d is not None]
+        remaining = [r for r in remaining if r is not None]
+        return min(remaining) if remaining else None
+
+    def check(self) -> None:
+        """
+        Raises:
+            RunCancelledError: The run was cancelled
+            DeadlineExceededError: The step or run deadline has passed
+        """
+        if self.cancel_check is not None and self.cancel_check():
+            raise RunCancelledError("Run cancelled during step")
+        self.check_deadlines()
+
+    def check_deadlines(self) -> None:
+        """
+        Raises:
+            DeadlineExceededError: The step or run deadline has passed
+        """
+        for deadline in (self.step_deadline, self.run_deadline):
+            remaining = deadline.remaining() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceededError(f"{deadline.label} deadline of {deadline.seconds:g}s exceeded")
+
+    def start_step(self, label: str, seconds: Optional[float]) -> None:
+        self.step_deadline = Deadline(seconds, label) if seconds is not None else None
+
+    def end_step(self) -> None:
+        self.step_deadline = None
+
+
+_current: "contextvars.ContextVar[Optional[RunControl]]" = contextvars.ContextVar("run_control", default=None)
+
+
+def current_control() -> Optional[RunControl]:
+    return _current.get()
+
+
+@contextmanager
+def run_control(control: RunControl) -> Iterator[RunControl]:
+    """Make ``control`` the active RunControl for provider calls in this thread."""
+    token = _current.set(control)
+    try:
+        yield control
+    finally:
+        _current.reset(token)
+
+
+def request_timeout(default: float) -> float:
+    """
+    Timeout for the next provider request: the configured request timeout (or
+    the provider's ``default``), capped by the nearest deadline.
+
+    Raises:
+        RunCancelledError: The run was cancelled
+        DeadlineExceededError: No time is left
+    """
+    control = _current.get()
+    if control is None:
+        return default
+    control.check()
+    timeout = control.request_timeout_seconds or default
+    remaining = control.remaining()
+    return timeout if remaining is None else max(min(timeout, remaining), 0.001)
+
+
+def retry_sleep(seconds: float) -> None:
+    """Back off before a retry without sleeping past a deadline."""
+    control = _current.get()
+    if control is not None:
+        control.check()
+        remaining = control.remaining()
+        if remaining is not None and remaining < seconds:
+            time.sleep(max(remaining, 0))
+            control.check()
+            return
+    time.sleep(seconds)
+
+
+def check_run_control() -> None:
+    """Raise if the active run was cancelled or its deadline passed (no-op outside a run)."""
+    control = _current.get()
+    if control is not None:
+        control.check()
+
+
+class CancelToken:
+    """Thread-safe cancellation flag; callable, so it can be passed as a cancel_check."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._event.wait(timeout)
+
+    def __call__(self) -> bool:
+        return self._event.is_set()
+
+
+@contextmanager
+def graceful_shutdown(
+    token: CancelToken,
+    on_cancel: Optional[Callable[[str], None]] = None,
+    signals=(signal.SIGINT, signal.SIGTERM),
+) -> Iterator[CancelToken]:
+    """
+    Route SIGINT/SIGTERM to ``token`` while the block runs.
+
+    The first signal cancels the token (and calls ``on_cancel``); a second one
+    raises KeyboardInterrupt. Handlers are only installed on the main thread
+    and are restored on exit.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield token
+        return
+
+    def handler(signum, frame):
+        name = signal.Signals(signum).name
+        if token.cancelled:
+            raise KeyboardInterrupt
+        token.cancel(f"received {name}")
+        print(f"\n🛑 {name} received - stopping after the current step or request "
+              f"(send it again to stop immediately)")
+        if on_cancel is not None:
+            on_cancel(name)
+
+    previous = {}
+    for sig in signals:
+        previous[sig] = signal.signal(sig, handler)
+    try:
+        yield token
+    finally:
+        for sig, prev in previous.items():
+            signal.signal(sig, prev)
@@ -0,0 +1,242 @@
+"""
+Run log - optional append-only storage mode for a run's artifacts.
+
+Per step a run normally writes its deliverable and state files, a
+checkpoint, and rewrites run_manifest.json in full; on a network
+filesystem those small-file operations cost more than the step itself.
+In log mode the run appends framed records to one file,
+``<run_dir>/run.log``, instead:
+
+- ``file``: a step output (``NN_agent.md``, ``NN_agent_state.json``, ``99_final_state.json``)
+- ``checkpoint``: the state after a step, as a top-level delta against the previous checkpoint record
+- ``manifest``: a top-level patch of run_manifest.json (the log is fsynced after it, once per step)
+- ``ledger``: a ledger event of the run (still appended to the governance ledger as well)
+
+Each record is framed as magic, payload length and CRC32 (big-endian,
+4 bytes each) followed by the JSON payload. A torn record at the tail (a
+crash mid-append) is ignored by readers and cut off before the next append.
+
+Replaying the log (load_view) gives the familiar files - step outputs,
+``checkpoints/step_NN_state.json`` and ``run_manifest.json`` - which the
+readers in orchestrator/artifact_store.py and run_artifacts.py resolve on
+demand. When the run completes the pipeline materializes them as files
+and removes the log; an interrupted run keeps its log, and resume (or a
+worker taking the run over) replays it and keeps appending.
+
+Configured in run_config (applies to fresh runs; a run directory that has a
+log stays in log mode)::
+
+    "run_log": {"enabled": true, "fsync": true}
+"""
+
+import copy
+import json
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+RUN_LOG_FILENAME = "run.log"
+
+_MAGIC = b"ADKR"
+_HEADER = struct.Struct(">4sII")  # magic, payload length, crc32
+
+
+# ------------------------------------------------------------------------------
+# Settings
+# ------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RunLogSettings:
+    """Resolved ``run_log`` block."""
+    fsync: bool = True
+
+
+def run_log_settings(config: Mapping[str, Any]) -> Optional[RunLogSettings]:
+    """
+    Read the ``run_log`` block of a run config.
+
+    Returns:
+        RunLogSettings, or None when fresh runs write plain files
+
+    Raises:
+        ValueError: Malformed settings
+    """
+    cfg = config.get("run_log") or {}
+    if not isinstance(cfg, Mapping):
+        raise ValueError("run_log must be an object")
+    if not cfg.get("enabled", False):
+        return None
+    fsync = cfg.get("fsync", True)
+    if not isinstance(fsync, bool):
+        raise ValueError("run_log.fsync must be true or false")
+    return RunLogSettings(fsync=fsync)
+
+
+# ------------------------------------------------------------------------------
+# Records
+# ------------------------------------------------------------------------------
+
+def _frame(record: Mapping[str, Any]) -> bytes:
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(_MAGIC, len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(path: Union[str, Path]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Decode a run log up to its last complete, intact record.
+
+    Returns:
+        Tuple of (records, length of the valid prefix in bytes)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    records, offset = [], 0
+    while offset + _HEADER.size <= len(data):
+        magic, length, crc = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size
+        payload = data[start:start + length]
+        if magic != _MAGIC or len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        records.append(json.loads(payload))
+        offset = start + length
+    return records, offset
+
+
+def _diff(old: Mapping[str, Any], new: Mapping[str, Any]) -> Dict[str, Any]:
+    """Top-level delta turning ``old`` into ``new``."""
+    return {
+        "set": {k: v for k, v in new.items() if k not in old or old[k] != v},
+        "unset": [k for k in old if k not in new],
+    }
+
+
+def _apply(base: Mapping[str, Any], delta: Mapping[str, Any]) -> Dict[str, Any]:
+    result = dict(base)
+    result.update(delta["set"])
+    for key in delta["unset"]:
+        result.pop(key, None)
+    return result
+
+
+def _json_bytes(data: Any) -> bytes:
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+@dataclass
+class RunLogView:
+    """The run's files as of the end of the log, plus its ledger events."""
+    files: Dict[str, bytes] = field(default_factory=dict)
+    state: Dict[str, Any] = field(default_factory=dict)
+    manifest: Optional[Dict[str, Any]] = None
+    ledger_events: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def replay(records: List[Mapping[str, Any]]) -> RunLogView:
+    view = RunLogView()
+    for record in records:
+        kind = record["type"]
+        if kind == "file":
+            view.files[record["path"]] = record["data"].encode("utf-8")
+        elif kind == "checkpoint":
+            view.state = _apply(view.state, record["delta"])
+            view.files[f"checkpoints/step_{record['step']:02d}_state.json"] = _json_bytes(view.state)
+        elif kind == "manifest":
+            view.manifest = _apply(view.manifest or {}, record["patch"])
+        elif kind == "ledger":
+            view.ledger_events.append(record["event"])
+    if view.manifest is not None:
+        view.files["run_manifest.json"] = _json_bytes(view.manifest)
+    return view
+
+
+_view_cache: Dict[str, Tuple[Tuple[int, int], RunLogView]] = {}
+_view_cache_lock = threading.Lock()
+
+
+def load_view(run_dir: Union[str, Path]) -> Optional[RunLogView]:
+    """
+    Replay a run directory's log (cached until the log changes).
+
+    Returns:
+        RunLogView, or None when the run has no log
+    """
+    path = os.path.join(run_dir, RUN_LOG_FILENAME)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key, stamp = os.path.realpath(path), (stat.st_size, stat.st_mtime_ns)
+    with _view_cache_lock:
+        cached = _view_cache.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    view = replay(read_records(path)[0])
+    with _view_cache_lock:
+        _view_cache[key] = (stamp, view)
+    return view
+
+
+# ------------------------------------------------------------------------------
+# Writer
+# ------------------------------------------------------------------------------
+
+class RunLog:
+    """
+    Appends a run's records to ``<run_dir>/run.log``.
+
+    Opening an existing log replays it (the base of the next checkpoint delta
+    and manifest patch) and cuts off a torn tail record.
+    """
+
+    def __init__(self, run_dir: Union[str, Path], fsync: bool = True):
+        self.path = Path(run_dir) / RUN_LOG_FILENAME
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        view = RunLogView()
+        if self.path.exists():
+            records, valid = read_records(self.path)
+            if valid < self.path.stat().st_size:
+                print(f"[RunLog] {self.path}: dropping a torn record at offset {valid}")
+                os.truncate(self.path, valid)
+            view = replay(records)
+        self._state = view.state
+        self._manifest = view.manifest or {}
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def _append(self, record: Mapping[str, Any], sync: bool = False) -> None:
+        with self._lock:
+            os.write(self._fd, _frame(record))
+            if sync and self.fsync:
+                os.fsync(self._fd)
+
+    def write_file(self, rel_path: str, data: str) -> None:
+        self._append({"type": "file", "path": rel_path, "data": data})
+
+    def write_checkpoint(self, step_idx: int, state: Mapping[str, Any]) -> None:
+        self._append({"type": "checkpoint", "step": step_idx, "delta": _diff(self._state, state)})
+        self._state = copy.deepcopy(dict(state))
+
+    def write_manifest(self, manifest: Mapping[str, Any]) -> None:
+        patch = _diff(self._manifest, manifest)
+        if patch["set"] or patch["unset"]:
+            self._append({"type": "manifest", "patch": patch}, sync=True)
+            self._manifest = copy.deepcopy(dict(manifest))
+
+    def log_event(self, event: Mapping[str, Any]) -> None:
+        self._append({"type": "ledger", "event": event})
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def open_run_log(run_dir: Union[str, Path], settings: Optional[RunLogSettings]) -> Optional[RunLog]:
+    """The run's log writer when it is in log mode (an existing log, or enabled for a fresh run)."""
+    if settings is None and not (Path(run_dir) / RUN_LOG_FILENAME).exists():
+        return None
+    return RunLog(run_dir, fsync=settings.fsync if settings is not None else True)
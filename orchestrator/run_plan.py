@@ -0,0 +1,292 @@
+"""
+Compiled run plan - the run configuration resolved once per run.
+
+``compile_run_plan()`` takes the merged run config (file + overrides) and
+resolves everything the step loop needs up front: each agent's provider and
+cascade tiers, its prompt template text, whether its step is gated, and the
+approval, validation and prompt-layout settings. The plan is immutable
+(mappings are read-only, lists are tuples) and is written to
+``run_plan.json`` in the run directory, so a resumed run (CLI resume, a
+parked approval, a recovered service job) executes exactly the same plan
+instead of re-reading config, PROVIDER and prompt files.
+
+``ProviderPool`` holds the provider instances of one run, so a provider/model
+is constructed once and reused by every step that uses it.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional, Tuple
+
+from orchestrator import file_cache
+from orchestrator.approval_handler import load_phase_gates
+from orchestrator.knowledge_pack import PackRules, pack_rules
+from orchestrator.model_cascade import resolve_model_tiers
+from orchestrator.prompt_layout import resolve_prompt_layout
+from orchestrator.retrieval import RetrievalRules, retrieval_rules
+from orchestrator.run_control import deadline_settings
+from orchestrator.providers.base import BaseProvider
+from orchestrator.providers.singleflight import SingleFlightProvider
+from orchestrator.shared_fs import atomic_write_json
+from orchestrator.state_digest import DigestRules, digest_rules
+from orchestrator.usage import budget_settings, price_table
+from orchestrator.validation import ValidationConfig
+
+RUN_PLAN_FILENAME = "run_plan.json"
+RUN_PLAN_VERSION = 1
+
+DEFAULT_PLACEHOLDER_MARKERS = ("[Missing", "[Pending", "TODO", "TBD", "PLACEHOLDER", "template")
+
+
+# JSON leaves, checked first: isinstance() against the Mapping ABC is slow
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def freeze(value: Any) -> Any:
+    """Read-only deep copy: dicts become mapping proxies, lists become tuples."""
+    if isinstance(value, _SCALARS):
+        return value
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Plain (JSON-serialisable) deep copy of a frozen value."""
+    if isinstance(value, _SCALARS):
+        return value
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class StepPlan:
+    """One agent step: its config, resolved provider tiers, template, state digest, retrieval and knowledge pack rules."""
+    step_idx: int
+    name: str
+    prompt_path: str
+    agent: Mapping[str, Any]
+    provider_name: str
+    tiers: Tuple[Mapping[str, Optional[str]], ...]
+    template: str
+    gated: bool
+    digest: Optional[DigestRules] = None
+    retrieval: Optional[RetrievalRules] = None
+    knowledge: Optional[PackRules] = None
+
+
+@dataclass(frozen=True)
+class RunPlan:
+    """Immutable, fully resolved run configuration."""
+    config: Mapping[str, Any]
+    config_path: str
+    provider_env: Optional[str]
+    steps: Tuple[StepPlan, ...]
+    gate_strategy: str
+    phase_gates: FrozenSet[int]
+    approval_token: str
+    min_deliverable_chars: int
+    placeholder_markers: Tuple[str, ...]
+    retry_once_on_parse_error: bool
+    prompt_layout: str
+
+    @property
+    def approval(self) -> Mapping[str, Any]:
+        return self.config.get("approval") or MappingProxyType({})
+
+    def validation_config(self) -> ValidationConfig:
+        return ValidationConfig(
+            min_deliverable_chars=self.min_deliverable_chars,
+            placeholder_markers=list(self.placeholder_markers),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": RUN_PLAN_VERSION,
+            "config_path": self.config_path,
+            "provider_env": self.provider_env,
+            "config": thaw(self.config),
+            "steps": [
+                {
+                    "step_idx": step.step_idx,
+                    "provider_name": step.provider_name,
+                    "tiers": thaw(step.tiers),
+                    "template": step.template,
+                    "gated": step.gated,
+                }
+                for step in self.steps
+            ],
+        }
+
+    @property
+    def plan_hash(self) -> str:
+        """SHA256 of the persisted plan (config, resolved steps and templates)."""
+        canonical = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def compile_run_plan(
+    config: Dict[str, Any],
+    config_path: str,
+    provider_env: Optional[str] = None,
+    provider_override_name: Optional[str] = None,
+    templates: Optional[Dict[int, str]] = None,
+    resolved_steps: Optional[Dict[int, Dict[str, Any]]] = None,
+    load_template: Callable[[str], str] = file_cache.read_text,
+) -> RunPlan:
+    """
+    Resolve a merged run config into a RunPlan.
+
+    Args:
+        config: Run config with overrides already applied
+        config_path: Config file the run was started from (recorded only)
+        provider_env: PROVIDER env override; applies to every agent and tier
+        provider_override_name: Name of a provider instance that replaces all
+                                configured providers (e.g. batch mode); every
+                                step then runs as a single tier
+        templates: Step index -> template text (used when loading a persisted
+                   plan); otherwise templates are read from each prompt_path
+        resolved_steps: Step index -> persisted provider_name/tiers (used when
+                        loading a persisted plan)
+        load_template: Reads a prompt template file
+
+    Raises:
+        FileNotFoundError: An agent's prompt file does not exist
+        ValueError: Invalid approval, validation, layout, cascade, digest, retrieval,
+                    knowledge pack, pricing, budget or deadline settings
+    """
+    price_table(config)
+    budget_settings(config)
+    deadline_settings(config)
+    approval_cfg = config.get("approval", {})
+    gate_strategy = (approval_cfg.get("gate_strategy", "per_phase") or "per_phase").strip().lower()
+    phase_gates = frozenset(load_phase_gates(approval_cfg, gate_strategy))
+    validation_cfg = config.get("validation", {})
+
+    steps = []
+    for step_idx, agent_cfg in enumerate(config["agents"], start=1):
+        name, prompt_path = agent_cfg["name"], agent_cfg["prompt_path"]
+
+        if resolved_steps is not None:
+            provider_name = resolved_steps[step_idx]["provider_name"]
+            tiers = resolved_steps[step_idx]["tiers"]
+        elif provider_override_name is not None:
+            # A provider_override (e.g. batch mode) always runs as a single tier
+            provider_name = provider_override_name
+            tiers = [{"provider": provider_name, "model": None}]
+        else:
+            # PROVIDER (--dry_run / --mode) overrides ALL agents, including
+            # per-agent overrides; otherwise per-agent provider, then config default
+            provider_name = provider_env or agent_cfg.get("provider") or config.get("provider")
+            tiers = resolve_model_tiers(agent_cfg, provider_name, env_provider=provider_env)
+
+        if templates is not None:
+            template = templates[step_idx]
+        elif not Path(prompt_path).exists():
+            raise FileNotFoundError(f"Missing prompt file for {name}: {prompt_path}")
+        else:
+            template = load_template(prompt_path)
+
+        if gate_strategy == "per_phase":
+            gated = step_idx in phase_gates
+        elif gate_strategy == "per_agent":
+            gated = bool(agent_cfg.get("gate", False))
+        else:
+            gated = False
+
+        steps.append(StepPlan(
+            step_idx=step_idx,
+            name=name,
+            prompt_path=prompt_path,
+            agent=freeze(agent_cfg),
+            provider_name=provider_name,
+            tiers=freeze(tiers),
+            template=template,
+            gated=gated,
+            digest=digest_rules(agent_cfg),
+            retrieval=retrieval_rules(config, agent_cfg),
+            knowledge=pack_rules(config, agent_cfg),
+        ))
+
+    return RunPlan(
+        config=freeze(config),
+        config_path=str(config_path),
+        provider_env=provider_env,
+        steps=tuple(steps),
+        gate_strategy=gate_strategy,
+        phase_gates=phase_gates,
+        approval_token=approval_cfg.get("require_approval_token", "APPROVE"),
+        min_deliverable_chars=validation_cfg.get("min_deliverable_chars", 300),
+        placeholder_markers=tuple(validation_cfg.get("placeholder_markers", DEFAULT_PLACEHOLDER_MARKERS)),
+        retry_once_on_parse_error=bool(validation_cfg.get("retry_once_on_parse_error", False)),
+        prompt_layout=resolve_prompt_layout(config),
+    )
+
+
+def write_run_plan(run_dir: Path, plan: RunPlan) -> Path:
+    """Persist the plan to <run_dir>/run_plan.json (atomically)."""
+    path = Path(run_dir) / RUN_PLAN_FILENAME
+    atomic_write_json(path, plan.to_dict())
+    return path
+
+
+def read_run_plan(run_dir: Path) -> Optional[RunPlan]:
+    """
+    Load the plan persisted in a run directory.
+
+    Returns:
+        The RunPlan, or None if the run has no persisted plan (older runs)
+
+    Raises:
+        ValueError: Unsupported plan file version
+    """
+    path = Path(run_dir) / RUN_PLAN_FILENAME
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("version") != RUN_PLAN_VERSION:
+        raise ValueError(f"Unsupported run plan version in {path}: {data.get('version')}")
+    steps = {step["step_idx"]: step for step in data["steps"]}
+    return compile_run_plan(
+        data["config"],
+        data["config_path"],
+        provider_env=data.get("provider_env"),
+        templates={idx: step["template"] for idx, step in steps.items()},
+        resolved_steps=steps,
+    )
+
+
+class ProviderPool:
+    """
+    Provider instances for one run, keyed by (provider, model, singleflight).
+
+    Args:
+        factory: ``get_provider``-style callable (provider_name, model=...)
+    """
+
+    def __init__(self, factory: Callable[..., BaseProvider]):
+        self.factory = factory
+        self._providers: Dict[Tuple[str, Optional[str], bool], BaseProvider] = {}
+
+    def get(self, provider_name: str, model: Optional[str] = None, singleflight: bool = False) -> BaseProvider:
+        key = (provider_name, model, singleflight)
+        provider = self._providers.get(key)
+        if provider is None:
+            if singleflight:
+                provider = SingleFlightProvider(self.get(provider_name, model), provider_name)
+            else:
+                provider = self.factory(provider_name, model=model)
+            self._providers[key] = provider
+        return provider
+
+    def __len__(self) -> int:
+        return len(self._providers)
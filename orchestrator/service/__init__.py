@@ -0,0 +1,20 @@
+"""
+Course-factory service: durable leased job queue, worker pool and local HTTP API.
+
+Run with ``python -m adk serve``; add worker-only nodes that share the work
+dir, ``outputs/`` and ``governance/`` with ``python -m adk serve --no-api``.
+"""
+
+from orchestrator.service.jobs import DEFAULT_LEASE_SECONDS, JobQueue, TERMINAL_JOB_STATUSES, new_job_id
+from orchestrator.service.worker import WorkerPool
+from orchestrator.service.api import make_service_server, submit_job
+
+__all__ = [
+    "DEFAULT_LEASE_SECONDS",
+    "JobQueue",
+    "TERMINAL_JOB_STATUSES",
+    "new_job_id",
+    "WorkerPool",
+    "make_service_server",
+    "submit_job",
+]
@@ -0,0 +1,177 @@
+"""
+Local HTTP/JSON API for the course-factory service.
+
+    GET  /health                              service and queue summary
+    POST /jobs                                submit a course (201)
+         {"business_brief": "...", "sme_notes": "..."}  or  {"inputs_dir": "..."}
+         optional: "tenant_id", "priority" (higher first within the tenant), "governance_profile",
+                   "max_step", "config_overrides"
+    GET  /jobs[?status=queued]                list jobs
+    GET  /jobs/<job_id>                       job with live run status
+    GET  /tenants                             per-tenant jobs, queue wait, throughput and quota use
+    POST /jobs/<job_id>/cancel                cancel a queued, running or parked (awaiting_approval) job
+    GET  /jobs/<job_id>/artifacts             list run artifacts
+    GET  /jobs/<job_id>/artifacts/<path>      fetch one artifact
+"""
+
+import json
+import mimetypes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+from urllib.parse import parse_qs, unquote, urlparse
+
+from orchestrator.artifact_store import list_run_artifacts, read_run_bytes
+from orchestrator.run_artifacts import read_manifest
+from orchestrator.service.jobs import JobQueue, new_job_id
+from orchestrator.service.worker import WorkerPool
+from orchestrator.tenants import DEFAULT_TENANT, validate_tenant_id
+
+INPUT_FILES = {"business_brief": "business_brief.md", "sme_notes": "sme_notes.md"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def submit_job(queue: JobQueue, work_dir: Path, body: Dict[str, Any]) -> str:
+    """
+    Queue a job from an API body; inline inputs are written under <work_dir>/<job_id>/inputs.
+
+    Raises:
+        BadRequest: If neither inline inputs nor an existing inputs_dir are given
+    """
+    options = {k: body[k] for k in ("governance_profile", "max_step", "config_overrides") if body.get(k) is not None}
+    priority = body.get("priority", 0)
+    if not isinstance(priority, int):
+        raise BadRequest("priority must be an integer")
+    tenant_id = body.get("tenant_id", DEFAULT_TENANT)
+    try:
+        validate_tenant_id(tenant_id)
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+    if all(isinstance(body.get(k), str) and body[k].strip() for k in INPUT_FILES):
+        job_id = new_job_id()
+        inputs_dir = Path(work_dir) / job_id / "inputs"
+        inputs_dir.mkdir(parents=True, exist_ok=True)
+        for key, filename in INPUT_FILES.items():
+            (inputs_dir / filename).write_text(body[key])
+        return queue.submit(str(inputs_dir), priority=priority, options=options, job_id=job_id, tenant_id=tenant_id)
+
+    inputs_dir = body.get("inputs_dir")
+    if not inputs_dir:
+        raise BadRequest("Provide business_brief and sme_notes, or inputs_dir")
+    missing = [f for f in INPUT_FILES.values() if not (Path(inputs_dir) / f).exists()]
+    if missing:
+        raise BadRequest(f"inputs_dir is missing: {', '.join(missing)}")
+    return queue.submit(inputs_dir, priority=priority, options=options, tenant_id=tenant_id)
+
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job row plus the live run status and progress from its manifest."""
+    view = dict(job)
+    if job.get("run_dir"):
+        try:
+            manifest = read_manifest(Path(job["run_dir"]))
+            view["run_status"] = manifest.get("status")
+            view["current_step_completed"] = manifest.get("current_step_completed")
+            view["pending_approval"] = manifest.get("pending_approval")
+        except FileNotFoundError:
+            pass
+    return view
+
+
+def make_service_server(
+    queue: JobQueue,
+    pool: WorkerPool,
+    work_dir: Path,
+    host: str = "127.0.0.1",
+    port: int = 8780,
+) -> ThreadingHTTPServer:
+    """Build the service HTTP server (call serve_forever() to run it)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Any) -> None:
+            body = json.dumps(payload, indent=2).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+        def _job_or_404(self, job_id: str):
+            job = queue.get(job_id)
+            if job is None:
+                self._send(404, {"error": f"Unknown job: {job_id}"})
+            return job
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [unquote(p) for p in url.path.split("/") if p]
+
+            if parts == ["health"]:
+                return self._send(200, {"status": "ok", "workers": pool.workers, "active": pool.active_jobs(),
+                                        "jobs": queue.counts()})
+            if parts == ["tenants"]:
+                return self._send(200, queue.tenant_stats())
+            if parts == ["jobs"]:
+                status = (parse_qs(url.query).get("status") or [None])[0]
+                return self._send(200, [job_view(j) for j in queue.list(status=status)])
+            if len(parts) < 2 or parts[0] != "jobs":
+                return self._send(404, {"error": "Not found"})
+
+            job = self._job_or_404(parts[1])
+            if job is None:
+                return
+            if len(parts) == 2:
+                return self._send(200, job_view(job))
+            if parts[2] != "artifacts" or not job.get("run_dir"):
+                return self._send(404, {"error": "Not found"})
+
+            # Plain files, artifact store pointers and run log records alike
+            run_dir = Path(job["run_dir"]).resolve()
+            if len(parts) == 3:
+                return self._send(200, list_run_artifacts(run_dir))
+
+            target = run_dir.joinpath(*parts[3:]).resolve()
+            rel_path = target.relative_to(run_dir).as_posix() if run_dir in target.parents else None
+            if rel_path is None or rel_path not in list_run_artifacts(run_dir):
+                return self._send(404, {"error": "Artifact not found"})
+            data = read_run_bytes(run_dir, rel_path)
+            self.send_response(200)
+            self.send_header("Content-Type", mimetypes.guess_type(target.name)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            parts = [unquote(p) for p in urlparse(self.path).path.split("/") if p]
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                return self._send(400, {"error": "Body must be JSON"})
+
+            if parts == ["jobs"]:
+                try:
+                    job_id = submit_job(queue, work_dir, body)
+                except BadRequest as e:
+                    return self._send(400, {"error": str(e)})
+                pool.notify()
+                return self._send(201, job_view(queue.get(job_id)))
+
+            if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+                try:
+                    return self._send(200, job_view(queue.cancel(parts[1])))
+                except KeyError as e:
+                    return self._send(404, {"error": e.args[0]})
+                except ValueError as e:
+                    return self._send(409, {"error": str(e)})
+
+            self._send(404, {"error": "Not found"})
+
+    return ThreadingHTTPServer((host, port), Handler)
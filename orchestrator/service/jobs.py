@@ -0,0 +1,534 @@
+"""
+Durable job queue for the course-factory service (SQLite, stdlib sqlite3).
+
+A job is one course run: its inputs directory, priority and run options.
+Workers claim the highest-priority queued job (oldest first) inside an
+IMMEDIATE transaction, so several worker threads or processes never claim
+the same job.
+
+A claim is a lease: the owning worker renews it with heartbeat() while the
+run is in progress. When a worker crashes (or its host drops off the shared
+filesystem) the lease lapses and the next claim() on any node takes the job
+over; the new owner resumes the run from its latest checkpoint. finish() and
+heartbeat() only succeed for the current lease owner, so a stale worker
+cannot overwrite the job after it has been taken over.
+
+Tenants: every job belongs to a tenant (``tenant_id``, "default" when not
+given). Fresh claims are weighted-fair across tenants (start-time fair
+queuing): each tenant has a virtual finish time that advances by 1/weight
+per job handed out, and the next job goes to the tenant with the smallest
+virtual start time max(system virtual time, its virtual finish), ties by
+tenant id. A tenant that was idle therefore re-joins at the current virtual
+time instead of catching up on the capacity it did not use. Within a tenant,
+higher priority runs first, then oldest. Tenants at their running-job cap or
+out of token quota for the current window are skipped; see
+orchestrator/tenants.py for the policies.
+
+Token quotas are accounted in this database, not per process: a running job
+of a tenant with a quota reserves the estimated tokens of each provider call
+(reserve_tokens) and books its actual tokens on the job (charge_tokens)
+through a TenantQuotaMeter. A tenant's usage is the tokens of its jobs
+finished within the window plus those of its running jobs and their
+in-flight reservations, so its jobs on every node draw on one remainder.
+
+Multi-node: every host opens the same jobs.db on the shared mount. The
+database keeps SQLite's default rollback journal (WAL mode does not work
+over network filesystems); hosts need synchronised clocks, and the lease
+should be well above any clock skew.
+
+Approvals: a job whose run parks at a gate finishes as awaiting_approval.
+Deciding its approval request (orchestrator/approval_queue.py) requeues an
+approved job with the gate to resume after (``resume``), so a worker runs it
+on from there under a lease, or aborts a rejected one.
+
+Job statuses:
+    queued -> running -> completed | failed | aborted | cancelled | awaiting_approval
+    running -> running (lease expired; taken over by another worker)
+    queued -> cancelled (cancel before a worker claims it)
+    awaiting_approval -> queued (approved) | aborted (rejected) | cancelled
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from orchestrator.tenants import DEFAULT_TENANT, TenantSettings, validate_tenant_id
+from orchestrator.usage import UsageMeter
+
+TERMINAL_JOB_STATUSES = {"completed", "failed", "aborted", "cancelled"}
+DEFAULT_LEASE_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id           TEXT PRIMARY KEY,
+    status           TEXT NOT NULL,
+    priority         INTEGER NOT NULL DEFAULT 0,
+    inputs_dir       TEXT NOT NULL,
+    run_dir          TEXT,
+    options          TEXT NOT NULL,
+    created_at       TEXT NOT NULL,
+    started_at       TEXT,
+    finished_at      TEXT,
+    worker_id        TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error            TEXT,
+    lease_expires_at REAL,
+    heartbeat_at     TEXT,
+    attempts         INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Columns added after the first release of the table (migrated in place)
+_LEASE_COLUMNS = {
+    "lease_expires_at": "REAL",
+    "heartbeat_at": "TEXT",
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+}
+_TENANT_COLUMNS = {
+    "tenant_id": f"TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'",
+    "total_tokens": "INTEGER",
+}
+_RESUME_COLUMNS = {
+    "resume": "TEXT",
+}
+_QUOTA_COLUMNS = {
+    "tokens_reserved": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# Fair-scheduling clock: each tenant's virtual finish time, and the system
+# virtual time (the start tag of the last job handed out) under tenant_id ''
+_CLOCK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenant_clock (
+    tenant_id      TEXT PRIMARY KEY,
+    virtual_time   REAL NOT NULL
+)
+"""
+_SYSTEM_CLOCK = ""
+
+
+def new_job_id() -> str:
+    return f"job_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class JobQueue:
+    """
+    SQLite-backed course job queue.
+
+    Args:
+        path: Database file (shared by every node)
+        tenants: Tenant weights, running-job caps and token quotas
+                 (default: every tenant weight 1, unlimited)
+    """
+
+    def __init__(self, path: str, tenants: TenantSettings = None):
+        self.path = Path(path)
+        self.tenants = tenants or TenantSettings()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+            conn.execute(_CLOCK_SCHEMA)
+            existing = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+            for column, decl in {**_LEASE_COLUMNS, **_TENANT_COLUMNS, **_RESUME_COLUMNS, **_QUOTA_COLUMNS}.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {decl}")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_tenant ON jobs (tenant_id, status)")
+
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["resume"] = json.loads(job["resume"]) if job["resume"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def submit(
+        self,
+        inputs_dir: str,
+        priority: int = 0,
+        options: Dict[str, Any] = None,
+        job_id: str = None,
+        tenant_id: str = DEFAULT_TENANT,
+    ) -> str:
+        """
+        Queue a course run for a tenant; within the tenant, higher priority runs first.
+
+        Raises:
+            ValueError: Invalid tenant_id
+        """
+        validate_tenant_id(tenant_id)
+        job_id = job_id or new_job_id()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, priority, inputs_dir, options, created_at, tenant_id) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, int(priority), str(inputs_dir), json.dumps(options or {}), datetime.utcnow().isoformat(),
+                 tenant_id),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, status: str = None) -> List[Dict[str, Any]]:
+        query, params = "SELECT * FROM jobs", []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY created_at, job_id", params).fetchall()
+        return [self._row(r) for r in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def claim(
+        self,
+        worker_id: str,
+        run_dir_for=None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomically lease the next job: a running job whose lease has expired
+        (its worker stopped heartbeating), otherwise the next queued job in
+        weighted-fair tenant order.
+
+        Args:
+            worker_id: Lease owner recorded on the job
+            run_dir_for: Callable(job_id) -> run directory to record (kept on takeover)
+            lease_seconds: Lease length; renew it with heartbeat()
+
+        Returns:
+            The job, with "recovered_from" set to the previous owner on a
+            takeover (None for a fresh claim) and "token_quota_remaining" set
+            to its tenant's unused quota (None = unlimited), or None if
+            nothing is claimable
+        """
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT job_id, status, worker_id, run_dir FROM jobs "
+                "WHERE status = 'running' AND lease_expires_at < ? "
+                "ORDER BY priority DESC, created_at, job_id LIMIT 1",
+                (now,),
+            ).fetchone() or self._fair_pick(conn, now)
+            if row is None:
+                return None
+            job_id = row["job_id"]
+            recovered_from = row["worker_id"] if row["status"] == "running" else None
+            run_dir = row["run_dir"] or (str(run_dir_for(job_id)) if run_dir_for else None)
+            started_at = datetime.utcnow().isoformat()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?), worker_id = ?, "
+                "run_dir = ?, lease_expires_at = ?, heartbeat_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (started_at, worker_id, run_dir, now + lease_seconds, started_at, job_id),
+            )
+        job = self.get(job_id)
+        job["recovered_from"] = recovered_from
+        quota = self.tenants.policy(job["tenant_id"]).token_quota
+        job["token_quota_remaining"] = (
+            None if quota is None else max(0, quota - self.tokens_used().get(job["tenant_id"], 0))
+        )
+        return job
+
+    def _quota_cutoff(self) -> str:
+        return (datetime.utcnow() - timedelta(hours=self.tenants.quota_window_hours)).isoformat()
+
+    def _tokens_used(self, conn: sqlite3.Connection, tenant_id: str = None) -> Dict[str, int]:
+        query = (
+            "SELECT tenant_id, SUM(COALESCE(total_tokens, 0) + tokens_reserved) AS tokens FROM jobs "
+            "WHERE (status = 'running' OR (total_tokens IS NOT NULL AND finished_at >= ?))"
+        )
+        params = [self._quota_cutoff()]
+        if tenant_id is not None:
+            query += " AND tenant_id = ?"
+            params.append(tenant_id)
+        rows = conn.execute(query + " GROUP BY tenant_id HAVING tokens > 0", params).fetchall()
+        return {r["tenant_id"]: r["tokens"] for r in rows}
+
+    def tokens_used(self) -> Dict[str, int]:
+        """
+        Tokens used per tenant against its quota: jobs finished within the
+        quota window, plus running jobs (charged so far and reserved).
+        """
+        with self._connect() as conn:
+            return self._tokens_used(conn)
+
+    def reserve_tokens(self, job_id: str, tenant_id: str, quota: int, tokens: int, release: int = 0) -> Optional[int]:
+        """
+        Reserve ``tokens`` of a tenant's quota for a running job's next
+        provider call, first releasing ``release`` tokens the job reserved
+        before. Runs in one IMMEDIATE transaction, so jobs on different nodes
+        cannot both take the last of the quota.
+
+        Returns:
+            None if the tokens were reserved, else the tenant's tokens used
+            (nothing is reserved)
+        """
+        with self._connect(immediate=True) as conn:
+            if release:
+                conn.execute(
+                    "UPDATE jobs SET tokens_reserved = MAX(0, tokens_reserved - ?) WHERE job_id = ?",
+                    (release, job_id),
+                )
+            used = self._tokens_used(conn, tenant_id).get(tenant_id, 0)
+            if used + tokens > quota:
+                return used
+            conn.execute("UPDATE jobs SET tokens_reserved = tokens_reserved + ? WHERE job_id = ?", (tokens, job_id))
+        return None
+
+    def charge_tokens(self, job_id: str, tokens: int, release: int = 0) -> None:
+        """Book a provider call's tokens on a running job and release its reservation."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET total_tokens = COALESCE(total_tokens, 0) + ?, "
+                "tokens_reserved = MAX(0, tokens_reserved - ?) WHERE job_id = ?",
+                (tokens, release, job_id),
+            )
+
+    def _fair_pick(self, conn: sqlite3.Connection, now: float) -> Optional[sqlite3.Row]:
+        """
+        Next queued job in weighted-fair tenant order (see module docstring),
+        advancing the tenant's virtual clock. Called inside claim()'s transaction.
+        """
+        heads = conn.execute(
+            "SELECT job_id, status, worker_id, run_dir, tenant_id FROM ("
+            "  SELECT *, ROW_NUMBER() OVER (PARTITION BY tenant_id ORDER BY priority DESC, created_at, job_id) AS n"
+            "  FROM jobs WHERE status = 'queued'"
+            ") WHERE n = 1"
+        ).fetchall()
+        if not heads:
+            return None
+        running = {
+            r["tenant_id"]: r["n"] for r in conn.execute(
+                "SELECT tenant_id, COUNT(*) AS n FROM jobs WHERE status = 'running' AND lease_expires_at >= ? "
+                "GROUP BY tenant_id", (now,)
+            )
+        }
+        used = self._tokens_used(conn)
+        clock = {r["tenant_id"]: r["virtual_time"] for r in conn.execute("SELECT * FROM tenant_clock")}
+        system_time = clock.get(_SYSTEM_CLOCK, 0.0)
+
+        best = None
+        for head in heads:
+            tenant_id = head["tenant_id"]
+            policy = self.tenants.policy(tenant_id)
+            if policy.max_concurrent is not None and running.get(tenant_id, 0) >= policy.max_concurrent:
+                continue
+            if policy.token_quota is not None and used.get(tenant_id, 0) >= policy.token_quota:
+                continue
+            start = max(system_time, clock.get(tenant_id, 0.0))
+            if best is None or (start, tenant_id) < (best[0], best[1]["tenant_id"]):
+                best = (start, head, policy)
+        if best is None:
+            return None
+
+        start, head, policy = best
+        conn.executemany(
+            "INSERT INTO tenant_clock (tenant_id, virtual_time) VALUES (?, ?) "
+            "ON CONFLICT(tenant_id) DO UPDATE SET virtual_time = excluded.virtual_time",
+            [(head["tenant_id"], start + 1.0 / policy.weight), (_SYSTEM_CLOCK, start)],
+        )
+        return head
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Renew worker_id's lease on a running job; False if the lease was lost."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, heartbeat_at = ? "
+                "WHERE job_id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + lease_seconds, datetime.utcnow().isoformat(), job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        error: str = None,
+        worker_id: str = None,
+        total_tokens: int = None,
+    ) -> bool:
+        """
+        Record a job's final (or parked) status and the tokens its run used
+        (counted against its tenant's quota; tokens already charged to the
+        job while it ran are kept if they are more) and drop its reservations.
+
+        When worker_id is given the update only applies while that worker
+        still holds the lease; returns False if another worker took over.
+        """
+        query = (
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ?, lease_expires_at = NULL, tokens_reserved = 0, "
+            "total_tokens = CASE WHEN ? IS NULL THEN total_tokens ELSE MAX(COALESCE(total_tokens, 0), ?) END "
+            "WHERE job_id = ?"
+        )
+        params = [status, datetime.utcnow().isoformat(), error, total_tokens, total_tokens, job_id]
+        if worker_id is not None:
+            query += " AND worker_id = ? AND status = 'running'"
+            params.append(worker_id)
+        with self._connect() as conn:
+            cursor = conn.execute(query, params)
+        return cursor.rowcount == 1
+
+    def requeue(self, job_id: str, resume: Dict[str, Any]) -> bool:
+        """
+        Queue a job parked at an approved gate again; the worker that claims
+        it resumes the run after the gate (``resume``: {"request_id", "step_idx"}).
+
+        Returns:
+            False if the job is not awaiting approval
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', resume = ?, worker_id = NULL, lease_expires_at = NULL "
+                "WHERE job_id = ? AND status = 'awaiting_approval'",
+                (json.dumps(resume), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def abort_parked(self, job_id: str, error: str = None) -> bool:
+        """Mark a job parked at a rejected gate aborted; False if it is not awaiting approval."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'aborted', finished_at = ?, error = ? "
+                "WHERE job_id = ? AND status = 'awaiting_approval'",
+                (datetime.utcnow().isoformat(), error, job_id),
+            )
+        return cursor.rowcount == 1
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """
+        Cancel a job: queued jobs stop immediately, running jobs stop before
+        their next step, and a job parked at a gate is cancelled with its run
+        and its pending approval request closed.
+
+        Raises:
+            KeyError: Unknown job
+            ValueError: Job already finished
+        """
+        with self._connect(immediate=True) as conn:
+            row = conn.execute("SELECT status, run_dir FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown job: {job_id}")
+            if row["status"] in ("queued", "awaiting_approval"):
+                conn.execute(
+                    "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ? WHERE job_id = ?",
+                    (datetime.utcnow().isoformat(), job_id),
+                )
+            elif row["status"] == "running":
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+            else:
+                raise ValueError(f"Job {job_id} is already {row['status']}")
+        if row["status"] == "awaiting_approval" and row["run_dir"]:
+            from orchestrator.approval_queue import cancel_parked_run
+            cancel_parked_run(row["run_dir"], f"Job {job_id} cancelled while awaiting approval")
+        return self.get(job_id)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def tenant_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-tenant queue report: job counts by status, queue wait (created ->
+        first started) of the jobs started within the quota window and of the
+        oldest queued job, completed jobs per hour over the window, and tokens
+        used against the quota.
+        """
+        now = datetime.utcnow()
+        cutoff = self._quota_cutoff()
+        window_hours = self.tenants.quota_window_hours
+        with self._connect() as conn:
+            rows = conn.execute("SELECT tenant_id, status, created_at, started_at, finished_at FROM jobs").fetchall()
+            used = self._tokens_used(conn)
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        waits: Dict[str, List[float]] = {}
+        for r in rows:
+            tenant_id = r["tenant_id"]
+            entry = stats.setdefault(tenant_id, {"jobs": {}, "completed_in_window": 0, "oldest_queued_wait_seconds": None})
+            entry["jobs"][r["status"]] = entry["jobs"].get(r["status"], 0) + 1
+            created = datetime.fromisoformat(r["created_at"])
+            if r["started_at"] and r["started_at"] >= cutoff:
+                waits.setdefault(tenant_id, []).append((datetime.fromisoformat(r["started_at"]) - created).total_seconds())
+            if r["status"] == "queued":
+                wait = (now - created).total_seconds()
+                entry["oldest_queued_wait_seconds"] = max(entry["oldest_queued_wait_seconds"] or 0.0, round(wait, 3))
+            if r["status"] == "completed" and r["finished_at"] and r["finished_at"] >= cutoff:
+                entry["completed_in_window"] += 1
+
+        for tenant_id, entry in stats.items():
+            policy = self.tenants.policy(tenant_id)
+            tenant_waits = waits.get(tenant_id, [])
+            entry.update({
+                "weight": policy.weight,
+                "max_concurrent": policy.max_concurrent,
+                "queue_wait_seconds_avg": round(sum(tenant_waits) / len(tenant_waits), 3) if tenant_waits else None,
+                "queue_wait_seconds_max": round(max(tenant_waits), 3) if tenant_waits else None,
+                "throughput_per_hour": round(entry["completed_in_window"] / window_hours, 3),
+                "tokens_used": used.get(tenant_id, 0),
+                "token_quota": policy.token_quota,
+            })
+        return dict(sorted(stats.items()))
+
+
+class TenantQuotaMeter(UsageMeter):
+    """
+    A running job's meter for its tenant's token quota, kept in the shared
+    JobQueue: exceeded_by() reserves the next call's estimated tokens there
+    (refusing when the quota cannot cover them) and charge() books the
+    call's actual tokens on the job. Used as the run's enclosing meter
+    (run_pipeline usage_meter).
+
+    Args:
+        queue: Job queue holding the job
+        job_id: The running job
+        tenant_id: Its tenant
+        quota: The tenant's token quota for the window
+    """
+
+    def __init__(self, queue: JobQueue, job_id: str, tenant_id: str, quota: int):
+        super().__init__(max_tokens=quota, label=f"tenant {tenant_id} quota")
+        self.queue = queue
+        self.job_id = job_id
+        self.tenant_id = tenant_id
+        self._reserved = threading.local()  # per calling thread: tokens reserved for its next call
+
+    def exceeded_by(self, tokens: int, cost_usd: Optional[float]) -> Optional[str]:
+        release = getattr(self._reserved, "tokens", 0)
+        used = self.queue.reserve_tokens(self.job_id, self.tenant_id, self.max_tokens, tokens, release=release)
+        self._reserved.tokens = tokens if used is None else 0
+        if used is not None:
+            return f"{self.label} token budget ({used} + ~{tokens} > {self.max_tokens})"
+        return None
+
+    def charge(self, tokens: int, cost_usd: Optional[float]) -> None:
+        super().charge(tokens, cost_usd)
+        self.queue.charge_tokens(self.job_id, tokens, release=getattr(self._reserved, "tokens", 0))
+        self._reserved.tokens = 0
@@ -0,0 +1,272 @@
+"""
+Worker pool for the course-factory service.
+
+Each worker thread claims jobs from the JobQueue and runs them in-process
+through run_pipeline, so modules, config, prompts and schemas stay loaded
+between courses (orchestrator.file_cache re-reads them only when they
+change on disk).
+
+A daemon has no stdin, so human gates use the approval queue backend: a
+gated job finishes as ``awaiting_approval`` and is decided with
+``python -m adk approvals``. Approving requeues the job and the worker that
+claims it resumes the run after the gate; rejecting aborts the job.
+
+Jobs are leased (see orchestrator.service.jobs). While a job runs, a
+heartbeat thread renews its lease; if the lease is lost the run is fenced
+before its next provider request or run-state write (a response that arrives
+after the loss is dropped). A job taken over from a crashed worker resumes
+from the latest checkpoint in its run directory, so several worker
+processes on one or more hosts can drain one shared queue.
+
+Runs are tagged with their job's tenant. A run of a tenant with a token
+quota is metered against the quota kept in the shared job queue (a
+TenantQuotaMeter, see orchestrator.service.jobs): each provider call
+reserves its estimated tokens there and books its actual tokens on the job,
+so concurrent jobs of the tenant on every node draw on the same remainder
+and a run stops (``budget_exceeded``) instead of overspending. The tokens
+each run used are recorded on the job when it finishes.
+"""
+
+import os
+import socket
+import threading
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from orchestrator.run_artifacts import read_checkpoint, read_latest_checkpoint, read_manifest
+from orchestrator.service.jobs import DEFAULT_LEASE_SECONDS, JobQueue, TenantQuotaMeter
+
+# Manifest status -> job status for a run that returned or exited
+_RUN_STATUS_TO_JOB = {
+    "completed": "completed",
+    "awaiting_approval": "awaiting_approval",
+    "cancelled": "cancelled",
+    "aborted": "aborted",
+    "failed": "failed",
+    "budget_exceeded": "failed",
+    "timed_out": "failed",
+}
+
+SERVICE_CONFIG_OVERRIDES = {"approval": {"backend": "queue"}}
+
+
+def default_worker_prefix() -> str:
+    """Host- and process-unique prefix for worker ids (e.g. "node-a:4242")."""
+    return f"{socket.gethostname().split('.')[0]}:{os.getpid()}"
+
+
+class _LeaseKeeper:
+    """Renews a job lease in the background until stopped or lost."""
+
+    def __init__(self, queue: JobQueue, job_id: str, worker_id: str, lease_seconds: float):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"adk-lease-{job_id}", daemon=True)
+
+    def __enter__(self) -> "_LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                renewed = self.queue.heartbeat(self.job_id, self.worker_id, self.lease_seconds)
+            except Exception:
+                continue  # transient (e.g. shared mount hiccup); retry before the lease lapses
+            if not renewed:
+                self.lost.set()
+                return
+
+
+class WorkerPool:
+    """
+    Fixed-size pool of worker threads draining a JobQueue.
+
+    Args:
+        queue: Job queue to claim from
+        workers: Number of worker threads
+        outputs_dir: Parent directory for job run directories (default: root_agent.OUTPUTS_DIR)
+        poll_interval: Seconds an idle worker waits before polling again
+        lease_seconds: Job lease length; renewed every lease_seconds / 3
+        worker_prefix: Worker id prefix (default: "<hostname>:<pid>")
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = 2,
+        outputs_dir: str = None,
+        poll_interval: float = 1.0,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        worker_prefix: str = None,
+    ):
+        self.queue = queue
+        self.workers = max(1, int(workers))
+        self.outputs_dir = outputs_dir
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_prefix = worker_prefix or default_worker_prefix()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.active: Dict[str, str] = {}  # worker_id -> job_id
+        self._lock = threading.Lock()
+
+    def run_dir_for(self, job_id: str) -> Path:
+        from orchestrator import root_agent
+        return Path(self.outputs_dir or root_agent.OUTPUTS_DIR) / job_id
+
+    def start(self, exit_when_idle: bool = False) -> "WorkerPool":
+        """
+        Start the worker threads.
+
+        Args:
+            exit_when_idle: Let each worker exit once nothing is claimable
+                            (drain mode; see join())
+        """
+        for i in range(self.workers):
+            worker_id = f"{self.worker_prefix}:worker-{i + 1}"
+            thread = threading.Thread(target=self._loop, args=(worker_id, exit_when_idle),
+                                      name=f"adk-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def join(self, timeout: float = None) -> None:
+        """Wait for the worker threads to exit."""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def active_jobs(self) -> Dict[str, str]:
+        """Snapshot of worker_id -> running job_id."""
+        with self._lock:
+            return dict(self.active)
+
+    def notify(self) -> None:
+        """Wake idle workers (e.g. after a submit)."""
+        self._wake.set()
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop claiming new jobs and wait for running jobs to finish."""
+        self._stop.set()
+        self._wake.set()
+        self.join(timeout)
+
+    def _loop(self, worker_id: str, exit_when_idle: bool = False) -> None:
+        while not self._stop.is_set():
+            job = self.queue.claim(worker_id, run_dir_for=self.run_dir_for, lease_seconds=self.lease_seconds)
+            if job is None:
+                if exit_when_idle:
+                    return
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            with self._lock:
+                self.active[worker_id] = job["job_id"]
+            try:
+                with _LeaseKeeper(self.queue, job["job_id"], worker_id, self.lease_seconds) as lease:
+                    status, error = self.run_job(job, worker_id=worker_id, lease=lease)
+            finally:
+                with self._lock:
+                    self.active.pop(worker_id, None)
+            total_tokens = self._run_tokens(Path(job["run_dir"] or self.run_dir_for(job["job_id"])))
+            if not self.queue.finish(job["job_id"], status, error, worker_id=worker_id, total_tokens=total_tokens):
+                print(f"⚠️  {worker_id} lost the lease on {job['job_id']}; its result was not recorded.")
+
+    def run_job(self, job: Dict[str, Any], worker_id: str = None, lease: _LeaseKeeper = None):
+        """
+        Run one job to a stop point; returns (job_status, error).
+
+        A job taken over from another worker (job["recovered_from"]) resumes
+        from the latest checkpoint in its run directory; if that run already
+        reached a stop point, its manifest status is reported as-is. A job
+        requeued by an approval (job["resume"]) resumes after its gate.
+        """
+        from orchestrator.root_agent import RunFencedError, deep_merge, run_pipeline, utc_now, write_ledger
+
+        options = job["options"]
+        run_dir = Path(job["run_dir"] or self.run_dir_for(job["job_id"]))
+        error: Optional[str] = None
+
+        def cancel_check() -> bool:
+            if lease is not None and lease.lost.is_set():
+                raise RunFencedError(f"Lease on {job['job_id']} lost by {worker_id}")
+            return self.queue.cancel_requested(job["job_id"])
+
+        resume_kwargs: Dict[str, Any] = {}
+        if job.get("recovered_from"):
+            try:
+                prior_status = read_manifest(run_dir).get("status")
+            except FileNotFoundError:
+                prior_status = None
+            if prior_status in _RUN_STATUS_TO_JOB:
+                return self._job_result(run_dir, None)
+            last_step, state = read_latest_checkpoint(run_dir / "checkpoints")
+            if prior_status is not None and last_step > 0:
+                resume_kwargs = {"start_step": last_step + 1, "initial_state": state}
+            write_ledger({
+                "timestamp_utc": utc_now(),
+                "event": "job_recovered",
+                "job_id": job["job_id"],
+                "previous_worker": job["recovered_from"],
+                "worker_id": worker_id,
+                "resume_step": resume_kwargs.get("start_step", 1),
+                "run_dir": str(run_dir),
+            })
+        elif job.get("resume"):
+            step_idx = job["resume"]["step_idx"]
+            resume_kwargs = {
+                "start_step": step_idx + 1,
+                "initial_state": read_checkpoint(run_dir / "checkpoints", step_idx),
+            }
+
+        tenant_id = job.get("tenant_id")
+        quota = self.queue.tenants.policy(tenant_id).token_quota
+        if quota is not None:
+            resume_kwargs["usage_meter"] = TenantQuotaMeter(self.queue, job["job_id"], tenant_id, quota)
+
+        try:
+            run_pipeline(
+                run_dir=str(run_dir),
+                inputs_dir=job["inputs_dir"],
+                config_overrides=deep_merge(SERVICE_CONFIG_OVERRIDES, options.get("config_overrides") or {}),
+                governance_profile=options.get("governance_profile"),
+                max_step=options.get("max_step"),
+                cancel_check=cancel_check,
+                tenant_id=tenant_id,
+                service_job={"job_id": job["job_id"], "jobs_path": str(self.queue.path)},
+                **resume_kwargs,
+            )
+        except SystemExit:
+            pass  # run_pipeline already recorded the failure (ledger, manifest)
+        except Exception:
+            error = traceback.format_exc()[-2000:]
+        return self._job_result(run_dir, error)
+
+    @staticmethod
+    def _run_tokens(run_dir: Path) -> Optional[int]:
+        """Total tokens recorded in a run's manifest (None if it has no usage)."""
+        try:
+            return (read_manifest(run_dir).get("usage_totals") or {}).get("total_tokens")
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _job_result(run_dir: Path, error: Optional[str]):
+        try:
+            status = _RUN_STATUS_TO_JOB.get(read_manifest(run_dir).get("status"), "failed")
+        except FileNotFoundError:
+            status = "failed"
+            error = error or "Run did not start (no run manifest)"
+        if status == "failed" and error is None:
+            error = "Run failed (see run ledger)"
+        return status, error
@@ -0,0 +1,71 @@
+"""
+Multi-writer safe file writes for run artifacts on a shared filesystem.
+
+Several worker processes (possibly on different hosts sharing an NFS mount
+of ``outputs/`` and ``governance/``) write run manifests, checkpoints and
+the run ledger:
+
+- atomic_write_json / atomic_write_bytes: write a host/process/thread-unique
+  temp file and rename it into place, so readers never see a partial document.
+- append_line: appends one line under an exclusive POSIX record lock
+  (fcntl.lockf, which NFS clients forward to the server's lock manager),
+  so concurrent appends from different hosts never interleave.
+"""
+
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-host only, appends are unlocked
+    fcntl = None
+
+_HOSTNAME = socket.gethostname().split(".")[0]
+
+
+def _temp_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.{_HOSTNAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def atomic_write_json(path, data: Any, indent: int = 2) -> None:
+    """Write JSON to path via a unique temp file and an atomic rename."""
+    # Serialised up front: one write instead of one per encoder chunk
+    atomic_write_bytes(path, json.dumps(data, indent=indent).encode("utf-8"))
+
+
+def atomic_write_bytes(path, data: bytes) -> None:
+    """Write bytes to path via a unique temp file and an atomic rename."""
+    path = Path(path)
+    tmp_file = _temp_path(path)
+    try:
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_file)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def append_line(path, line: str) -> None:
+    """Append one line (newline added) to path under an exclusive lock."""
+    data = (line.rstrip("\n") + "\n").encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            # Re-seek after taking the lock: NFS O_APPEND is client-side
+            os.lseek(fd, 0, os.SEEK_END)
+            os.write(fd, data)
+        finally:
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
@@ -0,0 +1,178 @@
+"""
+Speculative execution - run the next step(s) while an approval gate is open.
+
+When a gate needs a human decision, the orchestrator starts the steps after
+the gate in a background thread against the post-gate state (the gate itself
+never changes state). Their outputs and checkpoints are held in a staging
+area (<run_dir>/_speculative/) until the gate resolves:
+
+- approved: staged results are handed back to the pipeline loop, which writes
+  them through the normal save/checkpoint/manifest path instead of calling the
+  provider again
+- rejected: the staging area is deleted and the spent work (steps attempted,
+  token usage, wall time) is reported so it can be logged in the ledger
+
+Speculation stops at the next gated step, at max_step, or at the first step
+whose speculative call fails; that step simply runs normally after approval.
+The background thread runs in a copy of the starting thread's context, so
+speculative provider calls obey the run's RunControl (deadlines and
+cancellation, orchestrator/run_control.py). A speculative call records its
+usage on the run through SpeculativeRun.record, which refuses once the
+speculation is discarded: a call still in flight at a rejection is dropped
+without touching the aborted run's usage or budgets.
+
+Configured in run_config.json:
+
+    "speculation": {"enabled": true, "max_steps": 1}
+"""
+
+import contextvars
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from orchestrator.providers.base import add_usage
+from orchestrator.run_artifacts import write_checkpoint
+
+STAGING_DIRNAME = "_speculative"
+
+# step_fn(step_idx, agent_cfg, state, record) -> {"parsed", "provider_name", "model", "usage"};
+# record(fn) runs fn (e.g. charging the run's meter) unless the speculation was discarded
+RecordFn = Callable[[Callable[[], None]], bool]
+StepFn = Callable[[int, Dict[str, Any], Dict[str, Any], RecordFn], Dict[str, Any]]
+MergeFn = Callable[[Dict, Dict], Dict]
+
+
+def speculation_settings(config: Dict[str, Any]) -> Tuple[bool, int]:
+    """Read (enabled, max_steps) from run_config ("speculation"); disabled by default."""
+    cfg = config.get("speculation") or {}
+    return bool(cfg.get("enabled", False)), max(1, int(cfg.get("max_steps", 1)))
+
+
+class SpeculativeRun:
+    """
+    Background execution of the steps following an open approval gate.
+
+    Args:
+        run_dir: Run output directory; staging lives in <run_dir>/_speculative
+        gate_step: Step index whose gate is pending
+        steps: (step_idx, agent_cfg) pairs to run, in order
+        state: Post-gate system state
+        step_fn: Executes one step and returns its staged result (raises on failure);
+                 records provider usage on the run only through record()
+        merge_fn: State merge used between chained steps (deep_merge)
+    """
+
+    def __init__(
+        self,
+        run_dir: str,
+        gate_step: int,
+        steps: List[Tuple[int, Dict[str, Any]]],
+        state: Dict[str, Any],
+        step_fn: StepFn,
+        merge_fn: MergeFn,
+    ):
+        self.staging_dir = Path(run_dir) / STAGING_DIRNAME
+        self.gate_step = gate_step
+        self.steps = steps
+        self.state = state
+        self.step_fn = step_fn
+        self.merge_fn = merge_fn
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.steps_attempted = 0
+        self.usage: Optional[Dict[str, int]] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(self._run,),
+            name=f"speculate-after-{gate_step}", daemon=True,
+        )
+        self._started_at = 0.0
+
+    def start(self) -> "SpeculativeRun":
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        (self.staging_dir / "checkpoints").mkdir(parents=True)
+        self._started_at = time.monotonic()
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        state = self.state
+        for step_idx, agent_cfg in self.steps:
+            with self._lock:
+                if self._cancelled:
+                    return
+                self.steps_attempted += 1
+            try:
+                result = self.step_fn(step_idx, agent_cfg, state, self.record)
+            except Exception as e:
+                with self._lock:
+                    if not self._cancelled:
+                        self.error = f"step {step_idx}: {e}"[:200]
+                return
+            state = self.merge_fn(state, result["parsed"]["updated_state"])
+
+            with self._lock:
+                if self._cancelled:
+                    return
+                self.usage = add_usage(self.usage, result.get("usage"))
+                self._stage(step_idx, agent_cfg["name"], result["parsed"], state)
+                self.results[step_idx] = result
+
+    def record(self, fn: Callable[[], None]) -> bool:
+        """Run ``fn`` unless the speculation was discarded; returns whether it ran."""
+        with self._lock:
+            if self._cancelled:
+                return False
+            fn()
+            return True
+
+    def _stage(self, step_idx: int, agent_name: str, parsed: Dict[str, Any], state: Dict[str, Any]) -> None:
+        with open(self.staging_dir / f"{step_idx:02d}_{agent_name}.md", "w") as f:
+            f.write(parsed["deliverable_markdown"])
+        with open(self.staging_dir / f"{step_idx:02d}_{agent_name}_state.json", "w") as f:
+            json.dump(parsed, f, indent=2)
+        write_checkpoint(self.staging_dir / "checkpoints", step_idx, state)
+
+    def _summary(self, in_flight: bool) -> Dict[str, Any]:
+        return {
+            "gate_step": self.gate_step,
+            "steps": sorted(self.results),
+            "steps_attempted": self.steps_attempted,
+            "usage": self.usage,
+            "elapsed_seconds": round(time.monotonic() - self._started_at, 3),
+            "in_flight": in_flight,
+            "error": self.error,
+        }
+
+    def commit(self) -> Tuple[Dict[int, Dict[str, Any]], Dict[str, Any]]:
+        """
+        Gate approved: wait for the speculative steps and release their results.
+
+        Returns:
+            (results by step_idx, summary dict for the ledger)
+        """
+        self._thread.join()
+        summary = self._summary(in_flight=False)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        return dict(self.results), summary
+
+    def discard(self) -> Dict[str, Any]:
+        """
+        Gate rejected: stop after the in-flight call and delete the staging area.
+
+        An in-flight provider call cannot be interrupted; its result and usage
+        are dropped (nothing is recorded through record() after this returns).
+
+        Returns:
+            Summary dict (work spent so far) for the ledger
+        """
+        with self._lock:
+            self._cancelled = True
+            summary = self._summary(in_flight=self._thread.is_alive())
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+        return summary
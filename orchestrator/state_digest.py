@@ -0,0 +1,305 @@
+"""
+Token-budgeted system state digests for broad-context agents.
+
+The auditing/librarian agents (qa, change_management, operations_librarian)
+otherwise receive the whole system state, which by step 8 holds every module
+design, assessment and storyboard. A digest replaces it with a deterministic,
+structured summary:
+
+- per section: a short SHA256 and the size of the full section, plus a
+  summary (IDs, titles, counts) at the most detailed level that fits
+- objective coverage: each curriculum objective with the assessment
+  question IDs that reference it, uncovered objectives and orphan refs
+- sections listed in ``full_sections`` (or expanded on request) verbatim
+
+Detail is lowered one level at a time on the largest summarised section
+until the digest fits ``budget_tokens`` (estimated at 4 chars per token).
+
+An agent that needs detail answers with only
+``{"expand_sections": ["storyboards"]}``; the orchestrator re-sends the
+prompt with those sections in full (up to ``max_expansions`` times per step).
+A reply that still asks for sections after that (or names none it can get)
+is answered by one final attempt with the full state instead of the digest.
+
+Opt-in per agent in run_config (the shipped config lists the blocks with
+``"enabled": false``)::
+
+    {"name": "qa_agent", ...,
+     "state_digest": {"enabled": true, "budget_tokens": 3000, "full_sections": ["qa"], "max_expansions": 1}}
+"""
+
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from orchestrator.json_tools import parse_json_object
+
+CHARS_PER_TOKEN = 4
+DEFAULT_BUDGET_TOKENS = 4000
+DEFAULT_MAX_EXPANSIONS = 1
+
+# Summary detail levels, most detailed first
+DETAIL_LEVELS = ("detail", "outline", "counts")
+
+# Sections carried elsewhere in the prompt ({business_brief}, {sme_notes}); hash only
+PROMPT_INPUT_SECTIONS = ("inputs",)
+
+ID_FIELDS = ("module_id", "q_id", "screen_id", "id", "asset_id")
+TITLE_FIELDS = ("title", "name", "objective_ref")
+TEXT_LIMITS = {"detail": 160, "outline": 60}
+
+
+@dataclass(frozen=True)
+class DigestRules:
+    """Per-agent digest settings (run_config agent ``state_digest`` block)."""
+    budget_tokens: int = DEFAULT_BUDGET_TOKENS
+    full_sections: Tuple[str, ...] = ()
+    max_expansions: int = DEFAULT_MAX_EXPANSIONS
+
+
+def digest_rules(agent_cfg: Mapping[str, Any]) -> Optional[DigestRules]:
+    """
+    Read an agent's ``state_digest`` block.
+
+    Returns:
+        DigestRules, or None when the agent gets the (pruned) state as before
+
+    Raises:
+        ValueError: Malformed settings
+    """
+    cfg = agent_cfg.get("state_digest")
+    if not cfg or not cfg.get("enabled", True):
+        return None
+    name = agent_cfg.get("name")
+    budget = cfg.get("budget_tokens", DEFAULT_BUDGET_TOKENS)
+    max_expansions = cfg.get("max_expansions", DEFAULT_MAX_EXPANSIONS)
+    full_sections = cfg.get("full_sections", [])
+    if not isinstance(budget, int) or budget <= 0:
+        raise ValueError(f"state_digest.budget_tokens for '{name}' must be a positive integer")
+    if not isinstance(max_expansions, int) or max_expansions < 0:
+        raise ValueError(f"state_digest.max_expansions for '{name}' must be a non-negative integer")
+    if isinstance(full_sections, str) or not all(isinstance(s, str) for s in full_sections):
+        raise ValueError(f"state_digest.full_sections for '{name}' must be a list of section names")
+    return DigestRules(budget, tuple(full_sections), max_expansions)
+
+
+def tokens_for_chars(chars: int) -> int:
+    """Rough token estimate for a text length (no tokenizer dependency)."""
+    return math.ceil(chars / CHARS_PER_TOKEN)
+
+
+def estimate_tokens(text: str) -> int:
+    return tokens_for_chars(len(text))
+
+
+def render_digest(digest: Mapping[str, Any]) -> str:
+    """Prompt text for a digest: compact JSON (no indentation, which costs tokens)."""
+    return json.dumps(digest, separators=(",", ":"))
+
+
+def _dumps(value: Any) -> str:
+    return render_digest(value)
+
+
+def _sha(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def _short(text: str, level: str) -> Any:
+    limit = TEXT_LIMITS.get(level)
+    if limit is None:
+        return {"chars": len(text)}
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _item_label(item: Any, level: str) -> Any:
+    """ID/title/list-size line for one list item."""
+    if not isinstance(item, Mapping):
+        return _short(item, level) if isinstance(item, str) else item
+    label = {k: item[k] for k in ID_FIELDS if k in item}
+    for k in TITLE_FIELDS:
+        if k in item and isinstance(item[k], str):
+            label[k] = _short(item[k], level)
+            break
+    if level == "detail":
+        for k, v in item.items():
+            if isinstance(v, list) and k not in label:
+                label[f"{k}_count"] = len(v)
+    return label or {"keys": sorted(item)[:8]}
+
+
+def _outline_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return f"<list:{len(value)}>"
+    if isinstance(value, Mapping):
+        return f"<dict:{len(value)}>"
+    return _short(value, "outline") if isinstance(value, str) else value
+
+
+def summarize(value: Any, level: str) -> Any:
+    """Summarise one state section at a detail level (see DETAIL_LEVELS)."""
+    if isinstance(value, str):
+        return _short(value, level)
+    if isinstance(value, list):
+        if level == "counts":
+            return {"count": len(value)}
+        return {"count": len(value), "items": [_item_label(item, level) for item in value]}
+    if isinstance(value, Mapping):
+        if level == "counts":
+            return {"keys": len(value)}
+        if level == "outline":
+            return {k: _outline_value(v) for k, v in value.items()}
+        return {k: summarize(v, "outline") for k, v in value.items()}
+    return value
+
+
+def _questions(state: Mapping[str, Any]) -> List[Mapping[str, Any]]:
+    """Assessment questions wherever the assessment designer put them."""
+    found = []
+    assessment = state.get("assessment")
+    candidates = [assessment.get("questions") if isinstance(assessment, Mapping) else None, state.get("assessments")]
+    for items in candidates:
+        for item in items or []:
+            if not isinstance(item, Mapping):
+                continue
+            if "objective_ref" in item:
+                found.append(item)
+            for q in item.get("questions") or []:
+                if isinstance(q, Mapping) and "objective_ref" in q:
+                    found.append(q)
+    return found
+
+
+def objective_coverage(state: Mapping[str, Any], level: str = "detail") -> Dict[str, Any]:
+    """Curriculum objective -> question IDs, uncovered objectives and orphan objective_refs."""
+    modules = (state.get("curriculum") or {}).get("modules") or []
+    questions = _questions(state)
+    q_ids_by_ref: Dict[str, List[Any]] = {}
+    for q in questions:
+        q_ids_by_ref.setdefault(q.get("objective_ref"), []).append(q.get("q_id"))
+
+    rows, uncovered, known = [], [], set()
+    for module in modules:
+        if not isinstance(module, Mapping):
+            continue
+        for objective in module.get("objectives") or []:
+            known.add(objective)
+            q_ids = q_ids_by_ref.get(objective, [])
+            rows.append({"module_id": module.get("module_id"), "objective": _short(objective, "outline"),
+                         "q_ids": q_ids})
+            if not q_ids:
+                uncovered.append(rows[-1]["objective"])
+    coverage = {
+        "objectives": len(rows),
+        "questions": len(questions),
+        "covered": len(rows) - len(uncovered),
+        "uncovered": uncovered,
+        "orphan_refs": sorted(_short(str(ref), "outline") for ref in q_ids_by_ref if ref not in known),
+    }
+    if level == "detail":
+        coverage["by_objective"] = rows
+    return coverage
+
+
+def build_state_digest(
+    state: Mapping[str, Any],
+    rules: DigestRules,
+    expand: Iterable[str] = (),
+    can_expand: bool = True,
+) -> Dict[str, Any]:
+    """
+    Build the digest of ``state`` for an agent.
+
+    Args:
+        state: Full system state
+        rules: The agent's DigestRules
+        expand: Section names to include in full (on-demand expansion)
+        can_expand: Whether the agent may still request an expansion
+
+    Returns:
+        JSON-serialisable digest; deterministic for a given state, rules and expand
+    """
+    verbatim = set(rules.full_sections) | set(expand)
+    sections: Dict[str, Dict[str, Any]] = {}
+    levels: Dict[str, int] = {}
+    for name, value in state.items():
+        entry = {"sha256": _sha(value), "chars": len(json.dumps(value, indent=2))}
+        if name in verbatim:
+            entry["full"] = value
+        elif name in PROMPT_INPUT_SECTIONS:
+            entry["see"] = "business brief and SME notes above"
+        else:
+            levels[name] = 0
+            entry["detail"] = DETAIL_LEVELS[0]
+            entry["summary"] = summarize(value, DETAIL_LEVELS[0])
+        sections[name] = entry
+
+    expandable = sorted(n for n in state if n not in verbatim)
+    digest = {
+        "_digest": {
+            "note": "Compact digest of the system state: per-section IDs, titles and counts, "
+                    "with a sha256 prefix and the size of each full section.",
+            "expand": (
+                'To read sections in full, reply with only {"expand_sections": ["<section>", ...]}. '
+                f"Expandable: {', '.join(expandable)}" if can_expand and rules.max_expansions > 0 and expandable
+                else "No further sections can be expanded."
+            ),
+        },
+        "objective_coverage": objective_coverage(state),
+        "sections": sections,
+    }
+
+    # Lower detail on the largest summarised section until the digest fits
+    coverage_level = 0
+    while estimate_tokens(_dumps(digest)) > rules.budget_tokens:
+        candidates = [n for n, lvl in levels.items() if lvl < len(DETAIL_LEVELS) - 1]
+        if candidates:
+            name = max(candidates, key=lambda n: (len(_dumps(sections[n]["summary"])), n))
+            levels[name] += 1
+            level = DETAIL_LEVELS[levels[name]]
+            sections[name]["detail"] = level
+            sections[name]["summary"] = summarize(state[name], level)
+        elif coverage_level == 0:
+            coverage_level = 1
+            digest["objective_coverage"] = objective_coverage(state, DETAIL_LEVELS[1])
+        else:
+            break  # already at minimum detail (verbatim sections are never reduced)
+    return digest
+
+
+def _expansion_request(response: str) -> Optional[list]:
+    """The ``expand_sections`` list of a reply that only asks for sections, else None."""
+    try:
+        parsed = parse_json_object(response)
+    except Exception:
+        return None
+    if not isinstance(parsed, dict) or "deliverable_markdown" in parsed:
+        return None
+    requested = parsed.get("expand_sections")
+    return requested if isinstance(requested, list) else None
+
+
+def expansion_requested(response: str) -> bool:
+    """Whether a reply only asks for sections (whether or not they can still be expanded)."""
+    return _expansion_request(response) is not None
+
+
+def requested_sections(response: str, state: Mapping[str, Any], already: Iterable[str] = ()) -> List[str]:
+    """
+    Sections an agent asked to expand (a reply of only ``{"expand_sections": [...]}``).
+
+    Returns:
+        New, known section names in request order; [] for a normal response
+    """
+    requested = _expansion_request(response)
+    if requested is None:
+        return []
+    already = set(already)
+    sections = []
+    for name in requested:
+        if isinstance(name, str) and name in state and name not in already and name not in sections:
+            sections.append(name)
+    return sections
@@ -0,0 +1,116 @@
+"""
+Tenants - which business unit a course run belongs to, and its share of factory capacity.
+
+Signals and proposals carry ``tenant_context.tenant_id``; course runs are
+tagged the same way in service and batch mode (``run_manifest.json``
+``tenant_id``). The service job queue schedules queued jobs weighted-fair
+across tenants (see orchestrator/service/jobs.py), caps each tenant's
+running jobs and stops handing out jobs once its token quota for the
+current window is used up; batch mode charges each tenant's courses to a
+shared tenant meter.
+
+Configured in run_config (all keys optional; tenants without a policy use
+``default``)::
+
+    "tenants": {
+        "quota_window_hours": 24,
+        "default": {"weight": 1, "max_concurrent": null, "token_quota": null},
+        "policies": {"sales": {"weight": 2, "max_concurrent": 2, "token_quota": 5000000}}
+    }
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from orchestrator.usage import UsageMeter
+
+DEFAULT_TENANT = "default"
+DEFAULT_QUOTA_WINDOW_HOURS = 24.0
+
+_TENANT_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+@dataclass(frozen=True)
+class TenantPolicy:
+    """Scheduling weight, running-job cap and token quota of one tenant."""
+    weight: float = 1.0
+    max_concurrent: Optional[int] = None
+    token_quota: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class TenantSettings:
+    """Resolved ``tenants`` block."""
+    default: TenantPolicy = TenantPolicy()
+    policies: Mapping[str, TenantPolicy] = field(default_factory=dict)
+    quota_window_hours: float = DEFAULT_QUOTA_WINDOW_HOURS
+
+    def policy(self, tenant_id: str) -> TenantPolicy:
+        return self.policies.get(tenant_id, self.default)
+
+
+def validate_tenant_id(tenant_id: Any) -> str:
+    """
+    Raises:
+        ValueError: Not 1-64 letters, digits, '_', '.' or '-'
+    """
+    if not isinstance(tenant_id, str) or not _TENANT_ID.match(tenant_id):
+        raise ValueError(f"Invalid tenant_id: {tenant_id!r} (use 1-64 letters, digits, '_', '.' or '-')")
+    return tenant_id
+
+
+def _policy(name: str, cfg: Any) -> TenantPolicy:
+    if not isinstance(cfg, Mapping):
+        raise ValueError(f"tenants policy '{name}' must be an object")
+    weight = cfg.get("weight", 1.0)
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+        raise ValueError(f"tenants.{name}.weight must be a positive number")
+    values = {}
+    for key in ("max_concurrent", "token_quota"):
+        value = cfg.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+            raise ValueError(f"tenants.{name}.{key} must be a positive integer or null")
+        values[key] = value
+    return TenantPolicy(weight=float(weight), **values)
+
+
+def tenant_settings(config: Mapping[str, Any]) -> TenantSettings:
+    """
+    Read the ``tenants`` block of a run config.
+
+    Raises:
+        ValueError: Malformed policies or tenant ids
+    """
+    cfg = config.get("tenants") or {}
+    window = cfg.get("quota_window_hours", DEFAULT_QUOTA_WINDOW_HOURS)
+    if isinstance(window, bool) or not isinstance(window, (int, float)) or window <= 0:
+        raise ValueError("tenants.quota_window_hours must be a positive number")
+    policies = cfg.get("policies") or {}
+    if not isinstance(policies, Mapping):
+        raise ValueError("tenants.policies must map tenant ids to policies")
+    return TenantSettings(
+        default=_policy("default", cfg.get("default") or {}),
+        policies={validate_tenant_id(t): _policy(t, p) for t, p in policies.items()},
+        quota_window_hours=float(window),
+    )
+
+
+def tenant_meters(
+    settings: TenantSettings,
+    tenant_ids: Iterable[str],
+    parent: Optional[UsageMeter] = None,
+) -> Dict[str, UsageMeter]:
+    """
+    One meter per tenant, limited to its token quota and charged through to
+    ``parent`` (e.g. the batch meter). Tenants without a quota share
+    ``parent`` directly (None when it is unlimited too).
+    """
+    meters = {}
+    for tenant_id in sorted(set(tenant_ids)):
+        quota = settings.policy(tenant_id).token_quota
+        if quota is not None:
+            meters[tenant_id] = UsageMeter(max_tokens=quota, parent=parent, label=f"tenant {tenant_id} quota")
+        elif parent is not None:
+            meters[tenant_id] = parent
+    return meters
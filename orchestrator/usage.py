@@ -0,0 +1,381 @@
+"""
+Provider usage, cost accounting and per-run / per-batch budgets.
+
+Every provider call made by a step is recorded (including parse retries and
+digest expansions; providers that make several HTTP requests per call -
+rate-limit retries, JSON-mode fallback, JSON repair - list them in
+``last_requests``). A call's cost is priced from the ``pricing`` table in
+run_config, so estimates work offline. Calls answered from a cassette replay
+keep the recorded usage and price but are marked ``replayed``: they are not
+charged to any meter and ``usage_totals`` counts them apart (nothing was
+spent)::
+
+    "pricing": {
+        "default_models": {"openai": "gpt-4o-mini"},
+        "models": {"gpt-4o-mini": {"input_per_1m": 0.15, "cached_input_per_1m": 0.075, "output_per_1m": 0.6}}
+    }
+
+``budget`` sets hard limits checked before each call (estimated prompt tokens
+plus ``reserve_completion_tokens``)::
+
+    "budget": {"max_run_tokens": 200000, "max_run_cost_usd": 2.0,
+               "max_batch_tokens": null, "max_batch_cost_usd": 10.0,
+               "on_exceed": "stop", "reserve_completion_tokens": 2000}
+
+``on_exceed: "stop"`` stops the run (status ``budget_exceeded``, resumable).
+``"downgrade"`` first keeps model_cascade steps on their current (cheaper)
+tier instead of escalating, and stops only when that tier cannot be afforded.
+"""
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from orchestrator.providers.base import add_usage
+from orchestrator.state_digest import tokens_for_chars
+
+ON_EXCEED_ACTIONS = ("stop", "downgrade")
+DEFAULT_RESERVE_COMPLETION_TOKENS = 2000
+TOKENS_PER_PRICE_UNIT = 1_000_000
+
+# Kinds of HTTP request inside one provider call (see BaseProvider.last_requests)
+REQUEST_KINDS = ("request", "retry", "fallback", "repair")
+
+
+class BudgetExceededError(Exception):
+    """Raised before a provider call that would take the run or batch over budget."""
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per 1M tokens."""
+    input_per_1m: float
+    output_per_1m: float
+    cached_input_per_1m: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class PriceTable:
+    models: Mapping[str, ModelPrice]
+    default_models: Mapping[str, str]
+
+    def model_for(self, provider_name: Optional[str], model: Optional[str]) -> Optional[str]:
+        """Model a call is priced as: the explicit model, else the provider's default."""
+        return model or self.default_models.get(provider_name or "")
+
+    def price_for(self, provider_name: Optional[str], model: Optional[str]) -> Optional[ModelPrice]:
+        return self.models.get(self.model_for(provider_name, model) or "")
+
+
+@dataclass(frozen=True)
+class BudgetSettings:
+    """Hard usage limits (run_config ``budget`` block); None means unlimited."""
+    max_run_tokens: Optional[int] = None
+    max_run_cost_usd: Optional[float] = None
+    max_batch_tokens: Optional[int] = None
+    max_batch_cost_usd: Optional[float] = None
+    on_exceed: str = "stop"
+    reserve_completion_tokens: int = DEFAULT_RESERVE_COMPLETION_TOKENS
+
+    @property
+    def has_run_limits(self) -> bool:
+        return self.max_run_tokens is not None or self.max_run_cost_usd is not None
+
+    @property
+    def has_batch_limits(self) -> bool:
+        return self.max_batch_tokens is not None or self.max_batch_cost_usd is not None
+
+
+def _non_negative(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def price_table(config: Mapping[str, Any]) -> PriceTable:
+    """
+    Read the ``pricing`` block of a run config.
+
+    Raises:
+        ValueError: Malformed price entries
+    """
+    cfg = config.get("pricing") or {}
+    models = {}
+    for name, entry in (cfg.get("models") or {}).items():
+        if not isinstance(entry, Mapping):
+            raise ValueError(f"pricing.models.{name} must be an object")
+        for key in ("input_per_1m", "output_per_1m"):
+            if not _non_negative(entry.get(key)):
+                raise ValueError(f"pricing.models.{name}.{key} must be a non-negative number")
+        cached = entry.get("cached_input_per_1m")
+        if cached is not None and not _non_negative(cached):
+            raise ValueError(f"pricing.models.{name}.cached_input_per_1m must be a non-negative number")
+        models[name] = ModelPrice(entry["input_per_1m"], entry["output_per_1m"], cached)
+    default_models = cfg.get("default_models") or {}
+    if not all(isinstance(v, str) for v in default_models.values()):
+        raise ValueError("pricing.default_models must map provider names to model names")
+    return PriceTable(models, dict(default_models))
+
+
+def budget_settings(config: Mapping[str, Any]) -> BudgetSettings:
+    """
+    Read the ``budget`` block of a run config.
+
+    Raises:
+        ValueError: Malformed limits or on_exceed action
+    """
+    cfg = config.get("budget") or {}
+    for key in ("max_run_tokens", "max_batch_tokens", "reserve_completion_tokens"):
+        value = cfg.get(key)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            raise ValueError(f"budget.{key} must be a non-negative integer")
+    for key in ("max_run_cost_usd", "max_batch_cost_usd"):
+        value = cfg.get(key)
+        if value is not None and not _non_negative(value):
+            raise ValueError(f"budget.{key} must be a non-negative number")
+    on_exceed = cfg.get("on_exceed", "stop")
+    if on_exceed not in ON_EXCEED_ACTIONS:
+        raise ValueError(f"budget.on_exceed must be one of {', '.join(ON_EXCEED_ACTIONS)}")
+    reserve = cfg.get("reserve_completion_tokens")
+    return BudgetSettings(
+        max_run_tokens=cfg.get("max_run_tokens"),
+        max_run_cost_usd=cfg.get("max_run_cost_usd"),
+        max_batch_tokens=cfg.get("max_batch_tokens"),
+        max_batch_cost_usd=cfg.get("max_batch_cost_usd"),
+        on_exceed=on_exceed,
+        reserve_completion_tokens=DEFAULT_RESERVE_COMPLETION_TOKENS if reserve is None else reserve,
+    )
+
+
+def usage_cost(usage: Optional[Mapping[str, int]], price: Optional[ModelPrice]) -> Optional[float]:
+    """USD cost of a normalized usage dict; None when the model has no price."""
+    if price is None or not usage:
+        return None
+    cached = usage.get("cached_tokens", 0)
+    cached_rate = price.input_per_1m if price.cached_input_per_1m is None else price.cached_input_per_1m
+    cost = (
+        (usage.get("prompt_tokens", 0) - cached) * price.input_per_1m
+        + cached * cached_rate
+        + usage.get("completion_tokens", 0) * price.output_per_1m
+    ) / TOKENS_PER_PRICE_UNIT
+    return round(cost, 6)
+
+
+def estimated_usage(prompt_chars: int, completion_tokens: int = 0) -> Dict[str, int]:
+    """Usage estimate for a call from its prompt size (4 chars per token)."""
+    prompt_tokens = tokens_for_chars(prompt_chars)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "cached_tokens": 0,
+    }
+
+
+def call_record(
+    kind: str,
+    provider_name: str,
+    model: Optional[str],
+    usage: Optional[Mapping[str, int]],
+    latency_ms: int,
+    prices: PriceTable,
+    prompt_chars: int = 0,
+    response_chars: int = 0,
+    requests: Optional[List[Dict[str, Any]]] = None,
+    replayed: bool = False,
+) -> Dict[str, Any]:
+    """
+    One provider call as recorded in the run manifest.
+
+    Providers that report no usage (dry_run, manual, CLI) are estimated from
+    prompt/response size and marked ``estimated``; calls served from a
+    cassette are marked ``replayed``.
+    """
+    estimated = not usage
+    if estimated:
+        usage = estimated_usage(prompt_chars, tokens_for_chars(response_chars))
+    priced_model = prices.model_for(provider_name, model)
+    record = {
+        "kind": kind,
+        "provider": provider_name,
+        "model": priced_model,
+        **{k: usage.get(k, 0) for k in ("prompt_tokens", "completion_tokens", "cached_tokens", "total_tokens")},
+        "estimated": estimated,
+        "cost_usd": usage_cost(usage, prices.price_for(provider_name, model)),
+        "latency_ms": latency_ms,
+    }
+    if requests:
+        record["requests"] = [dict(r) for r in requests]
+    if replayed:
+        record["replayed"] = True
+    return record
+
+
+def summarize_calls(calls: List[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Totals for a list of call records (a step or a whole run); replayed calls spend nothing."""
+    replayed = sum(1 for c in calls if c.get("replayed"))
+    if replayed:
+        calls = [c for c in calls if not c.get("replayed")]
+    return {
+        "calls": len(calls),
+        "replayed_calls": replayed,
+        "requests": sum(len(c.get("requests") or ()) or 1 for c in calls),
+        "retries": sum(1 for c in calls for r in c.get("requests") or () if r.get("kind") != "request"),
+        "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+        "completion_tokens": sum(c["completion_tokens"] for c in calls),
+        "cached_tokens": sum(c["cached_tokens"] for c in calls),
+        "total_tokens": sum(c["total_tokens"] for c in calls),
+        "estimated_calls": sum(1 for c in calls if c.get("estimated")),
+        "unpriced_calls": sum(1 for c in calls if c.get("cost_usd") is None),
+        "cost_usd": round(sum(c.get("cost_usd") or 0.0 for c in calls), 6),
+        "latency_ms": sum(c.get("latency_ms", 0) for c in calls),
+    }
+
+
+def update_usage_manifest(
+    manifest: Dict[str, Any],
+    step_calls: Dict[int, List[Dict[str, Any]]],
+    budget: BudgetSettings,
+    step_idx: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Move recorded calls into the run manifest and refresh its run totals.
+
+    Calls are appended to ``usage_calls_by_step`` (a re-run step keeps the
+    calls of earlier attempts: they were paid for) and summarised in
+    ``usage_totals``.
+
+    Args:
+        manifest: Run manifest (updated in place)
+        step_calls: Step index -> call records not yet in the manifest
+        budget: The run's budget settings (recorded with the totals)
+        step_idx: Move only this step's calls (default: all)
+
+    Returns:
+        The updated ``usage_totals``
+    """
+    calls_by_step = manifest.setdefault("usage_calls_by_step", {})
+    for idx in sorted(step_calls) if step_idx is None else [step_idx]:
+        calls = step_calls.pop(idx, [])
+        if calls:
+            calls_by_step.setdefault(str(idx), []).extend(calls)
+    totals = summarize_calls([c for calls in calls_by_step.values() for c in calls])
+    if budget.has_run_limits or budget.has_batch_limits:
+        totals["budget"] = asdict(budget)
+    manifest["usage_totals"] = totals
+    return totals
+
+
+class UsageMeter:
+    """
+    Thread-safe running usage totals with optional hard limits.
+
+    A run's meter may have a ``parent`` (the batch meter) that every charge
+    also counts against; ``check()`` fails when either limit would be crossed.
+
+    Args:
+        max_tokens: Token limit for this scope (None = unlimited)
+        max_cost_usd: USD limit for this scope (None = unlimited)
+        parent: Enclosing meter (e.g. the batch), charged with every call
+        label: Scope name used in error messages ("run", "batch")
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost_usd: Optional[float] = None,
+        parent: Optional["UsageMeter"] = None,
+        label: str = "run",
+    ):
+        self.max_tokens = max_tokens
+        self.max_cost_usd = max_cost_usd
+        self.parent = parent
+        self.label = label
+        self.tokens = 0
+        self.cost_usd = 0.0
+        self._lock = threading.Lock()
+
+    def exceeded_by(self, tokens: int, cost_usd: Optional[float]) -> Optional[str]:
+        """Reason the given additional usage would cross a limit, or None."""
+        with self._lock:
+            if self.max_tokens is not None and self.tokens + tokens > self.max_tokens:
+                return f"{self.label} token budget ({self.tokens} + ~{tokens} > {self.max_tokens})"
+            if self.max_cost_usd is not None and cost_usd and self.cost_usd + cost_usd > self.max_cost_usd:
+                return (
+                    f"{self.label} cost budget (${self.cost_usd:.4f} + ~${cost_usd:.4f} "
+                    f"> ${self.max_cost_usd:.4f})"
+                )
+        return self.parent.exceeded_by(tokens, cost_usd) if self.parent is not None else None
+
+    def charge(self, tokens: int, cost_usd: Optional[float]) -> None:
+        with self._lock:
+            self.tokens += tokens
+            self.cost_usd = round(self.cost_usd + (cost_usd or 0.0), 6)
+        if self.parent is not None:
+            self.parent.charge(tokens, cost_usd)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tokens": self.tokens,
+                "cost_usd": self.cost_usd,
+                "max_tokens": self.max_tokens,
+                "max_cost_usd": self.max_cost_usd,
+            }
+
+
+def run_meter(budget: BudgetSettings, spent: Optional[Mapping[str, Any]] = None,
+              parent: Optional[UsageMeter] = None) -> UsageMeter:
+    """Meter for one run, resuming from the totals already recorded in its manifest."""
+    meter = UsageMeter(budget.max_run_tokens, budget.max_run_cost_usd, parent=parent, label="run")
+    if spent:
+        with meter._lock:
+            meter.tokens = spent.get("total_tokens", 0)
+            meter.cost_usd = spent.get("cost_usd", 0.0)
+    return meter
+
+
+def batch_meter(budget: BudgetSettings) -> Optional[UsageMeter]:
+    """Shared meter for a batch of runs, or None when the batch is unlimited."""
+    if not budget.has_batch_limits:
+        return None
+    return UsageMeter(budget.max_batch_tokens, budget.max_batch_cost_usd, label="batch")
+
+
+def estimate_plan_usage(
+    steps: List[Mapping[str, Any]],
+    prices: PriceTable,
+    base_prompt_chars: int,
+    completion_tokens: int = DEFAULT_RESERVE_COMPLETION_TOKENS,
+) -> Dict[str, Any]:
+    """
+    Offline usage/cost estimate for a run before it starts.
+
+    Each step sends its template, the inputs and the state so far (approximated
+    as the completions of the previous steps) and is assumed to return
+    ``completion_tokens``; cascade steps are priced at their first tier.
+
+    Args:
+        steps: ``{"template_chars", "provider", "model"}`` per step
+        prices: Price table
+        base_prompt_chars: Size of the inputs rendered into every prompt
+        completion_tokens: Assumed completion size per step
+    """
+    total = None
+    cost, unpriced = 0.0, 0
+    state_tokens = 0
+    for step in steps:
+        usage = estimated_usage(step["template_chars"] + base_prompt_chars, completion_tokens)
+        usage["prompt_tokens"] += state_tokens
+        usage["total_tokens"] += state_tokens
+        step_cost = usage_cost(usage, prices.price_for(step["provider"], step["model"]))
+        if step_cost is None:
+            unpriced += 1
+        else:
+            cost += step_cost
+        total = add_usage(total, usage)
+        state_tokens += completion_tokens
+    return {
+        "steps": len(steps),
+        "total_tokens": (total or {}).get("total_tokens", 0),
+        "cost_usd": round(cost, 4),
+        "unpriced_steps": unpriced,
+    }
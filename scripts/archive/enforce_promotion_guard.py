@@ -67,7 +67,8 @@ def is_governed(file_path: str) -> bool:
         
     # 4. governance/ (except runtime output)
     if file_path.startswith("governance/"):
-        if file_path.endswith("approval_ledger.jsonl") or file_path.endswith("run_ledger.jsonl"):
+        # Ledgers and the ledger's Merkle checkpoints (written every CHECKPOINT_BLOCK_SIZE appends)
+        if file_path.endswith(("approval_ledger.jsonl", "approval_ledger.checkpoints.jsonl", "run_ledger.jsonl")):
             return False
         return True
         
@@ -95,12 +96,12 @@ def get_promotion_id() -> Optional[str]:
     # 2. Env var
     return os.environ.get("ADK_PROMOTION_ID")
 
-def verify_ledger_integrity():
+def verify_ledger_integrity(full=False):
     """
-    Calls ledger verify.
+    Calls ledger verify (incremental from the last checkpoint unless full).
     """
     try:
-        approval_ledger.verify_ledger()
+        approval_ledger.verify_ledger(full=full)
     except Exception as e:
         print(f"Ledger verification failed: {e}")
         sys.exit(3) # Or 4? Prompt says 3 for governed changes missing/invalid promo id. 4 is hash mismatch.
@@ -153,10 +154,12 @@ def main():
          print("Error: Promotion record missing 'id'")
          sys.exit(3)
 
-    # Validate ledger integrity
-    print("Verifying ledger integrity...")
+    # Validate ledger integrity (--full re-hashes it from genesis instead of
+    # from the last checkpoint)
+    full = "--full" in sys.argv[1:]
+    print(f"Verifying ledger integrity{' (full)' if full else ''}...")
     try:
-        approval_ledger.verify_ledger()
+        approval_ledger.verify_ledger(full=full)
     except Exception as e:
         print(f"Error: Ledger verification failed: {e}")
         sys.exit(3)
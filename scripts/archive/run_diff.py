@@ -8,6 +8,11 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple, Set
 from datetime import datetime
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from orchestrator.artifact_store import read_run_json, run_file_exists
+
 # --- Constants & Configuration ---
 OUTPUTS_DIR = Path("outputs")
 RUN_ID_PATTERN = re.compile(r"^\d{8}_\d{6}$")
@@ -37,6 +42,10 @@ def resolve_run_path(identifier: str) -> Path:
     p_run = OUTPUTS_DIR / identifier
     if p_run.exists() and p_run.is_dir():
         return p_run
+
+    # 3. An archived run, read from its archive (see orchestrator/run_archive.py)
+    if run_file_exists(p_run, "run_manifest.json"):
+        return p_run
         
     return None
 
@@ -48,22 +57,21 @@ def load_run_data(run_dir: Path) -> Dict[str, Any]:
     audit_path = run_dir / "audit_summary.json"
     manifest_path = run_dir / "run_manifest.json"
     
-    if not audit_path.exists():
+    if not run_file_exists(run_dir, "audit_summary.json"):
         print(f"Error: Mandatory file missing: {audit_path}", file=sys.stderr)
         sys.exit(1)
         
     try:
-        with open(audit_path, 'r') as f:
-            audit_data = json.load(f)
+        audit_data = read_run_json(run_dir, "audit_summary.json")
     except json.JSONDecodeError as e:
         print(f"Error: Failed to parse {audit_path}: {e}", file=sys.stderr)
         sys.exit(1)
 
     manifest_data = {}
-    if manifest_path.exists():
+    has_manifest = run_file_exists(run_dir, "run_manifest.json")
+    if has_manifest:
         try:
-            with open(manifest_path, 'r') as f:
-                manifest_data = json.load(f)
+            manifest_data = read_run_json(run_dir, "run_manifest.json")
         except json.JSONDecodeError:
             # Manifest is optional, warn but don't fail? Or fail strict?
             # Prompt says "Load ... (optional fallback)", imply warn is ok or ignore.
@@ -76,7 +84,7 @@ def load_run_data(run_dir: Path) -> Dict[str, Any]:
         "audit": audit_data,
         "manifest": manifest_data,
         "audit_path": str(audit_path),
-        "manifest_path": str(manifest_path) if manifest_path.exists() else None
+        "manifest_path": str(manifest_path) if has_manifest else None
     }
 
 def get_field(data: Dict[str, Any], path: List[str], default: Any = None) -> Any:
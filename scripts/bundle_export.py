@@ -10,6 +10,13 @@ from pathlib import Path
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from governance import approval_ledger
+from orchestrator.artifact_store import list_run_artifacts, list_run_files, read_run_bytes, read_run_json, run_file_exists
+
 # --- Constants ---
 OUTPUTS_DIR = Path("outputs")
 GOVERNANCE_DIR = Path("governance")
@@ -33,7 +40,8 @@ def get_recent_runs(limit: int = 10) -> List[str]:
     return [r[1] for r in runs[:limit]]
 
 def validate_run_dir(run_path: Path) -> Path:
-    if not run_path.exists() or not run_path.is_dir():
+    # An archived run (see orchestrator/run_archive.py) has no directory but is read from its archive
+    if not run_path.is_dir() and not run_file_exists(run_path, "run_manifest.json"):
         print(f"Error: Run directory not found: {run_path}", file=sys.stderr)
         recent = get_recent_runs()
         if recent:
@@ -46,7 +54,7 @@ def validate_run_dir(run_path: Path) -> Path:
         print(f"Error: Directory name '{run_path.name}' does not match run ID pattern", file=sys.stderr)
         sys.exit(1)
     
-    if not (run_path / "audit_summary.json").exists():
+    if not run_file_exists(run_path, "audit_summary.json"):
         print(f"Error: audit_summary.json missing in {run_path}", file=sys.stderr)
         sys.exit(1)
         
@@ -90,8 +98,44 @@ def filter_ledger(run_ids: List[str]) -> Dict[str, str]:
     
     return {rid: "\n".join(lines) for rid, lines in filtered.items() if lines}
 
+def collect_approval_proofs(run_id: str, run_dir: Path) -> Dict[str, Any]:
+    """
+    Inclusion proofs for the approval ledger entries behind a run: entries
+    about the run itself or the knowledge pack version it used. Each proof
+    checks against its checkpoint's Merkle root without the whole ledger
+    (governance.approval_ledger.verify_inclusion_proof / adk ledger prove --check);
+    entries after the last checkpoint are listed unproven.
+    """
+    artifact_ids = [run_id]
+    if run_file_exists(run_dir, "run_manifest.json"):
+        pack = read_run_json(run_dir, "run_manifest.json").get("knowledge_pack") or {}
+        if pack.get("pack_version"):
+            artifact_ids.append(pack["pack_version"])
+
+    proofs, unproven = [], []
+    for entry in approval_ledger.entries_for(artifact_ids):
+        proof = approval_ledger.inclusion_proof(entry["ledger_seq"])
+        if proof is None:
+            unproven.append(entry)
+        else:
+            proofs.append(proof)
+    return {
+        "run_id": run_id,
+        "artifact_ids": artifact_ids,
+        "checkpoint_block_size": approval_ledger.CHECKPOINT_BLOCK_SIZE,
+        "proofs": proofs,
+        "unproven_entries": unproven
+    }
+
 # --- Main Logic ---
 
+def run_file_entry(run_dir: Path, rel: str) -> Dict[str, Any]:
+    """A plain run file by path; one of an archived run (see orchestrator/run_archive.py) by content."""
+    path = run_dir / rel
+    if path.is_file():
+        return {'source': path, 'arcname': rel}
+    return {'source': None, 'arcname': rel, 'content': read_run_bytes(run_dir, rel)}
+
 def collect_run_files(run_id: str, run_dir: Path, include_state: bool) -> List[Dict[str, Any]]:
     """
     Collects files to include for a single run.
@@ -101,27 +145,21 @@ def collect_run_files(run_id: str, run_dir: Path, include_state: bool) -> List[D
     files_to_add = []
     
     # 1. Manifest
-    if (run_dir / "run_manifest.json").exists():
+    if run_file_exists(run_dir, "run_manifest.json"):
         files_to_add.append({
-            'source': run_dir / "run_manifest.json",
-            'arcname': "run_manifest.json"
+            'source': None,
+            'arcname': "run_manifest.json",
+            'content': read_run_bytes(run_dir, "run_manifest.json")
         })
     else:
         print(f"Note: run_manifest.json missing for {run_id} (skipping)")
 
     # 2. Audit Summary (Required, already validated)
-    files_to_add.append({
-        'source': run_dir / "audit_summary.json",
-        'arcname': "audit_summary.json"
-    })
+    files_to_add.append(run_file_entry(run_dir, "audit_summary.json"))
 
     # 3. Audit Summary MD
-    audit_md = run_dir / "audit_summary.md"
-    if audit_md.exists():
-        files_to_add.append({
-            'source': audit_md,
-            'arcname': "audit_summary.md"
-        })
+    if run_file_exists(run_dir, "audit_summary.md"):
+        files_to_add.append(run_file_entry(run_dir, "audit_summary.md"))
     else:
         # Generate it
         print(f"Generating audit_summary.md for {run_id}...")
@@ -144,31 +182,23 @@ def collect_run_files(run_id: str, run_dir: Path, include_state: bool) -> List[D
     })
 
     # 5. Optional run_diff_* files
-    for f in run_dir.iterdir():
-        if f.name.startswith("run_diff_") and (f.suffix == ".md" or f.suffix == ".json"):
-            files_to_add.append({
-                'source': f,
-                'arcname': f.name
-            })
+    for rel in list_run_files(run_dir, "run_diff_*"):
+        if rel.endswith(".md") or rel.endswith(".json"):
+            files_to_add.append(run_file_entry(run_dir, rel))
             
-    # 6. State files
+    # 6. State files (plain, or read through the artifact store or run log)
     if include_state:
-        for f in run_dir.glob("*_state.json"):
+        for rel in list_run_files(run_dir, "*_state.json"):
             files_to_add.append({
-                'source': f,
-                'arcname': f.name
+                'source': None,
+                'arcname': rel,
+                'content': read_run_bytes(run_dir, rel)
             })
 
     # 7. Dist directory (delivery artifacts)
-    dist_dir = run_dir / "dist"
-    if dist_dir.is_dir():
-        for f in sorted(dist_dir.rglob("*")):
-            if f.is_file():
-                rel = f.relative_to(run_dir)
-                files_to_add.append({
-                    'source': f,
-                    'arcname': str(rel)
-                })
+    for rel in list_run_artifacts(run_dir):
+        if rel.startswith("dist/"):
+            files_to_add.append(run_file_entry(run_dir, rel))
 
     return files_to_add
 
@@ -190,6 +220,8 @@ def main():
     parser.add_argument("--format", choices=["md", "json"], default="json", help="Manifest format inside zip")
     parser.add_argument("--include_state", action="store_true", help="Include per-step state JSONs")
     parser.add_argument("--include_ledger", action="store_true", help="Include filtered ledger entries")
+    parser.add_argument("--include_approval_proofs", action="store_true",
+                        help="Include approval ledger inclusion proofs for each run's approvals")
     parser.add_argument("--overwrite", action="store_true", help="Overwrite existing bundle")
 
     args = parser.parse_args()
@@ -286,6 +318,12 @@ def main():
                 name = f"ledger_filtered_{rid}.jsonl"
                 add_entry(name, content=content)
                 files_included.append(name)
+
+        # Approval evidence (per run), verifiable without the approval ledger
+        if args.include_approval_proofs:
+            name = f"approval_proofs_{rid}.json"
+            add_entry(name, content=json.dumps(collect_approval_proofs(rid, rdir), indent=2))
+            files_included.append(name)
     
     # Two-Run Extras (Run Diff)
     if mode == "two_run":
@@ -320,7 +358,8 @@ def main():
         "run_ids": [r[0] for r in runs_to_process],
         "included_files": sorted(files_included),
         "include_state": args.include_state,
-        "include_ledger": args.include_ledger
+        "include_ledger": args.include_ledger,
+        "include_approval_proofs": args.include_approval_proofs
     }
     
     
@@ -334,6 +373,7 @@ def main():
         lines.append(f"- **Run IDs**: {', '.join(manifest['run_ids'])}")
         lines.append(f"- **Include State**: {manifest['include_state']}")
         lines.append(f"- **Include Ledger**: {manifest['include_ledger']}")
+        lines.append(f"- **Include Approval Proofs**: {manifest['include_approval_proofs']}")
         lines.append("")
         lines.append("## Included Files")
         for f in manifest['included_files']:
@@ -19,6 +19,7 @@ logger = logging.getLogger("preflight")
 
 # Constants
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 CONFIG_PATH = PROJECT_ROOT / "config" / "run_config.json"
 SCHEMAS_DIR = PROJECT_ROOT / "schemas"
 OUTPUTS_DIR = PROJECT_ROOT / "outputs"
@@ -46,7 +47,7 @@ def check_config_validation(config: Dict) -> List[str]:
     # Actually, strict top-level check might be too brittle if user adds one, let's stick to requirements.
     # "Fail with clear error if unknown keys are detected (protect against typos)"
     # I'll need to define the allowed keys strictly.
-    ALLOWED_TOP_KEYS = REQUIRED_TOP_KEYS | {"governance_profile"} # Add any optional ones found in existing config
+    ALLOWED_TOP_KEYS = REQUIRED_TOP_KEYS | {"governance_profile", "singleflight", "prompt_layout", "speculation", "cassette", "pricing", "budget", "deadlines", "retrieval", "knowledge_pack", "tenants", "artifact_store", "run_log", "retention"} # Add any optional ones found in existing config
     
     # Update ALLOWED based on what I saw in view_file of run_config.json
     # It had: mode, provider, approval, validation, agents.
@@ -56,6 +57,45 @@ def check_config_validation(config: Dict) -> List[str]:
     if unknown_keys:
         errors.append(f"Config contains unknown top-level keys: {', '.join(unknown_keys)}")
 
+    # Check provider cassette settings
+    from orchestrator.providers.cassette import cassette_settings
+    try:
+        cassette_settings(config)
+    except ValueError as e:
+        errors.append(str(e))
+
+    # Check the price table, usage budgets, deadlines, tenant policies, run storage and retention
+    from orchestrator.artifact_store import store_settings
+    from orchestrator.run_control import deadline_settings
+    from orchestrator.run_archive import retention_settings
+    from orchestrator.run_log import run_log_settings
+    from orchestrator.tenants import tenant_settings
+    from orchestrator.usage import budget_settings, price_table
+    for check in (price_table, budget_settings, deadline_settings, tenant_settings, store_settings, run_log_settings, retention_settings):
+        try:
+            check(config)
+        except ValueError as e:
+            errors.append(str(e))
+
+    # Check model cascades (per-agent tiers and quality check names), state digests,
+    # input retrieval and knowledge pack retrieval
+    from orchestrator.knowledge_pack import load_active_pack, pack_rules
+    from orchestrator.model_cascade import resolve_model_tiers
+    from orchestrator.retrieval import retrieval_rules
+    from orchestrator.state_digest import digest_rules
+    for agent in config.get("agents", []):
+        try:
+            resolve_model_tiers(agent, config.get("provider", ""))
+            digest_rules(agent)
+            retrieval_rules(config, agent)
+            pack_rules(config, agent)
+        except ValueError as e:
+            errors.append(str(e))
+    try:
+        load_active_pack()
+    except ValueError as e:
+        errors.append(str(e))
+
     # Check approval structure
     if "approval" in config:
         approval = config["approval"]
@@ -6,6 +6,15 @@ Usage:
     python3 scripts/resume_run.py --run_id <run_id>
     python3 scripts/resume_run.py --run_id <run_id> --from_step 4
     python3 scripts/resume_run.py --run_id <run_id> --force
+    python3 scripts/resume_run.py --run_id <run_id> --force --replan
+
+The run continues with the run plan persisted in its directory (run_plan.json:
+agents, providers, prompt templates, gates); --replan recompiles it from the
+current config and prompt files instead.
+
+Courses of a batch (run plan provider batch:<backend>) are resumed with
+``scripts/run_batch.py --resume <batch_id>``; this script rejects them unless
+--replan continues them with the configured providers.
 """
 
 import argparse
@@ -16,6 +25,8 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from orchestrator.artifact_store import list_run_files
+from orchestrator.batch import BATCH_PROVIDER_PREFIX, find_batch
 from orchestrator.run_artifacts import (
     read_manifest,
     read_checkpoint,
@@ -24,6 +35,7 @@ from orchestrator.run_artifacts import (
     compute_inputs_hash,
 )
 from orchestrator.root_agent import run_pipeline
+from orchestrator.run_plan import read_run_plan
 
 
 def main():
@@ -40,6 +52,9 @@ Examples:
 
   # Force resume despite config/input changes
   python3 scripts/resume_run.py --run_id 20260130_155254 --force
+
+  # Resume with the current config/prompts instead of the persisted run plan
+  python3 scripts/resume_run.py --run_id 20260130_155254 --force --replan
         """
     )
     
@@ -60,6 +75,12 @@ Examples:
         action="store_true",
         help="Force resume even if config/inputs have changed"
     )
+
+    parser.add_argument(
+        "--replan",
+        action="store_true",
+        help="Recompile the run plan from the current config instead of the one persisted in the run"
+    )
     
     args = parser.parse_args()
     
@@ -80,6 +101,19 @@ Examples:
         print("This run may not support resuming (created before v0.2.1)")
         sys.exit(1)
     
+    # ----------------------------------------------------------------------
+    # Batch courses resume through their batch
+    # ----------------------------------------------------------------------
+
+    if not args.replan:
+        plan = read_run_plan(run_dir)
+        if plan is not None and any(step.provider_name.startswith(BATCH_PROVIDER_PREFIX) for step in plan.steps):
+            batch_id = find_batch(PROJECT_ROOT / "outputs" / "_batches", run_dir) or "<batch_id>"
+            print(f"❌ Error: {args.run_id} is a course of a batch; its steps run through the batch provider")
+            print(f"   Resume it with: python3 scripts/run_batch.py --resume {batch_id}")
+            print(f"   (or --replan to continue with the configured providers)")
+            sys.exit(1)
+
     # ----------------------------------------------------------------------
     # Load Manifest
     # ----------------------------------------------------------------------
@@ -159,10 +193,10 @@ Examples:
             print(f"❌ Error: Checkpoint not found for step {checkpoint_step}")
             print(f"   Available checkpoints:")
             
-            checkpoint_files = sorted(checkpoints_dir.glob("step_*_state.json"))
+            checkpoint_files = list_run_files(run_dir, "checkpoints/step_*_state.json")
             if checkpoint_files:
                 for cp in checkpoint_files:
-                    print(f"     - {cp.name}")
+                    print(f"     - {Path(cp).name}")
             else:
                 print(f"     (none)")
             
@@ -179,6 +213,7 @@ Examples:
         run_dir=str(run_dir),
         start_step=resume_step,
         initial_state=initial_state,
+        replan=args.replan,
     )
 
 
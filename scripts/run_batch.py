@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Batch Runner - Advance many queued courses through provider batch submissions.
+
+Every wave collects the next provider call of each active course into one
+batch file (OpenAI Batch JSONL format), submits it, polls until it completes,
+and feeds each result back through the normal parse/validate/checkpoint flow.
+Batch runs are unattended, so approval gates are auto-approved (logged).
+
+Usage:
+    python3 scripts/run_batch.py courses/acme courses/globex            # local stand-in backend
+    python3 scripts/run_batch.py courses/* --backend openai --poll-interval 60
+    python3 scripts/run_batch.py --queue batch_queue.json --backend local
+    python3 scripts/run_batch.py courses/acme courses/globex --tenant sales
+    python3 scripts/run_batch.py --cancel 20260301_101500_batch acme  # cancel one course of a running batch
+    python3 scripts/run_batch.py --resume 20260301_101500_batch       # continue an interrupted batch
+
+Each course directory must contain business_brief.md and sme_notes.md.
+A queue file is a JSON list of {"course_id": ..., "inputs_dir": ..., "tenant_id": ...}
+(tenant_id optional; --tenant tags the course directories given as arguments).
+Courses of a tenant with a token quota (run_config "tenants") share that quota.
+SIGINT/SIGTERM cancel every course cooperatively (each keeps its last
+checkpoint and can be resumed); a second signal stops immediately.
+
+Each course's outcome is the status its run recorded (completed, cancelled,
+failed, ...); the exit code is 0 only if every course completed. --resume
+continues every course of a batch that did not complete (or was aborted at a
+gate) from its last checkpoint, on the batch's own backend. Batch courses are
+resumed only this way: scripts/resume_run.py rejects them.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from orchestrator.batch import (
+    BatchCoordinator,
+    BatchCourse,
+    get_batch_backend,
+    read_batch_manifest,
+    request_course_cancel,
+    resumable_courses,
+)
+from orchestrator.root_agent import load_config
+from orchestrator.run_control import CancelToken, graceful_shutdown
+from orchestrator.tenants import tenant_settings, validate_tenant_id
+from orchestrator.usage import batch_meter, budget_settings
+
+OUTPUTS_DIR = PROJECT_ROOT / "outputs"
+
+
+def _course_id(inputs_dir: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", Path(inputs_dir).resolve().name) or "course"
+
+
+def load_courses(args, batch_id: str):
+    entries = []
+    if args.queue:
+        with open(args.queue, "r") as f:
+            for item in json.load(f):
+                entries.append((item.get("course_id") or _course_id(item["inputs_dir"]), item["inputs_dir"],
+                                item.get("tenant_id")))
+    for inputs_dir in args.inputs_dirs:
+        entries.append((_course_id(inputs_dir), inputs_dir, args.tenant))
+
+    courses = []
+    seen = set()
+    for course_id, inputs_dir, tenant_id in entries:
+        if tenant_id is not None:
+            validate_tenant_id(tenant_id)
+        if course_id in seen:
+            raise ValueError(f"Duplicate course_id in batch: {course_id}")
+        seen.add(course_id)
+        for name in ("business_brief.md", "sme_notes.md"):
+            if not (Path(inputs_dir) / name).exists():
+                raise FileNotFoundError(f"Missing input file: {Path(inputs_dir) / name}")
+        run_dir = OUTPUTS_DIR / f"{batch_id}_{course_id}"
+        courses.append(BatchCourse(course_id=course_id, inputs_dir=str(inputs_dir), run_dir=str(run_dir),
+                                   tenant_id=tenant_id))
+    return courses
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run many courses through provider batch submissions, wave by wave",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("inputs_dirs", nargs="*", help="Course input directories")
+    parser.add_argument("--queue", help="JSON queue file listing courses")
+    parser.add_argument("--backend", choices=["local", "openai"], default="local",
+                        help="Batch backend (default: local file-based stand-in)")
+    parser.add_argument("--poll-interval", type=float, default=30.0,
+                        help="Seconds between batch status polls (default: 30; local backend: 0)")
+    parser.add_argument("--max-wait-hours", type=float, default=24.0,
+                        help="Give up on a batch after this many hours (default: 24)")
+    parser.add_argument("--tenant", help="Tenant id for the course directories given as arguments")
+    parser.add_argument("--cancel", nargs=2, metavar=("BATCH_ID", "COURSE_ID"),
+                        help="Cancel one course of a running batch; the other courses continue")
+    parser.add_argument("--resume", metavar="BATCH_ID",
+                        help="Continue the unfinished courses of an interrupted batch from their checkpoints")
+    args = parser.parse_args()
+
+    if args.cancel:
+        batch_id, course_id = args.cancel
+        work_dir = OUTPUTS_DIR / "_batches" / batch_id
+        if not work_dir.is_dir():
+            print(f"❌ Unknown batch: {batch_id}", file=sys.stderr)
+            sys.exit(2)
+        request_course_cancel(work_dir, course_id)
+        print(f"🛑 Cancel requested for course {course_id} in batch {batch_id}")
+        return
+
+    if args.resume:
+        if args.inputs_dirs or args.queue:
+            parser.error("--resume takes no course directories or --queue")
+        batch_id = args.resume
+        work_dir = OUTPUTS_DIR / "_batches" / batch_id
+        try:
+            backend_name = read_batch_manifest(work_dir)["backend"]
+            courses = resumable_courses(work_dir)
+        except (FileNotFoundError, KeyError, json.JSONDecodeError) as e:
+            print(f"❌ Cannot resume batch {batch_id}: {e}", file=sys.stderr)
+            sys.exit(2)
+        if not courses:
+            print(f"✅ Batch {batch_id}: every course already finished")
+            return
+    else:
+        if not args.inputs_dirs and not args.queue:
+            parser.error("Provide course input directories or --queue")
+        batch_id = datetime.utcnow().strftime("%Y%m%d_%H%M%S") + "_batch"
+        try:
+            courses = load_courses(args, batch_id)
+        except (ValueError, FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(2)
+        work_dir = OUTPUTS_DIR / "_batches" / batch_id
+        backend_name = args.backend
+
+    backend = get_batch_backend(backend_name, root_dir=work_dir / "backend")
+    poll_interval = 0.0 if backend_name == "local" else args.poll_interval
+
+    # Batch runs are unattended: gates are auto-approved and attributed in the ledger
+    os.environ["AUTO_APPROVE"] = "1"
+    os.environ.setdefault("AUTO_APPROVE_SOURCE", "cli_flag")
+    print("⚠️  Batch mode: all approval gates will be automatically approved (logged in the ledger).")
+
+    # Batch-wide budget (max_batch_tokens / max_batch_cost_usd), shared by every
+    # course, and per-tenant token quotas
+    try:
+        config = load_config()
+        usage_meter = batch_meter(budget_settings(config))
+        tenants = tenant_settings(config)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+
+    coordinator = BatchCoordinator(
+        backend,
+        work_dir,
+        model=os.environ.get("OPENAI_MODEL", "gpt-4o-mini").strip(),
+        temperature=float(os.environ.get("OPENAI_TEMPERATURE", "0.2")),
+        poll_interval=poll_interval,
+        max_wait_seconds=args.max_wait_hours * 3600,
+        usage_meter=usage_meter,
+        tenants=tenants,
+    )
+
+    resumed = " (resumed)" if args.resume else ""
+    print(f"📦 Batch {batch_id}{resumed}: {len(courses)} course(s), backend={backend_name}")
+    try:
+        with graceful_shutdown(CancelToken(), on_cancel=lambda _: coordinator.cancel_all()):
+            outcomes = coordinator.run_courses(courses)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Batch interrupted by user (Ctrl+C)")
+        sys.exit(130)
+
+    print("\n" + "=" * 60)
+    print(f"BATCH SUMMARY ({len(coordinator.waves)} waves)")
+    print("=" * 60)
+    for course in courses:
+        print(f"   {outcomes.get(course.course_id, 'failed'):10s} {course.course_id:30s} {course.run_dir}")
+    if usage_meter is not None:
+        spent = usage_meter.snapshot()
+        print(f"\n💰 Batch usage: {spent['tokens']:,} tokens, ${spent['cost_usd']:.4f}")
+    for tenant_id, meter in coordinator.tenant_meters.items():
+        if meter is not usage_meter:
+            spent = meter.snapshot()
+            print(f"   Tenant {tenant_id}: {spent['tokens']:,} / {spent['max_tokens']:,} quota tokens")
+    print(f"\n📄 Batch manifest: {work_dir / 'batch_manifest.json'}")
+
+    if all(outcomes.get(course.course_id) == "completed" for course in courses):
+        sys.exit(0)
+    print(f"   Resume with: python3 scripts/run_batch.py --resume {batch_id}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner - Measure pipeline performance and detect regressions.
+
+Usage:
+    python3 scripts/run_benchmarks.py run                      # micro + pipeline -> baselines/benchmarks/latest.json
+    python3 scripts/run_benchmarks.py run --suite micro --repeat 9
+    python3 scripts/run_benchmarks.py run --update-baseline    # refresh committed baseline
+    python3 scripts/run_benchmarks.py compare                  # latest.json vs baseline.json
+    python3 scripts/run_benchmarks.py compare --threshold 0.1 --current other.json
+    python3 scripts/run_benchmarks.py scaling                  # size ladder -> baselines/benchmarks/scaling_<VERSION>.json
+    python3 scripts/run_benchmarks.py scaling --sizes s m --metric peak_kib
+
+The compare command exits 1 when any benchmark regresses beyond the threshold.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.harness import (
+    DEFAULT_BASELINE_PATH,
+    DEFAULT_RESULTS_PATH,
+    DEFAULT_THRESHOLD,
+    build_results_document,
+    compare_results,
+    format_comparison,
+    read_results,
+    write_results,
+)
+from benchmarks.synthetic import SIZE_LADDER
+
+SUITES = ("micro", "pipeline", "all")
+
+
+def cmd_run(args) -> int:
+    from benchmarks.micro import run_micro_suite
+    from benchmarks.pipeline import PIPELINE_PROVIDERS, run_pipeline_suite
+
+    results = {}
+    if args.suite in ("micro", "all"):
+        print("\n⏱  Micro-benchmarks")
+        results.update(run_micro_suite(repeat=args.repeat))
+    if args.suite in ("pipeline", "all"):
+        print(f"\n⏱  Pipeline throughput ({', '.join(PIPELINE_PROVIDERS)} providers)")
+        results.update(run_pipeline_suite(repeat=args.repeat))
+
+    document = build_results_document(args.suite, results)
+    out_path = DEFAULT_BASELINE_PATH if args.update_baseline else Path(args.out)
+    write_results(out_path, document)
+    print(f"\n📄 Results written: {out_path}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    try:
+        baseline = read_results(Path(args.baseline))
+        current = read_results(Path(args.current))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    report = compare_results(
+        baseline, current, threshold=args.threshold, min_delta_ms=args.min_delta_ms, metric=args.metric
+    )
+    print(format_comparison(report, args.threshold))
+
+    if report["regressions"]:
+        print(f"\n❌ {len(report['regressions'])} benchmark(s) regressed beyond {args.threshold:.0%}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+def cmd_scaling(args) -> int:
+    from benchmarks.scaling import format_scaling_table, run_scaling_suite, scaling_results_path
+
+    print("\n⏱  Scaling (synthetic size ladder)")
+    results = run_scaling_suite(sizes=args.sizes, repeat=args.repeat)
+
+    document = build_results_document("scaling", results)
+    out_path = Path(args.out) if args.out else scaling_results_path(document["system_version"])
+    write_results(out_path, document)
+
+    print(f"\n{format_scaling_table(results, metric=args.metric)}")
+    print(f"\n📄 Results written: {out_path}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run pipeline benchmarks and compare against committed baselines",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmark suites and write a results file")
+    run_parser.add_argument("--suite", choices=SUITES, default="all", help="Suite to run (default: all)")
+    run_parser.add_argument("--repeat", type=int, default=9, help="Timed samples per benchmark (default: 9)")
+    run_parser.add_argument("--out", default=str(DEFAULT_RESULTS_PATH), help="Results file path")
+    run_parser.add_argument("--update-baseline", action="store_true",
+                            help=f"Write results to the committed baseline ({DEFAULT_BASELINE_PATH.relative_to(PROJECT_ROOT)})")
+    run_parser.set_defaults(func=cmd_run)
+
+    cmp_parser = subparsers.add_parser("compare", help="Compare a results file against the baseline")
+    cmp_parser.add_argument("--baseline", default=str(DEFAULT_BASELINE_PATH), help="Baseline results file")
+    cmp_parser.add_argument("--current", default=str(DEFAULT_RESULTS_PATH), help="Current results file")
+    cmp_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help=f"Relative slowdown that counts as a regression (default: {DEFAULT_THRESHOLD})")
+    cmp_parser.add_argument("--min-delta-ms", type=float, default=0.01,
+                            help="Ignore absolute slowdowns below this many ms (default: 0.01)")
+    cmp_parser.add_argument("--metric", choices=["min_ms", "median_ms", "mean_ms"], default="min_ms",
+                            help="Statistic to compare (default: min_ms)")
+    cmp_parser.set_defaults(func=cmd_compare)
+
+    scaling_parser = subparsers.add_parser("scaling", help="Measure time and peak memory across synthetic course sizes")
+    scaling_parser.add_argument("--sizes", nargs="+", choices=list(SIZE_LADDER), default=list(SIZE_LADDER),
+                                help="Ladder rungs to run (default: all)")
+    scaling_parser.add_argument("--repeat", type=int, default=3, help="Timed samples per benchmark (default: 3)")
+    scaling_parser.add_argument("--out", default=None,
+                                help="Results file path (default: baselines/benchmarks/scaling_<VERSION>.json)")
+    scaling_parser.add_argument("--metric", choices=["min_ms", "median_ms", "peak_kib"], default="median_ms",
+                                help="Statistic shown in the summary table (default: median_ms)")
+    scaling_parser.set_defaults(func=cmd_scaling)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ This script provides a user-friendly interface to run the orchestrator with:
 - Run plan display (shows what will execute)
 - Cost guardrails (prevents accidental API calls)
 - Dry run mode (tests without API calls)
-- Multiple provider modes (manual, openai, claude_cli, dry_run)
+- Multiple provider modes (manual, openai, claude_cli, dry_run, synthetic)
 """
 
 import sys
@@ -21,7 +21,11 @@ from datetime import datetime
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from orchestrator.root_agent import run_pipeline, write_ledger, utc_now
+from orchestrator.root_agent import deep_merge, run_pipeline, write_ledger, utc_now
+from orchestrator.run_artifacts import read_manifest
+from orchestrator.run_control import CancelToken, graceful_shutdown
+from orchestrator.run_plan import RunPlan, compile_run_plan
+from orchestrator.usage import budget_settings, estimate_plan_usage, price_table
 from scripts.preflight_check import run_preflight_checks
 from utils.worktree_guard import enforce_preflight, enforce_postflight
 
@@ -233,7 +237,28 @@ def apply_profile_transformations(config: dict, profile: str) -> dict:
     return new_config
 
 
-def cost_guardrail_check(num_steps: int, provider: str, skip_confirmation: bool) -> bool:
+def estimate_run_usage(plan: RunPlan, inputs_dir: Path, max_step: int = None) -> dict:
+    """
+    Offline token/cost estimate for a compiled plan (config price table, no API calls).
+
+    Cascade steps are priced at their first tier; the completion size per step
+    is the budget's reserve_completion_tokens.
+    """
+    steps = [
+        {"template_chars": len(step.template), "provider": step.tiers[0]["provider"], "model": step.tiers[0]["model"]}
+        for step in plan.steps
+        if max_step is None or step.step_idx <= max_step
+    ]
+    base_chars = sum(
+        len(path.read_text()) for path in (inputs_dir / "business_brief.md", inputs_dir / "sme_notes.md") if path.exists()
+    )
+    return estimate_plan_usage(
+        steps, price_table(plan.config), base_chars, budget_settings(plan.config).reserve_completion_tokens
+    )
+
+
+def cost_guardrail_check(num_steps: int, provider: str, skip_confirmation: bool, estimate: dict = None,
+                         max_cost_usd: float = None) -> bool:
     """
     Check with user before making API calls (unless --yes flag is set).
     
@@ -241,6 +266,8 @@ def cost_guardrail_check(num_steps: int, provider: str, skip_confirmation: bool)
         num_steps: Number of steps that will make API calls
         provider: Provider name
         skip_confirmation: If True, skip the confirmation prompt
+        estimate: Offline usage estimate (see estimate_run_usage)
+        max_cost_usd: Configured run cost budget, shown next to the estimate
         
     Returns:
         True if user approves or skip_confirmation is True, False otherwise
@@ -249,7 +276,7 @@ def cost_guardrail_check(num_steps: int, provider: str, skip_confirmation: bool)
     api_providers = ["openai", "openai_api", "perplexity", "claude_cli"]
     
     if provider not in api_providers:
-        # No cost for manual or dry_run
+        # No cost for manual, dry_run or synthetic
         return True
     
     if skip_confirmation:
@@ -260,7 +287,15 @@ def cost_guardrail_check(num_steps: int, provider: str, skip_confirmation: bool)
     print(f"💰 COST GUARDRAIL")
     print(f"=" * 60)
     print(f"\nThis run will make API calls for up to {num_steps} steps using provider: {provider}")
-    print(f"This may incur API costs.\n")
+    print(f"This may incur API costs.")
+    if estimate:
+        print(f"Estimated usage: ~{estimate['total_tokens']:,} tokens, ~${estimate['cost_usd']:.2f} "
+              f"(offline estimate from the config price table)")
+        if estimate.get("unpriced_steps"):
+            print(f"   {estimate['unpriced_steps']} step(s) use a model without a price entry (not included)")
+    if max_cost_usd is not None:
+        print(f"Run budget: ${max_cost_usd:.2f} (the run stops before exceeding it)")
+    print()
     
     user_input = input("Type RUN to continue, anything else to abort: ").strip()
     
@@ -274,6 +309,7 @@ def cost_guardrail_check(num_steps: int, provider: str, skip_confirmation: bool)
             "reason": "cost_guardrail_rejected",
             "provider": provider,
             "num_steps": num_steps,
+            "estimate": estimate,
         })
         
         return False
@@ -309,6 +345,7 @@ Modes:
   claude_cli  - Claude CLI (requires 'claude' command)
   perplexity  - Perplexity API (requires PERPLEXITY_API_KEY)
   dry_run     - Dry run mode (no API calls, returns stubs)
+  synthetic   - Synthetic outputs derived from the run state (no API calls; sized via SYNTHETIC_* env vars)
 
 The --dry_run flag is a shortcut for --mode dry_run.
         """
@@ -322,7 +359,7 @@ The --dry_run flag is a shortcut for --mode dry_run.
     
     parser.add_argument(
         "--mode",
-        choices=["manual", "openai", "claude_cli", "perplexity"],
+        choices=["manual", "openai", "claude_cli", "perplexity", "synthetic"],
         help="Provider mode to use"
     )
     
@@ -373,9 +410,32 @@ The --dry_run flag is a shortcut for --mode dry_run.
         action="store_true",
         help="Skip strict input quality validation (quality gate)"
     )
+
+    parser.add_argument(
+        "--record-cassette",
+        action="store_true",
+        help="Record every provider prompt/response into <run_dir>/provider_cassette.jsonl"
+    )
+
+    parser.add_argument(
+        "--replay-cassette",
+        metavar="PATH",
+        help="Replay a recorded cassette (file or run directory) instead of calling providers"
+    )
+
+    parser.add_argument(
+        "--cassette-match",
+        choices=["strict", "lenient"],
+        default="strict",
+        help="Replay matching: strict = exact prompt, lenient = by agent/step (default: strict)"
+    )
     
     args = parser.parse_args()
 
+    if args.record_cassette and args.replay_cassette:
+        print("\n❌ Error: --record-cassette and --replay-cassette are mutually exclusive")
+        sys.exit(1)
+
     # Validate max-step
     if args.max_step is not None and args.max_step < 1:
         print("\n❌ Error: --max-step must be >= 1")
@@ -558,25 +618,17 @@ The --dry_run flag is a shortcut for --mode dry_run.
     # This must happen BEFORE printing run plan and BEFORE calculating num_steps
     if governance_profile:
         config = apply_profile_transformations(config, governance_profile)
-        
-        # We also need to ensure these structural changes (agents list, gates)
-        # are passed to the orchestrator via overrides, because orchestrator 
-        # re-loads config from disk.
-        
-        if "agents" not in config_overrides:
-            config_overrides["agents"] = config["agents"]
-            
-        if "approval" not in config_overrides:
-            config_overrides["approval"] = {}
-        
-        # Merge approval configs carefully
-        current_approval = config.get("approval", {})
-        override_approval = config_overrides["approval"]
-        
-        if "phase_gates" in current_approval:
-             override_approval["phase_gates"] = current_approval["phase_gates"]
-             
-        config_overrides["approval"] = override_approval
+
+    # Provider cassette (record or replay)
+    if args.record_cassette:
+        config_overrides["cassette"] = {"mode": "record"}
+    elif args.replay_cassette:
+        config_overrides["cassette"] = {
+            "mode": "replay",
+            "path": args.replay_cassette,
+            "match": args.cassette_match,
+        }
+        print(f"\n📼 Replaying provider cassette: {args.replay_cassette} ({args.cassette_match} match)")
 
     # Step 4: Print run plan
     print_run_plan(config, provider)
@@ -589,8 +641,24 @@ The --dry_run flag is a shortcut for --mode dry_run.
         print(f"\n⚡ Run limited to first {args.max_step} steps (--max-step)")
 
     effective_provider = provider or config.get("provider") or os.getenv("PROVIDER") or "manual"
+    if args.replay_cassette:
+        effective_provider = "replay"  # no provider calls, no cost
     
-    if not cost_guardrail_check(num_steps, effective_provider, args.yes):
+    # Compile the run plan once; the orchestrator executes it as-is (no second
+    # config load or override merge) and persists it for resume
+    try:
+        plan = compile_run_plan(
+            deep_merge(config, config_overrides),
+            str(CONFIG_PATH),
+            provider_env=provider or os.getenv("PROVIDER"),
+        )
+    except Exception as e:
+        print(f"\n❌ Run plan compilation failed: {e}\n")
+        sys.exit(1)
+
+    estimate = estimate_run_usage(plan, Path(inputs_dir), args.max_step)
+    max_cost_usd = budget_settings(plan.config).max_run_cost_usd
+    if not cost_guardrail_check(num_steps, effective_provider, args.yes, estimate, max_cost_usd):
         sys.exit(1)
     
     # Step 6: Set provider environment variable if needed
@@ -623,16 +691,26 @@ The --dry_run flag is a shortcut for --mode dry_run.
             run_id=run_id
         )
         
-        run_pipeline(
-            config_path=str(CONFIG_PATH),
-            run_dir=str(run_dir),  # Pass explicit run_dir to use the same ID
-            start_step=1,
-            initial_state=None,
-            config_overrides=config_overrides,
-            governance_profile=governance_profile,
-            max_step=args.max_step,
-            inputs_dir=str(inputs_dir),  # Pass the resolved inputs directory
-        )
+        # SIGINT/SIGTERM stop the run cooperatively: the current step finishes
+        # writing its artifacts, the manifest is marked cancelled and the run
+        # can be resumed from its last checkpoint (a second signal aborts)
+        cancel_token = CancelToken()
+        with graceful_shutdown(cancel_token):
+            run_pipeline(
+                config_path=str(CONFIG_PATH),
+                run_dir=str(run_dir),  # Pass explicit run_dir to use the same ID
+                start_step=1,
+                initial_state=None,
+                config_overrides=config_overrides,
+                governance_profile=governance_profile,
+                max_step=args.max_step,
+                inputs_dir=str(inputs_dir),  # Pass the resolved inputs directory
+                run_plan=plan,
+                cancel_check=cancel_token,
+            )
+        if cancel_token.cancelled and read_manifest(run_dir).get("status") == "cancelled":
+            print(f"\n⚠️  Pipeline stopped ({cancel_token.reason})")
+            sys.exit(130)
 
         # Enforce Postflight Guard
         # Only run if pipeline completed successfully (did not raise exception)
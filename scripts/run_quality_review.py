@@ -19,8 +19,11 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 EXPORTS_DIR = PROJECT_ROOT / "exports"
+LA_STATE = "03_learning_architect_agent_state.json"
+SB_STATE = "06_storyboard_agent_state.json"
 
 from orchestrator.agents.quality_review_agent import run_quality_review
+from orchestrator.artifact_store import read_run_json, run_file_exists
 
 def main():
     parser = argparse.ArgumentParser(description="Run Quality Review Agent")
@@ -37,12 +40,11 @@ def main():
     # Depending on how it's called, inputs_dir might point directly to a run dir
     # or we might need to find the latest run in outputs/
     
-    la_file = None
-    sb_file = None
+    source_dir = None
     
-    if args.inputs_dir and (args.inputs_dir / "03_learning_architect_agent_state.json").exists():
-        la_file = args.inputs_dir / "03_learning_architect_agent_state.json"
-        sb_file = args.inputs_dir / "06_storyboard_agent_state.json"
+    # State files may be plain or pointers into the artifact store
+    if args.inputs_dir and run_file_exists(args.inputs_dir, LA_STATE):
+        source_dir = args.inputs_dir
     else:
         # Fallback to the latest run in outputs/
         outputs_dir = PROJECT_ROOT / "outputs"
@@ -52,20 +54,16 @@ def main():
             reverse=True
         )
         for run_dir in all_runs:
-            if (run_dir / "03_learning_architect_agent_state.json").exists() and (run_dir / "06_storyboard_agent_state.json").exists():
-                la_file = run_dir / "03_learning_architect_agent_state.json"
-                sb_file = run_dir / "06_storyboard_agent_state.json"
+            if run_file_exists(run_dir, LA_STATE) and run_file_exists(run_dir, SB_STATE):
+                source_dir = run_dir
                 break
 
-    if not la_file or not sb_file or not la_file.exists() or not sb_file.exists():
-        print("ERROR: Could not find required state files (03_learning_architect_agent_state.json, 06_storyboard_agent_state.json)")
+    if not source_dir or not run_file_exists(source_dir, SB_STATE):
+        print(f"ERROR: Could not find required state files ({LA_STATE}, {SB_STATE})")
         sys.exit(1)
 
-    with open(la_file, "r") as f:
-        la_state = json.load(f)
-    
-    with open(sb_file, "r") as f:
-        sb_state = json.load(f)
+    la_state = read_run_json(source_dir, LA_STATE)
+    sb_state = read_run_json(source_dir, SB_STATE)
 
     print(f"Running Quality Review for '{args.course_slug}'...")
     try:
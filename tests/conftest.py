@@ -0,0 +1,55 @@
+"""
+Shared fixtures for the pipeline tests.
+
+``course`` sets up the three-agent course most run_pipeline tests use:
+prompt templates ``Prompt agent<i> {business_brief}`` (so a fake provider
+can read the agent name from the second word of the prompt), the two course
+inputs, and a config writer. PROVIDER and AUTO_APPROVE are unset.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+
+class CourseFixture:
+    """Three agents (agent1..agent3), their prompts and the course inputs under tmp_path."""
+
+    def __init__(self, tmp_path: Path):
+        self.tmp_path = tmp_path
+        self.agents = []
+        for i in (1, 2, 3):
+            (tmp_path / f"prompt{i}.md").write_text(f"Prompt agent{i} {{business_brief}}")
+            self.agents.append({"name": f"agent{i}", "prompt_path": str(tmp_path / f"prompt{i}.md")})
+        self.inputs = tmp_path / "inputs"
+        self.inputs.mkdir()
+        (self.inputs / "business_brief.md").write_text("Brief")
+        (self.inputs / "sme_notes.md").write_text("Notes")
+
+    def config(self, phase_gates=(), approval: dict = None, **extra) -> dict:
+        """
+        Run config for the three agents. ``approval`` keys are added to the
+        per-phase approval section; ``extra`` top-level keys are added or
+        replace the defaults.
+        """
+        return {
+            "provider": "openai",
+            "agents": self.agents,
+            "approval": {"gate_strategy": "per_phase", "phase_gates": list(phase_gates), **(approval or {})},
+            "validation": {"min_deliverable_chars": 20},
+            **extra,
+        }
+
+    def write_config(self, phase_gates=(), filename: str = "run_config.json", **kwargs) -> Path:
+        """Write config() to tmp_path/<filename> and return its path."""
+        path = self.tmp_path / filename
+        path.write_text(json.dumps(self.config(phase_gates, **kwargs)))
+        return path
+
+
+@pytest.fixture
+def course(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROVIDER", raising=False)
+    monkeypatch.delenv("AUTO_APPROVE", raising=False)
+    return CourseFixture(tmp_path)
@@ -0,0 +1,199 @@
+"""
+Unit tests for governance/approval_ledger.py
+
+Tests cover:
+- Appended entries chain and verify; the line format is unchanged
+- The last entry is found by reading from the end (long ledgers, long entries, blank lines)
+- append_entries chains many entries in one transaction
+- Concurrent writers (threads and processes) never fork the chain
+- A torn last line is reported as corruption
+- Appends completing a block sign off a Merkle checkpoint; legacy ledgers are checkpointed on demand
+- Incremental verification re-hashes only entries after the last checkpoint; full verification
+  catches tampering the incremental one cannot see
+- Inclusion proofs verify without the ledger and fail for tampered entries or paths
+"""
+
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+import governance.approval_ledger as approval_ledger
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(approval_ledger, "CHECKPOINT_BLOCK_SIZE", 4)
+
+
+@pytest.fixture
+def ledger_path(tmp_path, monkeypatch):
+    path = tmp_path / "governance" / "approval_ledger.jsonl"
+    monkeypatch.setattr(approval_ledger, "_get_ledger_path", lambda: str(path))
+    return path
+
+
+def _entries(path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_append_chains_and_verifies(ledger_path):
+    first = approval_ledger.append_entry("SIGNAL_CREATED", "alice", "SIG-1", decision_metadata={"k": 1})
+    second = approval_ledger.append_entry("PROPOSAL_CREATED", "bob", "PROP-1", evidence_ref="SIG-1")
+
+    assert first["ledger_seq"] == 1 and first["previous_entry_hash"] == approval_ledger.GENESIS_HASH
+    assert second["ledger_seq"] == 2 and second["previous_entry_hash"] == first["integrity_hash"]
+    assert ledger_path.read_text() == json.dumps(first) + "\n" + json.dumps(second) + "\n"
+    assert approval_ledger.verify_ledger() is True
+
+
+def test_last_entry_read_from_tail(ledger_path):
+    approval_ledger.append_entries(
+        {"action": "PACK_APPLIED", "actor": "ci", "target_artifact_id": f"PACK-{i}"} for i in range(200))
+    approval_ledger.append_entry("PACK_APPLIED", "ci", "PACK-big", decision_metadata={"blob": "x" * 20000})
+    with open(ledger_path, "a") as f:
+        f.write("\n\n")  # blank lines are skipped
+
+    entry = approval_ledger.append_entry("PACK_ROLLED_BACK", "ci", "PACK-big")
+    assert entry["ledger_seq"] == 202
+    assert len(approval_ledger.load_checkpoints()) == 50
+    assert approval_ledger.verify_ledger() is True
+
+
+def test_append_entries_bulk(ledger_path):
+    assert approval_ledger.append_entries([]) == []
+    approval_ledger.append_entry("SIGNAL_CREATED", "alice", "SIG-1")
+    appended = approval_ledger.append_entries([
+        {"action": "PROPOSAL_APPROVED", "actor": "a", "target_artifact_id": "PROP-1"},
+        {"action": "PROPOSAL_APPROVED", "actor": "b", "target_artifact_id": "PROP-1", "evidence_ref": "APR-2"},
+    ])
+    assert [e["ledger_seq"] for e in appended] == [2, 3]
+    assert appended[1]["previous_entry_hash"] == appended[0]["integrity_hash"]
+    assert appended[1]["decision_metadata"] == {} and appended[1]["evidence_ref"] == "APR-2"
+    assert _entries(ledger_path)[1:] == appended
+    assert approval_ledger.verify_ledger() is True
+
+
+def _append_many(path, worker, count):
+    approval_ledger._get_ledger_path = lambda: path
+    for i in range(count):
+        approval_ledger.append_entry("SIGNAL_CREATED", f"worker-{worker}", f"SIG-{worker}-{i}")
+
+
+def test_concurrent_writers_keep_one_chain(ledger_path):
+    ledger_path.parent.mkdir(parents=True)
+    threads = [threading.Thread(target=_append_many, args=(str(ledger_path), t, 20)) for t in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_append_many, args=(str(ledger_path), 10 + p, 20)) for p in range(3)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+        assert p.exitcode == 0
+
+    assert [e["ledger_seq"] for e in _entries(ledger_path)] == list(range(1, 141))
+    assert approval_ledger.verify_ledger() is True
+
+
+def test_torn_last_line_is_corruption(ledger_path):
+    approval_ledger.append_entry("SIGNAL_CREATED", "alice", "SIG-1")
+    with open(ledger_path, "a") as f:
+        f.write('{"timestamp_utc": "2026')
+    with pytest.raises(ValueError, match="corrupted"):
+        approval_ledger.append_entry("SIGNAL_CREATED", "alice", "SIG-2")
+
+
+def _bulk(count, start=0):
+    return [{"action": "SIGNAL_CREATED", "actor": "ci", "target_artifact_id": f"SIG-{start + i}"}
+            for i in range(count)]
+
+
+def test_checkpoints_signed_off_per_block(ledger_path):
+    approval_ledger.append_entries(_bulk(3))
+    assert approval_ledger.load_checkpoints() == []
+    approval_ledger.append_entries(_bulk(6, 3))  # completes blocks 0 and 1
+
+    checkpoints = approval_ledger.load_checkpoints()
+    entries = _entries(ledger_path)
+    assert [(c["block"], c["first_seq"], c["last_seq"]) for c in checkpoints] == [(0, 1, 4), (1, 5, 8)]
+    assert checkpoints[0]["merkle_root"] == approval_ledger.merkle_root([e["integrity_hash"] for e in entries[:4]])
+    assert checkpoints[1]["previous_checkpoint_hash"] == checkpoints[0]["checkpoint_hash"]
+    assert checkpoints[1]["start_offset"] == checkpoints[0]["end_offset"]
+    assert checkpoints[1]["end_offset"] == len("".join(json.dumps(e) + "\n" for e in entries[:8]))
+    assert approval_ledger.checkpoint_ledger() == []
+
+    # A ledger written before checkpoints existed is signed off on demand
+    (ledger_path.parent / "approval_ledger.checkpoints.jsonl").unlink()
+    assert len(approval_ledger.checkpoint_ledger()) == 2
+    assert approval_ledger.load_checkpoints()[1]["merkle_root"] == checkpoints[1]["merkle_root"]
+
+
+def test_incremental_and_full_verification(ledger_path):
+    approval_ledger.append_entries(_bulk(10))
+    assert approval_ledger.verify_ledger() is True
+    assert approval_ledger.verify_ledger(full=True) is True
+    lines = ledger_path.read_text().splitlines(keepends=True)
+
+    # Tampering inside a checkpointed block: only full verification re-hashes it
+    tampered = json.loads(lines[1])
+    tampered["actor"] = "mallory"
+    ledger_path.write_text(lines[0] + json.dumps(tampered) + "\n" + "".join(lines[2:]))
+    assert len(ledger_path.read_text()) != len("".join(lines))  # shifts every offset after it
+    with pytest.raises(ValueError, match="Does not match the ledger"):
+        approval_ledger.verify_ledger()
+
+    tampered["actor"] = "xx"  # same length as "ci": offsets unchanged
+    ledger_path.write_text(lines[0] + json.dumps(tampered) + "\n" + "".join(lines[2:]))
+    assert approval_ledger.verify_ledger() is True
+    with pytest.raises(ValueError, match="Line 2: Integrity hash mismatch"):
+        approval_ledger.verify_ledger(full=True)
+
+    # Tampering after the last checkpoint is caught incrementally
+    ledger_path.write_text("".join(lines))
+    tampered = json.loads(lines[9])
+    tampered["target_artifact_id"] = "SIG-X"
+    ledger_path.write_text("".join(lines[:9]) + json.dumps(tampered) + "\n")
+    with pytest.raises(ValueError, match="Integrity hash mismatch"):
+        approval_ledger.verify_ledger()
+
+    # A rewritten checkpoint record fails its own hash
+    ledger_path.write_text("".join(lines))
+    checkpoints_path = ledger_path.parent / "approval_ledger.checkpoints.jsonl"
+    records = approval_ledger.load_checkpoints()
+    records[-1]["merkle_root"] = "0" * 64
+    checkpoints_path.write_text("".join(json.dumps(c) + "\n" for c in records))
+    with pytest.raises(ValueError, match="Checkpoint hash mismatch"):
+        approval_ledger.verify_ledger()
+
+
+def test_inclusion_proofs(ledger_path):
+    approval_ledger.append_entries(_bulk(10))
+    assert approval_ledger.inclusion_proof(9) is None  # block 2 is not complete
+
+    for seq in range(1, 9):
+        proof = approval_ledger.inclusion_proof(seq)
+        assert proof["entry"]["ledger_seq"] == seq and len(proof["merkle_path"]) == 2
+        assert approval_ledger.verify_inclusion_proof(json.loads(json.dumps(proof))) is True
+
+    proof = approval_ledger.inclusion_proof(6)
+    proof["entry"]["actor"] = "mallory"
+    with pytest.raises(ValueError, match="Integrity hash mismatch"):
+        approval_ledger.verify_inclusion_proof(proof)
+
+    proof = approval_ledger.inclusion_proof(6)
+    proof["merkle_path"][0][1] = "0" * 64
+    with pytest.raises(ValueError, match="does not lead to the checkpoint root"):
+        approval_ledger.verify_inclusion_proof(proof)
+
+    proof = approval_ledger.inclusion_proof(6)
+    proof["entry"] = approval_ledger.inclusion_proof(2)["entry"]
+    with pytest.raises(ValueError, match="Not in checkpoint"):
+        approval_ledger.verify_inclusion_proof(proof)
+
+    assert [e["ledger_seq"] for e in approval_ledger.entries_for(["SIG-2", "SIG-9"])] == [3, 10]
@@ -0,0 +1,160 @@
+"""
+Unit tests for orchestrator/approval_queue.py (asynchronous approval gates)
+
+Tests cover:
+- Queue persistence: submit/list/decide, duplicate submits, double decisions
+- A queued gate parks the run (awaiting_approval) instead of prompting on stdin
+- Approval resumes the run from the step after the gate; rejection aborts it
+- An approval recorded without resuming is resumed later (only approved requests resume)
+- Ledger events keep the stdin step_approved / run_failed shapes
+- Local HTTP endpoint lists and decides requests
+"""
+
+import json
+import threading
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.approval_queue import ApprovalQueue, apply_decision, make_http_server, resume_request
+from orchestrator.providers.base import BaseProvider
+
+STEP_APPROVED_KEYS = {
+    "timestamp_utc", "event", "approval_mode", "approval_source", "step_idx", "agent", "agent_name",
+    "gate_strategy", "gate_type", "gate_reason", "run_id", "run_dir",
+}
+
+
+class _Provider(BaseProvider):
+    def __init__(self, calls):
+        self.calls = calls
+
+    def run(self, prompt):
+        agent = prompt.split()[1]
+        self.calls.append(agent)
+        return json.dumps({
+            "deliverable_markdown": f"# {agent}\n" + "content " * 10,
+            "updated_state": {},
+            "open_questions": [],
+        })
+
+
+@pytest.fixture
+def pipeline(course):
+    """Config with three agents, a phase gate after step 1 and the queue backend."""
+    tmp_path = course.tmp_path
+    queue_path = tmp_path / "approval_queue.db"
+    config_path = course.write_config(
+        phase_gates=[1], approval={"backend": "queue", "queue_path": str(queue_path)}
+    )
+
+    calls = []
+    ledger_path = tmp_path / "ledger.jsonl"
+    run_dir = tmp_path / "outputs" / "run1"
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(ledger_path)), \
+         patch("orchestrator.root_agent.get_provider", return_value=_Provider(calls)), \
+         patch("builtins.input", side_effect=AssertionError("stdin must not be used")):
+        from orchestrator.root_agent import run_pipeline
+        run_pipeline(run_dir=str(run_dir), inputs_dir=str(course.inputs))
+        yield {
+            "queue": ApprovalQueue(str(queue_path)),
+            "calls": calls,
+            "run_dir": run_dir,
+            "manifest": lambda: json.loads((run_dir / "run_manifest.json").read_text()),
+            "events": lambda: [json.loads(line) for line in ledger_path.read_text().splitlines()],
+        }
+
+
+def test_queue_submit_list_decide(tmp_path):
+    queue = ApprovalQueue(str(tmp_path / "q.db"))
+    args = dict(run_id="r1", run_dir="outputs/r1", step_idx=3, agent_name="a", gate_strategy="per_phase",
+                gate_type="phase_gate", gate_reason="routine_check")
+    request_id = queue.submit(**args)
+    assert queue.submit(**args) == request_id
+    assert [r["request_id"] for r in queue.list(status="pending")] == [request_id]
+
+    decided = queue.decide(request_id, approved=True, actor_id="reviewer")
+    assert decided["status"] == "approved" and decided["decided_by"] == "reviewer"
+    with pytest.raises(ValueError):
+        queue.decide(request_id, approved=False)
+    with pytest.raises(KeyError):
+        queue.decide("apr_missing", approved=True)
+
+
+def test_queued_gate_parks_run(pipeline):
+    manifest = pipeline["manifest"]()
+    pending = pipeline["queue"].list(status="pending")
+
+    assert pipeline["calls"] == ["agent1"]
+    assert manifest["status"] == "awaiting_approval"
+    assert manifest["pending_approval"] == {"request_id": pending[0]["request_id"], "step_idx": 1}
+    assert pending[0]["resume"]["inputs_dir"].endswith("inputs")
+
+
+def test_approval_resumes_run(pipeline):
+    request_id = pipeline["queue"].list(status="pending")[0]["request_id"]
+    apply_decision(pipeline["queue"], request_id, approved=True, actor_id="reviewer")
+
+    manifest = pipeline["manifest"]()
+    assert pipeline["calls"] == ["agent1", "agent2", "agent3"]
+    assert manifest["status"] == "completed"
+    assert "pending_approval" not in manifest
+    assert pipeline["queue"].get(request_id)["status"] == "resumed"
+
+    approved = [e for e in pipeline["events"]() if e["event"] == "step_approved"]
+    assert set(approved[0]) == STEP_APPROVED_KEYS
+    assert approved[0]["approval_mode"] == "manual" and approved[0]["approval_source"] == "approval_queue"
+
+
+def test_deferred_resume(pipeline, monkeypatch):
+    queue = pipeline["queue"]
+    request_id = queue.list(status="pending")[0]["request_id"]
+    with pytest.raises(ValueError, match="is pending"):
+        resume_request(queue, request_id)
+    apply_decision(queue, request_id, approved=True, resume=False)
+    assert pipeline["calls"] == ["agent1"] and pipeline["manifest"]()["status"] == "awaiting_approval"
+
+    monkeypatch.setenv("PROVIDER", "openai")
+    resume_request(queue, request_id)
+    assert pipeline["calls"] == ["agent1", "agent2", "agent3"]
+    assert pipeline["manifest"]()["status"] == "completed"
+    assert queue.get(request_id)["status"] == "resumed"
+    with pytest.raises(ValueError, match="is resumed"):
+        resume_request(queue, request_id)
+    with pytest.raises(KeyError):
+        resume_request(queue, "apr_missing")
+
+
+def test_rejection_aborts_run(pipeline):
+    request_id = pipeline["queue"].list(status="pending")[0]["request_id"]
+    apply_decision(pipeline["queue"], request_id, approved=False)
+
+    assert pipeline["calls"] == ["agent1"]
+    assert pipeline["manifest"]()["status"] == "aborted"
+    failed = [e for e in pipeline["events"]() if e["event"] == "run_failed"]
+    assert failed[0]["reason"] == "approval_rejected" and failed[0]["step_idx"] == 1
+
+
+def test_http_endpoint_lists_and_decides(pipeline):
+    server = make_http_server(pipeline["queue"], port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/approvals?status=pending") as response:
+            request_id = json.loads(response.read())[0]["request_id"]
+
+        post = urllib.request.Request(f"{base}/approvals/{request_id}/reject", data=b'{"actor_id": "web"}',
+                                      method="POST")
+        with urllib.request.urlopen(post) as response:
+            assert json.loads(response.read())["status"] == "rejected"
+
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(urllib.request.Request(post.full_url, data=b"{}", method="POST"))
+        assert err.value.code == 409
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert pipeline["manifest"]()["status"] == "aborted"
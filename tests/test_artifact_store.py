@@ -0,0 +1,172 @@
+"""
+Unit tests for orchestrator/artifact_store.py and runs written through the artifact store
+
+Tests cover:
+- Settings validation (disabled by default)
+- Blobs are content-addressed, deduplicated and verified on read
+- Run files resolve through pointers; a pointer write drops a stale plain copy; listing matches per path segment
+- Checkpoints written to the store are read back by read_checkpoint / read_latest_checkpoint
+- materialize_run writes the plain layout in place or to a copy
+- Two identical runs with the store enabled share every blob; resume, the audit summary
+  and a materialized copy read the same artifacts as a plain run
+"""
+
+import json
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.artifact_store import (
+    POINTER_MANIFEST,
+    ArtifactStore,
+    StoreSettings,
+    list_run_files,
+    materialize_run,
+    read_run_json,
+    read_run_text,
+    run_file_exists,
+    store_settings,
+    write_run_file,
+)
+from orchestrator.providers.base import BaseProvider
+from orchestrator.run_artifacts import read_checkpoint, read_latest_checkpoint, write_checkpoint
+
+
+def test_store_settings():
+    assert store_settings({}) is None
+    assert store_settings({"artifact_store": {"enabled": False}}) is None
+    assert store_settings({"artifact_store": {"enabled": True}}) == StoreSettings()
+    assert store_settings({"artifact_store": {"enabled": True, "path": "cas"}}).path == "cas"
+    with pytest.raises(ValueError):
+        store_settings({"artifact_store": {"enabled": True, "compression_level": 10}})
+    with pytest.raises(ValueError):
+        store_settings({"artifact_store": {"enabled": True, "path": ""}})
+
+
+def test_blobs_deduplicated_and_verified(tmp_path):
+    store = ArtifactStore(tmp_path / "cas")
+    digest, written = store.put(b"deliverable " * 100)
+    assert written and store.has(digest)
+    assert store.put(b"deliverable " * 100) == (digest, False)
+    assert store.blob_path(digest).stat().st_size < 100  # compressed
+    assert store.get(digest) == b"deliverable " * 100
+
+    store.blob_path(digest).write_bytes(zlib.compress(b"tampered"))
+    with pytest.raises(ValueError):
+        store.get(digest)
+    with pytest.raises(FileNotFoundError):
+        store.get("0" * 64)
+
+
+def test_run_files_resolve_through_pointers(tmp_path):
+    store = ArtifactStore(tmp_path / "outputs" / "_cas")
+    run_dir = tmp_path / "outputs" / "run"
+    run_dir.mkdir(parents=True)
+    (run_dir / "01_agent1.md").write_text("stale plain copy")
+    write_run_file(run_dir, "01_agent1.md", "# agent1", store)
+    write_run_file(run_dir, "01_agent1_state.json", json.dumps({"open_questions": ["Q1"]}), store)
+    write_run_file(run_dir, "02_agent2_state.json", json.dumps({"open_questions": []}))  # plain
+
+    assert not (run_dir / "01_agent1.md").exists()
+    pointers = json.loads((run_dir / POINTER_MANIFEST).read_text())
+    assert pointers["store"] == "../_cas" and set(pointers["files"]) == {"01_agent1.md", "01_agent1_state.json"}
+    assert read_run_text(run_dir, "01_agent1.md") == "# agent1"
+    assert read_run_json(run_dir, "01_agent1_state.json") == {"open_questions": ["Q1"]}
+    assert run_file_exists(run_dir, "02_agent2_state.json") and not run_file_exists(run_dir, "03_x.md")
+    assert list_run_files(run_dir, "*_state.json") == ["01_agent1_state.json", "02_agent2_state.json"]
+
+    with pytest.raises(FileNotFoundError):
+        read_run_text(run_dir, "03_x.md")
+
+
+def test_checkpoints_through_store(tmp_path):
+    store = ArtifactStore(tmp_path / "_cas")
+    checkpoints_dir = tmp_path / "run" / "checkpoints"
+    checkpoints_dir.mkdir(parents=True)
+    assert write_checkpoint(checkpoints_dir, 1, {"step": 1}, store=store)
+    assert not write_checkpoint(checkpoints_dir, 2, {"step": 1}, store=store)  # same content, one blob
+    write_checkpoint(checkpoints_dir, 3, {"step": 3}, store=store)
+
+    assert list(checkpoints_dir.iterdir()) == []
+    assert list_run_files(tmp_path / "run", "*_state.json") == []  # checkpoints are one level down
+    assert read_checkpoint(checkpoints_dir, 2) == {"step": 1}
+    assert read_latest_checkpoint(checkpoints_dir) == (3, {"step": 3})
+    with pytest.raises(FileNotFoundError):
+        read_checkpoint(checkpoints_dir, 4)
+
+
+def test_materialize_in_place_and_copy(tmp_path):
+    store = ArtifactStore(tmp_path / "_cas")
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    (run_dir / "run_manifest.json").write_text("{}")
+    write_run_file(run_dir, "01_agent1.md", "# agent1", store)
+    write_run_file(run_dir, "checkpoints/step_01_state.json", "{}", store)
+
+    copy = tmp_path / "plain"
+    assert materialize_run(run_dir, copy) == {"files": 2, "bytes": 10}
+    assert (copy / "01_agent1.md").read_text() == "# agent1" and (copy / "run_manifest.json").exists()
+    assert not (copy / POINTER_MANIFEST).exists() and (run_dir / POINTER_MANIFEST).exists()
+    with pytest.raises(FileExistsError):
+        materialize_run(run_dir, copy)
+
+    assert materialize_run(run_dir)["files"] == 2
+    assert (run_dir / "checkpoints" / "step_01_state.json").read_text() == "{}"
+    assert not (run_dir / POINTER_MANIFEST).exists()
+
+
+class _Provider(BaseProvider):
+    def run(self, prompt):
+        agent = prompt.split()[1]
+        return json.dumps({"deliverable_markdown": f"# {agent}\n" + "content " * 10,
+                           "updated_state": {agent: "done"}, "open_questions": [f"Question from {agent}?"]})
+
+
+def test_pipeline_writes_through_store(tmp_path, monkeypatch):
+    from orchestrator.audit import generate_audit_summary
+    from orchestrator.root_agent import run_pipeline
+
+    agents = []
+    for name in ("agent1", "agent2"):
+        (tmp_path / f"{name}.md").write_text(f"Prompt {name}\n{{business_brief}}")
+        agents.append({"name": name, "prompt_path": str(tmp_path / f"{name}.md")})
+    config = {"provider": "openai", "agents": agents,
+              "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+              "validation": {"min_deliverable_chars": 20}}
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "business_brief.md").write_text("Brief")
+    (inputs / "sme_notes.md").write_text("Notes")
+    monkeypatch.delenv("PROVIDER", raising=False)
+    outputs = tmp_path / "outputs"
+
+    def run(name, store_enabled):
+        config["artifact_store"] = {"enabled": store_enabled}
+        (tmp_path / "run_config.json").write_text(json.dumps(config))
+        with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+             patch("orchestrator.root_agent.OUTPUTS_DIR", str(outputs)), \
+             patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+             patch("orchestrator.root_agent.get_provider", return_value=_Provider()):
+            run_pipeline(run_dir=str(outputs / name), inputs_dir=str(inputs))
+        return outputs / name
+
+    plain, first, second = run("plain", False), run("first", True), run("second", True)
+
+    assert not (first / "01_agent1.md").exists() and not (first / "99_final_state.json").exists()
+    assert json.loads((first / "run_manifest.json").read_text())["artifact_store"] == {
+        "blobs_written": 6, "deduplicated": 1}  # the final state is the last checkpoint
+    assert json.loads((second / "run_manifest.json").read_text())["artifact_store"] == {
+        "blobs_written": 0, "deduplicated": 7}
+    assert json.loads((plain / "run_manifest.json").read_text()).get("artifact_store") is None
+
+    assert read_latest_checkpoint(first / "checkpoints") == read_latest_checkpoint(plain / "checkpoints")
+    summary_path = generate_audit_summary("first", str(first), ledger_path=str(tmp_path / "ledger.jsonl"),
+                                          suppress_ledger_events=True)
+    summary = json.loads(summary_path.read_text())
+    assert summary["open_questions_summary"]["total_count"] == 2
+
+    materialize_run(first, tmp_path / "materialized")
+    for rel in list_run_files(plain, "*") + list_run_files(plain, "checkpoints/*"):
+        if rel.endswith((".md", "_state.json")):
+            assert (tmp_path / "materialized" / rel).read_bytes() == (plain / rel).read_bytes()
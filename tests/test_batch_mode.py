@@ -0,0 +1,193 @@
+"""
+Unit tests for orchestrator/batch/
+
+Tests cover:
+- Request lines carry the same chat payload as OpenAIProvider
+- LocalBatchBackend follows the submit/poll/fetch cycle and reports per-line errors
+- parse_result_line handles success, error and non-200 lines
+- BatchCoordinator advances several courses wave by wave through run_pipeline
+- Identical prompts within a wave are submitted once
+- A failed batch line fails only its own course
+- Course outcomes are the statuses the runs recorded (parked, cancelled and fenced runs included)
+- An interrupted batch resumes its unfinished courses from their checkpoints
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.batch import (
+    BatchCoordinator,
+    BatchCourse,
+    BatchError,
+    LocalBatchBackend,
+    find_batch,
+    resumable_courses,
+)
+from orchestrator.batch.backends import build_request_line, parse_result_line, write_jsonl
+from orchestrator.providers import DryRunProvider
+from orchestrator.providers.openai_provider import JSON_SYSTEM_PROMPT
+
+
+class _FailOnMarker(DryRunProvider):
+    """Responder that fails any prompt containing FAIL_ME (and ``also``, if given)."""
+
+    def __init__(self, also=None):
+        self.also = also
+
+    def run(self, prompt):
+        if "FAIL_ME" in prompt and (self.also is None or self.also in prompt):
+            raise RuntimeError("simulated provider error")
+        return super().run(prompt)
+
+
+def test_request_line_matches_openai_payload():
+    line = build_request_line("w01-abc", "Prompt text", "gpt-4o-mini", 0.2)
+
+    assert line["method"] == "POST"
+    assert line["url"] == "/v1/chat/completions"
+    assert line["body"]["messages"] == [
+        {"role": "system", "content": JSON_SYSTEM_PROMPT},
+        {"role": "user", "content": "Prompt text"},
+    ]
+    assert line["body"]["response_format"] == {"type": "json_object"}
+
+
+def test_local_backend_submit_poll_fetch(tmp_path):
+    backend = LocalBatchBackend(tmp_path / "backend", responder=_FailOnMarker(), polls_until_complete=2)
+    requests_path = tmp_path / "requests.jsonl"
+    write_jsonl(requests_path, [
+        build_request_line("ok", "Strategy Lead prompt", "m", 0.2),
+        build_request_line("bad", "FAIL_ME", "m", 0.2),
+    ])
+
+    batch_id = backend.submit(requests_path)
+    with pytest.raises(BatchError):
+        backend.fetch_results(batch_id)
+
+    assert backend.status(batch_id) == "in_progress"
+    assert backend.status(batch_id) == "completed"
+
+    results = {r["custom_id"]: parse_result_line(r) for r in backend.fetch_results(batch_id)}
+    assert results["ok"]["error"] is None
+    assert "deliverable_markdown" in json.loads(results["ok"]["content"])
+    assert results["bad"]["content"] is None
+    assert "simulated provider error" in results["bad"]["error"]
+
+
+def test_parse_result_line_non_200():
+    line = {"custom_id": "x", "response": {"status_code": 429, "body": {"error": {"message": "rate limited"}}},
+            "error": None}
+    assert parse_result_line(line)["error"] == "rate limited"
+
+
+@pytest.fixture
+def batch_env(tmp_path, monkeypatch):
+    """Two-agent config with three courses; run_pipeline paths redirected to tmp_path."""
+    (tmp_path / "prompt.md").write_text("Strategy Lead prompt\n{business_brief}\n{sme_notes}")
+    config = {
+        "provider": "openai",
+        "agents": [
+            {"name": "strategy_lead_agent", "prompt_path": str(tmp_path / "prompt.md")},
+            {"name": "learner_research_agent", "prompt_path": str(tmp_path / "prompt.md")},
+        ],
+        "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+        "validation": {"min_deliverable_chars": 10},
+    }
+    config_path = tmp_path / "run_config.json"
+    config_path.write_text(json.dumps(config))
+
+    courses = []
+    for course_id, brief in (("acme", "Brief A"), ("globex", "Brief B"), ("initech", "Brief A")):
+        inputs_dir = tmp_path / "inputs" / course_id
+        inputs_dir.mkdir(parents=True)
+        (inputs_dir / "business_brief.md").write_text(brief)
+        (inputs_dir / "sme_notes.md").write_text("Notes")
+        courses.append(BatchCourse(course_id, str(inputs_dir), str(tmp_path / "outputs" / course_id)))
+
+    monkeypatch.setenv("AUTO_APPROVE", "1")
+    monkeypatch.delenv("PROVIDER", raising=False)
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.OUTPUTS_DIR", str(tmp_path / "outputs")), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")):
+        yield tmp_path, courses
+
+
+def test_coordinator_runs_courses_wave_by_wave(batch_env):
+    tmp_path, courses = batch_env
+    backend = LocalBatchBackend(tmp_path / "backend")
+    coordinator = BatchCoordinator(backend, tmp_path / "batch", poll_interval=0)
+
+    outcomes = coordinator.run_courses(courses)
+
+    assert outcomes == {"acme": "completed", "globex": "completed", "initech": "completed"}
+    assert [w["wave"] for w in coordinator.waves] == [1, 2]
+    # acme and initech share inputs, so their prompts are identical and sent once
+    assert all(w["requests"] == 2 and w["deduplicated"] == 1 for w in coordinator.waves)
+
+    for course in courses:
+        manifest = json.loads((tmp_path / "outputs" / course.course_id / "run_manifest.json").read_text())
+        assert manifest["status"] == "completed"
+        assert manifest["current_step_completed"] == 2
+        assert manifest["providers_used_by_step"] == {"1": "batch:local", "2": "batch:local"}
+
+    batch_manifest = json.loads((tmp_path / "batch" / "batch_manifest.json").read_text())
+    assert len(batch_manifest["waves"]) == 2
+    assert (tmp_path / "batch" / "wave_01" / "requests.jsonl").exists()
+
+
+def test_failed_line_fails_only_its_course(batch_env):
+    tmp_path, courses = batch_env
+    (tmp_path / "inputs" / "globex" / "business_brief.md").write_text("FAIL_ME")
+    backend = LocalBatchBackend(tmp_path / "backend", responder=_FailOnMarker())
+    coordinator = BatchCoordinator(backend, tmp_path / "batch", poll_interval=0)
+
+    outcomes = coordinator.run_courses(courses)
+
+    assert outcomes["globex"] == "failed"
+    assert outcomes["acme"] == "completed"
+    manifest = json.loads((tmp_path / "outputs" / "globex" / "run_manifest.json").read_text())
+    assert manifest["status"] == "failed"
+    assert coordinator.waves[0]["failed"] == 1
+
+
+def test_outcomes_come_from_the_run_manifests(batch_env):
+    tmp_path, courses = batch_env
+    recorded = {"acme": "awaiting_approval", "globex": "cancelled", "initech": "running"}
+
+    def run_fn(run_dir, **kwargs):
+        Path(run_dir).mkdir(parents=True)
+        (Path(run_dir) / "run_manifest.json").write_text(json.dumps({"status": recorded[Path(run_dir).name]}))
+
+    coordinator = BatchCoordinator(LocalBatchBackend(tmp_path / "backend"), tmp_path / "batch", poll_interval=0)
+    outcomes = coordinator.run_courses(courses, run_fn=run_fn)
+
+    assert outcomes == {"acme": "awaiting_approval", "globex": "cancelled", "initech": "fenced"}
+
+
+def test_interrupted_batch_resumes_unfinished_courses(batch_env):
+    tmp_path, courses = batch_env
+    (tmp_path / "prompt2.md").write_text("Learner Research prompt STEP_TWO\n{business_brief}\n{sme_notes}")
+    config_path = tmp_path / "run_config.json"
+    config = json.loads(config_path.read_text())
+    config["agents"][1]["prompt_path"] = str(tmp_path / "prompt2.md")
+    config_path.write_text(json.dumps(config))
+    (tmp_path / "inputs" / "globex" / "business_brief.md").write_text("FAIL_ME")
+
+    backend = LocalBatchBackend(tmp_path / "backend", responder=_FailOnMarker(also="STEP_TWO"))
+    outcomes = BatchCoordinator(backend, tmp_path / "batch", poll_interval=0).run_courses(courses)
+    assert outcomes["globex"] == "failed" and outcomes["acme"] == "completed"
+
+    resumed = resumable_courses(tmp_path / "batch")
+    assert [(c.course_id, c.start_step) for c in resumed] == [("globex", 2)]
+    assert resumed[0].initial_state is not None
+    globex_dir = tmp_path / "outputs" / "globex"
+    assert find_batch(tmp_path, globex_dir) == "batch"
+
+    coordinator = BatchCoordinator(LocalBatchBackend(tmp_path / "backend"), tmp_path / "batch", poll_interval=0)
+    assert coordinator.run_courses(resumed) == {"globex": "completed"}
+    assert [w["wave"] for w in coordinator.waves] == [1, 2, 3]
+    assert json.loads((globex_dir / "run_manifest.json").read_text())["current_step_completed"] == 2
+    assert resumable_courses(tmp_path / "batch") == []
@@ -0,0 +1,137 @@
+"""
+Unit tests for benchmarks/harness.py
+
+Tests cover:
+- measure() returns per-call statistics and runs setup outside the timing
+- compare_results() flags regressions beyond the threshold only
+- Results documents round-trip and reject unknown schema versions
+- The dry-run pipeline suite runs in a sandbox without touching the repo
+- Synthetic courses are deterministic, sized to spec and contract-valid
+- The scaling suite reports time and peak memory per op and size
+"""
+
+import json
+import os
+
+import pytest
+
+from benchmarks.harness import (
+    build_results_document,
+    compare_results,
+    measure,
+    read_results,
+    write_results,
+)
+from benchmarks.pipeline import run_pipeline_suite
+from benchmarks.scaling import SCALING_OPS, run_scaling_suite
+from benchmarks.synthetic import (
+    SyntheticCourseSpec,
+    generate_learning_architect_response,
+    generate_sme_notes,
+    generate_state,
+)
+from orchestrator.json_tools import parse_json_object
+from orchestrator.validation import ValidationConfig, validate_agent_output
+
+
+def _doc(results):
+    return build_results_document("micro", {k: {"min_ms": v, "median_ms": v} for k, v in results.items()})
+
+
+def test_measure_reports_stats_and_calls_setup_per_repeat():
+    calls = {"func": 0, "setup": 0}
+
+    def func():
+        calls["func"] += 1
+
+    def setup():
+        calls["setup"] += 1
+
+    stats = measure(func, repeat=3, number=4, setup=setup, warmup=1)
+
+    assert calls["func"] == 1 + 3 * 4
+    assert calls["setup"] == 1 + 3
+    assert stats["repeat"] == 3 and stats["number"] == 4
+    assert stats["min_ms"] <= stats["median_ms"] <= stats["max_ms"]
+
+
+def test_compare_flags_regression_beyond_threshold():
+    baseline = _doc({"a": 10.0, "b": 10.0, "c": 10.0})
+    current = _doc({"a": 13.0, "b": 11.0, "c": 5.0})
+
+    report = compare_results(baseline, current, threshold=0.25)
+
+    assert [e["name"] for e in report["regressions"]] == ["a"]
+    assert [e["name"] for e in report["unchanged"]] == ["b"]
+    assert [e["name"] for e in report["improvements"]] == ["c"]
+
+
+def test_compare_ignores_noise_below_min_delta():
+    report = compare_results(_doc({"tiny": 0.001}), _doc({"tiny": 0.004}), threshold=0.25, min_delta_ms=0.01)
+    assert report["regressions"] == []
+
+
+def test_compare_reports_missing_and_new():
+    report = compare_results(_doc({"old": 1.0}), _doc({"new": 1.0}))
+    assert report["missing"] == ["old"]
+    assert report["new"] == ["new"]
+
+
+def test_results_round_trip(tmp_path):
+    path = tmp_path / "results.json"
+    write_results(path, _doc({"a": 1.5}))
+    assert read_results(path)["results"]["a"]["median_ms"] == 1.5
+
+
+def test_read_results_rejects_unknown_schema(tmp_path):
+    path = tmp_path / "results.json"
+    path.write_text(json.dumps({"schema_version": 999, "results": {}}))
+    with pytest.raises(ValueError):
+        read_results(path)
+
+
+def test_pipeline_suite_runs_in_sandbox():
+    cwd = os.getcwd()
+    provider = os.environ.get("PROVIDER")
+
+    results = run_pipeline_suite(repeat=1, quiet=True)
+
+    stats = results["pipeline.dry_run.full"]
+    assert stats["median_ms"] > 0
+    assert stats["steps"] == 10
+    synthetic = results["pipeline.synthetic.full"]
+    assert synthetic["state_kib"] > 0 and synthetic["run_dir_kib"] > synthetic["state_kib"]
+    assert os.getcwd() == cwd
+    assert os.environ.get("PROVIDER") == provider
+
+
+def test_synthetic_course_is_deterministic_and_sized():
+    spec = SyntheticCourseSpec(num_modules=30, objectives_per_module=4, assessment_items=240, sme_notes_kib=16)
+
+    state = generate_state(spec)
+
+    assert generate_state(spec) == state
+    assert len(state["curriculum"]["modules"]) == 30
+    assert len(state["curriculum"]["modules"][0]["objectives"]) == 4
+    assert len(state["assessments"]["questions"]) == 240
+    assert len(generate_sme_notes(spec)) == 16 * 1024
+
+
+def test_synthetic_learning_architect_response_passes_contract():
+    spec = SyntheticCourseSpec(num_modules=12)
+    parsed = parse_json_object(generate_learning_architect_response(spec))
+    vcfg = ValidationConfig(min_deliverable_chars=300, placeholder_markers=["[Missing", "TBD", "TODO"])
+
+    validate_agent_output("learning_architect_agent", parsed, vcfg)
+
+    assert len(parsed["updated_state"]["curriculum"]["modules"]) == 12
+
+
+def test_scaling_suite_reports_time_and_memory():
+    results = run_scaling_suite(sizes=["s"], repeat=1, quiet=True)
+
+    assert sorted(results) == sorted(f"scaling.{op}.s" for op in SCALING_OPS)
+    for stats in results.values():
+        assert stats["min_ms"] >= 0
+        assert stats["peak_kib"] >= 0
+        assert stats["spec"] == SyntheticCourseSpec().label
@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 import pytest
 from unittest.mock import patch
+import governance.approval_ledger
 from scripts.bundle_export import collect_run_files
 
 @patch('scripts.bundle_export.run_subprocess')
@@ -61,3 +62,34 @@ def test_collect_run_files_handles_missing_dist(mock_run_subprocess, tmp_path):
     
     filenames = [f['arcname'] for f in files]
     assert not any(f.startswith("dist/") for f in filenames)
+
+def test_collect_approval_proofs(tmp_path, monkeypatch):
+    """
+    Verify that a run's approval ledger entries (its own and its knowledge pack's)
+    are exported with inclusion proofs that check without the ledger.
+    """
+    from scripts.bundle_export import collect_approval_proofs
+
+    ledger_path = tmp_path / "governance" / "approval_ledger.jsonl"
+    monkeypatch.setattr(governance.approval_ledger, '_get_ledger_path', lambda: str(ledger_path))
+    monkeypatch.setattr(governance.approval_ledger, 'CHECKPOINT_BLOCK_SIZE', 4)
+    for i in range(5):
+        governance.approval_ledger.append_entry("SIGNAL_CREATED", "ci", f"SIG-{i}")
+    governance.approval_ledger.append_entry("PACK_APPLIED", "ci", "v2")
+    governance.approval_ledger.append_entry("SIGNAL_CREATED", "ci", "SIG-5")
+    governance.approval_ledger.append_entry("SIGNAL_CREATED", "ci", "SIG-6")  # completes block 1
+    governance.approval_ledger.append_entry("PACK_APPLIED", "ci", "v3")
+
+    run_dir = tmp_path / "outputs" / "20260206_120002"
+    run_dir.mkdir(parents=True)
+    (run_dir / "run_manifest.json").write_text(json.dumps({"knowledge_pack": {"pack_version": "v2"}}))
+    (run_dir / "audit_summary.json").write_text("{}")
+
+    evidence = collect_approval_proofs("20260206_120002", run_dir)
+    assert evidence["artifact_ids"] == ["20260206_120002", "v2"]
+    assert [p["entry"]["ledger_seq"] for p in evidence["proofs"]] == [6] and evidence["unproven_entries"] == []
+    assert governance.approval_ledger.verify_inclusion_proof(json.loads(json.dumps(evidence["proofs"][0])))
+
+    run_dir.joinpath("run_manifest.json").write_text(json.dumps({"knowledge_pack": {"pack_version": "v3"}}))
+    evidence = collect_approval_proofs("20260206_120002", run_dir)
+    assert evidence["proofs"] == [] and [e["ledger_seq"] for e in evidence["unproven_entries"]] == [9]
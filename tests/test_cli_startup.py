@@ -0,0 +1,97 @@
+"""
+Startup budget tests for the adk CLI (cli/adk.py, lazy imports)
+
+Tests cover:
+- `adk --help` and the signal/proposal/pack/approvals commands do not import
+  the orchestrator, providers, jsonschema or http.server (python -X importtime)
+- Import-time budget for `adk --help`; the wall-clock target (< 100 ms) depends on the
+  machine and only runs with ADK_TEST_WALL_CLOCK=1
+- Providers are registered lazily and still resolve by name and attribute
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = {
+    "jsonschema",
+    "orchestrator.root_agent",
+    "orchestrator.providers.openai_provider",
+    "scripts.run_pipeline",
+    "urllib.request",
+    "http.server",
+}
+
+STARTUP_BUDGET_MS = 100
+
+
+def _importtime(*argv):
+    """Run `python -X importtime -m adk ...`; returns {module: cumulative_us} for top-level imports and all names."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "adk", *argv],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    top_level, names = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        names.add(name.strip())
+        if not name[1:].startswith(" "):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, names
+
+
+@pytest.mark.parametrize("argv", [
+    ["--help"],
+    ["signal", "--help"],
+    ["proposal", "approve", "--help"],
+    ["pack", "rollback", "--help"],
+    ["approvals", "list", "--help"],
+])
+def test_commands_skip_heavy_imports(argv):
+    _, names = _importtime(*argv)
+    assert not HEAVY_MODULES & names
+
+
+def test_help_import_budget():
+    top_level, _ = _importtime("--help")
+    assert sum(top_level.values()) / 1000 < STARTUP_BUDGET_MS
+
+
+@pytest.mark.skipif(os.environ.get("ADK_TEST_WALL_CLOCK") != "1",
+                    reason="wall-clock timing is machine-dependent; set ADK_TEST_WALL_CLOCK=1")
+def test_help_wall_clock_target():
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "adk", "--help"], cwd=REPO_ROOT,
+                       stdout=subprocess.DEVNULL, check=True, timeout=60)
+        timings.append(time.perf_counter() - started)
+    assert min(timings) * 1000 < STARTUP_BUDGET_MS
+
+
+def test_providers_register_lazily():
+    code = (
+        "import sys\n"
+        "import orchestrator.providers as p\n"
+        "assert 'orchestrator.providers.openai_provider' not in sys.modules\n"
+        "assert type(p.get_provider('dry_run')).__name__ == 'DryRunProvider'\n"
+        "assert 'orchestrator.providers.openai_provider' not in sys.modules\n"
+        "from orchestrator.providers import OpenAIProvider\n"
+        "assert OpenAIProvider.__module__ == 'orchestrator.providers.openai_provider'\n"
+        "try:\n"
+        "    p.NoSuchProvider\n"
+        "except AttributeError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise SystemExit('expected AttributeError')\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True, timeout=60)
@@ -67,6 +67,15 @@ def test_no_governed_changes(mock_subprocess, mock_sys_exit):
     mock_subprocess.return_value = b"README.md\n"
     run_main_expecting_code(0, mock_sys_exit)
 
+def test_runtime_ledger_files_not_governed(mock_subprocess, mock_sys_exit):
+    assert not enforce_promotion_guard.is_governed("governance/approval_ledger.jsonl")
+    assert not enforce_promotion_guard.is_governed("governance/approval_ledger.checkpoints.jsonl")
+    assert not enforce_promotion_guard.is_governed("governance/run_ledger.jsonl")
+    assert enforce_promotion_guard.is_governed("governance/approval_ledger.py")
+
+    mock_subprocess.return_value = b"governance/approval_ledger.jsonl\ngovernance/approval_ledger.checkpoints.jsonl\n"
+    run_main_expecting_code(0, mock_sys_exit)
+
 def test_governed_changes_no_promo_id(mock_subprocess, mock_sys_exit, monkeypatch):
     def side_effect(cmd, **kwargs):
         cmd_str = " ".join(cmd)
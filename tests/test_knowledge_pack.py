@@ -0,0 +1,165 @@
+"""
+Unit tests for orchestrator/knowledge_pack.py and knowledge pack passages in run_pipeline
+
+Tests cover:
+- Settings validation and per-agent overrides
+- Loading the active pack (none applied, valid, marker naming a missing pack)
+- The index is cached per manifest hash; chunk IDs carry the pack file path
+- Invalidation removes the indexes of packs that are no longer active
+- Prompt rendering fills {knowledge_pack} or appends a KNOWLEDGE PACK section (both layouts)
+- A run records the active pack version and the chunk IDs each step received in the manifest
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.knowledge_pack import (
+    PackRetriever,
+    PackRules,
+    invalidate_pack_indexes,
+    load_active_pack,
+    load_or_build_pack_index,
+    pack_rules,
+)
+from orchestrator.providers.base import BaseProvider
+
+REFUNDS = """# Refunds
+
+## Approval thresholds
+Refunds above 500 EUR need a manager approval recorded in the ticket.
+
+## Evidence
+Attach the customer's receipt and the audit evidence note.
+"""
+
+ONBOARDING = """# Onboarding
+
+New clients complete the onboarding checklist within five days.
+"""
+
+
+def _apply_pack(active_dir, version, files, manifest_hash):
+    """Lay out an applied pack the way ``adk pack apply`` does."""
+    pack_dir = active_dir / "packs" / version
+    for rel_path, content in files.items():
+        (pack_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (pack_dir / rel_path).write_text(content)
+    manifest = {"pack_version": version, "manifest_hash": manifest_hash,
+                "files": [{"path": p, "sha256": "x"} for p in files]}
+    (pack_dir / "manifest.json").write_text(json.dumps(manifest))
+    (active_dir / "ACTIVE_PACK.json").write_text(json.dumps({"pack_version": version}))
+
+
+def test_pack_rules():
+    config = {"knowledge_pack": {"top_k": 2}}
+    assert pack_rules(config, {"name": "qa_agent"}) == PackRules(top_k=2)
+    assert pack_rules(config, {"name": "qa_agent", "knowledge_pack": {"query": "refunds"}}).query == "refunds"
+    assert pack_rules(config, {"name": "qa_agent", "knowledge_pack": False}) is None
+    assert pack_rules({}, {"name": "qa_agent"}) is None
+    with pytest.raises(ValueError):
+        pack_rules({"knowledge_pack": {"budget_tokens": 0}}, {"name": "qa_agent"})
+    with pytest.raises(ValueError):
+        pack_rules(config, {"name": "qa_agent", "knowledge_pack": "yes"})
+
+
+def test_load_active_pack(tmp_path):
+    assert load_active_pack(tmp_path) is None
+    _apply_pack(tmp_path, "v1", {"included/refunds.md": REFUNDS}, "a" * 64)
+    pack = load_active_pack(tmp_path)
+    assert pack.version == "v1" and pack.manifest_hash == "a" * 64 and pack.files == ("included/refunds.md",)
+
+    (tmp_path / "ACTIVE_PACK.json").write_text(json.dumps({"pack_version": "v9"}))
+    with pytest.raises(ValueError, match="v9"):
+        load_active_pack(tmp_path)
+
+
+def test_index_cached_per_manifest_hash_and_invalidated(tmp_path):
+    _apply_pack(tmp_path, "v1", {"included/refunds.md": REFUNDS, "included/logo.png": "binary"}, "a" * 64)
+    pack = load_active_pack(tmp_path)
+    index, cached = load_or_build_pack_index(pack, 400, tmp_path)
+    assert not cached
+    assert [c["id"] for c in index.chunks] == ["refunds.md:0001", "refunds.md:0002"]
+    assert load_or_build_pack_index(pack, 400, tmp_path)[1]
+
+    _apply_pack(tmp_path, "v2", {"included/onboarding.md": ONBOARDING}, "b" * 64)
+    v2 = load_active_pack(tmp_path)
+    assert not load_or_build_pack_index(v2, 400, tmp_path)[1]
+    assert invalidate_pack_indexes(tmp_path, keep=v2.manifest_hash) == 1
+    assert [p.name for p in (tmp_path / "_index").iterdir()] == [f"{'b' * 64}-400.json"]
+
+    text, chunk_ids = PackRetriever(v2, tmp_path).retrieve("qa_agent", {}, PackRules(query="onboarding checklist"))
+    assert chunk_ids == ["onboarding.md:0001"] and "[onboarding.md:0001]" in text
+    assert PackRetriever(v2, tmp_path).retrieve("qa_agent", {}, PackRules(query="zebra")) == (None, [])
+
+
+def test_render_prompt_knowledge_slot():
+    from orchestrator.root_agent import render_prompt, render_prompt_messages
+
+    passages = "[refunds.md:0001] Approval thresholds\nRefunds above 500 EUR..."
+    assert render_prompt("Prompt qa_agent", "qa_agent", "B", "N", {}) == "Prompt qa_agent"
+    appended = render_prompt("Prompt qa_agent", "qa_agent", "B", "N", {}, knowledge_text=passages)
+    assert appended.endswith(f"## KNOWLEDGE PACK\n\n{passages}\n")
+    placed = render_prompt("Prompt\n{knowledge_pack}\nEnd", "qa_agent", "B", "N", {}, knowledge_text=passages)
+    assert placed == f"Prompt\n{passages}\nEnd"
+
+    messages = render_prompt_messages("Prompt qa_agent", "qa_agent", "B", "N", {}, knowledge_text=passages)
+    assert messages[-1]["content"] == f"## KNOWLEDGE PACK\n\n{passages}"
+    assert passages not in messages[0]["content"]
+
+
+class _Provider(BaseProvider):
+    def __init__(self):
+        self.prompts = []
+
+    def run(self, prompt):
+        self.prompts.append(prompt)
+        agent = prompt.split()[1]
+        return json.dumps({"deliverable_markdown": f"# {agent}\n" + "content " * 10,
+                           "updated_state": {}, "open_questions": []})
+
+
+def test_pipeline_records_pack_chunks(tmp_path, monkeypatch):
+    from orchestrator.root_agent import run_pipeline
+
+    active_dir = tmp_path / "knowledge" / "active"
+    _apply_pack(active_dir, "v1", {"included/refunds.md": REFUNDS, "included/onboarding.md": ONBOARDING},
+                "c" * 64)
+    agents = []
+    for name in ("agent1", "agent2", "agent3"):
+        (tmp_path / f"{name}.md").write_text(f"Prompt {name}\n{{business_brief}}")
+        agents.append({"name": name, "prompt_path": str(tmp_path / f"{name}.md")})
+    agents[0]["knowledge_pack"] = {"query": "refund approval evidence"}
+    agents[2]["knowledge_pack"] = False
+    config = {"provider": "openai", "agents": agents,
+              "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+              "validation": {"min_deliverable_chars": 20},
+              "knowledge_pack": {"top_k": 2, "chunk_chars": 400}}
+    (tmp_path / "run_config.json").write_text(json.dumps(config))
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "business_brief.md").write_text("Brief")
+    (inputs / "sme_notes.md").write_text("Notes")
+    monkeypatch.delenv("PROVIDER", raising=False)
+    provider = _Provider()
+    run_dir = tmp_path / "outputs" / "run"
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+         patch("orchestrator.root_agent.KNOWLEDGE_DIR", str(active_dir)), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+         patch("orchestrator.root_agent.get_provider", return_value=provider):
+        run_pipeline(run_dir=str(run_dir), inputs_dir=str(inputs))
+
+    first, second, third = provider.prompts
+    assert "## KNOWLEDGE PACK" in first and "[refunds.md:0001]" in first and "[refunds.md:0002]" in first
+    assert "KNOWLEDGE PACK" not in second  # no chunk matched agent2's query
+    assert "KNOWLEDGE PACK" not in third  # knowledge_pack disabled for agent3
+
+    manifest = json.loads((run_dir / "run_manifest.json").read_text())
+    assert manifest["knowledge_pack"] == {
+        "pack_version": "v1",
+        "manifest_hash": "c" * 64,
+        "chunk_ids_by_step": {"1": ["refunds.md:0001", "refunds.md:0002"], "2": []},
+    }
+    assert list((active_dir / "_index").glob(f"{'c' * 64}-400.json"))
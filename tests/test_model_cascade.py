@@ -0,0 +1,131 @@
+"""
+Unit tests for orchestrator/model_cascade.py and cascade routing in run_pipeline
+
+Tests cover:
+- Tier resolution (no cascade, configured tiers, PROVIDER env override, bad config)
+- Escalation to the next tier on parse, validation and quality-check failures
+- Winning tier and escalations recorded in the manifest; model_escalated ledger events
+- Failure on the last tier still fails the run
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.model_cascade import resolve_model_tiers, run_quality_checks
+from orchestrator.providers.base import BaseProvider
+
+VALID = json.dumps({
+    "deliverable_markdown": "# Deliverable\n[Scenario: A] [Scenario: B] Decision Point: choose.\n" + "x" * 40,
+    "updated_state": {},
+    "open_questions": [],
+})
+NO_SCENARIOS = json.dumps({"deliverable_markdown": "# Deliverable\n" + "x" * 60, "updated_state": {},
+                           "open_questions": []})
+TOO_SHORT = json.dumps({"deliverable_markdown": "short", "updated_state": {}, "open_questions": []})
+
+CASCADE = {"tiers": [{"provider": "openai", "model": "small"}, {"provider": "openai", "model": "large"}]}
+
+
+class _ScriptedProvider(BaseProvider):
+    def __init__(self, model, responses, calls):
+        self.model = model
+        self.responses = responses
+        self.calls = calls
+
+    def run(self, prompt):
+        self.calls.append(self.model)
+        return self.responses[self.model]
+
+
+def test_resolve_tiers_without_cascade():
+    assert resolve_model_tiers({"name": "a"}, "openai") == [{"provider": "openai", "model": None}]
+
+
+def test_resolve_tiers_env_override_keeps_tier_count():
+    tiers = resolve_model_tiers({"name": "a", "model_cascade": CASCADE}, "openai", env_provider="dry_run")
+    assert tiers == [{"provider": "dry_run", "model": "small"}, {"provider": "dry_run", "model": "large"}]
+
+
+def test_resolve_tiers_rejects_bad_config():
+    with pytest.raises(ValueError):
+        resolve_model_tiers({"name": "a", "model_cascade": {"tiers": []}}, "openai")
+    with pytest.raises(ValueError):
+        resolve_model_tiers({"name": "a", "model_cascade": dict(CASCADE, quality_checks=["nope"])}, "openai")
+
+
+def test_run_quality_checks():
+    cfg = {"model_cascade": dict(CASCADE, quality_checks=["scenario_density"])}
+    assert run_quality_checks(cfg, json.loads(VALID)["deliverable_markdown"]) == []
+    assert run_quality_checks(cfg, "no scenarios here")
+
+
+def _run(tmp_path, monkeypatch, responses, cascade=CASCADE):
+    from orchestrator.root_agent import run_pipeline
+
+    inputs_dir = tmp_path / "inputs"
+    inputs_dir.mkdir()
+    (inputs_dir / "business_brief.md").write_text("Brief")
+    (inputs_dir / "sme_notes.md").write_text("Notes")
+    (tmp_path / "prompt.md").write_text("Prompt {business_brief}")
+    config = {
+        "provider": "openai",
+        "agents": [{"name": "agent1", "prompt_path": str(tmp_path / "prompt.md"), "model_cascade": cascade}],
+        "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+        "validation": {"min_deliverable_chars": 20},
+    }
+    config_path = tmp_path / "run_config.json"
+    config_path.write_text(json.dumps(config))
+    monkeypatch.delenv("PROVIDER", raising=False)
+    calls = []
+    ledger_path = tmp_path / "ledger.jsonl"
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(ledger_path)), \
+         patch("orchestrator.root_agent.get_provider",
+               side_effect=lambda name, model=None: _ScriptedProvider(model, responses, calls)):
+        run_pipeline(run_dir=str(tmp_path / "outputs" / "run1"), inputs_dir=str(inputs_dir))
+
+    manifest = json.loads((tmp_path / "outputs" / "run1" / "run_manifest.json").read_text())
+    events = [json.loads(line) for line in ledger_path.read_text().splitlines()]
+    return calls, manifest, events
+
+
+def test_first_tier_wins_without_escalation(tmp_path, monkeypatch):
+    calls, manifest, _ = _run(tmp_path, monkeypatch, {"small": VALID, "large": VALID})
+
+    assert calls == ["small"]
+    assert manifest["model_tier_by_step"]["1"] == {"tier": 1, "provider": "openai", "model": "small",
+                                                   "escalations": []}
+
+
+@pytest.mark.parametrize("bad_response,reason", [
+    ("this is not json", "parse_error"),
+    (TOO_SHORT, "validation_error"),
+])
+def test_escalates_on_parse_and_validation_failure(tmp_path, monkeypatch, bad_response, reason):
+    calls, manifest, events = _run(tmp_path, monkeypatch, {"small": bad_response, "large": VALID})
+
+    assert calls == ["small", "large"]
+    assert manifest["status"] == "completed"
+    assert manifest["model_tier_by_step"]["1"]["tier"] == 2
+    assert manifest["model_tier_by_step"]["1"]["escalations"] == [{"tier": 1, "reason": reason}]
+    escalated = [e for e in events if e["event"] == "model_escalated"]
+    assert escalated[0]["from_model"] == "small" and escalated[0]["to_model"] == "large"
+
+
+def test_escalates_on_quality_check_failure(tmp_path, monkeypatch):
+    cascade = dict(CASCADE, quality_checks=["scenario_density"])
+    calls, manifest, _ = _run(tmp_path, monkeypatch, {"small": NO_SCENARIOS, "large": VALID}, cascade=cascade)
+
+    assert calls == ["small", "large"]
+    assert manifest["model_tier_by_step"]["1"]["escalations"] == [{"tier": 1, "reason": "quality_check"}]
+
+
+def test_last_tier_failure_fails_run(tmp_path, monkeypatch):
+    with pytest.raises(SystemExit):
+        _run(tmp_path, monkeypatch, {"small": TOO_SHORT, "large": TOO_SHORT})
+
+    manifest = json.loads((tmp_path / "outputs" / "run1" / "run_manifest.json").read_text())
+    assert manifest["status"] == "failed"
@@ -0,0 +1,191 @@
+"""
+Unit tests for multi-node execution over a shared filesystem
+(orchestrator/service leases, orchestrator/shared_fs.py)
+
+Tests cover:
+- Leases: heartbeat renews, an expired lease is taken over, the stale owner is fenced
+- A lease lost during a provider call fences the run before it writes the step
+- Concurrent ledger appends from several processes never interleave
+- A job left running by a crashed worker resumes from its latest checkpoint
+- Several `adk serve --no-api` worker processes drain one shared queue
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from orchestrator.providers.base import BaseProvider
+from orchestrator.root_agent import run_pipeline
+from orchestrator.service import JobQueue, WorkerPool
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class _Provider(BaseProvider):
+    def __init__(self):
+        self.calls = []
+
+    def run(self, prompt):
+        agent = prompt.split()[1]
+        self.calls.append(agent)
+        return json.dumps({
+            "deliverable_markdown": f"# {agent}\n" + "content " * 10,
+            "updated_state": {},
+            "open_questions": [],
+        })
+
+
+class _LeaseLosingProvider(_Provider):
+    """Loses the worker's lease while agent2's request is in flight."""
+
+    def __init__(self, lease):
+        super().__init__()
+        self.lease = lease
+
+    def run(self, prompt):
+        response = super().run(prompt)
+        if self.calls[-1] == "agent2":
+            self.lease.lost.set()
+        return response
+
+
+def test_lease_takeover_and_fencing(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.submit("inputs")
+
+    job = queue.claim("node-a:1:worker-1", lease_seconds=30)
+    assert job["recovered_from"] is None and job["attempts"] == 1
+    assert queue.heartbeat(job_id, "node-a:1:worker-1", lease_seconds=30)
+    assert queue.claim("node-b:2:worker-1") is None  # lease still live
+
+    # node-a stops heartbeating; once the lease lapses node-b takes the job over
+    assert queue.heartbeat(job_id, "node-a:1:worker-1", lease_seconds=-1)
+    job = queue.claim("node-b:2:worker-1", lease_seconds=30)
+    assert job["job_id"] == job_id
+    assert job["recovered_from"] == "node-a:1:worker-1"
+    assert job["attempts"] == 2
+
+    assert not queue.heartbeat(job_id, "node-a:1:worker-1")
+    assert not queue.finish(job_id, "failed", "stale", worker_id="node-a:1:worker-1")
+    assert queue.finish(job_id, "completed", worker_id="node-b:2:worker-1")
+    assert queue.get(job_id)["status"] == "completed"
+
+
+def test_concurrent_ledger_appends(tmp_path):
+    ledger = tmp_path / "run_ledger.jsonl"
+    script = (
+        "import json, sys\n"
+        "from orchestrator.shared_fs import append_line\n"
+        "for i in range(200):\n"
+        "    append_line(sys.argv[1], json.dumps({'writer': sys.argv[2], 'i': i, 'pad': 'x' * 3000}))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    procs = [subprocess.Popen([sys.executable, "-c", script, str(ledger), str(n)], env=env) for n in range(4)]
+    assert all(p.wait(timeout=60) == 0 for p in procs)
+
+    entries = [json.loads(line) for line in ledger.read_text().splitlines()]
+    assert len(entries) == 800
+    for n in range(4):
+        assert [e["i"] for e in entries if e["writer"] == str(n)] == list(range(200))
+
+
+def test_lease_lost_during_provider_call(course):
+    config_path = course.write_config()
+    ledger_path = course.tmp_path / "run_ledger.jsonl"
+    lease = SimpleNamespace(lost=threading.Event())
+    provider = _LeaseLosingProvider(lease)
+
+    queue = JobQueue(str(course.tmp_path / "jobs.db"))
+    queue.submit(str(course.inputs))
+    pool = WorkerPool(queue, workers=1, outputs_dir=str(course.tmp_path / "outputs"))
+    job = queue.claim("node-a:1:worker-1", run_dir_for=pool.run_dir_for, lease_seconds=30)
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(ledger_path)), \
+         patch("orchestrator.root_agent.get_provider", return_value=provider):
+        pool.run_job(job, worker_id="node-a:1:worker-1", lease=lease)
+
+    # Step 2's response arrived after the lease was lost: nothing of it is written
+    run_dir = Path(job["run_dir"])
+    assert provider.calls == ["agent1", "agent2"]
+    assert (run_dir / "01_agent1.md").exists()
+    assert not (run_dir / "02_agent2.md").exists()
+    assert not (run_dir / "02_agent2_state.json").exists()
+    assert not (run_dir / "checkpoints" / "step_02_state.json").exists()
+    manifest = json.loads((run_dir / "run_manifest.json").read_text())
+    assert manifest["status"] == "running" and manifest["current_step_completed"] == 1
+
+    events = [json.loads(line) for line in ledger_path.read_text().splitlines()]
+    assert [e["event"] for e in events][-1] == "run_fenced"
+
+
+def test_crashed_worker_job_resumes_from_checkpoint(course):
+    tmp_path, inputs = course.tmp_path, course.inputs
+    config_path = course.write_config()
+    ledger_path = tmp_path / "run_ledger.jsonl"
+    provider = _Provider()
+
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.submit(str(inputs))
+    pool = WorkerPool(queue, workers=1, outputs_dir=str(tmp_path / "outputs"), poll_interval=0.05, lease_seconds=30)
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(ledger_path)), \
+         patch("orchestrator.root_agent.get_provider", return_value=provider):
+        # "node-a" claims the job, completes two steps, then dies without heartbeating
+        job = queue.claim("node-a:1:worker-1", run_dir_for=pool.run_dir_for, lease_seconds=-1)
+        run_pipeline(run_dir=job["run_dir"], inputs_dir=str(inputs), max_step=2)
+        assert provider.calls == ["agent1", "agent2"]
+        manifest_path = Path(job["run_dir"]) / "run_manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        manifest["status"] = "running"  # crashed during step 3
+        manifest_path.write_text(json.dumps(manifest))
+
+        pool.start(exit_when_idle=True).join(timeout=30)
+
+    assert provider.calls == ["agent1", "agent2", "agent3"]
+    job = queue.get(job_id)
+    assert job["status"] == "completed"
+    assert job["attempts"] == 2
+    assert job["worker_id"].startswith(pool.worker_prefix)
+
+    events = [json.loads(line) for line in ledger_path.read_text().splitlines()]
+    recovered = [e for e in events if e["event"] == "job_recovered"]
+    assert recovered and recovered[0]["previous_worker"] == "node-a:1:worker-1"
+    assert recovered[0]["resume_step"] == 3
+    assert any(e["event"] == "run_resumed" and e["start_step"] == 3 for e in events)
+
+
+def test_worker_processes_share_queue(tmp_path):
+    # One "shared mount" with config, prompts, outputs/ and governance/
+    for name in ("config", "prompts"):
+        shutil.copytree(REPO_ROOT / name, tmp_path / name)
+    shutil.copy(REPO_ROOT / "VERSION", tmp_path / "VERSION")
+    inputs = tmp_path / "inputs"
+    shutil.copytree(REPO_ROOT / "tests" / "fixtures" / "golden_run", inputs)
+
+    queue = JobQueue(str(tmp_path / "jobs" / "jobs.db"))
+    job_ids = [queue.submit(str(inputs), priority=i % 2) for i in range(6)]
+
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT), PROVIDER="dry_run", AUTO_APPROVE="1")
+    cmd = [sys.executable, "-m", "adk", "serve", "--no-api", "--exit-when-idle", "--skip-preflight",
+           "--workers", "2", "--work-dir", "jobs"]
+    procs = [subprocess.Popen(cmd, cwd=tmp_path, env=env, stdout=subprocess.DEVNULL) for _ in range(3)]
+    assert all(p.wait(timeout=120) == 0 for p in procs)
+
+    jobs = [queue.get(job_id) for job_id in job_ids]
+    assert [j["status"] for j in jobs] == ["completed"] * 6
+    assert all(j["attempts"] == 1 for j in jobs)
+    for job in jobs:
+        manifest = json.loads((Path(tmp_path) / job["run_dir"] / "run_manifest.json").read_text())
+        assert manifest["status"] == "completed"
+
+    ledger = (tmp_path / "governance" / "run_ledger.jsonl").read_text().splitlines()
+    events = [json.loads(line) for line in ledger]
+    assert sum(e["event"] == "run_completed" for e in events) == 6
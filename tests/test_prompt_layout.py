@@ -0,0 +1,142 @@
+"""
+Unit tests for orchestrator/prompt_layout.py
+
+Tests cover:
+- The cache-friendly static prefix is byte-identical across different run contexts
+- Cache-friendly messages carry exactly the legacy prompt's content (reassembly
+  reproduces render_prompt() for every configured agent template)
+- OpenAIProvider.run_messages() sends the messages after the JSON system message
+  and records cached-token usage
+- run_pipeline records the layout and per-step usage in the manifest
+- Unknown layouts are rejected
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from benchmarks.fixtures import build_state
+from orchestrator.prompt_layout import PROMPT_VARIABLES, resolve_prompt_layout, variable_reference
+from orchestrator.providers.base import BaseProvider
+from orchestrator.root_agent import render_prompt, render_prompt_messages
+from schemas.system_state import get_initial_state
+
+with open("config/run_config.json", "r") as _f:
+    AGENTS = [(a["name"], a["prompt_path"]) for a in json.load(_f)["agents"]]
+
+
+def _reassemble(messages):
+    """Substitute variable messages back into the static prefix (legacy layout)."""
+    prompt = messages[0]["content"]
+    preamble = None
+    for message in messages[1:]:
+        for _, label in PROMPT_VARIABLES:
+            header = f"## {label}\n\n"
+            if message["content"].startswith(header):
+                prompt = prompt.replace(variable_reference(label), message["content"][len(header):])
+                break
+        else:
+            preamble = message["content"]
+    return preamble + "\n\n" + prompt if preamble else prompt
+
+
+@pytest.mark.parametrize("agent_name,prompt_path", AGENTS)
+def test_cache_friendly_layout_has_same_semantics_as_legacy(agent_name, prompt_path):
+    template = open(prompt_path).read()
+    state = build_state()
+
+    legacy = render_prompt(template, agent_name, "Brief text", "SME notes text", state)
+    messages = render_prompt_messages(template, agent_name, "Brief text", "SME notes text", state)
+
+    assert _reassemble(messages) == legacy
+
+
+@pytest.mark.parametrize("agent_name,prompt_path", AGENTS)
+def test_static_prefix_is_stable_across_runs(agent_name, prompt_path):
+    template = open(prompt_path).read()
+
+    first = render_prompt_messages(template, agent_name, "Brief A", "Notes A", get_initial_state())
+    second = render_prompt_messages(template, agent_name, "Brief B " * 50, "Notes B " * 50, build_state())
+
+    assert first[0] == second[0]
+    assert "{business_brief}" not in first[0]["content"]
+    assert "{system_state}" not in first[0]["content"]
+
+
+def test_openai_run_messages_records_cached_tokens():
+    from orchestrator.providers.openai_provider import OpenAIProvider
+
+    response = MagicMock()
+    response.read.return_value = json.dumps({
+        "choices": [{"message": {"content": '{"ok": true}'}}],
+        "usage": {"prompt_tokens": 5000, "completion_tokens": 200, "total_tokens": 5200,
+                  "prompt_tokens_details": {"cached_tokens": 4096}},
+    }).encode("utf-8")
+    ctx = MagicMock()
+    ctx.__enter__.return_value = response
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}), \
+         patch("orchestrator.providers.openai_provider.urllib.request.urlopen", return_value=ctx) as urlopen:
+        provider = OpenAIProvider()
+        result = provider.run_messages([{"role": "user", "content": "static"}, {"role": "user", "content": "var"}])
+
+    payload = json.loads(urlopen.call_args[0][0].data.decode("utf-8"))
+    assert [m["role"] for m in payload["messages"]] == ["system", "user", "user"]
+    assert payload["messages"][1]["content"] == "static"
+    assert result == '{"ok": true}'
+    assert provider.last_usage == {"prompt_tokens": 5000, "completion_tokens": 200,
+                                   "total_tokens": 5200, "cached_tokens": 4096}
+
+
+class _UsageReportingProvider(BaseProvider):
+    provider_name = "usage_stub"
+
+    def __init__(self):
+        self.calls = []
+
+    def run(self, prompt):
+        raise AssertionError("cache_friendly layout must use run_messages()")
+
+    def run_messages(self, messages):
+        self.calls.append(messages)
+        self.last_usage = {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110, "cached_tokens": 64}
+        return json.dumps({"deliverable_markdown": "# Deliverable\n" + "x" * 50, "updated_state": {},
+                           "open_questions": []})
+
+
+def test_run_pipeline_records_layout_and_usage(tmp_path, monkeypatch):
+    from orchestrator.root_agent import run_pipeline
+
+    inputs_dir = tmp_path / "inputs"
+    inputs_dir.mkdir()
+    (inputs_dir / "business_brief.md").write_text("Brief")
+    (inputs_dir / "sme_notes.md").write_text("Notes")
+    (tmp_path / "prompt.md").write_text("Instructions\n{business_brief}\n{sme_notes}\n{system_state}")
+    config = {
+        "provider": "dry_run",
+        "prompt_layout": "cache_friendly",
+        "agents": [{"name": "agent1", "prompt_path": str(tmp_path / "prompt.md")}],
+        "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+        "validation": {"min_deliverable_chars": 10},
+    }
+    config_path = tmp_path / "run_config.json"
+    config_path.write_text(json.dumps(config))
+    provider = _UsageReportingProvider()
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")):
+        run_pipeline(run_dir=str(tmp_path / "outputs" / "run1"), inputs_dir=str(inputs_dir),
+                     provider_override=provider)
+
+    manifest = json.loads((tmp_path / "outputs" / "run1" / "run_manifest.json").read_text())
+    assert manifest["prompt_layout"] == "cache_friendly"
+    assert manifest["usage_by_step"]["1"]["cached_tokens"] == 64
+    assert len(provider.calls[0]) == 4
+
+
+def test_unknown_layout_rejected():
+    assert resolve_prompt_layout({}) == "legacy"
+    with pytest.raises(ValueError):
+        resolve_prompt_layout({"prompt_layout": "sideways"})
@@ -0,0 +1,185 @@
+"""
+Unit tests for orchestrator/providers/cassette.py and cassette record/replay in run_pipeline
+
+Tests cover:
+- Recording appends a deduplicated cassette (shared prompt/response texts stored once)
+- Strict replay reproduces deliverables, cascade escalations and usage without provider calls;
+  replayed calls are flagged and charged to no budget
+- Recording appends one line per call; a torn last line is dropped and rewritten; version 1
+  cassettes still load
+- Strict replay fails on a changed prompt; lenient replay matches by agent/step
+- CassettePlayer order and miss handling; cassette_settings validation
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.providers.base import BaseProvider
+from orchestrator.providers.cassette import (
+    CASSETTE_FILENAME,
+    LEGACY_CASSETTE_FILENAME,
+    Cassette,
+    CassetteMissError,
+    CassettePlayer,
+    cassette_settings,
+)
+
+VALID = json.dumps({"deliverable_markdown": "# Deliverable\n" + "content " * 10, "updated_state": {},
+                    "open_questions": []})
+CASCADE = {"tiers": [{"provider": "openai", "model": "small"}, {"provider": "openai", "model": "large"}]}
+
+
+class _Provider(BaseProvider):
+    """agent2's small tier returns unparseable text; everything else is valid."""
+
+    def __init__(self, model, calls):
+        self.model = model
+        self.calls = calls
+
+    def run(self, prompt):
+        self.calls.append((prompt.split()[1], self.model))
+        self.last_usage = {"prompt_tokens": len(prompt), "completion_tokens": 5, "total_tokens": len(prompt) + 5,
+                           "cached_tokens": 0}
+        if prompt.split()[1] == "agent2" and self.model == "small":
+            return "not json"
+        return VALID
+
+
+class _NoCallProvider(BaseProvider):
+    def run(self, prompt):
+        raise AssertionError("replay must not call a provider")
+
+
+@pytest.fixture
+def pipeline(course):
+    from orchestrator.root_agent import run_pipeline
+
+    tmp_path, inputs_dir = course.tmp_path, course.inputs
+    course.agents[1]["model_cascade"] = CASCADE
+    config_path = course.write_config()
+    ledger_path = tmp_path / "ledger.jsonl"
+
+    def run(name, cassette=None, provider_factory=None, **overrides):
+        calls = []
+        factory = provider_factory or (lambda provider_name, model=None: _Provider(model, calls))
+        run_dir = tmp_path / "outputs" / name
+        if cassette:
+            overrides["cassette"] = cassette
+        with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+             patch("orchestrator.root_agent.LEDGER_PATH", str(ledger_path)), \
+             patch("orchestrator.root_agent.get_provider", side_effect=factory):
+            run_pipeline(run_dir=str(run_dir), inputs_dir=str(inputs_dir), config_overrides=overrides or None)
+        return run_dir, calls
+
+    run.tmp_path = tmp_path
+    run.ledger_path = ledger_path
+    return run
+
+
+def _manifest(run_dir):
+    return json.loads((run_dir / "run_manifest.json").read_text())
+
+
+def test_record_then_strict_replay(pipeline):
+    recorded_dir, calls = pipeline("recorded", {"mode": "record"})
+    assert calls == [("agent1", None), ("agent2", "small"), ("agent2", "large"), ("agent3", None)]
+
+    cassette = Cassette.load(recorded_dir / CASSETTE_FILENAME)
+    assert len(cassette.calls) == 4
+    # 4 prompts (agent2's prompt shared by both tiers -> 3) + 2 distinct responses
+    assert len(cassette.texts) == 5
+    assert len((recorded_dir / CASSETTE_FILENAME).read_text().splitlines()) == 1 + 4
+
+    # A budget the recording would exceed: replayed calls spend nothing
+    recorded_tokens = _manifest(recorded_dir)["usage_totals"]["total_tokens"]
+    replay_dir, _ = pipeline("replayed", {"mode": "replay", "path": str(recorded_dir)},
+                             provider_factory=lambda name, model=None: _NoCallProvider(),
+                             budget={"max_run_tokens": recorded_tokens // 2})
+    recorded, replayed = _manifest(recorded_dir), _manifest(replay_dir)
+    assert replayed["status"] == "completed"
+    assert replayed["cassette"]["mode"] == "replay"
+    assert replayed["model_tier_by_step"]["2"]["tier"] == recorded["model_tier_by_step"]["2"]["tier"] == 2
+    assert replayed["usage_by_step"] == recorded["usage_by_step"]
+    assert replayed["usage_totals"]["total_tokens"] == 0 and replayed["usage_totals"]["replayed_calls"] == 4
+    assert all(c["replayed"] for calls in replayed["usage_calls_by_step"].values() for c in calls)
+    for name in ("01_agent1.md", "02_agent2.md", "03_agent3.md"):
+        assert (replay_dir / name).read_text() == (recorded_dir / name).read_text()
+
+    events = [json.loads(line) for line in pipeline.ledger_path.read_text().splitlines()]
+    assert [e["reason"] for e in events if e["event"] == "model_escalated"] == ["parse_error", "parse_error"]
+
+
+def test_strict_replay_misses_changed_prompt_lenient_matches(pipeline):
+    recorded_dir, _ = pipeline("recorded", {"mode": "record"})
+    (pipeline.tmp_path / "prompt3.md").write_text("Prompt agent3 revised wording {business_brief}")
+    no_calls = lambda name, model=None: _NoCallProvider()
+
+    with pytest.raises(SystemExit):
+        pipeline("strict", {"mode": "replay", "path": str(recorded_dir)}, provider_factory=no_calls)
+    events = [json.loads(line) for line in pipeline.ledger_path.read_text().splitlines()]
+    assert "No recorded response for step 3" in [e for e in events if e["event"] == "run_failed"][-1]["error"]
+
+    lenient_dir, _ = pipeline("lenient", {"mode": "replay", "path": str(recorded_dir), "match": "lenient"},
+                              provider_factory=no_calls)
+    assert _manifest(lenient_dir)["status"] == "completed"
+
+
+def test_player_order_and_misses(tmp_path):
+    cassette = Cassette(tmp_path / CASSETTE_FILENAME)
+    cassette.record(1, "a", "openai", None, "same prompt", "first")
+    cassette.record(1, "a", "openai", "large", "same prompt", "second")
+    cassette.record(2, "b", "openai", None, "other prompt", "third")
+
+    loaded = Cassette.load(tmp_path / CASSETTE_FILENAME)
+    strict = CassettePlayer(loaded, "strict")
+    assert strict.provider_for(1, "a").run("same prompt") == "first"
+    assert strict.provider_for(1, "a").run("same prompt") == "second"
+    with pytest.raises(CassetteMissError):
+        strict.provider_for(1, "a").run("same prompt")
+
+    lenient = CassettePlayer(loaded, "lenient")
+    assert lenient.provider_for(5, "b").run("edited prompt") == "third"  # agent fallback
+    with pytest.raises(CassetteMissError):
+        lenient.provider_for(2, "b").run("other prompt")
+
+
+def test_cassette_settings_validation(tmp_path):
+    assert cassette_settings({}) == ("off", None, "strict")
+    with pytest.raises(ValueError):
+        cassette_settings({"cassette": {"mode": "replay"}})
+    with pytest.raises(ValueError):
+        cassette_settings({"cassette": {"mode": "record", "match": "fuzzy"}})
+    with pytest.raises(FileNotFoundError):
+        Cassette.load(tmp_path / "missing.json", must_exist=True)
+
+
+def test_cassette_appends_and_survives_a_torn_line(tmp_path):
+    path = tmp_path / CASSETTE_FILENAME
+    cassette = Cassette(path)
+    cassette.record(1, "a", "openai", None, "prompt", "first")
+    cassette.record(1, "a", "openai", None, "prompt", "second")
+    lines = path.read_text().splitlines()
+    assert len(lines) == 3 and "prompt" not in json.loads(lines[2])["texts"].values()
+
+    with open(path, "a") as f:
+        f.write('{"texts": {"x": "trunc')  # crash mid-append
+    resumed = Cassette.load(path)
+    assert [c["response"] for c in resumed.calls] == [c["response"] for c in cassette.calls]
+    resumed.record(2, "b", "openai", None, "prompt", "third")
+    reloaded = Cassette.load(path)
+    assert len(reloaded.calls) == 3 and path.read_text().endswith("\n")
+    assert CassettePlayer(reloaded, "lenient").provider_for(2, "b").run("x") == "third"
+
+
+def test_version_1_cassette_loads_and_records(tmp_path):
+    legacy = Cassette(tmp_path / "scratch.jsonl")
+    legacy.record(1, "a", "openai", None, "prompt", "first")
+    path = tmp_path / LEGACY_CASSETTE_FILENAME
+    path.write_text(json.dumps({"version": 1, "texts": legacy.texts, "calls": legacy.calls}))
+
+    loaded = Cassette.load(path)
+    assert CassettePlayer(loaded, "strict").provider_for(1, "a").run("prompt") == "first"
+    loaded.record(2, "b", "openai", None, "other", "second")
+    assert len(Cassette.load(path).calls) == 2
@@ -0,0 +1,167 @@
+"""
+Unit tests for orchestrator/retrieval.py and retrieval-fed steps in run_pipeline
+
+Tests cover:
+- Chunking respects headings and the chunk size; chunk IDs are stable
+- BM25 ranks the chunk about the query first
+- Indexes are cached on disk by input hash and rebuilt when the input changes
+- Selection is round-robin over agent/module queries within top_k and the token budget
+- Settings validation and per-agent overrides; small or unmatched sources are sent in full
+- A run over large SME notes sends only retrieved passages and records chunk IDs in the step state file
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.providers.base import BaseProvider
+from orchestrator.retrieval import (
+    InputRetriever,
+    LexicalIndex,
+    RetrievalRules,
+    build_queries,
+    chunk_text,
+    load_or_build_index,
+    retrieval_rules,
+    select_passages,
+)
+
+NOTES = """# SME Notes
+
+## Refund policy
+Refunds above the threshold need a manager approval and an audit evidence note.
+
+## Onboarding
+New clients complete the onboarding checklist within five days.
+
+## Incident handling
+Every incident gets an owner, a root-cause review and a mitigation plan.
+"""
+
+
+def _large_notes(sections=60):
+    topics = ["refund approval", "onboarding checklist", "incident mitigation", "coaching feedback",
+              "dashboard metric", "retention cadence"]
+    parts = ["# Policy Manual\n"]
+    for n in range(sections):
+        topic = topics[n % len(topics)]
+        parts.append(f"\n## Section {n}: {topic}\n\n" + f"Guidance on {topic} for operations staff. " * 12)
+    return "".join(parts)
+
+
+def test_chunking_respects_headings_and_size():
+    chunks = chunk_text(NOTES, "sme_notes", chunk_chars=200)
+    assert [c["heading"] for c in chunks] == ["Refund policy", "Onboarding", "Incident handling"]
+    assert [c["id"] for c in chunks] == ["sme_notes:0001", "sme_notes:0002", "sme_notes:0003"]
+
+    long = chunk_text("## Long\n\n" + "One sentence here. " * 100, "sme_notes", chunk_chars=200)
+    assert len(long) > 5 and all(len(c["text"]) <= 200 for c in long)
+
+
+def test_bm25_ranks_relevant_chunk_first():
+    index = LexicalIndex.build(chunk_text(NOTES, "sme_notes", chunk_chars=200))
+    assert index.chunks[index.search("incident root cause owner", 3)[0][0]]["heading"] == "Incident handling"
+    assert index.chunks[index.search("refund approval", 3)[0][0]]["heading"] == "Refund policy"
+    assert index.search("zebra", 3) == []
+
+
+def test_index_cached_by_input_hash(tmp_path):
+    index, cached = load_or_build_index(NOTES, "sme_notes", 200, cache_dir=tmp_path)
+    assert not cached and len(list(tmp_path.iterdir())) == 1
+    again, cached = load_or_build_index(NOTES, "sme_notes", 200, cache_dir=tmp_path)
+    assert cached and again.chunks == index.chunks and again.search("refund", 1) == index.search("refund", 1)
+    _, cached = load_or_build_index(NOTES + "\nMore.", "sme_notes", 200, cache_dir=tmp_path)
+    assert not cached and len(list(tmp_path.iterdir())) == 2
+
+
+def test_selection_round_robin_within_budget():
+    index = LexicalIndex.build(chunk_text(_large_notes(), "sme_notes", chunk_chars=600))
+    state = {"curriculum": {"modules": [
+        {"module_id": "M1", "title": "Refunds", "objectives": ["Apply refund approval rules"]},
+        {"module_id": "M2", "title": "Incidents", "objectives": ["Lead incident mitigation"]},
+    ]}}
+    queries = build_queries("assessment_designer_agent", state, RetrievalRules())
+    assert [label for label, _ in queries] == ["agent", "M1", "M2"]
+
+    selection = select_passages(index, queries, top_k=4, budget_tokens=10000)
+    assert len(selection["chunk_ids"]) == 4
+    assert selection["by_query"]["M1"] and selection["by_query"]["M2"]
+    assert selection["chunk_ids"] == sorted(selection["chunk_ids"])
+
+    tight = select_passages(index, queries, top_k=8, budget_tokens=200)
+    assert tight["tokens"] <= 200 and len(tight["chunk_ids"]) < 8
+
+
+def test_retrieval_rules():
+    config = {"retrieval": {"top_k": 4}}
+    assert retrieval_rules(config, {"name": "qa_agent"}) == RetrievalRules(top_k=4)
+    assert retrieval_rules(config, {"name": "qa_agent", "retrieval": {"budget_tokens": 500}}).budget_tokens == 500
+    assert retrieval_rules(config, {"name": "qa_agent", "retrieval": False}) is None
+    assert retrieval_rules({}, {"name": "qa_agent"}) is None
+    assert retrieval_rules({"retrieval": {"enabled": False}}, {"name": "qa_agent"}) is None
+    with pytest.raises(ValueError):
+        retrieval_rules({"retrieval": {"sources": ["policies"]}}, {"name": "qa_agent"})
+    with pytest.raises(ValueError):
+        retrieval_rules({"retrieval": {"top_k": 0}}, {"name": "qa_agent"})
+
+
+def test_small_or_unmatched_inputs_pass_through():
+    retriever = InputRetriever({"business_brief": "Brief", "sme_notes": NOTES})
+    values, trace = retriever.retrieve("qa_agent", {}, RetrievalRules())
+    assert trace is None and values["sme_notes"] == NOTES
+
+    values, trace = retriever.retrieve("zebra_agent", {}, RetrievalRules(min_source_chars=10, chunk_chars=200))
+    assert trace is None and values["sme_notes"] == NOTES
+
+
+class _Provider(BaseProvider):
+    def __init__(self):
+        self.prompts = []
+
+    def run(self, prompt):
+        self.prompts.append(prompt)
+        agent = prompt.split()[1]
+        return json.dumps({"deliverable_markdown": f"# {agent}\n" + "content " * 10,
+                           "updated_state": {}, "open_questions": []})
+
+
+def test_pipeline_sends_retrieved_passages(tmp_path, monkeypatch):
+    from orchestrator.root_agent import run_pipeline
+
+    agents = []
+    for name in ("agent1", "agent2"):
+        (tmp_path / f"{name}.md").write_text(f"Prompt {name}\n{{sme_notes}}")
+        agents.append({"name": name, "prompt_path": str(tmp_path / f"{name}.md")})
+    agents[1]["retrieval"] = False
+    config = {"provider": "openai", "agents": agents,
+              "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+              "validation": {"min_deliverable_chars": 20},
+              "retrieval": {"min_source_chars": 5000, "chunk_chars": 600, "top_k": 3,
+                            "query": "refund approval"}}
+    (tmp_path / "run_config.json").write_text(json.dumps(config))
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    notes = _large_notes()
+    (inputs / "business_brief.md").write_text("Brief")
+    (inputs / "sme_notes.md").write_text(notes)
+    monkeypatch.delenv("PROVIDER", raising=False)
+    provider = _Provider()
+    run_dir = tmp_path / "outputs" / "run"
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+         patch("orchestrator.root_agent.OUTPUTS_DIR", str(tmp_path / "outputs")), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+         patch("orchestrator.root_agent.get_provider", return_value=provider):
+        run_pipeline(run_dir=str(run_dir), inputs_dir=str(inputs))
+
+    retrieved, full = provider.prompts
+    assert len(retrieved) < len(notes) / 4 and "[sme_notes:" in retrieved
+    assert notes in full  # retrieval disabled for agent2
+
+    step_state = json.loads((run_dir / "01_agent1_state.json").read_text())
+    trace = step_state["retrieval"]["sme_notes"]
+    assert len(trace["chunk_ids"]) == 3 and all(f"[{cid}]" in retrieved for cid in trace["chunk_ids"])
+    assert "business_brief" not in step_state["retrieval"]  # below min_source_chars: sent in full
+    assert "retrieval" not in json.loads((run_dir / "02_agent2_state.json").read_text())
+    assert list((tmp_path / "outputs" / "_index").glob("sme_notes-*.json"))
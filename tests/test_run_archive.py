@@ -0,0 +1,266 @@
+"""
+Unit tests for orchestrator/run_archive.py and reads of archived runs
+
+Tests cover:
+- Settings validation (defaults keep pilot and golden runs)
+- Retention keeps unfinished, pilot, golden, last-N-per-inputs and recent runs
+- Archiving writes month archives (a later run appends), updates the catalog,
+  removes the run directories and reports the bytes reclaimed
+- Concurrent archive invocations serialize on the archive lock and skip runs already archived
+- A replaced archive's superseded read handle is closed
+- Runs in the artifact store or log storage mode are archived as their plain layout
+- Run file readers, the manifest reader, bundle export and run diff read archived runs
+- Blob sweep removes only old, unreferenced blobs (a reused blob is fresh again) and
+  sweeps a configured store path
+"""
+
+import json
+import os
+import threading
+import time
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from orchestrator.artifact_store import (
+    ArtifactStore,
+    list_run_artifacts,
+    list_run_files,
+    read_run_json,
+    read_run_text,
+    run_file_exists,
+    write_run_file,
+)
+from orchestrator.run_archive import (
+    ARCHIVE_DIRNAME,
+    CATALOG_FILENAME,
+    RetentionSettings,
+    archive_runs,
+    archived_files,
+    list_runs,
+    plan_retention,
+    retention_settings,
+    sweep_blobs,
+)
+from orchestrator.run_artifacts import compute_inputs_hash, read_manifest
+from orchestrator.run_log import RunLog
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+def _run(outputs, run_id, started, status="completed", inputs_hash="h1", profile="dev", store=None):
+    run_dir = outputs / run_id
+    run_dir.mkdir(parents=True)
+    (run_dir / "run_manifest.json").write_text(json.dumps({
+        "run_id": run_id, "started_at_utc": started, "status": status,
+        "inputs_hash": inputs_hash, "governance_profile": profile}))
+    (run_dir / "audit_summary.json").write_text(json.dumps({"run_id": run_id, "end_state": status}))
+    write_run_file(run_dir, "01_agent1.md", f"# agent1 of {run_id}\n" + "content " * 50, store)
+    write_run_file(run_dir, "01_agent1_state.json", json.dumps({"open_questions": []}), store)
+    return run_dir
+
+
+def test_retention_settings():
+    assert retention_settings({}) == RetentionSettings()
+    assert retention_settings({}).keep_profiles == ("pilot",)
+    settings = retention_settings({"retention": {"keep_last_per_inputs": 0, "golden_inputs_dir": None}})
+    assert settings.keep_last_per_inputs == 0 and settings.golden_inputs_dir is None
+    with pytest.raises(ValueError):
+        retention_settings({"retention": {"keep_last_per_inputs": -1}})
+    with pytest.raises(ValueError):
+        retention_settings({"retention": {"archive_after_days": "30"}})
+    with pytest.raises(ValueError):
+        retention_settings({"retention": {"keep_profiles": "pilot"}})
+
+
+def test_plan_retention(tmp_path):
+    golden = tmp_path / "golden"
+    golden.mkdir()
+    (golden / "business_brief.md").write_text("Brief")
+    (golden / "sme_notes.md").write_text("Notes")
+    golden_hash = compute_inputs_hash(golden / "business_brief.md", golden / "sme_notes.md")
+
+    outputs = tmp_path / "outputs"
+    for day in range(1, 5):  # four old completed runs with the same inputs
+        _run(outputs, f"old_{day}", f"2026-08-0{day}T10:00:00")
+    _run(outputs, "running", "2026-08-01T09:00:00", status="running")
+    _run(outputs, "pilot", "2026-08-01T09:00:00", profile="pilot")
+    _run(outputs, "golden", "2026-08-01T09:00:00", inputs_hash=golden_hash)
+    _run(outputs, "recent", "2026-10-18T09:00:00", inputs_hash="h2")
+    _run(outputs, "lonely", "2026-07-01T09:00:00", inputs_hash="h3")
+    (outputs / "_cas").mkdir()
+    (outputs / "not_a_run").mkdir()
+
+    settings = RetentionSettings(keep_last_per_inputs=2, archive_after_days=30, golden_inputs_dir=str(golden))
+    runs = list_runs(outputs)
+    assert [r.run_id for r in runs][:2] == ["lonely", "golden"] and len(runs) == 9
+    decisions = {d.run.run_id: d for d in plan_retention(runs, settings, now=NOW)}
+
+    assert sorted(r for r, d in decisions.items() if not d.keep) == ["old_1", "old_2"]
+    assert decisions["old_4"].keep and decisions["old_3"].reason == "among the last 2 for its inputs"
+    assert decisions["running"].reason == "status running"
+    assert decisions["pilot"].reason == "pilot run" and decisions["golden"].reason == "golden run"
+    assert decisions["recent"].keep and decisions["lonely"].keep  # last for its inputs
+
+    settings = RetentionSettings(keep_last_per_inputs=0, archive_after_days=2, golden_inputs_dir=None)
+    decisions = {d.run.run_id: d for d in plan_retention(runs, settings, now=NOW)}
+    assert decisions["recent"].reason == "younger than 2 days" and not decisions["lonely"].keep
+    assert not decisions["golden"].keep
+
+
+def test_archive_runs_and_read_back(tmp_path):
+    outputs = tmp_path / "outputs"
+    store = ArtifactStore(outputs / "_cas")
+    plain = _run(outputs, "plain", "2026-08-01T10:00:00")
+    stored = _run(outputs, "stored", "2026-08-02T10:00:00", store=store)
+    (plain / "dist").mkdir()
+    (plain / "dist" / "course.html").write_text("<html></html>")
+    logged = _run(outputs, "logged", "2026-09-01T10:00:00")
+    log = RunLog(logged, fsync=False)
+    log.write_file("02_agent2.md", "# agent2")
+    log.close()
+    expected = {run: {rel: read_run_text(outputs / run, rel) for rel in list_run_artifacts(outputs / run)}
+                for run in ("plain", "stored", "logged")}
+    runs = {r.run_id: r for r in list_runs(outputs)}
+
+    dry = archive_runs(outputs, [runs["plain"]], dry_run=True)
+    assert dry["runs"] == ["plain"] and dry["bytes_reclaimed"] is None and plain.exists()
+
+    result = archive_runs(outputs, [runs["plain"], runs["stored"]])
+    assert result["runs"] == ["plain", "stored"] and result["archives"] == ["2026-08.zip"]
+    assert result["bytes_reclaimed"] == result["bytes_freed"] - result["archive_bytes"]
+    assert not plain.exists() and not stored.exists()
+    archive = outputs / ARCHIVE_DIRNAME / "2026-08.zip"
+    with zipfile.ZipFile(archive) as zf:
+        names = zf.namelist()
+    assert "plain/dist/course.html" in names and "stored/01_agent1.md" in names
+    assert "stored/artifacts.json" not in names  # archived as the plain layout
+
+    archive_runs(outputs, [runs["logged"]])
+    catalog = json.loads((outputs / ARCHIVE_DIRNAME / CATALOG_FILENAME).read_text())
+    assert {r: e["archive"] for r, e in catalog["runs"].items()} == {
+        "plain": "2026-08.zip", "stored": "2026-08.zip", "logged": "2026-09.zip"}
+    assert catalog["runs"]["plain"]["files"] == 5 and catalog["runs"]["logged"]["status"] == "completed"
+    assert list_runs(outputs) == []
+
+    for run, files in expected.items():
+        run_dir = outputs / run
+        assert list_run_artifacts(run_dir) == sorted(files)
+        assert {rel: read_run_text(run_dir, rel) for rel in files} == files
+    assert read_manifest(outputs / "logged")["run_id"] == "logged"
+    assert list_run_files(outputs / "stored", "*_state.json") == ["01_agent1_state.json"]
+    assert run_file_exists(outputs / "plain", "dist/course.html")
+    assert not run_file_exists(outputs / "plain", "02_agent2.md")
+    with pytest.raises(FileNotFoundError):
+        read_run_json(outputs / "missing", "run_manifest.json")
+
+    # Another run of the same month is appended; earlier entries stay readable
+    _run(outputs, "late", "2026-08-30T10:00:00")
+    archive_runs(outputs, list_runs(outputs))
+    assert read_run_json(outputs / "late", "audit_summary.json")["run_id"] == "late"
+    assert read_run_text(outputs / "plain", "dist/course.html") == "<html></html>"
+
+
+def test_concurrent_archiving_keeps_every_run(tmp_path):
+    outputs = tmp_path / "outputs"
+    for i in range(6):
+        _run(outputs, f"run{i}", f"2026-08-{i + 1:02d}T10:00:00")
+    runs = list_runs(outputs)
+    results, errors = [], []
+
+    def archive(subset):
+        try:
+            results.append(archive_runs(outputs, subset))
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    # Overlapping sets: a run archived by one thread is skipped by the other
+    threads = [threading.Thread(target=archive, args=(runs[:4],)), threading.Thread(target=archive, args=(runs[2:],))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert sorted(r for result in results for r in result["runs"]) == [f"run{i}" for i in range(6)]
+    catalog = json.loads((outputs / ARCHIVE_DIRNAME / CATALOG_FILENAME).read_text())
+    assert sorted(catalog["runs"]) == [f"run{i}" for i in range(6)]
+    for i in range(6):
+        assert read_run_json(outputs / f"run{i}", "audit_summary.json")["run_id"] == f"run{i}"
+
+
+def test_superseded_archive_handle_is_closed(tmp_path):
+    outputs = tmp_path / "outputs"
+    _run(outputs, "first", "2026-08-01T10:00:00")
+    archive_runs(outputs, list_runs(outputs))
+    old_archive, _ = archived_files(outputs / "first")["01_agent1.md"]
+
+    _run(outputs, "second", "2026-08-02T10:00:00")
+    archive_runs(outputs, list_runs(outputs))
+    new_archive, name = archived_files(outputs / "first")["01_agent1.md"]
+
+    assert new_archive is not old_archive
+    assert old_archive.fp is None  # closed
+    assert new_archive.read(name).startswith(b"# agent1 of first")
+
+
+def test_tools_read_archived_runs(tmp_path, monkeypatch):
+    from scripts.archive import run_diff
+    from scripts.bundle_export import collect_run_files, validate_run_dir
+
+    outputs = tmp_path / "outputs"
+    for run_id in ("20260801_100000", "20260802_100000"):
+        _run(outputs, run_id, "2026-08-01T10:00:00")
+        (outputs / run_id / "audit_summary.md").write_text("# Audit")
+    archive_runs(outputs, list_runs(outputs))
+    run_dir = outputs / "20260801_100000"
+
+    assert validate_run_dir(run_dir) == run_dir
+    monkeypatch.setattr("scripts.bundle_export.run_subprocess", lambda cmd: "{}")
+    files = {f["arcname"]: f for f in collect_run_files("20260801_100000", run_dir, include_state=True)}
+    assert json.loads(files["audit_summary.json"]["content"])["run_id"] == "20260801_100000"
+    assert files["01_agent1_state.json"]["content"] == b'{"open_questions": []}'
+
+    monkeypatch.setattr(run_diff, "OUTPUTS_DIR", outputs)
+    data = run_diff.load_run_data(run_diff.resolve_run_path("20260802_100000"))
+    assert data["manifest"]["run_id"] == "20260802_100000" and data["audit"]["end_state"] == "completed"
+
+
+def test_sweep_blobs(tmp_path):
+    outputs = tmp_path / "outputs"
+    store = ArtifactStore(outputs / "_cas")
+    _run(outputs, "kept", "2026-08-01T10:00:00", store=store)
+    orphan, _ = store.put(b"orphaned artifact")
+    fresh, _ = store.put(b"blob of a step still running")
+    old = time.time() - 2 * 3600
+    for blob in (outputs / "_cas").glob("*/*"):
+        if blob.name != fresh:
+            os.utime(blob, (old, old))
+
+    assert sweep_blobs(outputs, dry_run=True)["blobs"] == 1 and store.has(orphan)
+    stats = sweep_blobs(outputs)
+    assert stats["blobs"] == 1 and stats["bytes"] > 0
+    assert not store.has(orphan) and store.has(fresh)
+    assert read_run_text(outputs / "kept", "01_agent1.md").startswith("# agent1 of kept")
+
+    # A step reusing an old unreferenced blob restarts its grace period
+    reused, _ = store.put(b"reused by a running step")
+    os.utime(store.blob_path(reused), (old, old))
+    assert store.put(b"reused by a running step") == (reused, False)
+    assert sweep_blobs(outputs)["blobs"] == 0 and store.has(reused)
+
+
+def test_sweep_configured_store(tmp_path):
+    outputs = tmp_path / "outputs"
+    store = ArtifactStore(tmp_path / "shared_cas")
+    _run(outputs, "kept", "2026-08-01T10:00:00", store=store)
+    orphan, _ = store.put(b"orphaned artifact")
+    old = time.time() - 2 * 3600
+    for blob in store.root.glob("*/*"):
+        os.utime(blob, (old, old))
+
+    assert sweep_blobs(outputs)["blobs"] == 0  # the default store does not exist
+    assert sweep_blobs(outputs, store.root)["blobs"] == 1
+    assert not store.has(orphan)
+    assert read_run_text(outputs / "kept", "01_agent1.md").startswith("# agent1 of kept")
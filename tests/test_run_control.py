@@ -0,0 +1,183 @@
+"""
+Unit tests for orchestrator/run_control.py and deadlines/cancellation in run_pipeline
+
+Tests cover:
+- Deadline settings validation (run_config block and per-agent deadline_seconds)
+- Provider request timeouts are capped by the nearest deadline
+- A step deadline stops the run with status timed_out after the last checkpoint
+- A cancel token set mid-run stops the run with status cancelled, keeping completed steps
+- graceful_shutdown turns the first SIGINT into a cancellation
+- A cancel request for one batch course leaves the other courses running
+"""
+
+import json
+import signal
+import time
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.batch import BatchCoordinator, BatchCourse, LocalBatchBackend, request_course_cancel
+from orchestrator.providers.base import BaseProvider
+from orchestrator.run_control import (
+    CancelToken,
+    Deadline,
+    DeadlineExceededError,
+    DeadlineSettings,
+    RunCancelledError,
+    RunControl,
+    deadline_settings,
+    graceful_shutdown,
+    request_timeout,
+    run_control,
+)
+
+
+def test_deadline_settings_validation():
+    assert deadline_settings({}) == DeadlineSettings()
+    settings = deadline_settings({"deadlines": {"run_seconds": 60, "step_seconds": 10.5}})
+    assert settings.run_seconds == 60 and settings.step_seconds == 10.5
+    assert settings.request_timeout_seconds is None
+
+    with pytest.raises(ValueError):
+        deadline_settings({"deadlines": {"step_seconds": 0}})
+    with pytest.raises(ValueError):
+        deadline_settings({"deadlines": {"run_seconds": "1h"}})
+    with pytest.raises(ValueError):
+        deadline_settings({"agents": [{"name": "qa_agent", "deadline_seconds": -5}]})
+
+
+def test_request_timeout_capped_by_deadline():
+    assert request_timeout(300) == 300  # no active run
+
+    control = RunControl(run_deadline=Deadline(None, "Run"), request_timeout_seconds=30)
+    with run_control(control):
+        assert request_timeout(300) == 30
+        control.start_step("Step 1", 5)
+        assert 4 < request_timeout(300) <= 5
+        control.end_step()
+        assert request_timeout(300) == 30
+
+    expired = RunControl(run_deadline=Deadline(0.001, "Run"))
+    time.sleep(0.01)
+    with run_control(expired), pytest.raises(DeadlineExceededError, match="Run deadline"):
+        request_timeout(300)
+
+    token = CancelToken()
+    token.cancel()
+    with run_control(RunControl(run_deadline=Deadline(None, "Run"), cancel_check=token)), \
+         pytest.raises(RunCancelledError):
+        request_timeout(300)
+
+
+class _Provider(BaseProvider):
+    """Answers every agent; sleeps on agents listed in ``slow`` and runs ``on_call`` hooks."""
+
+    def __init__(self, calls, slow=(), on_call=None):
+        self.calls = calls
+        self.slow = slow
+        self.on_call = on_call or {}
+
+    def run(self, prompt):
+        agent = prompt.split()[1]
+        self.calls.append(agent)
+        if agent in self.slow:
+            time.sleep(0.2)
+        if agent in self.on_call:
+            self.on_call[agent]()
+        return json.dumps({"deliverable_markdown": f"# {agent}\n" + "content " * 10,
+                           "updated_state": {agent: "done"}, "open_questions": []})
+
+
+@pytest.fixture
+def env(course):
+    tmp_path, agents, inputs = course.tmp_path, course.agents, course.inputs
+
+    def run(provider, config_extra=None, **kwargs):
+        course.write_config(**(config_extra or {}))
+        run_dir = tmp_path / "outputs" / "run"
+        with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+             patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+             patch("orchestrator.root_agent.get_provider", return_value=provider):
+            from orchestrator.root_agent import run_pipeline
+            try:
+                run_pipeline(run_dir=str(run_dir), inputs_dir=str(inputs), **kwargs)
+            except SystemExit:
+                pass
+        events = [json.loads(line) for line in (tmp_path / "ledger.jsonl").read_text().splitlines()]
+        return json.loads((run_dir / "run_manifest.json").read_text()), events, run_dir
+
+    return agents, run
+
+
+def test_step_deadline_times_out_run(env):
+    agents, run = env
+    agents[1]["deadline_seconds"] = 0.05
+    calls = []
+    manifest, events, run_dir = run(_Provider(calls, slow=("agent2",)))
+
+    assert manifest["status"] == "timed_out"
+    assert manifest["current_step_completed"] == 1
+    assert calls == ["agent1", "agent2"]
+    timed_out = [e for e in events if e["event"] == "run_timed_out"]
+    assert timed_out and "Step 2 (agent2) deadline" in timed_out[0]["reason"]
+    assert (run_dir / "audit_summary.json").exists()
+
+
+def test_cancel_mid_run_keeps_checkpoint(env):
+    _, run = env
+    token = CancelToken()
+    calls = []
+    manifest, events, run_dir = run(_Provider(calls, on_call={"agent2": token.cancel}), cancel_check=token)
+
+    assert manifest["status"] == "cancelled"
+    assert calls == ["agent1", "agent2"]
+    assert manifest["current_step_completed"] == 2  # the step in flight finishes
+    assert (run_dir / "02_agent2_state.json").exists()
+    assert any(e["event"] == "run_cancelled" for e in events)
+
+
+def test_graceful_shutdown_first_signal_cancels():
+    token = CancelToken()
+    cancelled_by = []
+    previous = signal.getsignal(signal.SIGINT)
+    with graceful_shutdown(token, on_cancel=cancelled_by.append):
+        signal.raise_signal(signal.SIGINT)
+        assert token.cancelled and cancelled_by == ["SIGINT"]
+        with pytest.raises(KeyboardInterrupt):
+            signal.raise_signal(signal.SIGINT)
+    assert signal.getsignal(signal.SIGINT) is previous
+
+
+def test_batch_cancel_one_course(tmp_path, monkeypatch):
+    (tmp_path / "prompt.md").write_text("Strategy Lead prompt\n{business_brief}\n{sme_notes}")
+    config = {
+        "provider": "openai",
+        "agents": [
+            {"name": "strategy_lead_agent", "prompt_path": str(tmp_path / "prompt.md")},
+            {"name": "learner_research_agent", "prompt_path": str(tmp_path / "prompt.md")},
+        ],
+        "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+        "validation": {"min_deliverable_chars": 10},
+    }
+    (tmp_path / "run_config.json").write_text(json.dumps(config))
+    courses = []
+    for course_id in ("acme", "globex"):
+        inputs_dir = tmp_path / "inputs" / course_id
+        inputs_dir.mkdir(parents=True)
+        (inputs_dir / "business_brief.md").write_text(f"Brief {course_id}")
+        (inputs_dir / "sme_notes.md").write_text("Notes")
+        courses.append(BatchCourse(course_id, str(inputs_dir), str(tmp_path / "outputs" / course_id)))
+    monkeypatch.setenv("AUTO_APPROVE", "1")
+    monkeypatch.delenv("PROVIDER", raising=False)
+
+    coordinator = BatchCoordinator(LocalBatchBackend(tmp_path / "backend"), tmp_path / "batch", poll_interval=0)
+    request_course_cancel(tmp_path / "batch", "globex")
+    with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+         patch("orchestrator.root_agent.OUTPUTS_DIR", str(tmp_path / "outputs")), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")):
+        outcomes = coordinator.run_courses(courses)
+
+    assert outcomes == {"acme": "completed", "globex": "cancelled"}
+    manifest = json.loads((tmp_path / "outputs" / "globex" / "run_manifest.json").read_text())
+    assert manifest["status"] == "cancelled"
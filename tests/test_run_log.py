@@ -0,0 +1,160 @@
+"""
+Unit tests for orchestrator/run_log.py and runs in log storage mode
+
+Tests cover:
+- Settings validation (disabled by default)
+- Framed records round-trip; a torn or corrupt tail is ignored by readers and cut off by the writer
+- Replay rebuilds checkpoints from state deltas and the manifest from patches
+- Manifest, checkpoint and state file readers resolve a run log on demand
+- A cancelled run in log mode holds only its log (with its ledger events, gate decisions
+  included); resume replays it, the completed run
+  materializes the plain layout (byte-identical to a plain run) and removes the log
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.artifact_store import list_run_artifacts, list_run_files, materialize_run, read_run_json
+from orchestrator.providers.base import BaseProvider
+from orchestrator.run_artifacts import read_checkpoint, read_latest_checkpoint, read_manifest
+from orchestrator.run_log import (
+    RUN_LOG_FILENAME,
+    RunLog,
+    RunLogSettings,
+    load_view,
+    open_run_log,
+    read_records,
+    run_log_settings,
+)
+
+
+def test_run_log_settings():
+    assert run_log_settings({}) is None
+    assert run_log_settings({"run_log": {"enabled": True}}) == RunLogSettings(fsync=True)
+    assert run_log_settings({"run_log": {"enabled": True, "fsync": False}}).fsync is False
+    with pytest.raises(ValueError):
+        run_log_settings({"run_log": {"enabled": True, "fsync": "yes"}})
+    with pytest.raises(ValueError):
+        run_log_settings({"run_log": "on"})
+
+
+def test_torn_tail_ignored_and_truncated(tmp_path):
+    log = RunLog(tmp_path)
+    log.write_file("01_agent1.md", "# agent1")
+    log.write_manifest({"status": "running", "current_step_completed": 1})
+    log.close()
+    path = tmp_path / RUN_LOG_FILENAME
+    intact = path.stat().st_size
+
+    with open(path, "ab") as f:
+        f.write(b"ADKR\x00\x00\x01\x00partial")  # crash mid-append
+    records, valid = read_records(path)
+    assert [r["type"] for r in records] == ["file", "manifest"] and valid == intact
+    assert read_manifest(tmp_path)["current_step_completed"] == 1
+
+    log = RunLog(tmp_path)  # reopening cuts the torn record off
+    assert path.stat().st_size == intact
+    log.write_manifest({"status": "completed", "current_step_completed": 1})
+    log.close()
+    assert read_manifest(tmp_path)["status"] == "completed"
+
+    data = bytearray(path.read_bytes())
+    data[-2] ^= 0xFF  # corrupt the last payload
+    path.write_bytes(bytes(data))
+    assert read_manifest(tmp_path)["status"] == "running"
+
+
+def test_replay_deltas_and_patches(tmp_path):
+    (tmp_path / "checkpoints").mkdir()
+    log = RunLog(tmp_path)
+    log.write_manifest({"run_id": "r", "status": "running", "pending_approval": {"step_idx": 1}})
+    log.write_checkpoint(1, {"curriculum": {"modules": []}, "notes": "a"})
+    log.write_checkpoint(2, {"curriculum": {"modules": ["M1"]}, "notes": "a"})
+    log.write_manifest({"run_id": "r", "status": "running"})
+    log.write_manifest({"run_id": "r", "status": "running"})  # unchanged: no record
+    log.log_event({"event": "run_started"})
+
+    records = read_records(tmp_path / RUN_LOG_FILENAME)[0]
+    assert [r["type"] for r in records] == ["manifest", "checkpoint", "checkpoint", "manifest", "ledger"]
+    assert records[2]["delta"] == {"set": {"curriculum": {"modules": ["M1"]}}, "unset": []}
+    assert records[3]["patch"] == {"set": {}, "unset": ["pending_approval"]}
+
+    assert read_manifest(tmp_path) == {"run_id": "r", "status": "running"}
+    assert read_checkpoint(tmp_path / "checkpoints", 1) == {"curriculum": {"modules": []}, "notes": "a"}
+    assert read_latest_checkpoint(tmp_path / "checkpoints")[0] == 2
+    assert load_view(tmp_path).ledger_events == [{"event": "run_started"}]
+
+    # Reopened, the writer continues from the replayed state and manifest
+    log.close()
+    log = RunLog(tmp_path)
+    log.write_checkpoint(3, {"curriculum": {"modules": ["M1"]}})
+    log.close()
+    assert read_records(tmp_path / RUN_LOG_FILENAME)[0][-1]["delta"] == {"set": {}, "unset": ["notes"]}
+    assert read_checkpoint(tmp_path / "checkpoints", 3) == {"curriculum": {"modules": ["M1"]}}
+
+    assert open_run_log(tmp_path / "checkpoints", None) is None
+    open_run_log(tmp_path, None).close()  # an existing log stays in log mode
+
+
+class _Provider(BaseProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, prompt):
+        self.calls += 1
+        agent = prompt.split()[1]
+        return json.dumps({"deliverable_markdown": f"# {agent}\n" + "content " * 10,
+                           "updated_state": {agent: "done"}, "open_questions": []})
+
+
+def test_pipeline_log_mode_resume_and_materialize(tmp_path, monkeypatch):
+    from orchestrator.root_agent import run_pipeline
+
+    agents = []
+    for name in ("agent1", "agent2", "agent3"):
+        (tmp_path / f"{name}.md").write_text(f"Prompt {name}\n{{business_brief}}")
+        agents.append({"name": name, "prompt_path": str(tmp_path / f"{name}.md")})
+    config = {"provider": "openai", "agents": agents,
+              "approval": {"gate_strategy": "per_phase", "phase_gates": [1]},
+              "validation": {"min_deliverable_chars": 20}}
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "business_brief.md").write_text("Brief")
+    (inputs / "sme_notes.md").write_text("Notes")
+    monkeypatch.delenv("PROVIDER", raising=False)
+    monkeypatch.setenv("AUTO_APPROVE", "1")
+    outputs = tmp_path / "outputs"
+
+    def run(name, log_enabled, provider, **kwargs):
+        config["run_log"] = {"enabled": log_enabled, "fsync": False}
+        (tmp_path / "run_config.json").write_text(json.dumps(config))
+        with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+             patch("orchestrator.root_agent.OUTPUTS_DIR", str(outputs)), \
+             patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+             patch("orchestrator.root_agent.get_provider", return_value=provider):
+            run_pipeline(run_dir=str(outputs / name), inputs_dir=str(inputs), **kwargs)
+        return outputs / name
+
+    plain = run("plain", False, _Provider())
+    provider = _Provider()
+    logged = run("logged", True, provider, cancel_check=lambda: provider.calls >= 1)
+
+    assert sorted(p.name for p in logged.iterdir()) == ["checkpoints", "run.log", "run_plan.json"]
+    assert not any((logged / "checkpoints").iterdir())
+    assert read_manifest(logged)["status"] == "cancelled"
+    assert list_run_files(logged, "*_state.json") == ["01_agent1_state.json"]
+    assert "01_agent1.md" in list_run_artifacts(logged)
+    assert [e["event"] for e in load_view(logged).ledger_events] == ["run_started", "step_approved", "run_cancelled"]
+
+    # Resume replays the log and keeps appending to it, whatever the config says now
+    last_step, state = read_latest_checkpoint(logged / "checkpoints")
+    run("logged", False, _Provider(), start_step=last_step + 1, initial_state=state)
+
+    assert not (logged / RUN_LOG_FILENAME).exists()
+    assert read_run_json(logged, "run_manifest.json")["status"] == "completed"
+    for rel in list_run_artifacts(plain):
+        if rel.endswith((".md", "_state.json")):
+            assert (logged / rel).read_bytes() == (plain / rel).read_bytes(), rel
+    assert materialize_run(logged) == {"files": 0, "bytes": 0}  # already plain
@@ -0,0 +1,118 @@
+"""
+Unit tests for orchestrator/run_plan.py and run-plan execution in run_pipeline
+
+Tests cover:
+- run_pipeline honours config_path; the plan is persisted and recorded in the manifest
+- Provider instances are built once per provider/model and templates read once per step
+- A resumed run executes the persisted plan even after config and prompts change (--replan recompiles)
+- The compiled plan is read-only and round-trips through run_plan.json
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.providers.base import BaseProvider
+from orchestrator.root_agent import run_pipeline
+from orchestrator.run_artifacts import read_checkpoint
+from orchestrator.run_plan import RUN_PLAN_FILENAME, compile_run_plan, read_run_plan, write_run_plan
+
+
+class _Provider(BaseProvider):
+    def __init__(self, calls):
+        self.calls = calls
+
+    def run(self, prompt):
+        self.calls.append(prompt.split()[1])
+        return json.dumps({
+            "deliverable_markdown": f"# {prompt.split()[1]}\n" + "content " * 10,
+            "updated_state": {},
+            "open_questions": [],
+        })
+
+
+@pytest.fixture
+def env(course, monkeypatch):
+    tmp_path, inputs = course.tmp_path, course.inputs
+    config = course.config(phase_gates=[2])
+    config_path = course.write_config(phase_gates=[2], filename="custom_config.json")
+    monkeypatch.setenv("AUTO_APPROVE", "1")
+
+    class Env:
+        pass
+
+    e = Env()
+    e.tmp_path, e.config, e.config_path, e.inputs = tmp_path, config, config_path, inputs
+    e.calls, e.built = [], []
+
+    def factory(provider_name, model=None):
+        e.built.append((provider_name, model))
+        return _Provider(e.calls)
+
+    def run(run_dir, **kwargs):
+        # CONFIG_PATH points at a missing file: only config_path may be read
+        with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "missing.json"), \
+             patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+             patch("orchestrator.root_agent.get_provider", side_effect=factory):
+            run_pipeline(config_path=str(config_path), run_dir=str(run_dir), inputs_dir=str(inputs), **kwargs)
+
+    e.run = run
+    return e
+
+
+def test_config_path_honoured_and_plan_persisted(env):
+    run_dir = env.tmp_path / "outputs" / "run"
+    env.run(run_dir)
+
+    assert env.calls == ["agent1", "agent2", "agent3"]
+    manifest = json.loads((run_dir / "run_manifest.json").read_text())
+    assert manifest["status"] == "completed"
+    plan = read_run_plan(run_dir)
+    assert manifest["plan_hash"] == plan.plan_hash
+    assert plan.config_path == str(env.config_path)
+    assert [s.gated for s in plan.steps] == [False, True, False]
+
+
+def test_providers_built_once_and_templates_read_once(env):
+    with patch("orchestrator.root_agent.load_text", wraps=lambda p: open(p).read()) as load_text:
+        env.run(env.tmp_path / "outputs" / "run")
+
+    assert env.built == [("openai", None)]  # one instance shared by all three steps
+    template_reads = [c.args[0] for c in load_text.call_args_list if c.args[0].endswith(".md")
+                      and "prompt" in c.args[0]]
+    assert sorted(template_reads) == sorted(a["prompt_path"] for a in env.config["agents"])
+
+
+def test_resume_uses_persisted_plan(env):
+    run_dir = env.tmp_path / "outputs" / "run"
+    env.run(run_dir, max_step=1)
+    state = read_checkpoint(run_dir / "checkpoints", 1)
+
+    # Config and prompts change after the run started
+    env.config["agents"] = env.config["agents"][:2]
+    env.config_path.write_text(json.dumps(env.config))
+    (env.tmp_path / "prompt3.md").write_text("Prompt changed {business_brief}")
+
+    env.run(run_dir, start_step=2, initial_state=state)
+    assert env.calls == ["agent1", "agent2", "agent3"]  # agent3 kept, old template rendered
+
+    env.calls.clear()
+    env.run(run_dir, start_step=2, initial_state=state, replan=True)
+    assert env.calls == ["agent2"]
+
+
+def test_plan_is_read_only_and_round_trips(env, tmp_path):
+    plan = compile_run_plan(env.config, str(env.config_path), provider_env="dry_run")
+    assert [t["provider"] for s in plan.steps for t in s.tiers] == ["dry_run"] * 3
+    with pytest.raises(TypeError):
+        plan.steps[0].agent["name"] = "other"
+    with pytest.raises(AttributeError):
+        plan.steps[0].template = "other"
+
+    write_run_plan(tmp_path, plan)
+    (env.tmp_path / "prompt1.md").unlink()  # persisted plan does not touch prompt files
+    loaded = read_run_plan(tmp_path)
+    assert loaded.plan_hash == plan.plan_hash
+    assert loaded.steps[0].template == "Prompt agent1 {business_brief}"
+    assert (tmp_path / RUN_PLAN_FILENAME).exists()
@@ -0,0 +1,213 @@
+"""
+Unit tests for the course-factory service (orchestrator/service, orchestrator/file_cache.py)
+
+Tests cover:
+- JobQueue priority ordering, cancellation of queued and finished jobs
+- file_cache returns cached text and reloads on change
+- End to end: submit inline inputs over HTTP, workers run the job, artifacts are listed and fetched;
+  prompts stay in the file cache, the job's inputs do not
+- Cancelling a running job stops it before its next step (status "cancelled")
+- Gated jobs park as awaiting_approval (approval queue backend); approving requeues the job
+  and a worker completes it, rejecting aborts it
+- Cancelling a parked job cancels its run and closes its pending approval request
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator import file_cache
+from orchestrator.approval_queue import ApprovalQueue, apply_decision
+from orchestrator.providers.base import BaseProvider
+from orchestrator.service import JobQueue, WorkerPool, make_service_server
+
+
+class _Provider(BaseProvider):
+    def __init__(self, started=None, release=None):
+        self.started = started
+        self.release = release
+
+    def run(self, prompt):
+        agent = prompt.split()[1]
+        if self.release is not None and agent == "agent1":
+            self.started.set()
+            self.release.wait(timeout=5)
+        return json.dumps({
+            "deliverable_markdown": f"# {agent}\n" + "content " * 10,
+            "updated_state": {},
+            "open_questions": [],
+        })
+
+
+def test_job_queue_priority_and_cancel(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    low = queue.submit("inputs", priority=0)
+    high = queue.submit("inputs", priority=5)
+    other = queue.submit("inputs", priority=0)
+
+    assert queue.claim("w1")["job_id"] == high
+    assert queue.cancel(other)["status"] == "cancelled"
+    assert queue.claim("w1")["job_id"] == low
+    assert queue.claim("w1") is None
+
+    queue.finish(low, "completed")
+    with pytest.raises(ValueError):
+        queue.cancel(low)
+    with pytest.raises(KeyError):
+        queue.cancel("job_missing")
+
+
+def test_file_cache_hot_reload(tmp_path):
+    path = tmp_path / "prompt.md"
+    path.write_text("v1")
+    assert file_cache.read_text(path) == "v1"
+
+    path.write_text("version 2")
+    assert file_cache.read_text(path) == "version 2"
+
+
+@pytest.fixture
+def service(course):
+    tmp_path = course.tmp_path
+    approval = {"queue_path": str(tmp_path / "approval_queue.db")}
+    config = course.config(approval=approval)
+    config_path = course.write_config(approval=approval)
+
+    provider = _Provider()
+    queue = JobQueue(str(tmp_path / "jobs" / "jobs.db"))
+    pool = WorkerPool(queue, workers=2, outputs_dir=str(tmp_path / "outputs"), poll_interval=0.05)
+    server = make_service_server(queue, pool, tmp_path / "jobs", port=0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(base + path, data=data, method=method)
+        with urllib.request.urlopen(request) as response:
+            raw = response.read()
+            return json.loads(raw) if response.headers["Content-Type"] == "application/json" else raw
+
+    def wait_for(job_id, statuses, timeout=10):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = call("GET", f"/jobs/{job_id}")
+            if job["status"] in statuses:
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"job {job_id} stuck in {job['status']}")
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+         patch("orchestrator.root_agent.get_provider", side_effect=lambda *a, **k: provider):
+        pool.start()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            yield {"call": call, "wait_for": wait_for, "provider": provider, "config_path": config_path,
+                   "config": config}
+        finally:
+            server.shutdown()
+            server.server_close()
+            pool.stop(timeout=10)
+
+
+INPUTS = {"business_brief": "Brief", "sme_notes": "Notes"}
+
+
+def test_submit_run_and_fetch_artifacts(service):
+    call = service["call"]
+    job = call("POST", "/jobs", dict(INPUTS, priority=3))
+    assert job["status"] in ("queued", "running") and job["priority"] == 3
+
+    done = service["wait_for"](job["job_id"], {"completed", "failed"})
+    assert done["status"] == "completed"
+    assert done["run_status"] == "completed"
+
+    artifacts = call("GET", f"/jobs/{job['job_id']}/artifacts")
+    assert "01_agent1.md" in artifacts and "run_manifest.json" in artifacts
+    assert call("GET", f"/jobs/{job['job_id']}/artifacts/01_agent1.md").startswith(b"# agent1")
+    with pytest.raises(urllib.error.HTTPError) as err:
+        call("GET", f"/jobs/{job['job_id']}/artifacts/..%2F..%2Fjobs%2Fjobs.db")
+    assert err.value.code == 404
+    assert call("GET", "/health")["jobs"]["completed"] == 1
+
+    cached = list(file_cache._text_cache)
+    assert any(path.endswith("prompt1.md") for path in cached)
+    assert not any(path.endswith(("business_brief.md", "sme_notes.md")) for path in cached)
+
+
+def test_submit_requires_inputs(service):
+    with pytest.raises(urllib.error.HTTPError) as err:
+        service["call"]("POST", "/jobs", {"business_brief": "only one"})
+    assert err.value.code == 400
+
+
+def test_cancel_running_job(service):
+    provider = service["provider"]
+    provider.started, provider.release = threading.Event(), threading.Event()
+    job = service["call"]("POST", "/jobs", INPUTS)
+    assert provider.started.wait(timeout=5)
+
+    assert service["call"]("POST", f"/jobs/{job['job_id']}/cancel")["cancel_requested"] is True
+    provider.release.set()
+
+    done = service["wait_for"](job["job_id"], {"cancelled", "completed", "failed"})
+    assert done["status"] == "cancelled"
+    assert done["run_status"] == "cancelled"
+    assert done["current_step_completed"] == 1
+
+
+def test_gated_job_awaits_approval(service):
+    config = dict(service["config"])
+    config["approval"] = dict(config["approval"], phase_gates=[2])
+    service["config_path"].write_text(json.dumps(config, indent=4))
+
+    job = service["call"]("POST", "/jobs", INPUTS)
+    done = service["wait_for"](job["job_id"], {"awaiting_approval", "completed", "failed"})
+    assert done["status"] == "awaiting_approval"
+    assert done["pending_approval"]["step_idx"] == 2
+
+
+@pytest.mark.parametrize("approved,expected", [(True, "completed"), (False, "aborted")])
+def test_gated_job_resumes_in_the_service(service, approved, expected):
+    config = dict(service["config"])
+    config["approval"] = dict(config["approval"], phase_gates=[2])
+    service["config_path"].write_text(json.dumps(config, indent=4))
+
+    job = service["call"]("POST", "/jobs", INPUTS)
+    parked = service["wait_for"](job["job_id"], {"awaiting_approval", "completed", "failed"})
+    assert parked["status"] == "awaiting_approval"
+
+    approvals = ApprovalQueue(config["approval"]["queue_path"])
+    request_id = parked["pending_approval"]["request_id"]
+    apply_decision(approvals, request_id, approved=approved, actor_id="reviewer")
+
+    done = service["wait_for"](job["job_id"], {"completed", "failed", "aborted"})
+    assert done["status"] == expected and done["run_status"] == expected
+    assert done["attempts"] == (2 if approved else 1)
+    if approved:
+        assert done["current_step_completed"] == 3 and done["resume"]["step_idx"] == 2
+        assert approvals.get(request_id)["status"] == "resumed"
+
+
+def test_cancel_parked_job(service):
+    config = dict(service["config"])
+    config["approval"] = dict(config["approval"], phase_gates=[2])
+    service["config_path"].write_text(json.dumps(config, indent=4))
+
+    job = service["call"]("POST", "/jobs", INPUTS)
+    parked = service["wait_for"](job["job_id"], {"awaiting_approval", "completed", "failed"})
+    assert parked["status"] == "awaiting_approval"
+    request_id = parked["pending_approval"]["request_id"]
+
+    cancelled = service["call"]("POST", f"/jobs/{job['job_id']}/cancel")
+    assert cancelled["status"] == "cancelled" and cancelled["run_status"] == "cancelled"
+    assert cancelled["pending_approval"] is None
+
+    approvals = ApprovalQueue(config["approval"]["queue_path"])
+    assert approvals.get(request_id)["status"] == "cancelled"
+    with pytest.raises(ValueError):
+        apply_decision(approvals, request_id, approved=True, actor_id="reviewer")
@@ -0,0 +1,211 @@
+"""
+Unit tests for orchestrator/providers/singleflight.py
+
+Tests cover:
+- Concurrent identical calls share one provider call and result
+- Different prompts/models produce different keys and independent calls
+- Leader exceptions propagate to every waiting caller
+- A cancelled leader's run does not cancel followers: they retry under their own run
+- Completed calls are not cached
+- Per-agent config overrides the run-level default
+- run_pipeline records dedup info per step in the manifest
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.providers.singleflight import (
+    SingleFlight,
+    SingleFlightProvider,
+    singleflight_enabled,
+    singleflight_key,
+)
+from orchestrator.run_control import CancelToken, Deadline, RunCancelledError, RunControl, check_run_control, run_control
+
+
+class _BlockingProvider:
+    """Provider whose run() blocks until released, counting real calls."""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.release = threading.Event()
+        self.error = error
+        self._lock = threading.Lock()
+
+    def run(self, prompt):
+        with self._lock:
+            self.calls += 1
+        self.release.wait(timeout=5)
+        if self.error:
+            raise self.error
+        return f"response for {prompt}"
+
+
+def _run_concurrently(group, inner, n, prompt="same prompt"):
+    results, errors, wrappers = [], [], []
+    threads = []
+
+    def worker():
+        wrapper = SingleFlightProvider(inner, "mock", group=group)
+        wrappers.append(wrapper)
+        try:
+            results.append(wrapper.run(prompt))
+        except Exception as e:
+            errors.append(e)
+
+    for _ in range(n):
+        t = threading.Thread(target=worker)
+        t.start()
+        threads.append(t)
+
+    # Wait until every follower has joined the leader's in-flight call
+    for _ in range(500):
+        if group.stats["leader_calls"] + group.stats["shared_hits"] == n:
+            break
+        threading.Event().wait(0.01)
+    inner.release.set()
+    for t in threads:
+        t.join(timeout=5)
+    return results, errors, wrappers
+
+
+def test_concurrent_identical_calls_share_one_result():
+    group = SingleFlight()
+    inner = _BlockingProvider()
+
+    results, errors, wrappers = _run_concurrently(group, inner, 4)
+
+    assert errors == []
+    assert inner.calls == 1
+    assert results == ["response for same prompt"] * 4
+    assert group.stats == {"leader_calls": 1, "shared_hits": 3}
+    assert sorted(w.last_shared for w in wrappers) == [False, True, True, True]
+    assert group.in_flight() == 0
+
+
+def test_leader_error_propagates_to_followers():
+    group = SingleFlight()
+    inner = _BlockingProvider(error=RuntimeError("provider down"))
+
+    results, errors, _ = _run_concurrently(group, inner, 3)
+
+    assert results == []
+    assert len(errors) == 3
+    assert all(str(e) == "provider down" for e in errors)
+    assert inner.calls == 1
+
+
+def _wait_for(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        threading.Event().wait(0.01)
+
+
+def test_cancelled_leader_run_does_not_cancel_followers():
+    group = SingleFlight()
+    inner = _BlockingProvider()
+    original_run = inner.run
+
+    def run_checking_control(prompt):
+        result = original_run(prompt)
+        check_run_control()  # as providers do before sending a request
+        return result
+
+    inner.run = run_checking_control
+    tokens = {"a": CancelToken(), "b": CancelToken()}
+    outcomes = {}
+
+    def run(name):
+        control = RunControl(run_deadline=Deadline(None, "Run"), cancel_check=tokens[name])
+        with run_control(control):
+            try:
+                outcomes[name] = SingleFlightProvider(inner, "mock", group=group).run("same prompt")
+            except Exception as e:
+                outcomes[name] = e
+
+    run_a = threading.Thread(target=run, args=("a",))
+    run_a.start()
+    _wait_for(lambda: group.stats["leader_calls"] == 1)
+    run_b = threading.Thread(target=run, args=("b",))
+    run_b.start()
+    _wait_for(lambda: group.stats["shared_hits"] == 1)
+
+    tokens["a"].cancel()
+    inner.release.set()
+    run_a.join(timeout=5)
+    run_b.join(timeout=5)
+
+    assert isinstance(outcomes["a"], RunCancelledError)
+    assert outcomes["b"] == "response for same prompt"
+    assert inner.calls == 2 and group.stats["leader_calls"] == 2
+    assert group.in_flight() == 0
+
+
+def test_completed_calls_are_not_cached():
+    group = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return "x"
+
+    assert group.do("k", fn) == ("x", False)
+    assert group.do("k", fn) == ("x", False)
+    assert len(calls) == 2
+
+
+def test_key_depends_on_provider_model_and_prompt():
+    base = singleflight_key("openai", "p", model="gpt-4o-mini", temperature=0.2)
+    assert base == singleflight_key("openai", "p", model="gpt-4o-mini", temperature=0.2)
+    assert base != singleflight_key("openai", "p2", model="gpt-4o-mini", temperature=0.2)
+    assert base != singleflight_key("openai", "p", model="gpt-4o", temperature=0.2)
+    assert base != singleflight_key("perplexity", "p", model="gpt-4o-mini", temperature=0.2)
+
+
+@pytest.mark.parametrize("config,agent_cfg,expected", [
+    ({}, {}, False),
+    ({"singleflight": {"enabled": True}}, {}, True),
+    ({"singleflight": {"enabled": True}}, {"singleflight": False}, False),
+    ({"singleflight": {"enabled": False}}, {"singleflight": True}, True),
+])
+def test_per_agent_override(config, agent_cfg, expected):
+    assert singleflight_enabled(config, agent_cfg) is expected
+
+
+def test_run_pipeline_records_singleflight_in_manifest(tmp_path, monkeypatch):
+    from orchestrator.root_agent import run_pipeline
+
+    inputs_dir = tmp_path / "inputs"
+    inputs_dir.mkdir()
+    (inputs_dir / "business_brief.md").write_text("Brief " * 50)
+    (inputs_dir / "sme_notes.md").write_text("Notes " * 50)
+    (tmp_path / "prompt.md").write_text("Prompt {business_brief}")
+    config = {
+        "provider": "dry_run",
+        "singleflight": {"enabled": True},
+        "agents": [
+            {"name": "agent1", "prompt_path": str(tmp_path / "prompt.md")},
+            {"name": "agent2", "prompt_path": str(tmp_path / "prompt.md"), "singleflight": False},
+        ],
+        "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+        "validation": {"min_deliverable_chars": 10},
+    }
+    config_path = tmp_path / "run_config.json"
+    config_path.write_text(json.dumps(config))
+    monkeypatch.delenv("PROVIDER", raising=False)
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.OUTPUTS_DIR", str(tmp_path / "outputs")), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")):
+        run_pipeline(config_path=str(config_path), inputs_dir=str(inputs_dir))
+
+    run_dir = next((tmp_path / "outputs").iterdir())
+    manifest = json.loads((run_dir / "run_manifest.json").read_text())
+
+    assert manifest["singleflight"]["dedup_hits"] == 0
+    assert list(manifest["singleflight"]["steps"]) == ["1"]
+    assert manifest["singleflight"]["steps"]["1"]["shared"] is False
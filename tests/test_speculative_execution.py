@@ -0,0 +1,176 @@
+"""
+Unit tests for speculative execution while an approval gate is pending
+
+Tests cover:
+- gate_requires_human mirrors approval_gate mode selection
+- Approved gate: next step runs during the gate, its staged result is committed
+  without a second provider call, and recorded in the manifest and ledger
+- Rejected gate: staged work is discarded, nothing is written to the run dir,
+  and the spent work is logged in the ledger
+- A failed speculative step simply runs normally after approval
+- Speculative steps run under the run's RunControl (cancellation stops them)
+- A call still in flight when the gate is rejected records nothing on the run
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.approval_handler import gate_requires_human
+from orchestrator.providers.base import BaseProvider
+from orchestrator.run_control import CancelToken, Deadline, RunControl, check_run_control, current_control, run_control
+from orchestrator.speculative import STAGING_DIRNAME, SpeculativeRun
+
+
+def _response(agent):
+    return json.dumps({
+        "deliverable_markdown": f"# {agent}\n" + "content " * 10,
+        "updated_state": {"notes": {agent: True}},
+        "open_questions": [],
+    })
+
+
+class _RecordingProvider(BaseProvider):
+    """Answers per agent (from the prompt text); optionally fails an agent's first call."""
+
+    def __init__(self, calls, speculated, fail_first=()):
+        self.calls = calls
+        self.speculated = speculated
+        self.fail_first = fail_first
+
+    def run(self, prompt):
+        agent = prompt.split()[1]
+        self.calls.append(agent)
+        if agent == "agent2":
+            self.speculated.set()
+        if agent in self.fail_first and self.calls.count(agent) == 1:
+            return "not json"
+        return _response(agent)
+
+
+def _run(course, answer, fail_first=()):
+    from orchestrator.root_agent import run_pipeline
+
+    tmp_path = course.tmp_path
+    config_path = course.write_config(phase_gates=[1], speculation={"enabled": True, "max_steps": 1})
+
+    calls = []
+    speculated = threading.Event()
+    calls_at_gate = []
+
+    def fake_input(prompt_text):
+        speculated.wait(timeout=5)
+        calls_at_gate.extend(calls)
+        return answer
+
+    ledger_path = tmp_path / "ledger.jsonl"
+    run_dir = tmp_path / "outputs" / "run1"
+    provider = _RecordingProvider(calls, speculated, fail_first)
+    with patch("orchestrator.root_agent.CONFIG_PATH", config_path), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(ledger_path)), \
+         patch("orchestrator.root_agent.get_provider", return_value=provider), \
+         patch("builtins.input", side_effect=fake_input):
+        try:
+            run_pipeline(run_dir=str(run_dir), inputs_dir=str(course.inputs))
+        finally:
+            events = [json.loads(line) for line in ledger_path.read_text().splitlines()]
+    return calls, calls_at_gate, run_dir, events
+
+
+def test_gate_requires_human(monkeypatch):
+    monkeypatch.delenv("AUTO_APPROVE", raising=False)
+    monkeypatch.delenv("CI_SIMULATE_MANUAL_RISK_APPROVAL", raising=False)
+    assert gate_requires_human("phase_gate")
+
+    monkeypatch.setenv("AUTO_APPROVE", "1")
+    assert not gate_requires_human("phase_gate")
+    assert gate_requires_human("risk_gate", {"risk_auto_override": False})
+
+
+def test_approved_gate_commits_speculative_step(course):
+    calls, calls_at_gate, run_dir, events = _run(course, "APPROVE")
+
+    assert calls_at_gate == ["agent1", "agent2"]
+    assert calls == ["agent1", "agent2", "agent3"]
+    manifest = json.loads((run_dir / "run_manifest.json").read_text())
+    assert manifest["status"] == "completed"
+    assert manifest["speculative_steps"] == [2]
+    assert (run_dir / "02_agent2.md").read_text().startswith("# agent2")
+    assert (run_dir / "checkpoints" / "step_02_state.json").exists()
+    assert not (run_dir / STAGING_DIRNAME).exists()
+
+    committed = [e for e in events if e["event"] == "speculation_committed"]
+    assert committed[0]["gate_step"] == 1 and committed[0]["steps"] == [2]
+
+
+def test_rejected_gate_discards_speculative_step(course):
+    with pytest.raises(SystemExit):
+        _run(course, "no")
+
+    run_dir = course.tmp_path / "outputs" / "run1"
+    events = [json.loads(line) for line in (course.tmp_path / "ledger.jsonl").read_text().splitlines()]
+    assert not (run_dir / "02_agent2.md").exists()
+    assert not (run_dir / STAGING_DIRNAME).exists()
+    assert json.loads((run_dir / "run_manifest.json").read_text())["status"] == "aborted"
+
+    discarded = [e for e in events if e["event"] == "speculation_discarded"]
+    assert discarded[0]["gate_step"] == 1
+    assert discarded[0]["steps_attempted"] == 1
+    assert "elapsed_seconds" in discarded[0]
+
+
+def test_failed_speculation_reruns_step_after_approval(course):
+    calls, _, run_dir, events = _run(course, "APPROVE", fail_first=("agent2",))
+
+    assert calls.count("agent2") == 2
+    committed = [e for e in events if e["event"] == "speculation_committed"]
+    assert committed[0]["steps"] == [] and committed[0]["error"]
+    manifest = json.loads((run_dir / "run_manifest.json").read_text())
+    assert manifest["status"] == "completed"
+    assert "speculative_steps" not in manifest
+
+
+def test_speculative_steps_run_under_the_run_control(tmp_path):
+    token = CancelToken()
+    control = RunControl(run_deadline=Deadline(None, "Run"), cancel_check=token)
+    seen = []
+
+    def step_fn(step_idx, agent_cfg, state, record):
+        seen.append(current_control())
+        check_run_control()
+        return {"parsed": json.loads(_response(agent_cfg["name"])), "usage": None}
+
+    steps = [(2, {"name": "agent2"}), (3, {"name": "agent3"})]
+    with run_control(control):
+        token.cancel()
+        speculation = SpeculativeRun(str(tmp_path), 1, steps, {}, step_fn, lambda a, b: {**a, **b}).start()
+    results, summary = speculation.commit()
+
+    assert seen == [control]
+    assert results == {} and summary["steps_attempted"] == 1
+    assert "cancelled" in summary["error"]
+
+
+def test_nothing_recorded_after_discard(tmp_path):
+    in_flight, respond = threading.Event(), threading.Event()
+    recorded, record_results = [], []
+
+    def step_fn(step_idx, agent_cfg, state, record):
+        in_flight.set()
+        respond.wait(timeout=5)  # the provider call outlives the gate
+        record_results.append(record(lambda: recorded.append(step_idx)))
+        return {"parsed": json.loads(_response(agent_cfg["name"])), "usage": {"total_tokens": 10}}
+
+    speculation = SpeculativeRun(str(tmp_path), 1, [(2, {"name": "agent2"})], {}, step_fn, lambda a, b: {**a, **b})
+    speculation.start()
+    assert in_flight.wait(timeout=5)
+    summary = speculation.discard()
+    respond.set()
+    speculation._thread.join(timeout=5)
+
+    assert summary["in_flight"] is True and summary["steps_attempted"] == 1
+    assert record_results == [False] and recorded == []
+    assert speculation.results == {} and speculation.usage is None
+    assert not (tmp_path / STAGING_DIRNAME).exists()
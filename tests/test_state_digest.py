@@ -0,0 +1,207 @@
+"""
+Unit tests for orchestrator/state_digest.py and digest-fed steps in run_pipeline
+
+Tests cover:
+- Digest is deterministic, fits its token budget and lowers detail on the largest sections first
+- Objective coverage (question IDs per objective, uncovered objectives, orphan refs)
+- full_sections are verbatim; digest_rules validation; the shipped config leaves digests off
+- On-demand expansion: the agent's expand_sections reply re-sends the prompt with the section in full
+- A request after max_expansions gets one final attempt with the full state
+- The prompt-size reduction is recorded per step in the manifest
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.providers.base import BaseProvider
+from orchestrator.state_digest import (
+    DigestRules,
+    build_state_digest,
+    digest_rules,
+    estimate_tokens,
+    expansion_requested,
+    objective_coverage,
+    render_digest,
+    requested_sections,
+)
+
+
+def _state(modules=6, screens_per_module=5):
+    curriculum = {"modules": [
+        {"module_id": f"M{m}", "title": f"Module {m}", "objectives": [f"Objective {m}.{i}" for i in (1, 2)],
+         "key_concepts": ["a", "b", "c"]}
+        for m in range(1, modules + 1)
+    ]}
+    questions = [
+        {"q_id": n, "module_id": f"M{m}", "objective_ref": f"Objective {m}.1", "stem": "Stem " * 40}
+        for n, m in enumerate(range(1, modules + 1), start=1)
+    ]
+    questions.append({"q_id": 99, "module_id": "M1", "objective_ref": "Objective that does not exist"})
+    storyboards = [
+        {"module_id": f"M{m}", "screen_id": s, "narration": "Narration text " * 60, "alt_text": "Alt " * 10}
+        for m in range(1, modules + 1) for s in range(1, screens_per_module + 1)
+    ]
+    return {
+        "inputs": {"business_brief": "Brief " * 200, "sme_notes": "Notes " * 200},
+        "strategy": {"wiifm": "Why it matters " * 20},
+        "curriculum": curriculum,
+        "assessment": {"questions": questions},
+        "storyboards": storyboards,
+        "qa": {"status": "PASS"},
+        "course_title": "Course",
+    }
+
+
+def test_digest_fits_budget_and_is_deterministic():
+    state = _state()
+    rules = DigestRules(budget_tokens=500)
+    digest = build_state_digest(state, rules)
+
+    assert estimate_tokens(render_digest(digest)) <= 500
+    assert estimate_tokens(render_digest(digest)) < estimate_tokens(json.dumps(state, indent=2)) / 5
+    assert render_digest(build_state_digest(state, rules)) == render_digest(digest)
+
+    sections = digest["sections"]
+    assert sections["storyboards"]["detail"] != "detail"  # the largest section was reduced first
+    assert sections["course_title"]["detail"] == "detail"
+    assert sections["storyboards"]["chars"] == len(json.dumps(state["storyboards"], indent=2))
+    assert "summary" not in sections["inputs"]  # carried by {business_brief}/{sme_notes}
+
+    generous = build_state_digest(state, DigestRules(budget_tokens=50000))
+    assert all(s.get("detail", "detail") == "detail" for s in generous["sections"].values())
+    assert generous["sections"]["storyboards"]["summary"]["count"] == 30
+
+
+def test_objective_coverage():
+    coverage = objective_coverage(_state(modules=2))
+    assert coverage["objectives"] == 4
+    assert coverage["questions"] == 3
+    assert coverage["covered"] == 2
+    assert coverage["uncovered"] == ["Objective 1.2", "Objective 2.2"]
+    assert coverage["orphan_refs"] == ["Objective that does not exist"]
+    assert coverage["by_objective"][0] == {"module_id": "M1", "objective": "Objective 1.1", "q_ids": [1]}
+
+
+def test_full_sections_and_rules():
+    state = _state()
+    digest = build_state_digest(state, DigestRules(budget_tokens=500, full_sections=("qa",)), expand=["strategy"])
+    assert digest["sections"]["qa"]["full"] == {"status": "PASS"}
+    assert digest["sections"]["strategy"]["full"] == state["strategy"]
+
+    assert digest_rules({"name": "qa_agent"}) is None
+    assert digest_rules({"name": "qa_agent", "state_digest": {"enabled": False}}) is None
+    assert digest_rules({"name": "qa_agent", "state_digest": {"budget_tokens": 10}}) == DigestRules(10)
+    with pytest.raises(ValueError):
+        digest_rules({"name": "qa_agent", "state_digest": {"budget_tokens": 0}})
+    with pytest.raises(ValueError):
+        digest_rules({"name": "qa_agent", "state_digest": {"full_sections": "qa"}})
+
+
+def test_shipped_config_leaves_digests_off():
+    config = json.loads((Path(__file__).parent.parent / "config" / "run_config.json").read_text())
+    assert any("state_digest" in agent for agent in config["agents"])
+    assert all(digest_rules(agent) is None for agent in config["agents"])
+
+
+def test_requested_sections():
+    state = _state()
+    assert requested_sections('{"expand_sections": ["storyboards", "nope", "storyboards"]}', state) == ["storyboards"]
+    assert requested_sections('{"expand_sections": ["storyboards"]}', state, already=["storyboards"]) == []
+    assert requested_sections('{"deliverable_markdown": "x", "expand_sections": ["qa"]}', state) == []
+    assert requested_sections("not json", state) == []
+    assert expansion_requested('{"expand_sections": ["storyboards"]}')
+    assert not expansion_requested('{"deliverable_markdown": "x", "expand_sections": ["qa"]}')
+
+
+class _QAProvider(BaseProvider):
+    """agent1 fills the state; qa_agent asks to expand storyboards once, then answers."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def run(self, prompt):
+        self.prompts.append(prompt)
+        agent = prompt.split()[1]
+        state = _state() if agent == "agent1" else {}
+        if agent == "qa_agent" and len(self.prompts) == 2:
+            return json.dumps({"expand_sections": ["storyboards"]})
+        return json.dumps({"deliverable_markdown": f"# {agent}\n" + "content " * 10,
+                           "updated_state": state, "open_questions": []})
+
+
+class _GreedyQAProvider(_QAProvider):
+    """qa_agent keeps asking for storyboards while it is sent a digest."""
+
+    def run(self, prompt):
+        if prompt.split()[1] == "qa_agent" and "sha256" in prompt:
+            self.prompts.append(prompt)
+            return json.dumps({"expand_sections": ["storyboards"]})
+        return super().run(prompt)
+
+
+def _run_qa(tmp_path, monkeypatch, provider):
+    from orchestrator.root_agent import run_pipeline
+
+    agents = []
+    for name in ("agent1", "qa_agent"):
+        (tmp_path / f"{name}.md").write_text(f"Prompt {name} {{system_state}}")
+        agents.append({"name": name, "prompt_path": str(tmp_path / f"{name}.md")})
+    agents[1]["state_digest"] = {"budget_tokens": 1500, "max_expansions": 1}
+    config = {"provider": "openai", "agents": agents,
+              "approval": {"gate_strategy": "per_phase", "phase_gates": []},
+              "validation": {"min_deliverable_chars": 20}}
+    (tmp_path / "run_config.json").write_text(json.dumps(config))
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "business_brief.md").write_text("Brief")
+    (inputs / "sme_notes.md").write_text("Notes")
+    monkeypatch.delenv("PROVIDER", raising=False)
+    run_dir = tmp_path / "outputs" / "run"
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+         patch("orchestrator.root_agent.get_provider", return_value=provider):
+        run_pipeline(run_dir=str(run_dir), inputs_dir=str(inputs))
+    events = [json.loads(line) for line in (tmp_path / "ledger.jsonl").read_text().splitlines()]
+    return json.loads((run_dir / "run_manifest.json").read_text()), events
+
+
+def test_pipeline_expands_on_request_and_traces_reduction(tmp_path, monkeypatch):
+    provider = _QAProvider()
+    manifest, events = _run_qa(tmp_path, monkeypatch, provider)
+
+    first, expanded = provider.prompts[1], provider.prompts[2]
+    assert "expand_sections" in first and "Narration text" not in first
+    assert expanded.count("Narration text") == 30 * 60
+    assert "No further sections can be expanded." in expanded
+
+    assert manifest["status"] == "completed"
+    trace = manifest["state_digest_by_step"]["2"]
+    assert trace["expanded"] == ["storyboards"]
+    assert "full_state" not in trace
+    assert "1" not in manifest["state_digest_by_step"]
+    assert [e["sections"] for e in events if e["event"] == "state_digest_expanded"] == [["storyboards"]]
+
+
+def test_request_after_max_expansions_gets_the_full_state(tmp_path, monkeypatch):
+    provider = _GreedyQAProvider()
+    manifest, events = _run_qa(tmp_path, monkeypatch, provider)
+
+    assert manifest["status"] == "completed"
+    # digest, expanded digest, then the full state
+    qa_prompts = [p for p in provider.prompts if p.split()[1] == "qa_agent"]
+    assert len(qa_prompts) == 3 and "sha256" not in qa_prompts[2]
+    assert manifest["state_digest_by_step"]["2"]["full_state"] is True
+    assert [e["expanded"] for e in events if e["event"] == "state_digest_full_state"] == [["storyboards"]]
+
+
+def test_digest_smaller_than_full_state():
+    from orchestrator.root_agent import prune_system_state
+
+    state = _state()
+    full = json.dumps(prune_system_state(state, "qa_agent"), indent=2)
+    digest = render_digest(build_state_digest(state, DigestRules(budget_tokens=1500)))
+    assert estimate_tokens(digest) <= 1500 < estimate_tokens(full)
@@ -0,0 +1,103 @@
+"""
+Unit tests for orchestrator/providers/synthetic_provider.py
+
+Tests cover:
+- Settings from SYNTHETIC_* environment variables (and rejection of bad values)
+- Agent detection and state extraction from rendered prompts (legacy and digest)
+- A full 10-step run: every output passes validation and the state grows per module
+- One assessment question per pre-computed objective row
+- Same seed -> identical responses; a different seed changes the content
+- Simulated latency never sleeps past the step deadline
+"""
+
+import json
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.providers import SyntheticProvider, get_provider
+from orchestrator.providers.synthetic_provider import SyntheticSettings, detect_agent, extract_state
+from orchestrator.run_control import Deadline, DeadlineExceededError, RunControl, run_control
+from orchestrator.state_digest import DigestRules, build_state_digest, render_digest
+
+PROMPTS_DIR = Path("prompts")
+
+
+def _prompt(agent_dir, state):
+    from orchestrator.root_agent import render_prompt
+
+    template = (PROMPTS_DIR / agent_dir / "prompt.md").read_text()
+    return render_prompt(template, f"{agent_dir}_agent", "Brief", "Notes", state)
+
+
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("SYNTHETIC_MODULES", "9")
+    monkeypatch.setenv("SYNTHETIC_SEED", "3")
+    settings = SyntheticSettings.from_env()
+    assert settings.modules == 9 and settings.seed == 3 and settings.lessons_per_module == 3
+    assert isinstance(get_provider("synthetic"), SyntheticProvider)
+
+    monkeypatch.setenv("SYNTHETIC_LATENCY_MS", "fast")
+    with pytest.raises(ValueError):
+        SyntheticSettings.from_env()
+    monkeypatch.setenv("SYNTHETIC_LATENCY_MS", "0")
+    monkeypatch.setenv("SYNTHETIC_MODULES", "0")
+    with pytest.raises(ValueError):
+        SyntheticSettings.from_env()
+
+
+def test_detect_agent_and_extract_state():
+    state = {"inputs": {}, "curriculum": {"modules": [{"module_id": "M1", "objectives": ["Do X"]}]}}
+    prompt = _prompt("storyboard", state)
+    assert detect_agent(prompt) == "storyboard"
+    assert extract_state(prompt)["curriculum"] == state["curriculum"]
+    assert detect_agent(_prompt("assessment_designer", state)) == "assessment_designer"
+    assert detect_agent("Hello") is None
+
+    digest = render_digest(build_state_digest(state, DigestRules()))
+    assert "_digest" in extract_state(f"# QA Agent\n{digest}\nReturn JSON.")
+
+
+def test_full_run_outputs_are_valid_and_state_grows(tmp_path, monkeypatch):
+    from orchestrator.root_agent import run_pipeline
+
+    monkeypatch.setenv("AUTO_APPROVE", "1")
+    monkeypatch.setenv("PROVIDER", "synthetic")
+    monkeypatch.setenv("SYNTHETIC_MODULES", "8")
+    run_dir = tmp_path / "run"
+    with patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")):
+        run_pipeline(run_dir=str(run_dir), inputs_dir="tests/fixtures/golden_run")
+
+    manifest = json.loads((run_dir / "run_manifest.json").read_text())
+    assert manifest["status"] == "completed"
+    state = json.loads((run_dir / "99_final_state.json").read_text())
+    modules = state["curriculum"]["modules"]
+    assert [m["module_id"] for m in modules] == [f"M{i}" for i in range(1, 9)]
+    assert len(state["module_designs"]) == 8
+    assert [q["objective_ref"] for q in state["assessment"]["questions"]] == [
+        o for m in modules for o in m["objectives"]
+    ]
+    assert len(state["storyboards"]) == 8
+    assert len(state["media_spec"]["media_assets"]) == 8
+    assert len(state["qa"]["findings"]) == 8  # read from the qa agent's state digest
+    assert len(state["ops_metadata"]["asset_catalog"]) == 24
+
+
+def test_seed_determinism():
+    state = {"inputs": {}, "curriculum": {"modules": [{"module_id": "M1", "title": "T", "objectives": ["Do X"]}]}}
+    prompt = _prompt("instructional_designer", state)
+    first = SyntheticProvider(SyntheticSettings(seed=1)).run(prompt)
+    assert SyntheticProvider(SyntheticSettings(seed=1)).run(prompt) == first
+    assert SyntheticProvider(SyntheticSettings(seed=2)).run(prompt) != first
+
+
+def test_latency_respects_step_deadline():
+    provider = SyntheticProvider(SyntheticSettings(latency_ms=5000))
+    control = RunControl(run_deadline=Deadline(None, "Run"))
+    control.start_step("Step 1 (strategy_lead_agent)", 0.05)
+    started = time.monotonic()
+    with run_control(control), pytest.raises(DeadlineExceededError):
+        provider.run("# Strategy Lead Agent\n")
+    assert time.monotonic() - started < 1
@@ -0,0 +1,205 @@
+"""
+Unit tests for orchestrator/tenants.py and tenant-aware scheduling in the service job queue
+
+Tests cover:
+- Tenant settings validation and tenant id checks
+- Weighted-fair claim order across tenants (equal and unequal weights; priority within a tenant)
+- An idle tenant re-joins at the current virtual time instead of catching up
+- Per-tenant running-job caps and token quotas (remaining quota reported on claim)
+- Batch tenant meters share a tenant's quota and charge the batch meter
+- Concurrent service jobs of one tenant on two nodes share its token quota
+- Workers draining two tenants with the synthetic provider: tenant-tagged manifests,
+  recorded tokens and per-tenant stats
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from orchestrator.providers.base import BaseProvider
+from orchestrator.service import JobQueue, WorkerPool
+from orchestrator.tenants import (
+    TenantPolicy,
+    TenantSettings,
+    tenant_meters,
+    tenant_settings,
+    validate_tenant_id,
+)
+from orchestrator.usage import UsageMeter
+
+
+def _drain(queue, worker="w1"):
+    order = []
+    while (job := queue.claim(worker)) is not None:
+        order.append(job["tenant_id"])
+        queue.finish(job["job_id"], "completed")
+    return order
+
+
+def test_tenant_settings_validation():
+    assert tenant_settings({}) == TenantSettings()
+    settings = tenant_settings({"tenants": {"policies": {"sales": {"weight": 2, "max_concurrent": 1}}}})
+    assert settings.policy("sales") == TenantPolicy(weight=2.0, max_concurrent=1)
+    assert settings.policy("hr") == TenantPolicy()
+
+    with pytest.raises(ValueError):
+        tenant_settings({"tenants": {"policies": {"sales": {"weight": 0}}}})
+    with pytest.raises(ValueError):
+        tenant_settings({"tenants": {"default": {"token_quota": -1}}})
+    with pytest.raises(ValueError):
+        tenant_settings({"tenants": {"policies": {"bad id": {}}}})
+    with pytest.raises(ValueError):
+        validate_tenant_id("../etc")
+
+
+def test_weighted_fair_claim_order(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    for _ in range(6):
+        queue.submit("inputs", tenant_id="alpha")
+    urgent = queue.submit("inputs", tenant_id="alpha", priority=5)
+    for _ in range(2):
+        queue.submit("inputs", tenant_id="beta")
+
+    first = queue.claim("w1")
+    assert first["job_id"] == urgent  # priority still orders jobs within a tenant
+    queue.finish(first["job_id"], "completed")
+    assert _drain(queue) == ["beta", "alpha", "beta"] + ["alpha"] * 5
+
+    weighted = JobQueue(str(tmp_path / "weighted.db"),
+                        tenants=TenantSettings(policies={"beta": TenantPolicy(weight=2)}))
+    for _ in range(4):
+        weighted.submit("inputs", tenant_id="alpha")
+        weighted.submit("inputs", tenant_id="beta")
+    assert _drain(weighted) == ["alpha", "beta", "beta", "alpha", "beta", "beta", "alpha", "alpha"]
+
+
+def test_idle_tenant_does_not_catch_up(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    for _ in range(4):
+        queue.submit("inputs", tenant_id="alpha")
+    assert _drain(queue) == ["alpha"] * 4
+
+    for _ in range(3):
+        queue.submit("inputs", tenant_id="alpha")
+        queue.submit("inputs", tenant_id="beta")
+    assert _drain(queue) == ["beta", "alpha"] * 3  # not four beta jobs in a row
+
+
+def test_concurrency_cap_and_token_quota(tmp_path):
+    settings = TenantSettings(policies={"alpha": TenantPolicy(max_concurrent=1, token_quota=1000)})
+    queue = JobQueue(str(tmp_path / "jobs.db"), tenants=settings)
+    for _ in range(3):
+        queue.submit("inputs", tenant_id="alpha")
+    queue.submit("inputs", tenant_id="beta")
+
+    running = queue.claim("w1")
+    assert running["tenant_id"] == "alpha" and running["token_quota_remaining"] == 1000
+    other = queue.claim("w2")
+    assert other["tenant_id"] == "beta" and other["token_quota_remaining"] is None
+    assert queue.claim("w3") is None  # alpha is at its running-job cap
+
+    queue.finish(running["job_id"], "completed", total_tokens=600)
+    second = queue.claim("w1")
+    assert second["tenant_id"] == "alpha" and second["token_quota_remaining"] == 400
+    queue.finish(second["job_id"], "completed", total_tokens=500)
+    assert queue.claim("w1") is None  # quota used up for the window
+    assert queue.tokens_used() == {"alpha": 1100}
+
+    stats = queue.tenant_stats()
+    assert stats["alpha"]["jobs"] == {"completed": 2, "queued": 1}
+    assert stats["alpha"]["tokens_used"] == 1100 and stats["alpha"]["token_quota"] == 1000
+    assert stats["beta"]["jobs"] == {"running": 1}
+    assert stats["alpha"]["queue_wait_seconds_max"] >= 0
+
+
+def test_batch_tenant_meters():
+    batch = UsageMeter(max_tokens=10_000, label="batch")
+    settings = TenantSettings(policies={"alpha": TenantPolicy(token_quota=100)})
+    meters = tenant_meters(settings, ["alpha", "alpha", "beta"], parent=batch)
+    assert meters["beta"] is batch
+    meters["alpha"].charge(80, None)
+    assert batch.snapshot()["tokens"] == 80
+    assert "tenant alpha quota" in meters["alpha"].exceeded_by(30, None)
+    assert tenant_meters(TenantSettings(), ["alpha"]) == {}
+
+
+class _MeteredProvider(BaseProvider):
+    """Reports 500 tokens per call; the first calls wait until both runs are in flight."""
+
+    def __init__(self):
+        self.both_running = threading.Barrier(2, timeout=5)
+
+    def run(self, prompt):
+        agent = prompt.split()[1]
+        if agent == "agent1":
+            self.both_running.wait()
+        self.last_usage = {"prompt_tokens": 400, "completion_tokens": 100, "total_tokens": 500}
+        return json.dumps({
+            "deliverable_markdown": f"# {agent}\n" + "content " * 10,
+            "updated_state": {},
+            "open_questions": [],
+        })
+
+
+def test_jobs_on_two_nodes_share_tenant_quota(course):
+    tmp_path = course.tmp_path
+    # Each call reserves ~505 tokens (prompt + completion reserve) and books 500
+    course.write_config(budget={"reserve_completion_tokens": 500})
+
+    # Each run needs 1500 tokens; the tenant may spend 2020 in all
+    settings = TenantSettings(policies={"alpha": TenantPolicy(token_quota=2020)})
+    queue = JobQueue(str(tmp_path / "jobs.db"), tenants=settings)
+    jobs = [queue.submit(str(course.inputs), tenant_id="alpha") for _ in range(2)]
+    provider = _MeteredProvider()
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+         patch("orchestrator.root_agent.get_provider", side_effect=lambda *a, **k: provider):
+        # Two nodes: their own queue handle on the shared jobs.db, one worker each
+        pools = [
+            WorkerPool(JobQueue(str(tmp_path / "jobs.db"), tenants=settings), workers=1,
+                       outputs_dir=str(tmp_path / "outputs"), poll_interval=0, worker_prefix=node)
+            for node in ("node-a:1", "node-b:2")
+        ]
+        for pool in pools:
+            pool.start(exit_when_idle=True)
+        for pool in pools:
+            pool.join(timeout=60)
+
+    finished = [queue.get(job_id) for job_id in jobs]
+    assert {job["worker_id"].split(":")[0] for job in finished} == {"node-a", "node-b"}
+    assert "failed" in {job["status"] for job in finished}  # budget_exceeded
+    assert sum(job["total_tokens"] for job in finished) == 2000
+    assert all(job["tokens_reserved"] == 0 for job in finished)
+    assert queue.tokens_used() == {"alpha": 2000}
+
+
+def test_workers_tag_runs_and_report_per_tenant(tmp_path, monkeypatch):
+    config = json.loads(open("config/run_config.json").read())
+    config["approval"] = {"gate_strategy": "per_phase", "phase_gates": [], "backend": "queue",
+                          "queue_path": str(tmp_path / "approval_queue.db")}
+    (tmp_path / "run_config.json").write_text(json.dumps(config))
+    monkeypatch.setenv("PROVIDER", "synthetic")
+    monkeypatch.setenv("SYNTHETIC_MODULES", "2")
+
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    jobs = [queue.submit("tests/fixtures/golden_run", tenant_id=t) for t in ("alpha", "alpha", "alpha", "beta")]
+
+    with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+         patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")):
+        pool = WorkerPool(queue, workers=1, outputs_dir=str(tmp_path / "outputs"), poll_interval=0)
+        pool.start(exit_when_idle=True).join(timeout=120)
+
+    finished = {job_id: queue.get(job_id) for job_id in jobs}
+    assert all(job["status"] == "completed" and job["total_tokens"] > 0 for job in finished.values())
+    started = sorted(finished.values(), key=lambda job: job["started_at"])
+    assert [job["tenant_id"] for job in started] == ["alpha", "beta", "alpha", "alpha"]
+    manifest = json.loads((tmp_path / "outputs" / jobs[3] / "run_manifest.json").read_text())
+    assert manifest["tenant_id"] == "beta"
+
+    stats = queue.tenant_stats()
+    assert stats["alpha"]["jobs"] == {"completed": 3} and stats["beta"]["jobs"] == {"completed": 1}
+    assert stats["alpha"]["tokens_used"] == sum(finished[j]["total_tokens"] for j in jobs[:3])
+    assert stats["beta"]["queue_wait_seconds_avg"] <= stats["alpha"]["queue_wait_seconds_max"]
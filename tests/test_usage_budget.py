@@ -0,0 +1,193 @@
+"""
+Unit tests for orchestrator/usage.py and usage accounting in run_pipeline
+
+Tests cover:
+- Price table and budget validation; call cost with cached-token pricing
+- OpenAI provider records every HTTP request (repair included) with latency and usage
+- Per-call records, per-step lists and run totals in the manifest and audit summary
+- A run budget stops the run before the overspending call (status budget_exceeded)
+- on_exceed "downgrade" keeps a cascade step on its cheaper tier
+- A batch meter is charged by every run that shares it
+- Offline plan estimate
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from orchestrator.providers.base import BaseProvider
+from orchestrator.usage import (
+    BudgetSettings,
+    UsageMeter,
+    budget_settings,
+    call_record,
+    estimate_plan_usage,
+    price_table,
+    usage_cost,
+)
+
+PRICING = {
+    "default_models": {"openai": "small"},
+    "models": {
+        "small": {"input_per_1m": 1.0, "cached_input_per_1m": 0.5, "output_per_1m": 2.0},
+        "large": {"input_per_1m": 10.0, "output_per_1m": 20.0},
+    },
+}
+
+
+def test_price_table_and_cost():
+    prices = price_table({"pricing": PRICING})
+    usage = {"prompt_tokens": 1000, "cached_tokens": 400, "completion_tokens": 500, "total_tokens": 1500}
+    assert prices.model_for("openai", None) == "small"
+    assert usage_cost(usage, prices.price_for("openai", None)) == pytest.approx((600 + 200 + 1000) / 1e6)
+    assert usage_cost(usage, prices.price_for("openai", "large")) == pytest.approx((10000 + 10000) / 1e6)
+    assert usage_cost(usage, prices.price_for("dry_run", None)) is None
+
+    record = call_record("request", "dry_run", None, None, 12, prices, prompt_chars=400, response_chars=80)
+    assert record["estimated"] and record["prompt_tokens"] == 100 and record["completion_tokens"] == 20
+    assert record["cost_usd"] is None
+
+    with pytest.raises(ValueError):
+        price_table({"pricing": {"models": {"x": {"input_per_1m": -1, "output_per_1m": 1}}}})
+    with pytest.raises(ValueError):
+        budget_settings({"budget": {"on_exceed": "panic"}})
+    with pytest.raises(ValueError):
+        budget_settings({"budget": {"max_run_tokens": "lots"}})
+    assert budget_settings({}) == BudgetSettings()
+
+
+def test_meter_checks_parent():
+    batch = UsageMeter(max_tokens=1000, label="batch")
+    run_a, run_b = UsageMeter(parent=batch), UsageMeter(parent=batch)
+    run_a.charge(700, 0.1)
+    assert run_b.exceeded_by(200, None) is None
+    assert "batch token budget" in run_b.exceeded_by(400, None)
+    assert batch.snapshot()["tokens"] == 700
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+@patch("orchestrator.providers.openai_provider.urllib.request.urlopen")
+def test_openai_records_requests_including_repair(mock_urlopen):
+    from orchestrator.providers.openai_provider import OpenAIProvider
+
+    def response(content, prompt_tokens):
+        ctx = MagicMock()
+        ctx.__enter__.return_value.read.return_value = json.dumps({
+            "choices": [{"message": {"content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 5, "total_tokens": prompt_tokens + 5},
+        }).encode("utf-8")
+        return ctx
+
+    mock_urlopen.side_effect = [response("{broken", 100), response('{"ok": true}', 150)]
+    provider = OpenAIProvider()
+    assert provider.run("prompt") == '{"ok": true}'
+    assert [r["kind"] for r in provider.last_requests] == ["request", "repair"]
+    assert all(isinstance(r["latency_ms"], int) for r in provider.last_requests)
+    assert provider.last_usage["prompt_tokens"] == 250
+
+
+class _Provider(BaseProvider):
+    """Reports 1000 prompt / 200 completion tokens per call; output never passes scenario_density."""
+
+    def __init__(self, calls, model=None):
+        self.calls = calls
+        self.model = model
+
+    def run(self, prompt):
+        agent = prompt.split()[1]
+        self.calls.append((agent, self.model))
+        self.last_usage = {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200, "cached_tokens": 0}
+        return json.dumps({"deliverable_markdown": f"# {agent}\n" + "content " * 10,
+                           "updated_state": {}, "open_questions": []})
+
+
+@pytest.fixture
+def env(course):
+    tmp_path, inputs = course.tmp_path, course.inputs
+
+    class Env:
+        pass
+
+    e = Env()
+    e.tmp_path, e.agents, e.calls = tmp_path, course.agents, []
+
+    def run(run_dir, config_extra=None, **kwargs):
+        course.write_config(pricing=PRICING, **(config_extra or {}))
+        with patch("orchestrator.root_agent.CONFIG_PATH", tmp_path / "run_config.json"), \
+             patch("orchestrator.root_agent.LEDGER_PATH", str(tmp_path / "ledger.jsonl")), \
+             patch("orchestrator.root_agent.get_provider",
+                   side_effect=lambda name, model=None: _Provider(e.calls, model)):
+            from orchestrator.root_agent import run_pipeline
+            run_pipeline(run_dir=str(run_dir), inputs_dir=str(inputs), **kwargs)
+        return json.loads((run_dir / "run_manifest.json").read_text())
+
+    e.run = run
+    return e
+
+
+def test_usage_recorded_per_call_step_and_run(env):
+    run_dir = env.tmp_path / "outputs" / "run"
+    manifest = env.run(run_dir)
+
+    assert manifest["status"] == "completed"
+    call = manifest["usage_calls_by_step"]["1"][0]
+    assert call["kind"] == "request" and call["model"] == "small" and not call["estimated"]
+    assert call["cost_usd"] == pytest.approx((1000 * 1.0 + 200 * 2.0) / 1e6)
+    totals = manifest["usage_totals"]
+    assert totals["calls"] == 3 and totals["total_tokens"] == 3600
+    assert totals["cost_usd"] == pytest.approx(3 * call["cost_usd"])
+    summary = json.loads((run_dir / "audit_summary.json").read_text())
+    assert summary["usage_summary"]["total_tokens"] == 3600
+
+
+def test_run_budget_stops_before_overspending(env):
+    run_dir = env.tmp_path / "outputs" / "run"
+    with pytest.raises(SystemExit):
+        env.run(run_dir, {"budget": {"max_run_tokens": 2500, "reserve_completion_tokens": 200}})
+
+    manifest = json.loads((run_dir / "run_manifest.json").read_text())
+    assert manifest["status"] == "budget_exceeded"
+    assert manifest["current_step_completed"] == 2
+    assert [agent for agent, _ in env.calls] == ["agent1", "agent2"]  # agent3 was never called
+    assert manifest["usage_totals"]["total_tokens"] == 2400
+    events = [json.loads(line) for line in (env.tmp_path / "ledger.jsonl").read_text().splitlines()]
+    assert any(e["event"] == "run_budget_exceeded" and "run token budget" in e["reason"] for e in events)
+
+
+def test_downgrade_keeps_cascade_on_cheaper_tier(env):
+    env.agents[0]["model_cascade"] = {
+        "tiers": [{"model": "small"}, {"model": "large"}],
+        "quality_checks": ["scenario_density"],
+    }
+    budget = {"max_run_cost_usd": 0.01, "on_exceed": "downgrade"}
+    manifest = env.run(env.tmp_path / "outputs" / "run", {"budget": budget})
+
+    assert manifest["status"] == "completed"
+    assert ("agent1", "large") not in env.calls
+    assert manifest["budget_downgrades"] == [{"step_idx": 1, "tier": 1}]
+
+    env.calls.clear()
+    manifest = env.run(env.tmp_path / "outputs" / "run2")
+    assert ("agent1", "large") in env.calls  # no budget: the cascade escalates as usual
+
+
+def test_batch_meter_shared_across_runs(env):
+    batch = UsageMeter(max_tokens=5000, label="batch")
+    env.run(env.tmp_path / "outputs" / "a", usage_meter=batch)
+    assert batch.snapshot()["tokens"] == 3600
+    with pytest.raises(SystemExit):
+        env.run(env.tmp_path / "outputs" / "b", usage_meter=batch)
+    manifest = json.loads((env.tmp_path / "outputs" / "b" / "run_manifest.json").read_text())
+    assert manifest["status"] == "budget_exceeded"
+    assert batch.snapshot()["tokens"] <= 5000
+
+
+def test_estimate_plan_usage():
+    prices = price_table({"pricing": PRICING})
+    steps = [{"template_chars": 400, "provider": "openai", "model": None}] * 2
+    estimate = estimate_plan_usage(steps, prices, base_prompt_chars=400, completion_tokens=100)
+    # step 1: 200 prompt + 100 completion; step 2: 200 + 100 (state) prompt + 100 completion
+    assert estimate["total_tokens"] == 700
+    assert estimate["cost_usd"] == pytest.approx(round((500 * 1.0 + 200 * 2.0) / 1e6, 4))
@@ -1,7 +1,5 @@
 import json
 import os
-import jsonschema
-from jsonschema import Draft202012Validator
 
 def validate_instance(instance, schema_filename):
     """
@@ -15,6 +13,10 @@ def validate_instance(instance, schema_filename):
         ValidationError: If the instance is invalid, with a descriptive message.
         FileNotFoundError: If the schema file does not exist.
     """
+    # Deferred: jsonschema costs ~100 ms to import and most CLI paths never validate
+    import jsonschema
+    from jsonschema import Draft202012Validator
+
     # Locate schema directory relative to project root
     # Assumptions: this file is in utils/schema_validator.py
     # Project root is ../